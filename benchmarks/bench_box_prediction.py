@@ -0,0 +1,88 @@
+"""Measure how far the displayed crosshair trails a moving target per prediction mode.
+
+A synthetic target moves along a smooth path with occasional sharp turns.
+Telemetry reports its box at --rate Hz with receive jitter and measurement
+noise. Frames are captured at --fps, and each one asks BoxPredictor for the
+box at its capture time. The error is the distance between the predicted
+and the true box center. Dividing the mean error by the mean target speed
+gives the latency the crosshair appears to have.
+
+    python benchmarks/bench_box_prediction.py
+    python benchmarks/bench_box_prediction.py --rate 10 --fps 60 --noise 2 --output box.json
+"""
+import argparse
+import json
+
+import numpy as np
+
+from common import LAYOUTS, use_layout
+
+
+def target_path(t, seed):
+    """Return the true (cx, cy) of the target at times t, in pixels."""
+    rng = np.random.default_rng(seed)
+    phases = rng.uniform(0, 2 * np.pi, 4)
+    cx = 400 + 180 * np.sin(0.6 * t + phases[0]) + 60 * np.sin(1.9 * t + phases[1])
+    cy = 240 + 90 * np.sin(0.45 * t + phases[2]) + 40 * np.sign(np.sin(0.35 * t + phases[3]))
+    return cx, cy
+
+
+def run(mode, rate, fps, noise, jitter, duration, seed):
+    from box_predictor import BoxPredictor
+
+    rng = np.random.default_rng(seed + 1)
+    sample_times = np.arange(0, duration, 1.0 / rate)
+    sample_times = sample_times + rng.uniform(-jitter, jitter, len(sample_times))
+    sample_cx, sample_cy = target_path(sample_times, seed)
+    sample_cx = sample_cx + rng.normal(0, noise, len(sample_times))
+    sample_cy = sample_cy + rng.normal(0, noise, len(sample_times))
+    frame_times = np.arange(1.0, duration, 1.0 / fps)  # After the filter settles
+    true_cx, true_cy = target_path(frame_times, seed)
+
+    predictor = BoxPredictor(mode)
+    errors = np.empty(len(frame_times))
+    next_sample = 0
+    for index, t in enumerate(frame_times):
+        while next_sample < len(sample_times) and sample_times[next_sample] <= t:
+            predictor.update((sample_cx[next_sample] - 40, sample_cy[next_sample] - 30, 80, 60),
+                             sample_times[next_sample])
+            next_sample += 1
+        x, y, w, h = predictor.predict(t)
+        errors[index] = np.hypot(x + w / 2 - true_cx[index], y + h / 2 - true_cy[index])
+    speed = np.hypot(np.diff(true_cx), np.diff(true_cy)).mean() * fps
+    return {"mode": mode, "mean_px": float(errors.mean()),
+            "p50_px": float(np.percentile(errors, 50)),
+            "p95_px": float(np.percentile(errors, 95)),
+            "p99_px": float(np.percentile(errors, 99)),
+            "apparent_latency_ms": float(1000 * errors.mean() / speed),
+            "target_speed_px_s": float(speed)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layout", choices=LAYOUTS, default=LAYOUTS[0])
+    parser.add_argument("--rate", type=float, default=10.0, help="Telemetry samples per second")
+    parser.add_argument("--fps", type=float, default=30.0, help="Displayed frames per second")
+    parser.add_argument("--noise", type=float, default=1.0, help="Box measurement noise, px")
+    parser.add_argument("--jitter", type=float, default=0.01, help="Sample arrival jitter, s")
+    parser.add_argument("--duration", type=float, default=60.0, help="Simulated seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+    use_layout(args.layout)
+    from box_predictor import MODES
+
+    results = []
+    for mode in MODES:
+        result = run(mode, args.rate, args.fps, args.noise, args.jitter, args.duration, args.seed)
+        results.append(result)
+        print(f"{mode:12s} error mean {result['mean_px']:6.1f}  p50 {result['p50_px']:6.1f}  "
+              f"p95 {result['p95_px']:6.1f}  p99 {result['p99_px']:6.1f} px  "
+              f"apparent latency {result['apparent_latency_ms']:6.1f} ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Measure the on-box detector's throughput and capture-to-result latency.
+
+Frames from a pattern:// source are offered to ObjectDetector at the
+source rate, as the capture thread would, and the results are received
+through the Qt event loop like VideoWidget receives them. Each CPU budget
+runs with a fresh pool. It reports:
+- detections per second, and how many frames were skipped for busy
+  workers or for the budget;
+- inference CPU time and capture-to-result latency percentiles;
+- the distance between the detected box center and the pattern's bar,
+  as a check that the boxes come back in sensor pixels.
+
+    python benchmarks/bench_detector.py
+    python benchmarks/bench_detector.py --resolution 1920x1080 --budget 0.25 --budget 1 --workers 2
+"""
+import argparse
+import json
+import threading
+import time
+
+import numpy as np
+
+from common import LAYOUTS, make_app, use_layout
+
+
+def run(args, budget):
+    import cv2
+    from object_detector import ObjectDetector
+    from video_source import open_source
+
+    app = make_app()
+    source = open_source(f"pattern://{args.resolution}?fps={args.fps:g}")
+    detector = ObjectDetector(args.kind, args.model, None, args.size, args.workers, budget)
+    latencies = []
+    errors = []
+
+    def received(detection):
+        if detection is None:
+            return
+        latencies.append(time.monotonic() - detection["captured_at"])
+        # The bar of frame n starts at n * bar_width // 4, see PatternSource.render
+        bar_x = detection["frame_id"] * source.bar_width // 4 % source.width
+        center_x = detection["x"] + detection["w"] / 2
+        errors.append(abs(center_x - (bar_x + source.bar_width / 2)))
+
+    def capture():
+        # The source blocks until each frame is due, so it gets its own thread like VideoThread
+        image = None
+        start = time.monotonic()
+        while time.monotonic() - start < args.duration:
+            frame_id = int(source.get(cv2.CAP_PROP_POS_FRAMES))  # Index of the frame read next
+            ret, image = source.read(image)
+            detector.offer(image, time.monotonic(), frame_id)
+
+    detector.detection_ready.connect(received)
+    detector.start()
+    try:
+        capture_thread = threading.Thread(target=capture, name="bench-capture")
+        capture_thread.start()
+        while capture_thread.is_alive():
+            app.processEvents()
+            time.sleep(0.001)
+        deadline = time.monotonic() + 1.0
+        while detector.completed + detector.failed < detector.submitted and time.monotonic() < deadline:
+            app.processEvents()
+            time.sleep(0.005)
+        app.processEvents()
+    finally:
+        detector.stop()
+    stats = detector.stats()
+    stats["budget"] = budget
+    stats["delivered_ms"] = {f"p{p}": float(1000 * np.percentile(latencies, p))
+                             for p in (50, 95, 99)} if latencies else {}
+    stats["bar_error_px"] = float(np.median(errors)) if errors else None
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layout", choices=LAYOUTS, default=LAYOUTS[0])
+    parser.add_argument("--resolution", default="1280x720", help="Pattern frame size, WxH")
+    parser.add_argument("--fps", type=float, default=30.0, help="Source frame rate")
+    parser.add_argument("--kind", default="motion", help="Detector kind, see object_detector.KINDS")
+    parser.add_argument("--model", help="Model file for --kind dnn")
+    parser.add_argument("--size", type=int, default=320, help="Longest side frames are detected at")
+    parser.add_argument("--workers", type=int, default=1, help="Detector processes, dnn only; motion always runs one")
+    parser.add_argument("--budget", type=float, action="append",
+                        help="CPU budget in cores; repeat for several (default: 0.1 0.25 1)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds measured per budget")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+    use_layout(args.layout)
+
+    results = []
+    for budget in args.budget or [0.1, 0.25, 1.0]:
+        result = run(args, budget)
+        results.append(result)
+        inference = result.get("inference_ms", {})
+        delivered = result["delivered_ms"]
+        error = result["bar_error_px"]
+        print(f"budget {budget:4.2f}  {result['rate']:5.1f} det/s  "
+              f"submitted {result['submitted']}/{result['offered']} "
+              f"(busy {result['busy']}, over budget {result['over_budget']})  "
+              f"inference p50 {inference.get('p50', 0):5.1f} ms  "
+              f"latency p50/p95/p99 {delivered.get('p50', 0):5.1f} {delivered.get('p95', 0):5.1f} "
+              f"{delivered.get('p99', 0):5.1f} ms  "
+              f"bar error {'-' if error is None else f'{error:.1f} px'}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
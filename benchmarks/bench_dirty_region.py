@@ -0,0 +1,87 @@
+"""Count the pixels each telemetry tick repaints.
+
+Drives MainWindow.update_parameters() with the data timer stopped and
+records the region of every paint event on the gauges and the video widget.
+"before" is what a bare update() repaints (the full widget for every paint);
+"after" is the region that was actually painted.
+
+    python benchmarks/bench_dirty_region.py --layout 10inch --ticks 200
+"""
+import argparse
+import json
+
+from common import LAYOUTS, WINDOW_SIZES, make_app, use_layout
+
+
+def region_area(region):
+    return sum(rect.width() * rect.height() for rect in region.rects())
+
+
+def run(layout, ticks):
+    use_layout(layout)
+    app = make_app()
+    from PyQt5.QtCore import QObject, QEvent
+    from main_window import MainWindow
+
+    class PaintCounter(QObject):
+        def __init__(self):
+            super().__init__()
+            self.full = 0
+            self.dirty = 0
+            self.paints = 0
+
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                self.paints += 1
+                self.full += obj.width() * obj.height()
+                self.dirty += region_area(event.region())
+            return False
+
+    window = MainWindow()
+    window.data_timer.stop()
+    window.main_win.resize(*WINDOW_SIZES[layout])
+    window.show()
+    app.processEvents()
+
+    widgets = {"radian_picker": window.radian_picker,
+               "circle_picker": window.circle_picker}
+    if window.video_widget and not window.video_widget.surface:
+        widgets["video_widget"] = window.video_widget
+    counters = {}
+    for name, widget in widgets.items():
+        counters[name] = PaintCounter()
+        widget.installEventFilter(counters[name])
+
+    for _ in range(ticks):
+        window.update_parameters()
+        app.processEvents()
+
+    result = {"layout": layout, "ticks": ticks, "widgets": {}}
+    for name, counter in counters.items():
+        result["widgets"][name] = {
+            "paints": counter.paints,
+            "before_px_per_tick": counter.full / ticks,
+            "after_px_per_tick": counter.dirty / ticks,
+        }
+    if window.video_widget and window.video_widget.video_thread:
+        window.video_widget.video_thread.stop()
+        window.video_widget.video_thread.wait(2000)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layout", choices=LAYOUTS, default="10inch")
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+    result = run(args.layout, args.ticks)
+    for name, stats in result["widgets"].items():
+        before, after = stats["before_px_per_tick"], stats["after_px_per_tick"]
+        saved = 100.0 * (1 - after / before) if before else 0.0
+        print(f"{name:14s} before {before:10.0f} px/tick  after {after:10.0f} px/tick  "
+              f"({saved:.1f}% less)")
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Measure FrameBus throughput with 1-4 reader processes.
+
+A writer publishes pattern:// frames into a FrameBus as fast as it can
+(or at --fps) while N spawned reader processes follow it with their own
+cursors. The readers take zero-copy views by default, or private copies
+with --copy, and sample a pixel of every frame. For each reader count it
+reports:
+- frames published per second and the publish (copy-in) cost;
+- frames each reader got per second, and how many it missed because the
+  writer lapped it or tore a frame it was reading;
+- the publish-to-read latency percentiles.
+
+    python benchmarks/bench_frame_bus.py
+    python benchmarks/bench_frame_bus.py --resolution 1920x1080 --fps 30 --readers 4 --copy
+"""
+import argparse
+import json
+import multiprocessing
+import time
+
+import numpy as np
+
+from common import LAYOUTS, use_layout
+
+
+def read_frames(layout, name, copy, ready, done, results):
+    """Reader process: follow the bus until done is set, then report its counters."""
+    use_layout(layout)
+    from frame_bus import FrameBusReader
+
+    reader = FrameBusReader(name)
+    latencies = []
+    ready.set()
+    start = time.monotonic()
+    while not done.is_set():
+        frame = reader.read(copy)
+        if frame is None:
+            time.sleep(0.0005)
+            continue
+        image, seq, frame_id, timestamp = frame
+        image[0, 0, 0]  # Touch the frame as a consumer would
+        latencies.append(time.monotonic() - timestamp)
+        frame = image = None
+    elapsed = time.monotonic() - start
+    stats = reader.stats()
+    reader.close()
+    stats["fps"] = stats["read"] / elapsed
+    stats["latency_ms"] = {f"p{p}": float(1000 * np.percentile(latencies, p))
+                           for p in (50, 95, 99)} if latencies else {}
+    results.put(stats)
+
+
+def run(args, readers):
+    import cv2
+    from frame_bus import FrameBus
+    from video_source import open_source
+
+    width, height = (int(value) for value in args.resolution.split("x"))
+    source = open_source(f"pattern://{args.resolution}?fps={args.fps:g}")
+    bus = FrameBus(slots=args.slots, max_frame=(width, height))
+    context = multiprocessing.get_context("spawn")
+    done = context.Event()
+    results = context.Queue()
+    ready = [context.Event() for _ in range(readers)]
+    processes = [context.Process(target=read_frames,
+                                 args=(args.layout, bus.name, args.copy, event, done, results))
+                 for event in ready]
+    try:
+        for process in processes:
+            process.start()
+        for event in ready:
+            event.wait(30)
+        costs = []
+        image = None
+        start = time.monotonic()
+        while time.monotonic() - start < args.duration:
+            ret, image = source.read(image)
+            publish_start = time.perf_counter()
+            bus.publish(image, time.monotonic(), int(source.get(cv2.CAP_PROP_POS_FRAMES)))
+            costs.append(time.perf_counter() - publish_start)
+        elapsed = time.monotonic() - start
+        done.set()
+        reader_stats = [results.get(timeout=30) for _ in processes]
+        for process in processes:
+            process.join()
+    finally:
+        done.set()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        bus.close()
+    return {"readers": readers, "published": bus.seq, "fps": bus.seq / elapsed,
+            "publish_ms_p50": float(1000 * np.median(costs)),
+            "reader_fps": [stats["fps"] for stats in reader_stats],
+            "missed": sum(stats["missed"] for stats in reader_stats),
+            "torn": sum(stats["torn"] for stats in reader_stats),
+            "latency_ms": reader_stats[0]["latency_ms"], "reader_stats": reader_stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layout", choices=LAYOUTS, default=LAYOUTS[0])
+    parser.add_argument("--resolution", default="1280x720", help="Pattern frame size, WxH")
+    parser.add_argument("--fps", type=float, default=0.0,
+                        help="Source frame rate; 0 publishes as fast as possible")
+    parser.add_argument("--slots", type=int, default=8, help="Frames held by the bus")
+    parser.add_argument("--readers", type=int, action="append",
+                        help="Reader process count; repeat for several (default: 1 2 3 4)")
+    parser.add_argument("--copy", action="store_true", help="Readers copy frames out")
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds measured per case")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+    use_layout(args.layout)
+
+    results = []
+    for readers in args.readers or [1, 2, 3, 4]:
+        result = run(args, readers)
+        results.append(result)
+        latency = result["latency_ms"]
+        print(f"{readers} reader(s)  published {result['fps']:6.1f} fps "
+              f"({result['publish_ms_p50']:.2f} ms each)  "
+              f"read {min(result['reader_fps']):6.1f}-{max(result['reader_fps']):6.1f} fps  "
+              f"missed {result['missed']}  torn {result['torn']}  "
+              f"latency p50/p95/p99 {latency.get('p50', 0):5.2f} {latency.get('p95', 0):5.2f} "
+              f"{latency.get('p99', 0):5.2f} ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""End-to-end capture-to-paint benchmark of MainWindow on a synthetic camera.
+
+Runs the real MainWindow of each layout offscreen at 480p, 1080p and 4K
+from a decode-free source: a pattern:// generator, or with --source raw a
+memory-mapped raw:// replay of recorded pattern frames. Each case runs in
+its own process (each layout is a separate app with same-named modules).
+After a warm-up it reports:
+- sustained displayed fps;
+- the per-stage frame latency percentiles from the widget's PipelineStats;
+- GUI event loop lag, seen by a 10 ms timer;
+- process CPU time per displayed frame.
+
+--output writes the results as JSON. --baseline compares against an
+earlier file and exits with status 1 when a case regressed by more than
+--tolerance.
+
+    python benchmarks/bench_pipeline.py --output results.json
+    python benchmarks/bench_pipeline.py --layout 7inch --resolution 1080p --duration 3
+    python benchmarks/bench_pipeline.py --baseline results.json
+    python benchmarks/bench_pipeline.py --source raw --fps 0
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import LAYOUTS, ROOT, WINDOW_SIZES, make_app, use_layout
+
+RESOLUTIONS = {"480p": (640, 480), "1080p": (1920, 1080), "4K": (3840, 2160)}
+# Metric -> True when a larger value is better; used by --baseline
+REGRESSION_METRICS = {"fps": True, "latency_p95_ms": False, "cpu_ms_per_frame": False,
+                      "loop_lag_p99_ms": False}
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run_case(layout, resolution, source, duration, warmup):
+    """Run one layout/resolution in this process and return its result dict."""
+    use_layout(layout)
+    os.environ["VIDEO_SOURCES"] = source
+    app = make_app()
+    from PyQt5.QtCore import QTimer
+    from main_window import MainWindow
+
+    window = MainWindow()
+    window.main_win.resize(*WINDOW_SIZES[layout])
+    window.show()
+    widget = window.video_widget
+
+    lags = []
+    last_tick = [time.monotonic()]
+
+    def tick():
+        now = time.monotonic()
+        lags.append(max(0.0, now - last_tick[0] - 0.010))
+        last_tick[0] = now
+    lag_timer = QTimer()
+    lag_timer.timeout.connect(tick)
+    lag_timer.start(10)
+
+    start = {}
+
+    def begin_measuring():
+        widget.pipeline.clear()
+        lags.clear()
+        start.update(widget.frame_stats(), cpu=time.process_time(), wall=time.monotonic())
+    QTimer.singleShot(int(warmup * 1000), begin_measuring)
+    QTimer.singleShot(int((warmup + duration) * 1000), app.quit)
+    app.exec_()
+
+    wall = time.monotonic() - start["wall"]
+    cpu = time.process_time() - start["cpu"]
+    counters = widget.frame_stats()
+    displayed = counters["displayed"] - start["displayed"]
+    summary = widget.pipeline.summary()
+    widget.video_thread.stop()
+    widget.video_thread.wait(2000)
+    return {
+        "layout": layout,
+        "resolution": resolution,
+        "source": source,
+        "duration_s": wall,
+        "fps": displayed / wall,
+        "produced": counters["produced"] - start["produced"],
+        "displayed": displayed,
+        "dropped": counters["dropped"] - start["dropped"],
+        "latency_ms": summary["stages"],
+        "latency_p95_ms": summary["stages"].get("total", {}).get("p95", 0.0),
+        "loop_lag_ms": {"p50": 1000 * percentile(lags, 0.5),
+                        "p99": 1000 * percentile(lags, 0.99),
+                        "max": 1000 * max(lags, default=0.0)},
+        "loop_lag_p99_ms": 1000 * percentile(lags, 0.99),
+        "cpu_ms_per_frame": 1000 * cpu / displayed if displayed else 0.0,
+        "cpu_percent": 100 * cpu / wall,
+    }
+
+
+def make_sources(kind, resolutions, fps, raw_frames, directory):
+    """Return {resolution: VIDEO_SOURCES value}, recording raw replay files if asked to."""
+    sources = {}
+    for resolution in resolutions:
+        width, height = RESOLUTIONS[resolution]
+        pattern = f"pattern://{width}x{height}?fps={fps:g}"
+        if kind == "pattern":
+            sources[resolution] = pattern
+            continue
+        use_layout(LAYOUTS[0])
+        from video_source import record_raw
+        path = os.path.join(directory, f"{resolution}.raw")
+        record_raw(f"pattern://{width}x{height}?fps=0", path, raw_frames, fps or 30.0)
+        sources[resolution] = f"raw://{path}?fps={fps:g}"
+    return sources
+
+
+def run_in_subprocess(layout, resolution, source, args):
+    """Run one case in a fresh interpreter and return its result dict."""
+    command = [sys.executable, os.path.abspath(__file__), "--case", "--case-source", source,
+               "--layout", layout, "--resolution", resolution,
+               "--duration", str(args.duration), "--warmup", str(args.warmup)]
+    output = subprocess.run(command, stdout=subprocess.PIPE, check=True,
+                            universal_newlines=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def environment():
+    """Describe what produced the results, so files from different versions can be compared."""
+    import cv2
+    import numpy
+    from PyQt5.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+    try:
+        revision = subprocess.run(["git", "-C", ROOT, "rev-parse", "--short", "HEAD"],
+                                  stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                  universal_newlines=True).stdout.strip()
+    except OSError:
+        revision = ""
+    return {"revision": revision, "python": platform.python_version(),
+            "qt": QT_VERSION_STR, "pyqt": PYQT_VERSION_STR, "opencv": cv2.__version__,
+            "numpy": numpy.__version__, "machine": platform.machine(),
+            "cpu_count": os.cpu_count(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def compare(results, baseline, tolerance):
+    """Return a line for every metric that got worse than baseline by more than tolerance."""
+    previous = {(case["layout"], case["resolution"]): case for case in baseline["results"]}
+    regressions = []
+    for case in results:
+        old = previous.get((case["layout"], case["resolution"]))
+        if old is None:
+            continue
+        for metric, higher_is_better in REGRESSION_METRICS.items():
+            before, after = old[metric], case[metric]
+            if not before:
+                continue
+            change = (after - before) / before
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{case['layout']} {case['resolution']} {metric}: "
+                                   f"{before:.2f} -> {after:.2f} ({100 * change:+.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layout", choices=LAYOUTS, action="append",
+                        help="Layout to run; repeat for several (default: all)")
+    parser.add_argument("--resolution", choices=RESOLUTIONS, action="append",
+                        help="Source resolution; repeat for several (default: all)")
+    parser.add_argument("--source", choices=("pattern", "raw"), default="pattern",
+                        help="Generate frames, or replay recorded ones from a memory map")
+    parser.add_argument("--fps", type=float, default=30.0,
+                        help="Source frame rate; 0 runs as fast as possible")
+    parser.add_argument("--raw-frames", type=int, default=30,
+                        help="Frames recorded per resolution for --source raw")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds measured per case")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Seconds ignored per case")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Earlier --output file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Relative change counted as a regression")
+    parser.add_argument("--case", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--case-source", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    layouts = args.layout or list(LAYOUTS)
+    resolutions = args.resolution or list(RESOLUTIONS)
+
+    if args.case:
+        print(json.dumps(run_case(layouts[0], resolutions[0], args.case_source,
+                                  args.duration, args.warmup)))
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        sources = make_sources(args.source, resolutions, args.fps, args.raw_frames, directory)
+        for layout in layouts:
+            for resolution in resolutions:
+                case = run_in_subprocess(layout, resolution, sources[resolution], args)
+                results.append(case)
+                total = case["latency_ms"].get("total", {})
+                print(f"{layout:6s} {resolution:5s}  {case['fps']:5.1f} fps  "
+                      f"latency p50/p95/p99 {total.get('p50', 0):6.1f} {total.get('p95', 0):6.1f} "
+                      f"{total.get('p99', 0):6.1f} ms  loop lag p99 {case['loop_lag_p99_ms']:5.1f} ms  "
+                      f"cpu {case['cpu_ms_per_frame']:5.1f} ms/frame  dropped {case['dropped']}")
+    report = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+    else:
+        print(json.dumps(report))
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Time one value update of a readout: the old QTextEdit against NumericReadout.
+
+Both widgets get the style MainWindow gives them and the same sequence of
+values formatted like the telemetry model does. "set" is the setPlainText
+call alone; "set+paint" also forces a synchronous repaint, which is what
+each telemetry tick ends up costing.
+
+    python benchmarks/bench_readout.py --layout 10inch --updates 2000
+"""
+import argparse
+import json
+import random
+import time
+
+from common import LAYOUTS, make_app, use_layout
+
+STYLES = {"7inch": {"size": (70, 30), "font_size": 16, "border": 1},
+          "10inch": {"size": (120, 40), "font_size": 20, "border": 2}}
+
+
+def time_updates(widget, values, paint):
+    start = time.perf_counter()
+    for value in values:
+        widget.setPlainText(value)
+        if paint:
+            widget.repaint()
+    return (time.perf_counter() - start) / len(values)
+
+
+def run(layout, updates):
+    use_layout(layout)
+    app = make_app()
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QTextEdit, QFrame
+    from numeric_readout import NumericReadout
+    from theme_manager import make_palette
+
+    style = STYLES[layout]
+    text_edit = QTextEdit()
+    text_edit.setFrameShape(QFrame.Box)
+    text_edit.setStyleSheet(
+        f"background-color: black; color: yellow; font-size: {style['font_size']}px; "
+        f"font-weight: bold; border: {style['border']}px solid white;")
+    text_edit.setAlignment(Qt.AlignCenter)
+    readout = NumericReadout()
+    readout.setPalette(make_palette(True))
+    readout.set_style(style["font_size"], style["border"])
+
+    random.seed(0)
+    values = [str(round(random.uniform(0, 360), 2)) for _ in range(updates)]
+    result = {"layout": layout, "updates": updates, "us_per_update": {}}
+    for name, widget in (("QTextEdit", text_edit), ("NumericReadout", readout)):
+        widget.resize(*style["size"])
+        widget.show()
+        app.processEvents()
+        time_updates(widget, values[:100], True)  # Warm up caches
+        result["us_per_update"][name] = {
+            "set": 1e6 * time_updates(widget, values, False),
+            "set+paint": 1e6 * time_updates(widget, values, True),
+        }
+        widget.hide()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layout", choices=LAYOUTS, default="10inch")
+    parser.add_argument("--updates", type=int, default=2000)
+    args = parser.parse_args()
+    result = run(args.layout, args.updates)
+    for name, cost in result["us_per_update"].items():
+        print(f"{name:15s} set {cost['set']:8.1f} us  set+paint {cost['set+paint']:8.1f} us")
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Feed MainWindow from the UDP telemetry emitter and check the GUI keeps up.
+
+Starts the stand-in emitter on a thread, points TELEMETRY_SOURCE at it and
+runs the real MainWindow event loop. Reports link counters from
+TelemetryIngest, how many samples reached the GUI, the age of each sample
+when the GUI applied it and the worst event loop stall seen by a 10 ms timer.
+
+    python benchmarks/bench_telemetry.py --layout 7inch --rate 1000 --duration 5
+"""
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+
+from common import LAYOUTS, WINDOW_SIZES, make_app, use_layout
+from telemetry_emitter import emit
+
+
+def free_udp_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run(layout, rate, duration, loss, reorder):
+    use_layout(layout)
+    port = free_udp_port()
+    os.environ["TELEMETRY_SOURCE"] = f"udp://127.0.0.1:{port}"
+    app = make_app()
+    from PyQt5.QtCore import QTimer
+    from main_window import MainWindow
+
+    window = MainWindow()
+    window.main_win.resize(*WINDOW_SIZES[layout])
+    window.show()
+    app.processEvents()
+
+    ages = []
+    take = window.telemetry.take
+
+    def timed_take():
+        sample = take()
+        if sample is not None:
+            ages.append(time.monotonic() - sample["received_at"])
+        return sample
+    window.telemetry.take = timed_take
+
+    stalls = []
+    last_tick = [time.monotonic()]
+
+    def tick():
+        now = time.monotonic()
+        stalls.append(now - last_tick[0] - 0.010)
+        last_tick[0] = now
+    stall_timer = QTimer()
+    stall_timer.timeout.connect(tick)
+    stall_timer.start(10)
+
+    sent = []
+    emitter = threading.Thread(
+        target=lambda: sent.append(emit("127.0.0.1", port, rate, duration, loss, reorder)))
+    QTimer.singleShot(200, emitter.start)  # Let the ingest thread bind first
+    QTimer.singleShot(int((duration + 0.7) * 1000), app.quit)
+    app.exec_()
+    emitter.join()
+    window.stop_telemetry()
+    if window.video_widget and window.video_widget.video_thread:
+        window.video_widget.video_thread.stop()
+        window.video_widget.video_thread.wait(2000)
+
+    return {
+        "layout": layout,
+        "rate_hz": rate,
+        "sent": sent[0] if sent else 0,
+        "link": window.telemetry.stats(),
+        "gui_updates": len(ages),
+        "gui_updates_per_s": len(ages) / duration,
+        "sample_age_ms": {"p50": 1000 * percentile(ages, 0.5),
+                          "p99": 1000 * percentile(ages, 0.99)},
+        "max_stall_ms": 1000 * max(stalls, default=0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layout", choices=LAYOUTS, default="7inch")
+    parser.add_argument("--rate", type=float, default=1000.0)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--loss", type=float, default=0.0)
+    parser.add_argument("--reorder", type=float, default=0.0)
+    args = parser.parse_args()
+    result = run(args.layout, args.rate, args.duration, args.loss, args.reorder)
+    link = result["link"]
+    print(f"sent {result['sent']}  received {link['received']}  lost {link['lost']}  "
+          f"reordered {link['reordered']}  gui updates {result['gui_updates_per_s']:.0f}/s  "
+          f"age p99 {result['sample_age_ms']['p99']:.2f} ms  "
+          f"max stall {result['max_stall_ms']:.1f} ms")
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
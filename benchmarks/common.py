@@ -0,0 +1,32 @@
+"""Shared helpers for the headless benchmarks.
+
+Each layout directory (test_7inch, test_10inch) is a standalone app whose
+modules import each other by bare name, so a benchmark selects one layout
+by putting its directory first on sys.path before importing anything.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAYOUTS = ("7inch", "10inch")
+WINDOW_SIZES = {"7inch": (800, 480), "10inch": (1920, 1200)}
+
+
+def use_layout(layout):
+    """Make the modules of test_<layout> importable and return its directory."""
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout {layout!r}, expected one of {LAYOUTS}")
+    path = os.path.join(ROOT, f"test_{layout}")
+    for other in LAYOUTS:
+        other_path = os.path.join(ROOT, f"test_{other}")
+        if other_path in sys.path:
+            sys.path.remove(other_path)
+    sys.path.insert(0, path)
+    return path
+
+
+def make_app():
+    """Create (or return) a QApplication, offscreen unless a platform is forced."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication(sys.argv[:1])
@@ -0,0 +1,96 @@
+"""Stand-in for the rangefinder/turret controller: send telemetry packets over UDP.
+
+Angles sweep smoothly and the bounding box drifts, so the gauges can be
+watched moving. --loss and --reorder drop or swap packets to exercise the
+sequence tracking of TelemetryIngest.
+
+    TELEMETRY_SOURCE=udp://127.0.0.1:5005 python test_7inch/main_window.py
+    python benchmarks/telemetry_emitter.py --port 5005 --rate 1000
+"""
+import argparse
+import math
+import random
+import socket
+import time
+
+from common import LAYOUTS, use_layout
+
+
+def make_sample(t):
+    """Return a telemetry dict for time t seconds into the run."""
+    return {
+        "distance": 55 + 45 * math.sin(t * 0.2),
+        "elevation_angle": 45 + 45 * math.sin(t * 0.5),
+        "azimuth_angle": (t * 20) % 360,
+        "bounding_box": {
+            "x": int(300 + 200 * math.sin(t)),
+            "y": int(120 + 60 * math.cos(t)),
+            "w": 120,
+            "h": 90,
+        },
+    }
+
+
+def emit(host, port, rate, duration, loss=0.0, reorder=0.0, stop=None):
+    """Send packets at rate Hz for duration seconds; returns the number sent.
+
+    stop is an optional threading.Event that ends the run early.
+    """
+    from telemetry_protocol import encode_packet
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    period = 1.0 / rate
+    start = time.monotonic()
+    deadline = start
+    held = None  # Packet delayed by one slot to simulate reordering
+    sequence = 0
+    sent = 0
+    try:
+        while time.monotonic() - start < duration and not (stop and stop.is_set()):
+            now = time.monotonic()
+            packet = encode_packet(make_sample(now - start), sequence,
+                                   int((now - start) * 1e6))
+            sequence += 1
+            if random.random() < loss:
+                packet = None
+            elif held is None and random.random() < reorder:
+                held, packet = packet, None
+            if packet:
+                sock.sendto(packet, (host, port))
+                sent += 1
+            if held and packet:
+                sock.sendto(held, (host, port))
+                sent += 1
+                held = None
+            deadline += period
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -period:
+                deadline = time.monotonic()  # Fell behind: resync instead of bursting
+    finally:
+        sock.close()
+    return sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layout", choices=LAYOUTS, default="7inch",
+                        help="layout whose telemetry_protocol module is used")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5005)
+    parser.add_argument("--rate", type=float, default=100.0, help="packets per second")
+    parser.add_argument("--duration", type=float, default=float("inf"), help="seconds")
+    parser.add_argument("--loss", type=float, default=0.0, help="fraction of packets dropped")
+    parser.add_argument("--reorder", type=float, default=0.0,
+                        help="fraction of packets sent after their successor")
+    args = parser.parse_args()
+    use_layout(args.layout)
+    try:
+        sent = emit(args.host, args.port, args.rate, args.duration, args.loss, args.reorder)
+    except KeyboardInterrupt:
+        return
+    print(f"sent {sent} packets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import os
+import numpy as np
+from pipeline_stats import PERCENTILES
+
+MODE_OFF = "off"                  # Hiện khung mới nhất đúng như nhận được
+MODE_INTERPOLATE = "interpolate"  # Mượt, chậm sau một chu kỳ mẫu
+MODE_VELOCITY = "velocity"        # Ngoại suy từ hai mẫu cuối
+MODE_KALMAN = "kalman"            # Bộ lọc Kalman vận tốc không đổi
+MODES = (MODE_OFF, MODE_INTERPOLATE, MODE_VELOCITY, MODE_KALMAN)
+# Chế độ mặc định, ví dụ BOX_PREDICTION=off để so sánh
+DEFAULT_MODE = os.environ.get("BOX_PREDICTION", MODE_KALMAN)
+MAX_HORIZON = 0.3      # Số giây tối đa ngoại suy sau mẫu cuối
+RESET_GAP = 1.0        # Sau số giây không có mẫu này, mục tiêu được bắt lại từ đầu
+GATE_DISTANCE = 120.0  # px; mẫu cách dự đoán xa hơn mức này là mục tiêu mới
+PROCESS_NOISE = 2e4    # Mật độ nhiễu gia tốc của Kalman, px^2/s^3
+MEASUREMENT_NOISE = 4.0  # Phương sai đo khung của Kalman, px^2
+INITIAL_VELOCITY_VARIANCE = 1e5  # px^2/s^2, để vận tốc đầu tiên lấy từ dữ liệu
+ERROR_HISTORY = 256    # Số mẫu giữ lại để tính phân vị sai số dự đoán
+
+
+class BoxPredictor:
+    """Dự đoán vị trí khung mục tiêu tại một thời điểm từ các mẫu telemetry thưa.
+
+    Khung được theo dõi qua tâm x, tâm y, rộng và cao, mỗi đại lượng là một
+    cặp vị trí/vận tốc độc lập, nên toàn bộ trạng thái là mảng (2, 4) cùng
+    mảng hiệp phương sai Kalman (3, 4) (p00, p01, p11), và mỗi mẫu chỉ tốn
+    vài phép numpy vector hóa. predict(t) trả về khung cho frame chụp lúc t,
+    không ngoại suy quá MAX_HORIZON sau mẫu cuối. Mỗi mẫu được so với dự
+    đoán của chế độ hiện tại cho thời điểm của nó; stats() báo sai số này,
+    và mẫu lệch quá GATE_DISTANCE sẽ bắt đầu theo dõi lại.
+    """
+    def __init__(self, mode=DEFAULT_MODE):
+        self.mode = mode if mode in MODES else MODE_OFF
+        self.state = np.zeros((2, 4))       # Hàng: giá trị, vận tốc mỗi giây
+        self.covariance = np.zeros((3, 4))  # Hàng: p00, p01, p11
+        self.previous = np.zeros(4)         # Mẫu trước mẫu cuối, dùng để nội suy
+        self.previous_time = None
+        self.last = np.zeros(4)             # Mẫu cuối đúng như nhận được
+        self.last_time = None               # None khi không theo dõi mục tiêu nào
+        self.errors = np.zeros(ERROR_HISTORY)
+        self.error_index = 0
+        self.error_count = 0
+
+    def set_mode(self, mode):
+        """Đổi chế độ dự đoán; trạng thái bộ lọc được giữ nguyên."""
+        if mode in MODES:
+            self.mode = mode
+
+    def reset(self):
+        """Bỏ mục tiêu đang theo dõi."""
+        self.last_time = None
+        self.previous_time = None
+
+    def update(self, box, sample_time):
+        """Thêm một mẫu: khung (x, y, w, h), hoặc None khi mất mục tiêu."""
+        if box is None:
+            self.reset()
+            return
+        x, y, w, h = box
+        measured = np.array([x + w / 2, y + h / 2, w, h], float)
+        if self.last_time is None or sample_time - self.last_time > RESET_GAP:
+            self.start(measured, sample_time)
+            return
+        if sample_time <= self.last_time:
+            return  # Mẫu đến muộn hoặc trùng
+        error = np.hypot(*(measured[:2] - self.predict_center(sample_time)))
+        self.record_error(error)
+        if error > GATE_DISTANCE:
+            # Bộ phát hiện đổi mục tiêu: bước nhảy này không phải vận tốc
+            self.start(measured, sample_time)
+            return
+        dt = sample_time - self.last_time
+        self.correct(measured, dt)
+        self.previous, self.previous_time = self.last, self.last_time
+        self.last, self.last_time = measured, sample_time
+
+    def start(self, measured, sample_time):
+        """Bắt đầu theo dõi tại measured, chưa biết chuyển động."""
+        self.state[0] = measured
+        self.state[1] = 0.0
+        self.covariance[0] = MEASUREMENT_NOISE
+        self.covariance[1] = 0.0
+        self.covariance[2] = INITIAL_VELOCITY_VARIANCE
+        self.previous, self.previous_time = measured, None
+        self.last, self.last_time = measured, sample_time
+
+    def correct(self, measured, dt):
+        """Đưa bộ lọc Kalman tới sau dt rồi cập nhật theo giá trị đo."""
+        value, velocity = self.state
+        p00, p01, p11 = self.covariance
+        q = PROCESS_NOISE
+        value += velocity * dt
+        p00 += dt * (2 * p01 + dt * p11) + q * dt ** 3 / 3
+        p01 += dt * p11 + q * dt ** 2 / 2
+        p11 += q * dt
+        gain0 = p00 / (p00 + MEASUREMENT_NOISE)
+        gain1 = p01 / (p00 + MEASUREMENT_NOISE)
+        residual = measured - value
+        value += gain0 * residual
+        velocity += gain1 * residual
+        p11 -= gain1 * p01
+        p00 *= 1 - gain0
+        p01 *= 1 - gain0
+
+    def estimate(self, t):
+        """Trả về mảng (cx, cy, w, h) mà chế độ hiện tại cho tại thời điểm t."""
+        if self.mode == MODE_OFF or self.previous_time is None:
+            return self.last
+        if self.mode == MODE_INTERPOLATE:
+            interval = self.last_time - self.previous_time
+            fraction = min(1.0, max(0.0, (t - self.last_time) / interval))
+            return self.previous + (self.last - self.previous) * fraction
+        dt = min(MAX_HORIZON, max(-MAX_HORIZON, t - self.last_time))
+        if self.mode == MODE_VELOCITY:
+            interval = self.last_time - self.previous_time
+            return self.last + (self.last - self.previous) * (dt / interval)
+        value, velocity = self.state
+        return value + velocity * dt
+
+    def predict_center(self, t):
+        """Trả về tâm (cx, cy) dự đoán tại thời điểm t."""
+        return self.estimate(t)[:2]
+
+    def predict(self, t):
+        """Trả về khung (x, y, w, h) tại thời điểm t theo pixel nguyên, hoặc None nếu không có mục tiêu."""
+        if self.last_time is None:
+            return None
+        cx, cy, w, h = self.estimate(t)
+        w = max(1.0, w)
+        h = max(1.0, h)
+        return int(round(cx - w / 2)), int(round(cy - h / 2)), int(round(w)), int(round(h))
+
+    def record_error(self, error):
+        """Lưu khoảng cách giữa dự đoán và mẫu đến sau nó."""
+        self.errors[self.error_index] = error
+        self.error_index = (self.error_index + 1) % len(self.errors)
+        self.error_count = min(self.error_count + 1, len(self.errors))
+
+    def stats(self):
+        """Trả về chế độ và sai số tâm p50/p95/p99 theo pixel."""
+        errors = self.errors[:self.error_count]
+        result = {"mode": self.mode, "samples": int(self.error_count)}
+        if len(errors):
+            for p, value in zip(PERCENTILES, np.percentile(errors, PERCENTILES)):
+                result[f"p{p}"] = float(value)
+        return result
+
+    def hud_row(self):
+        """Trả về một hàng HUD: chế độ, rồi các phân vị sai số theo pixel."""
+        stats = self.stats()
+        return [f"box {self.mode}"] + [f"{stats.get(f'p{p}', 0.0):.2f}" for p in PERCENTILES]
@@ -0,0 +1,80 @@
+import random
+
+STATE_CONNECTING = "connecting"      # Đang mở nguồn video
+STATE_STREAMING = "streaming"        # Frame đang về đều
+STATE_DEGRADED = "degraded"          # Đọc frame lỗi nhưng nguồn vẫn mở
+STATE_RECONNECTING = "reconnecting"  # Đã đóng nguồn, chờ mở lại
+
+BACKOFF_INITIAL = 0.5     # Số giây chờ trước lần mở lại đầu tiên
+BACKOFF_MAX = 10.0        # Thời gian chờ tối đa giữa các lần thử
+BACKOFF_FACTOR = 2.0
+BACKOFF_JITTER = 0.25     # Dao động +/- để nhiều camera không thử lại cùng lúc
+DEGRADED_TIMEOUT = 2.0    # Số giây đọc lỗi liên tục trước khi mở lại nguồn
+READ_RETRY_DELAY = 0.05   # Nghỉ giữa các lần đọc lỗi khi suy giảm
+
+
+class CaptureSupervisor:
+    """Máy trạng thái quyết định khi nào đọc lại hoặc mở lại camera bị lỗi."""
+    def __init__(self, backoff_initial=BACKOFF_INITIAL, backoff_max=BACKOFF_MAX,
+                 degraded_timeout=DEGRADED_TIMEOUT):
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.degraded_timeout = degraded_timeout
+        self.state = STATE_CONNECTING
+        self.opens = 0              # Số lần mở; lần đầu mở ngay
+        self.attempts = 0           # Số lần mở lại kể từ frame tốt gần nhất
+        self.degraded_since = None  # Thời điểm monotonic của lần đọc lỗi đầu tiên
+        self.last_error = None      # Thông báo lỗi gần nhất, để không gửi trùng
+
+    def transition(self, state):
+        """Chuyển sang state và trả về nó, hoặc None nếu không đổi."""
+        if state == self.state:
+            return None
+        self.state = state
+        return state
+
+    def frame_read(self):
+        """Ghi nhận frame tốt; nguồn đã phát lại bình thường."""
+        self.attempts = 0
+        self.degraded_since = None
+        self.last_error = None
+        return self.transition(STATE_STREAMING)
+
+    def read_failed(self, now):
+        """Ghi nhận lần đọc lỗi tại thời điểm monotonic now."""
+        if self.degraded_since is None:
+            self.degraded_since = now
+        if self.state == STATE_STREAMING:
+            return self.transition(STATE_DEGRADED)
+        if now - self.degraded_since >= self.degraded_timeout:
+            return self.transition(STATE_RECONNECTING)
+        return None
+
+    def should_reopen(self):
+        """Trả về True khi cần đóng và mở lại camera."""
+        return self.state == STATE_RECONNECTING
+
+    def open_failed(self):
+        """Ghi nhận mở thất bại; sẽ thử lại sau thời gian chờ."""
+        return self.transition(STATE_RECONNECTING)
+
+    def opened(self):
+        """Ghi nhận mở thành công; việc đọc frame quyết định đã phát hay chưa."""
+        self.degraded_since = None
+        return self.transition(STATE_CONNECTING)
+
+    def next_delay(self):
+        """Trả về thời gian chờ tăng theo lũy thừa (có dao động) trước lần mở kế tiếp."""
+        self.opens += 1
+        if self.opens == 1:
+            return 0.0
+        delay = min(self.backoff_max, self.backoff_initial * BACKOFF_FACTOR ** self.attempts)
+        self.attempts += 1
+        return delay * random.uniform(1 - BACKOFF_JITTER, 1 + BACKOFF_JITTER)
+
+    def report_error(self, message):
+        """Trả về True nếu message khác thông báo lỗi gần nhất."""
+        if message == self.last_error:
+            return False
+        self.last_error = message
+        return True
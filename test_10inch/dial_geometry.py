@@ -0,0 +1,13 @@
+import math
+
+TICK_STEP = 15  # Số độ giữa hai vạch trên đồng hồ
+
+# Vector đơn vị (cos, sin) cho các vạch 0, 15, ..., 345 độ
+TICK_VECTORS = tuple((math.cos(math.radians(angle)), math.sin(math.radians(angle)))
+                     for angle in range(0, 360, TICK_STEP))
+
+
+def unit_vector(angle):
+    """Trả về (cos, sin) của góc tính theo độ."""
+    rad_angle = math.radians(angle)
+    return math.cos(rad_angle), math.sin(rad_angle)
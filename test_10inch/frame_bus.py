@@ -0,0 +1,214 @@
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+
+BUS_MAGIC = 0x53554246  # "FBUS"
+DEFAULT_SLOTS = 8       # Số frame bên đọc được phép chậm trước khi bị mất frame
+DEFAULT_MAX_FRAME = (1920, 1080)  # Frame lớn nhất một slot chứa được
+HEADER_BYTES = 64       # Phần đầu bus và slot được đệm để dữ liệu frame luôn căn lề
+# Phần đầu bus: bố cục, rồi số thứ tự của frame mới nhất đã phát
+BUS_HEADER = np.dtype([("magic", "<u4"), ("slots", "<u4"), ("slot_bytes", "<u8"),
+                       ("head", "<u8")])
+# Phần đầu slot: seq bằng 0 khi slot đang được ghi
+SLOT_HEADER = np.dtype([("seq", "<u8"), ("frame_id", "<u8"), ("timestamp", "<f8"),
+                        ("height", "<u4"), ("width", "<u4"), ("channels", "<u4"),
+                        ("stride", "<u4")])
+
+
+def bus_size(slots, slot_bytes):
+    """Trả về kích thước bộ nhớ dùng chung của một bus."""
+    return HEADER_BYTES + slots * (HEADER_BYTES + slot_bytes)
+
+
+def map_bus(buffer):
+    """Trả về các view numpy (phần đầu bus, phần đầu các slot, dữ liệu slot) của bộ nhớ bus."""
+    header = np.ndarray((), BUS_HEADER, buffer)
+    slots = int(header["slots"])
+    slot_bytes = int(header["slot_bytes"])
+    stride = HEADER_BYTES + slot_bytes
+    slot_headers = np.ndarray((slots,), SLOT_HEADER, buffer, HEADER_BYTES, (stride,))
+    data = np.ndarray((slots, slot_bytes), np.uint8, buffer, 2 * HEADER_BYTES, (stride, 1))
+    return header, slot_headers, data
+
+
+class FrameBus:
+    """Vòng frame một bên ghi trong bộ nhớ dùng chung, cho bên đọc ở tiến trình khác.
+
+    Mỗi slot có phần đầu nhỏ (số thứ tự, mã frame, thời điểm chụp, kích
+    thước và bước hàng) rồi tới dữ liệu frame. Khi phát một frame, slot được
+    đánh dấu đang ghi, frame được chép vào, phần đầu được điền, rồi đầu bus
+    mới tiến lên; bên ghi không bao giờ chờ bên đọc. Số thứ tự bắt đầu từ 1
+    và liên tục, nên frame seq nằm ở slot seq % số slot và mỗi bên đọc tự
+    giữ con trỏ của mình, xem FrameBusReader.
+    """
+    def __init__(self, name=None, slots=DEFAULT_SLOTS, max_frame=DEFAULT_MAX_FRAME):
+        slot_bytes = max_frame[0] * max_frame[1] * 3
+        slot_bytes += -slot_bytes % HEADER_BYTES
+        size = bus_size(slots, slot_bytes)
+        try:
+            self.memory = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            # Còn sót lại từ bên ghi không đóng bus, ví dụ sau khi bị lỗi
+            stale = shared_memory.SharedMemory(name)
+            stale.close()
+            stale.unlink()
+            self.memory = shared_memory.SharedMemory(name, create=True, size=size)
+        # close() xóa bus; không để resource tracker quản lý để bên đọc gắn vào
+        # rồi thoát không xóa bus quá sớm
+        resource_tracker.unregister(self.memory._name, "shared_memory")
+        header = np.ndarray((), BUS_HEADER, self.memory.buf)
+        header["slots"] = slots
+        header["slot_bytes"] = slot_bytes
+        header["head"] = 0
+        header["magic"] = BUS_MAGIC
+        header = None
+        self.header, self.slot_headers, self.data = map_bus(self.memory.buf)
+        self.name = self.memory.name
+        self.lock = threading.Lock()  # Không cho close() gỡ bộ nhớ khi đang phát frame
+        self.seq = 0              # Số thứ tự của frame phát gần nhất
+        self.too_large = 0        # Số frame lớn hơn một slot
+
+    def publish(self, image, timestamp, frame_id=0):
+        """Chép frame vào slot kế tiếp và cho bên đọc thấy; trả về seq, 0 nếu không phát."""
+        h, w = image.shape[:2]
+        channels = image.shape[2] if image.ndim == 3 else 1
+        with self.lock:
+            if self.data is None:
+                return 0  # Đã đóng
+            if h * w * channels > self.data.shape[1]:
+                self.too_large += 1
+                return 0
+            return self.write(image, timestamp, frame_id, h, w, channels)
+
+    def write(self, image, timestamp, frame_id, h, w, channels):
+        """Ghi slot kế tiếp và tiến đầu bus; gọi khi đang giữ khóa."""
+        seq = self.seq + 1
+        index = seq % len(self.slot_headers)
+        slot = self.slot_headers[index]
+        slot["seq"] = 0  # Bên đọc đang giữ slot thấy seq đổi trước khi dữ liệu đổi
+        np.copyto(self.data[index, :h * w * channels].reshape(image.shape), image)
+        slot["frame_id"] = frame_id
+        slot["timestamp"] = timestamp
+        slot["height"] = h
+        slot["width"] = w
+        slot["channels"] = channels
+        slot["stride"] = w * channels
+        slot["seq"] = seq
+        self.header["head"] = seq
+        self.seq = seq
+        return seq
+
+    def close(self):
+        """Xóa bus; bên đọc đã gắn vẫn giữ vùng nhớ đến khi tự đóng."""
+        with self.lock:
+            if self.data is None:
+                return
+            self.header = self.slot_headers = self.data = None
+        self.memory.close()
+        resource_tracker.register(self.memory._name, "shared_memory")  # unlink() sẽ hủy đăng ký
+        self.memory.unlink()
+
+
+class FrameBusReader:
+    """Bên đọc FrameBus không dùng khóa, dùng được từ bất kỳ tiến trình nào.
+
+    Con trỏ nằm riêng ở từng bên đọc, nên các bên đọc không phải phối hợp
+    với nhau hay với bên ghi. read() trả về frame theo thứ tự; bên đọc chậm
+    hơn cả vòng thì nhảy tới frame cũ nhất còn giữ và tính phần còn lại là
+    bị mất. Frame được trả về dạng view vào bộ nhớ dùng chung: view còn đúng
+    tới khi bên ghi quay vòng lại slot đó, kiểm tra bằng is_current(seq) sau
+    khi dùng. copy=True trả về bản sao riêng đã được kiểm tra nguyên vẹn.
+    """
+    def __init__(self, name):
+        self.memory = shared_memory.SharedMemory(name)
+        # Chỉ bên ghi được xóa bus, resource tracker không được xóa khi tiến trình này thoát
+        resource_tracker.unregister(self.memory._name, "shared_memory")
+        header = np.ndarray((), BUS_HEADER, self.memory.buf)
+        if int(header["magic"]) != BUS_MAGIC:
+            header = None
+            self.memory.close()
+            raise ValueError(f"{name} không phải frame bus")
+        header = None
+        self.header, self.slot_headers, self.data = map_bus(self.memory.buf)
+        self.cursor = int(self.header["head"])  # seq đã đọc gần nhất; bắt đầu từ frame mới nhất
+        self.read_count = 0
+        self.missed = 0           # Bị ghi đè trước khi bên đọc tới
+        self.torn = 0             # Bị ghi đè khi đang đọc
+        self.skipped = 0          # Bị latest() bỏ qua
+
+    def head(self):
+        """Trả về seq của frame mới nhất đã phát."""
+        return int(self.header["head"])
+
+    def lag(self):
+        """Trả về số frame đã phát mà bên đọc này chưa đọc."""
+        return self.head() - self.cursor
+
+    def read(self, copy=False):
+        """Trả về (image, seq, frame_id, timestamp) kế tiếp, hoặc None nếu chưa có."""
+        head = self.head()
+        while self.cursor < head:
+            oldest = head - len(self.slot_headers) + 1
+            if self.cursor + 1 < oldest:
+                self.missed += oldest - self.cursor - 1
+                self.cursor = oldest - 1
+            seq = self.cursor + 1
+            self.cursor = seq
+            frame = self.frame(seq, copy)
+            if frame is not None:
+                self.read_count += 1
+                return frame
+            head = self.head()
+        return None
+
+    def latest(self, copy=False):
+        """Trả về frame mới nhất, bỏ qua các frame chưa đọc, hoặc None nếu không có frame mới."""
+        head = self.head()
+        if head > self.cursor + 1:
+            self.skipped += head - self.cursor - 1
+            self.cursor = head - 1
+        return self.read(copy)
+
+    def frame(self, seq, copy=False):
+        """Trả về (image, seq, frame_id, timestamp) của seq nếu slot vẫn còn giữ nó."""
+        index = seq % len(self.slot_headers)
+        slot = self.slot_headers[index]
+        if int(slot["seq"]) != seq:
+            self.missed += 1
+            return None
+        h, w, channels = int(slot["height"]), int(slot["width"]), int(slot["channels"])
+        stride = int(slot["stride"])
+        frame_id = int(slot["frame_id"])
+        timestamp = float(slot["timestamp"])
+        image = np.ndarray((h, w, channels), np.uint8, self.data[index],
+                           strides=(stride, channels, 1))
+        if copy:
+            image = image.copy()
+        if int(slot["seq"]) != seq:
+            self.torn += 1  # Bên ghi dùng lại slot khi đang đọc phần đầu hoặc dữ liệu
+            return None
+        return image, seq, frame_id, timestamp
+
+    def is_current(self, seq):
+        """Trả về True nếu view đã trả cho seq chưa bị ghi đè."""
+        return int(self.slot_headers[seq % len(self.slot_headers)]["seq"]) == seq
+
+    def wait(self, timeout=None, poll=0.001, copy=False):
+        """Chờ frame kế tiếp tối đa timeout giây (None: chờ mãi)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            frame = self.read(copy)
+            if frame is not None or (deadline is not None and time.monotonic() >= deadline):
+                return frame
+            time.sleep(poll)
+
+    def stats(self):
+        """Trả về các bộ đếm của bên đọc."""
+        return {"read": self.read_count, "missed": self.missed, "torn": self.torn,
+                "skipped": self.skipped, "lag": self.lag()}
+
+    def close(self):
+        """Gỡ khỏi bus."""
+        self.header = self.slot_headers = self.data = None
+        self.memory.close()
@@ -0,0 +1,66 @@
+import numpy as np
+from pipeline_stats import PERCENTILES
+
+DEFAULT_CAPACITY = 256  # Số frame ghi nhớ, 8.5 s ở 30 fps
+LAG_HISTORY = 256       # Số lần phát hiện giữ lại để tính phân vị độ lệch
+
+
+class FrameIndex:
+    """Thời điểm chụp của các frame gần nhất theo mã frame, và độ lệch của kết quả phát hiện.
+
+    Mã frame là số thứ tự của luồng camera, nên vị trí của frame là mã chia
+    lấy dư cho dung lượng và mỗi lần tra chỉ tốn một phép so sánh. Mỗi kết
+    quả phát hiện được ghi lại số frame và số giây mà frame nó tính trên đó
+    chậm hơn frame đang hiện lúc nó đến. Luồng camera thêm mọi frame nó
+    đọc, luồng giao diện tra cứu; vị trí bị đánh dấu không hợp lệ trong lúc
+    ghi lại nên không cần khóa.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.ids = np.full(capacity, -1, np.int64)
+        self.times = np.zeros(capacity)
+        self.lags = np.full((LAG_HISTORY, 2), np.nan)  # Hàng: (số frame, số giây)
+        self.lag_index = 0
+        self.lag_count = 0
+        self.unmatched = 0  # Kết quả phát hiện có frame không còn trong chỉ mục
+
+    def add(self, frame_id, captured_at):
+        """Ghi nhớ thời điểm chụp của một frame; do luồng camera gọi."""
+        slot = frame_id % len(self.ids)
+        self.ids[slot] = -1
+        self.times[slot] = captured_at
+        self.ids[slot] = frame_id
+
+    def capture_time(self, frame_id):
+        """Trả về thời điểm chụp của frame_id, hoặc None nếu không biết hoặc đã quá cũ."""
+        slot = frame_id % len(self.ids)
+        if self.ids[slot] != frame_id:
+            return None
+        captured_at = float(self.times[slot])
+        return captured_at if self.ids[slot] == frame_id else None
+
+    def record_detection(self, detection_time, shown_time, frame_id=None, shown_id=None):
+        """Ghi độ chậm của kết quả phát hiện so với frame đang hiện; số frame là NaN nếu thiếu mã."""
+        frames = np.nan
+        if frame_id is not None and shown_id is not None:
+            frames = shown_id - frame_id
+        self.lags[self.lag_index] = frames, shown_time - detection_time
+        self.lag_index = (self.lag_index + 1) % len(self.lags)
+        self.lag_count = min(self.lag_count + 1, len(self.lags))
+
+    def stats(self):
+        """Trả về độ chậm p50/p95/p99 của kết quả phát hiện theo frame và mili giây."""
+        lags = self.lags[:self.lag_count]
+        result = {"detections": int(self.lag_count), "unmatched": self.unmatched}
+        if len(lags):
+            frames = lags[~np.isnan(lags[:, 0]), 0]
+            if len(frames):
+                result["frames"] = dict(zip((f"p{p}" for p in PERCENTILES),
+                                            np.percentile(frames, PERCENTILES).tolist()))
+            result["ms"] = dict(zip((f"p{p}" for p in PERCENTILES),
+                                    (1000 * np.percentile(lags[:, 1], PERCENTILES)).tolist()))
+        return result
+
+    def hud_row(self):
+        """Trả về hàng HUD: độ chậm của kết quả phát hiện so với màn hình, theo mili giây."""
+        ms = self.stats().get("ms", {})
+        return ["detect lag"] + [f"{ms.get(f'p{p}', 0.0):.2f}" for p in PERCENTILES]
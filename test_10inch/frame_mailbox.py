@@ -0,0 +1,55 @@
+import threading
+
+
+class FrameMailbox:
+    """Lớp hộp thư một ô "frame mới nhất thắng" giữa luồng camera và giao diện.
+
+    Luồng ghi ghi đè ô chứa; frame bị thay trước khi giao diện lấy sẽ được
+    trả về pool và tính là frame bị bỏ.
+    """
+    def __init__(self):
+        self._frame = None             # Frame mới nhất chưa hiển thị
+        self._lock = threading.Lock()
+        self.produced = 0              # Số frame đã chụp
+        self.displayed = 0             # Số frame đã hiển thị
+        self.dropped = 0               # Số frame bị bỏ
+
+    def post(self, frame):
+        """Lưu frame mới nhất. Trả về True nếu ô đang trống (cần báo giao diện)."""
+        with self._lock:
+            old, self._frame = self._frame, frame
+            self.produced += 1
+            if old is not None:
+                self.dropped += 1
+        if old is not None:
+            old.release()
+        return old is None
+
+    def take(self):
+        """Lấy frame mới nhất ra khỏi ô, hoặc None nếu chưa có frame mới."""
+        with self._lock:
+            frame, self._frame = self._frame, None
+            if frame is not None:
+                self.displayed += 1
+        return frame
+
+    def note_dropped(self):
+        """Ghi nhận frame luồng ghi phải bỏ trước khi gửi."""
+        with self._lock:
+            self.produced += 1
+            self.dropped += 1
+
+    def clear(self):
+        """Trả frame đang chờ về pool mà không hiển thị."""
+        with self._lock:
+            frame, self._frame = self._frame, None
+            if frame is not None:
+                self.dropped += 1
+        if frame is not None:
+            frame.release()
+
+    def stats(self):
+        """Trả về bản sao các bộ đếm frame."""
+        with self._lock:
+            return {"produced": self.produced, "displayed": self.displayed,
+                    "dropped": self.dropped}
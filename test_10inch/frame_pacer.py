@@ -0,0 +1,60 @@
+import time
+
+PACING_DEADLINE = "deadline"  # Chỉ nghỉ đến hạn frame kế tiếp
+PACING_FREE_RUN = "free"      # Không nghỉ: read() chặn tự quyết định nhịp
+
+DEFAULT_FPS = 30.0
+MAX_SOURCE_FPS = 240.0  # Camera báo FPS lớn hơn mức này coi như không rõ
+
+
+class FramePacer:
+    """Lớp tính thời gian vòng lặp camera cần nghỉ sau mỗi frame."""
+    def __init__(self, mode=PACING_DEADLINE, target_fps=None):
+        self.mode = mode                  # Chế độ điều nhịp
+        self.target_fps = target_fps      # FPS mong muốn (None: theo camera)
+        self.source_fps = None            # FPS camera báo (CAP_PROP_FPS)
+        self.period = 1.0 / DEFAULT_FPS   # Chu kỳ frame (giây)
+        self.deadline = None              # Hạn của frame kế tiếp
+        self.last_capture = None          # Thời điểm chụp frame trước
+        self.measured_fps = 0.0           # FPS đo được (trung bình trượt)
+        self.unpaced = False              # Nguồn phát nhanh hết mức, không cần nghỉ
+
+    def start(self, source_fps, unpaced=False):
+        """Đặt lại nhịp cho nguồn vừa mở với CAP_PROP_FPS của nó.
+
+        unpaced=True (nguồn phát lại nhanh hết mức) thì không nghỉ, trừ khi đã đặt target_fps.
+        """
+        self.unpaced = unpaced
+        self.source_fps = source_fps if 0 < source_fps <= MAX_SOURCE_FPS else None
+        self.deadline = None
+        self.last_capture = None
+        self._update_period()
+
+    def set_target_fps(self, target_fps):
+        """Ghi đè FPS của nguồn; None để theo camera."""
+        self.target_fps = target_fps
+        self._update_period()
+
+    def _update_period(self):
+        fps = self.target_fps or self.source_fps or DEFAULT_FPS
+        self.period = 1.0 / fps
+
+    def frame_captured(self, timestamp=None):
+        """Ghi nhận thời điểm chụp frame và đặt hạn cho frame kế tiếp."""
+        now = time.monotonic() if timestamp is None else timestamp
+        if self.last_capture is not None and now > self.last_capture:
+            fps = 1.0 / (now - self.last_capture)
+            self.measured_fps = fps if not self.measured_fps else 0.9 * self.measured_fps + 0.1 * fps
+        self.last_capture = now
+        if self.deadline is None or now - self.deadline > self.period:
+            # Frame đầu tiên hoặc bị trễ hơn một frame: đồng bộ lại
+            self.deadline = now
+        self.deadline += self.period
+
+    def remaining(self):
+        """Số giây còn lại đến hạn frame kế tiếp (0 ở chế độ chạy tự do)."""
+        if self.mode == PACING_FREE_RUN or self.deadline is None:
+            return 0.0
+        if self.unpaced and not self.target_fps:
+            return 0.0
+        return max(0.0, self.deadline - time.monotonic())
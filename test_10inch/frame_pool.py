@@ -0,0 +1,60 @@
+import threading
+import numpy as np
+from PyQt5.QtGui import QImage
+from pipeline_stats import new_stamps
+
+# Qt 5.14+ bọc trực tiếp dữ liệu BGR của OpenCV; bản cũ hơn đảo kênh tại chỗ.
+HAS_BGR888 = hasattr(QImage, "Format_BGR888")
+FRAME_FORMAT = QImage.Format_BGR888 if HAS_BGR888 else QImage.Format_RGB888
+
+
+class PooledFrame:
+    """Bộ đệm frame mượn từ FramePool.
+
+    `image` là QImage dùng chung bộ nhớ với `array`. Bên nhận phải gọi
+    release() khi đã dùng xong ảnh. `frame_id` và `stamps[READ]` xác định
+    lần chụp mà bộ đệm đang chứa.
+    """
+    def __init__(self, pool, generation, array):
+        self.pool = pool              # Pool sở hữu bộ đệm
+        self.generation = generation  # Thế hệ bộ đệm (đổi khi đổi độ phân giải)
+        self.array = array            # Dữ liệu ảnh (h, w, 3) uint8
+        h, w, _ = array.shape
+        self.image = QImage(array.data, w, h, array.strides[0], FRAME_FORMAT)
+        self.stamps = new_stamps()  # Mốc thời gian từng công đoạn, xem pipeline_stats
+        self.frame_id = 0           # Số thứ tự lần chụp, do bên sản xuất đặt
+        self.sensor_size = None     # (w, h) của ảnh chụp trước khi thu phóng, do bên sản xuất đặt
+
+    def release(self):
+        """Trả bộ đệm về pool."""
+        self.pool.release(self)
+
+
+class FramePool:
+    """Lớp quản lý tập bộ đệm frame cấp phát sẵn dùng chung giữa luồng ghi và luồng đọc."""
+    def __init__(self, size=3):
+        self.size = size        # Số bộ đệm cấp phát sẵn
+        self.shape = None       # Kích thước frame hiện tại (h, w, 3)
+        self.generation = 0     # Tăng mỗi lần cấp phát lại
+        self._free = []         # Các bộ đệm đang rảnh
+        self._lock = threading.Lock()
+
+    def acquire(self, shape):
+        """Mượn một bộ đệm kích thước (h, w, 3); trả về None nếu tất cả đang bận."""
+        with self._lock:
+            if shape != self.shape:
+                self._allocate(shape)
+            return self._free.pop() if self._free else None
+
+    def release(self, frame):
+        """Trả lại bộ đệm; bộ đệm của độ phân giải cũ bị bỏ qua."""
+        with self._lock:
+            if frame.generation == self.generation and frame not in self._free:
+                self._free.append(frame)
+
+    def _allocate(self, shape):
+        """Cấp phát lại toàn bộ bộ đệm khi đổi độ phân giải."""
+        self.shape = shape
+        self.generation += 1
+        self._free = [PooledFrame(self, self.generation, np.empty(shape, np.uint8))
+                      for _ in range(self.size)]
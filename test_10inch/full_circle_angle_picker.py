@@ -1,7 +1,7 @@
-import math
 from PyQt5.QtWidgets import QWidget
-from PyQt5.QtCore import Qt, QRectF
-from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QFont
+from PyQt5.QtCore import Qt, QRect, QRectF
+from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QFont, QPixmap, QRegion
+from dial_geometry import TICK_VECTORS, unit_vector
 
 class FullCircleAnglePicker(QWidget):
     """Lớp hiển thị đồng hồ góc hướng (0-360 độ)."""
@@ -9,7 +9,10 @@ class FullCircleAnglePicker(QWidget):
         super().__init__(parent)
         self.setMinimumSize(124, 124)
         self.indicator_angle = 39
+        self.indicator_vector = unit_vector(self.indicator_angle)  # (cos, sin) của kim
         self.day_mode = day_mode
+        self.dial = None          # Pixmap mặt đồng hồ tĩnh
+        self.dial_key = None      # (rộng, cao, day_mode) của pixmap đã vẽ
 
     def set_day_mode(self, day_mode):
         """Cập nhật chế độ ngày/đêm."""
@@ -19,53 +22,88 @@ class FullCircleAnglePicker(QWidget):
     def set_angle(self, angle):
         """Cập nhật góc hướng (0-360 độ)."""
         try:
+            old_rect = self.needle_rect()
             self.indicator_angle = float(angle) % 360
-            self.update()
+            self.indicator_vector = unit_vector(self.indicator_angle)
+            self.update(QRegion(old_rect).united(QRegion(self.needle_rect())))
         except (ValueError, TypeError):
             print(f"Góc không hợp lệ cho FullCircleAnglePicker: {angle}")
 
-    def paintEvent(self, event):
-        """Vẽ đồng hồ góc hướng với hình tròn và kim chỉ báo."""
-        painter = QPainter(self)
+    def dial_center(self):
+        """Trả về tâm và bán kính đồng hồ theo kích thước hiện tại."""
+        center_x, center_y = self.width() // 2, self.height() // 2
+        radius = min(center_x, center_y) - 5
+        return center_x, center_y, radius
+
+    def needle_end(self):
+        """Trả về tâm và đầu kim theo pixel widget."""
+        center_x, center_y, radius = self.dial_center()
+        cos_a, sin_a = self.indicator_vector
+        pointer_x = center_x + radius * 0.8 * cos_a
+        pointer_y = center_y - radius * 0.8 * sin_a
+        return center_x, center_y, int(pointer_x), int(pointer_y)
+
+    def needle_rect(self):
+        """Trả về hình chữ nhật bao kim chỉ báo, có lề cho độ dày bút."""
+        center_x, center_y, pointer_x, pointer_y = self.needle_end()
+        rect = QRect(min(center_x, pointer_x), min(center_y, pointer_y),
+                     abs(pointer_x - center_x) + 1, abs(pointer_y - center_y) + 1)
+        return rect.adjusted(-3, -3, 3, 3)
+
+    def dial_pixmap(self):
+        """Trả về mặt đồng hồ tĩnh, chỉ vẽ lại khi đổi kích thước hoặc chế độ ngày/đêm."""
+        key = (self.width(), self.height(), self.day_mode)
+        if key != self.dial_key:
+            self.dial = self.render_dial()
+            self.dial_key = key
+        return self.dial
+
+    def render_dial(self):
+        """Vẽ khung, hình tròn, mốc góc và trục vào pixmap."""
+        pixmap = QPixmap(self.size())
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
         painter.setRenderHint(QPainter.Antialiasing)
-        try:
-            center_x, center_y = self.width() // 2, self.height() // 2
-            radius = min(center_x, center_y) - 5
-            mark_length = radius // 6
+        center_x, center_y, radius = self.dial_center()
+        mark_length = radius // 6
+
+        border_color = Qt.white if self.day_mode else Qt.black
+        bg_color = Qt.black if self.day_mode else Qt.white
 
-            border_color = Qt.white if self.day_mode else Qt.black
-            bg_color = Qt.black if self.day_mode else Qt.white
-            indicator_color = Qt.red
+        # Vẽ khung và nền
+        painter.setPen(QPen(border_color, 2))
+        painter.drawRect(0, 0, self.width() - 1, self.height() - 1)
+        painter.setBrush(QBrush(bg_color))
+        painter.drawEllipse(QRectF(center_x - radius, center_y - radius, 
+                                radius * 2, radius * 2))
 
-            # Vẽ khung và nền
-            painter.setPen(QPen(border_color, 2))
-            painter.drawRect(0, 0, self.width() - 1, self.height() - 1)
-            painter.setBrush(QBrush(bg_color))
-            painter.drawEllipse(QRectF(center_x - radius, center_y - radius, 
-                                    radius * 2, radius * 2))
+        # Vẽ mốc góc
+        painter.setFont(QFont('Arial', min(8, radius // 10)))
+        for i, (cos_a, sin_a) in enumerate(TICK_VECTORS):
+            outer_x = center_x + radius * cos_a
+            outer_y = center_y - radius * sin_a
+            inner_x = center_x + (radius - mark_length) * cos_a
+            inner_y = center_y - (radius - mark_length) * sin_a
+            painter.setPen(QPen(border_color, 2 if i % 3 == 0 else 1))
+            painter.drawLine(int(outer_x), int(outer_y), int(inner_x), int(inner_y))
 
-            # Vẽ mốc góc
-            painter.setFont(QFont('Arial', min(8, radius // 10)))
-            for i in range(24):
-                angle = i * 15
-                rad_angle = math.radians(angle)
-                outer_x = center_x + radius * math.cos(rad_angle)
-                outer_y = center_y - radius * math.sin(rad_angle)
-                inner_x = center_x + (radius - mark_length) * math.cos(rad_angle)
-                inner_y = center_y - (radius - mark_length) * math.sin(rad_angle)
-                painter.setPen(QPen(border_color, 2 if i % 3 == 0 else 1))
-                painter.drawLine(int(outer_x), int(outer_y), int(inner_x), int(inner_y))
+        # Vẽ trục
+        painter.setPen(QPen(border_color, 2))
+        painter.drawLine(center_x - radius, center_y, center_x + radius, center_y)
+        painter.drawLine(center_x, center_y - radius, center_x, center_y + radius)
+        painter.end()
+        return pixmap
 
-            # Vẽ trục
-            painter.setPen(QPen(border_color, 2))
-            painter.drawLine(center_x - radius, center_y, center_x + radius, center_y)
-            painter.drawLine(center_x, center_y - radius, center_x, center_y + radius)
+    def paintEvent(self, event):
+        """Vẽ mặt đồng hồ đã lưu đệm và kim chỉ báo lên trên."""
+        painter = QPainter(self)
+        try:
+            painter.drawPixmap(0, 0, self.dial_pixmap())
+            painter.setRenderHint(QPainter.Antialiasing)
 
             # Vẽ kim chỉ báo
-            rad_angle = math.radians(self.indicator_angle)
-            pointer_x = center_x + radius * 0.8 * math.cos(rad_angle)
-            pointer_y = center_y - radius * 0.8 * math.sin(rad_angle)
-            painter.setPen(QPen(indicator_color, 2))
-            painter.drawLine(center_x, center_y, int(pointer_x), int(pointer_y))
+            center_x, center_y, pointer_x, pointer_y = self.needle_end()
+            painter.setPen(QPen(Qt.red, 2))
+            painter.drawLine(center_x, center_y, pointer_x, pointer_y)
         except Exception as e:
-            print(f"Lỗi trong paintEvent của FullCircleAnglePicker: {str(e)}")
\ No newline at end of file
+            print(f"Lỗi trong paintEvent của FullCircleAnglePicker: {str(e)}")
@@ -0,0 +1,97 @@
+from PyQt5 import sip
+from PyQt5.QtWidgets import QOpenGLWidget
+from PyQt5.QtCore import Qt, QRect, QRectF, QSize
+from PyQt5.QtGui import (QPainter, QOpenGLTexture, QOpenGLTextureBlitter,
+                         QOpenGLPixelTransferOptions)
+from frame_pool import HAS_BGR888
+
+class GLVideoSurface(QOpenGLWidget):
+    """Lớp bề mặt OpenGL nạp frame vào một texture cố định cho VideoWidget.
+
+    Chạy được trên mọi driver OpenGL 2.0, kể cả trình dựng phần mềm llvmpipe
+    của Mesa (LIBGL_ALWAYS_SOFTWARE=1) để đo hiệu năng trên máy không có GPU.
+    """
+    def __init__(self, owner):
+        super().__init__(owner)
+        self.owner = owner
+        self.texture = None
+        self.blitter = None
+        self.frame_size = None
+        self.pending = None  # Frame chờ tải lên từ ngoài paintGL, xem queue_upload()
+        self.transfer = QOpenGLPixelTransferOptions()
+        self.transfer.setAlignment(1)  # Các hàng frame BGR xếp liền nhau
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+
+    def initializeGL(self):
+        """Tạo blitter; texture được cấp phát (lại) ở frame đầu tiên."""
+        self.blitter = QOpenGLTextureBlitter()
+        self.blitter.create()
+        self.texture = None
+        self.frame_size = None
+
+    def allocate_texture(self, width, height):
+        """Cấp phát bộ nhớ texture cho frame có kích thước cho trước."""
+        if self.texture:
+            self.texture.destroy()
+        texture = QOpenGLTexture(QOpenGLTexture.Target2D)
+        texture.setSize(width, height)
+        texture.setFormat(QOpenGLTexture.RGB8_UNorm)
+        texture.setMinMagFilters(QOpenGLTexture.Linear, QOpenGLTexture.Linear)
+        texture.setWrapMode(QOpenGLTexture.ClampToEdge)
+        texture.allocateStorage(QOpenGLTexture.RGB, QOpenGLTexture.UInt8)
+        self.texture = texture
+        self.frame_size = QSize(width, height)
+
+    def upload(self, array):
+        """Chép mảng frame liên tục vào texture; cần ngữ cảnh OpenGL đang hiện hành."""
+        h, w, _ = array.shape
+        if self.texture is None or self.frame_size != QSize(w, h):
+            self.allocate_texture(w, h)
+        self.texture.setData(QOpenGLTexture.RGB, QOpenGLTexture.UInt8,
+                             sip.voidptr(array.ctypes.data), self.transfer)
+
+    def queue_upload(self, array):
+        """Tải frame lên ở lần paintGL kế tiếp, khi ngữ cảnh OpenGL đang hiện hành."""
+        self.pending = array
+        self.update()
+
+    def display_size(self):
+        """Trả về kích thước hiển thị của frame hiện tại, hoặc None."""
+        frame_size = self.frame_size
+        if self.pending is not None:
+            frame_size = QSize(self.pending.shape[1], self.pending.shape[0])
+        if frame_size is None:
+            return None
+        return frame_size.scaled(self.size(), Qt.KeepAspectRatio)
+
+    def paintGL(self):
+        """Vẽ texture frame rồi vẽ lớp phủ bằng QPainter trong cùng một lượt."""
+        painter = QPainter(self)
+        try:
+            if self.pending is not None:
+                array, self.pending = self.pending, None
+                self.upload(array)
+            self.owner.take_frame()
+            if self.texture and not self.owner.error_message:
+                painter.fillRect(self.rect(), Qt.black)
+                target = self.owner.view.rect
+                ratio = self.devicePixelRatioF()
+                viewport = QRect(0, 0, int(self.width() * ratio), int(self.height() * ratio))
+                device_target = QRectF(target.x() * ratio, target.y() * ratio,
+                                       target.width() * ratio, target.height() * ratio)
+                painter.beginNativePainting()
+                self.blitter.bind()
+                self.blitter.setRedBlueSwizzle(HAS_BGR888)
+                self.blitter.blit(self.texture.textureId(),
+                                  QOpenGLTextureBlitter.targetTransform(device_target, viewport),
+                                  QOpenGLTextureBlitter.OriginTopLeft)
+                self.blitter.release()
+                painter.endNativePainting()
+            else:
+                self.owner.paint_background(painter)
+            self.owner.paint_overlay(painter)
+            self.owner.finish_frame()
+        except Exception as e:
+            print(f"Lỗi trong paintGL: {str(e)}")
+        finally:
+            painter.end()
@@ -1,13 +1,66 @@
+import os
 import sys
 import datetime
 import random
-from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QMessageBox
+import threading
+import time
+from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QMessageBox, QShortcut
 from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QKeySequence
 from testui import Ui_MainWindow
 from video_widget import VideoWidget
+from video_grid import VideoGrid, LAYOUT_MAIN
 from radian_angle_picker import RadianAnglePicker
 from full_circle_angle_picker import FullCircleAnglePicker
 from border_frame import BorderFrame
+from numeric_readout import NumericReadout
+from theme_manager import ThemeManager, ROLE_HEADER, ROLE_CAPTION
+from telemetry_ingest import TelemetryIngest
+from telemetry_model import TelemetryModel, ORIGIN_DEVICE
+from video_recorder import VideoRecorder
+from replay_buffer import ReplayBuffer, EXPORT_EXTENSION
+from box_predictor import MODES as BOX_PREDICTION_MODES
+from frame_bus import FrameBus
+from object_detector import ObjectDetector, DEFAULT_WORKERS, DEFAULT_CPU_BUDGET, DEFAULT_SIZE
+
+def parse_video_sources(value):
+    """Tách chuỗi "0,1,rtsp://..." thành chỉ số camera và URL luồng."""
+    return [int(item) if item.isdigit() else item for item in value.split(",") if item]
+
+# Nhiều hơn một nguồn thì frame_video dùng VideoGrid, ví dụ VIDEO_SOURCES=0,1,2
+# Nguồn không cần camera: tệp video, pattern://640x480?fps=30 hoặc raw:///path.raw, live:///path.mp4, xem video_source
+VIDEO_SOURCES = parse_video_sources(os.environ.get("VIDEO_SOURCES", "0"))
+VIDEO_LAYOUT = os.environ.get("VIDEO_LAYOUT", LAYOUT_MAIN)  # "main" hoặc "grid"
+STREAM_FPS_BUDGET = 15  # FPS đọc của mỗi luồng phụ
+# Đường truyền thiết bị, ví dụ udp://0.0.0.0:5005 hoặc serial:///dev/ttyUSB0?baud=115200; để trống thì mô phỏng
+TELEMETRY_SOURCE = os.environ.get("TELEMETRY_SOURCE", "")
+# Mẫu telemetry được quan sát bao lâu trước khi đến, ví dụ độ trễ của bộ phát hiện
+TELEMETRY_LATENCY = float(os.environ.get("TELEMETRY_LATENCY_MS", "0")) / 1000
+BOX_PREDICTION_SHORTCUT = "F8"  # Chuyển lần lượt các chế độ dự đoán khung giới hạn
+# Tệp ghi thời gian các công đoạn khi thoát, .json hoặc .csv; các luồng phụ thêm hậu tố _1, _2...
+PIPELINE_STATS_FILE = os.environ.get("PIPELINE_STATS_FILE", "")
+HUD_SHORTCUT = "F3"  # Bật/tắt HUD thời gian trên mọi luồng video
+# Nơi ghi hình luồng chính kèm lớp phủ: các đoạn video, mỗi đoạn có file .jsonl telemetry
+RECORD_DIR = os.environ.get("RECORD_DIR", "recordings")
+RECORD_FPS = float(os.environ.get("RECORD_FPS", "30"))
+RECORD_SHORTCUT = "F5"  # Bắt đầu/dừng ghi hình
+FREEZE_SHORTCUT = "F6"  # Dừng hình luồng chính trên cửa sổ xem lại, hoặc quay lại trực tiếp
+REPLAY_EXPORT_SHORTCUT = "F7"  # Lưu cửa sổ xem lại vào RECORD_DIR
+# Khi đang dừng hình: phím -> số frame đã lưu cần dịch; Home và End nhảy về hai đầu cửa sổ
+REPLAY_STEPS = {"Left": -1, "Right": 1, "PgUp": -30, "PgDown": 30,
+                "Home": -sys.maxsize, "End": sys.maxsize}
+# Bộ phát hiện trên máy cho luồng chính thay cho khung từ telemetry: "motion", hoặc "dnn" kèm
+# DETECTOR_MODEL (và DETECTOR_CONFIG); để trống thì khung do thiết bị gửi
+DETECTOR = os.environ.get("DETECTOR", "")
+DETECTOR_MODEL = os.environ.get("DETECTOR_MODEL", "")
+DETECTOR_CONFIG = os.environ.get("DETECTOR_CONFIG", "")
+# Số tiến trình phát hiện, chỉ cho dnn: bộ phát hiện chuyển động luôn chạy một
+DETECTOR_WORKERS = int(os.environ.get("DETECTOR_WORKERS", DEFAULT_WORKERS))
+DETECTOR_CPU = float(os.environ.get("DETECTOR_CPU", DEFAULT_CPU_BUDGET))  # Số lõi trung bình
+DETECTOR_SIZE = int(os.environ.get("DETECTOR_SIZE", DEFAULT_SIZE))  # Cạnh dài nhất khi phát hiện
+# Tên bộ nhớ dùng chung để phát frame luồng chính cho tiến trình khác, ví dụ FRAME_BUS=camera0;
+# đọc bằng frame_bus.FrameBusReader("camera0")
+FRAME_BUS = os.environ.get("FRAME_BUS", "")
 
 class MainWindow:
     """Lớp cửa sổ chính cho giao diện camera 10 inch."""
@@ -23,15 +76,36 @@ class MainWindow:
 
         self.day_mode = self.is_day_time()
         self.video_widget = None
+        self.video_grid = None
+        self.telemetry = None
+        self.telemetry_model = TelemetryModel(self.main_win)  # Dữ liệu chung cho ô thông số và đồng hồ
         self.setup_ui()
         self.setup_connections()
         self.setup_timers()
+        self.setup_pipeline_stats()
+        self.setup_recording()
+        self.setup_replay()
+        self.setup_detector()
+        self.setup_frame_bus()
         self.initialize_values()
-        self.update_colors()
+        self.setup_theme()
+
+    def setup_readouts(self):
+        """Thay các ô QTextEdit từ Designer bằng NumericReadout tự vẽ."""
+        for name in ("textEditDis", "textEditEA", "textEditAA"):
+            text_edit = getattr(self.uic, name)
+            readout = NumericReadout(text_edit.parentWidget())
+            readout.setObjectName(name)
+            readout.setGeometry(text_edit.geometry())
+            text_edit.hide()
+            text_edit.deleteLater()
+            setattr(self.uic, name, readout)
 
     def setup_ui(self):
         """Thiết lập vị trí và widget giao diện."""
         try:
+            self.setup_readouts()
+
             # Thiết lập vị trí các thành phần
             self.uic.frame_video.setGeometry(10, 10, 1900, 900)
             self.uic.label_distance.setGeometry(844, 940, 101, 40)
@@ -73,7 +147,14 @@ class MainWindow:
         """Thiết lập widget video."""
         # camera_url = "rtsp://192.168.100.24:554/stream1"  # Thay bằng URL thực tế
         try:
-            self.video_widget = VideoWidget(self.uic.frame_video, video_source=0, #camera_url
+            if len(VIDEO_SOURCES) > 1:
+                self.video_grid = VideoGrid(self.uic.frame_video, VIDEO_SOURCES, self.day_mode,
+                                            VIDEO_LAYOUT, STREAM_FPS_BUDGET)
+                self.video_grid.setGeometry(4, 4, 1892, 892)
+                self.video_grid.show()
+                self.video_widget = self.video_grid.main_widget()
+                return
+            self.video_widget = VideoWidget(self.uic.frame_video, video_source=VIDEO_SOURCES[0], #camera_url
                                          day_mode=self.day_mode)
             self.video_widget.setGeometry(4, 4, 1892, 892)
             self.video_widget.show()
@@ -90,9 +171,14 @@ class MainWindow:
     def setup_connections(self):
         """Thiết lập kết nối tín hiệu-sự kiện."""
         try:
+            # textChanged chỉ mang giá trị người vận hành nhập: giá trị thiết bị được ghi khi chặn tín hiệu
             self.uic.textEditEA.textChanged.connect(self.update_elevation_angle)
             self.uic.textEditAA.textChanged.connect(self.update_azimuth_angle)
             self.uic.textEditDis.textChanged.connect(self.update_distance)
+            self.readouts = {"distance": self.uic.textEditDis,
+                             "elevation_angle": self.uic.textEditEA,
+                             "azimuth_angle": self.uic.textEditAA}
+            self.telemetry_model.value_changed.connect(self.apply_telemetry_value)
         except Exception as e:
             print(f"Lỗi khi kết nối tín hiệu textChanged: {str(e)}")
 
@@ -100,12 +186,218 @@ class MainWindow:
         """Thiết lập bộ đếm thời gian cho cập nhật thông số và chế độ ngày/đêm."""
         self.data_timer = QTimer(self.main_win)
         self.data_timer.timeout.connect(self.update_parameters)
-        self.data_timer.start(100)
+        if TELEMETRY_SOURCE:
+            self.setup_telemetry()
+        else:
+            self.data_timer.start(100)
 
         self.time_check_timer = QTimer(self.main_win)
         self.time_check_timer.timeout.connect(self.check_day_mode)
         self.time_check_timer.start(60000)
 
+    def setup_telemetry(self):
+        """Khởi động đường truyền đo xa; mỗi mẫu mới sẽ gọi update_parameters."""
+        try:
+            self.telemetry = TelemetryIngest(TELEMETRY_SOURCE)
+        except ValueError as e:
+            print(f"Lỗi nguồn đo xa: {str(e)}")
+            self.data_timer.start(100)
+            return
+        self.telemetry.sample_ready.connect(self.update_parameters)
+        self.telemetry.error_occurred.connect(self.show_error)
+        QApplication.instance().aboutToQuit.connect(self.stop_telemetry)
+        self.telemetry.start()
+
+    def stop_telemetry(self):
+        """Dừng luồng đo xa trước khi thoát ứng dụng."""
+        if self.telemetry:
+            self.telemetry.stop()
+            self.telemetry.wait(2000)
+
+    def video_widgets(self):
+        """Trả về mọi VideoWidget đang hiển thị, luồng chính trước."""
+        if self.video_grid:
+            return self.video_grid.widgets
+        return [self.video_widget] if self.video_widget else []
+
+    def setup_pipeline_stats(self):
+        """Gán phím tắt HUD và ghi thời gian các công đoạn khi thoát nếu được yêu cầu."""
+        self.hud_shortcut = QShortcut(QKeySequence(HUD_SHORTCUT), self.main_win)
+        self.hud_shortcut.activated.connect(self.toggle_pipeline_hud)
+        self.box_prediction_shortcut = QShortcut(QKeySequence(BOX_PREDICTION_SHORTCUT),
+                                                 self.main_win)
+        self.box_prediction_shortcut.activated.connect(self.cycle_box_prediction)
+        if PIPELINE_STATS_FILE:
+            QApplication.instance().aboutToQuit.connect(self.export_pipeline_stats)
+
+    def setup_recording(self):
+        """Gán phím tắt ghi hình, dừng ghi khi thoát hoặc khi tiến trình mã hóa lỗi."""
+        self.recorder = None
+        self.record_shortcut = QShortcut(QKeySequence(RECORD_SHORTCUT), self.main_win)
+        self.record_shortcut.activated.connect(self.toggle_recording)
+        for widget in self.video_widgets():
+            widget.recording_failed.connect(self.recording_failed)
+        QApplication.instance().aboutToQuit.connect(self.stop_recording)
+
+    def toggle_recording(self):
+        """Bắt đầu hoặc dừng ghi hình luồng chính."""
+        if self.recorder:
+            self.stop_recording()
+        else:
+            self.start_recording()
+
+    def start_recording(self):
+        """Ghi luồng chính, lớp phủ và telemetry vào RECORD_DIR."""
+        widgets = self.video_widgets()
+        if self.recorder or not widgets:
+            return
+        recorder = VideoRecorder(RECORD_DIR, RECORD_FPS)
+        try:
+            recorder.start()
+        except OSError as e:
+            print(f"Lỗi khi bắt đầu ghi hình: {str(e)}")
+            return
+        self.recorder = recorder
+        widgets[0].set_recorder(recorder, lambda: dict(self.telemetry_model.values))
+
+    def stop_recording(self):
+        """Dừng ghi hình, chờ tiến trình mã hóa ghi nốt các frame đang chờ."""
+        if not self.recorder:
+            return
+        for widget in self.video_widgets():
+            widget.set_recorder(None)
+        self.recorder.stop()
+        print(f"Đã dừng ghi hình: {self.recorder.stats()}")
+        self.recorder = None
+
+    def recording_failed(self, message):
+        """Dừng bản ghi có tiến trình mã hóa đã chết và báo cho người vận hành."""
+        self.stop_recording()
+        self.show_error(f"Đã dừng ghi hình: {message}")
+
+    def toggle_pipeline_hud(self):
+        """Bật/tắt HUD thời gian trên mọi luồng video."""
+        for widget in self.video_widgets():
+            widget.toggle_hud()
+
+    def cycle_box_prediction(self):
+        """Chuyển luồng chính sang chế độ dự đoán khung giới hạn tiếp theo."""
+        if not self.video_widget:
+            return
+        modes = BOX_PREDICTION_MODES
+        mode = modes[(modes.index(self.video_widget.box_predictor.mode) + 1) % len(modes)]
+        self.video_widget.set_box_prediction(mode)
+        print(f"Dự đoán khung giới hạn: {mode}")
+
+    def export_pipeline_stats(self, path=None):
+        """Ghi thời gian các công đoạn của từng luồng ra path (mặc định PIPELINE_STATS_FILE)."""
+        path = path or PIPELINE_STATS_FILE
+        root, ext = os.path.splitext(path)
+        for index, widget in enumerate(self.video_widgets()):
+            feed_path = path if index == 0 else f"{root}_{index}{ext}"
+            try:
+                widget.pipeline.export(feed_path, {
+                    "source": str(widget.video_thread.video_source),
+                    "counters": widget.frame_stats(),
+                    "box_prediction": widget.box_predictor.stats(),
+                    "detections": widget.frame_index.stats(),
+                    "detector": widget.detector.stats() if widget.detector else None})
+            except OSError as e:
+                print(f"Lỗi khi ghi thời gian các công đoạn: {str(e)}")
+
+    def setup_replay(self):
+        """Lưu cửa sổ xem lại trước sự kiện của luồng chính và gán phím tắt."""
+        widgets = self.video_widgets()
+        self.replay = ReplayBuffer()
+        self.replay_shortcuts = []
+        if not widgets:
+            return
+        widgets[0].set_replay_buffer(self.replay)
+        self.freeze_shortcut = QShortcut(QKeySequence(FREEZE_SHORTCUT), self.main_win)
+        self.freeze_shortcut.activated.connect(self.toggle_freeze)
+        self.replay_export_shortcut = QShortcut(QKeySequence(REPLAY_EXPORT_SHORTCUT), self.main_win)
+        self.replay_export_shortcut.activated.connect(self.export_replay)
+        for key, frames in REPLAY_STEPS.items():
+            shortcut = QShortcut(QKeySequence(key), self.main_win)
+            shortcut.activated.connect(lambda frames=frames: widgets[0].step_replay(frames))
+            shortcut.setEnabled(False)  # Phím mũi tên thuộc về các widget khác khi xem trực tiếp
+            self.replay_shortcuts.append(shortcut)
+
+    def toggle_freeze(self):
+        """Dừng hình luồng chính ở frame mới nhất đã lưu, hoặc quay lại video trực tiếp."""
+        widgets = self.video_widgets()
+        if widgets[0].is_frozen():
+            widgets[0].unfreeze()
+        else:
+            widgets[0].freeze()
+        for shortcut in self.replay_shortcuts:
+            shortcut.setEnabled(widgets[0].is_frozen())
+
+    def export_replay(self):
+        """Ghi cửa sổ xem lại vào RECORD_DIR mà không chặn giao diện."""
+        if not len(self.replay):
+            return
+        path = os.path.join(RECORD_DIR, time.strftime("replay_%Y%m%d_%H%M%S") + EXPORT_EXTENSION)
+
+        def export():
+            try:
+                os.makedirs(RECORD_DIR, exist_ok=True)
+                count = self.replay.export(path)
+                print(f"Đã xuất đoạn xem lại: {path} ({count} frame)")
+            except OSError as e:
+                print(f"Lỗi khi xuất đoạn xem lại: {str(e)}")
+        threading.Thread(target=export, name="replay-export", daemon=True).start()
+
+    def setup_detector(self):
+        """Khởi động bộ phát hiện trên luồng chính nếu DETECTOR có giá trị."""
+        self.detector = None
+        widgets = self.video_widgets()
+        if not DETECTOR or not widgets:
+            return
+        try:
+            detector = ObjectDetector(DETECTOR, DETECTOR_MODEL, DETECTOR_CONFIG or None,
+                                      DETECTOR_SIZE, DETECTOR_WORKERS, DETECTOR_CPU)
+            detector.start()
+        except (OSError, ValueError) as e:
+            print(f"Lỗi khi khởi động bộ phát hiện: {str(e)}")
+            return
+        self.detector = detector
+        widgets[0].set_detector(detector)
+        QApplication.instance().aboutToQuit.connect(self.stop_detector)
+
+    def stop_detector(self):
+        """Ngừng gửi frame cho bộ phát hiện rồi dừng các tiến trình của nó."""
+        if not self.detector:
+            return
+        for widget in self.video_widgets():
+            widget.set_detector(None)
+        self.detector.stop()
+        print(f"Đã dừng bộ phát hiện: {self.detector.stats()}")
+        self.detector = None
+
+    def setup_frame_bus(self):
+        """Phát luồng chính lên vòng bộ nhớ dùng chung FRAME_BUS nếu có tên."""
+        self.frame_bus = None
+        widgets = self.video_widgets()
+        if not FRAME_BUS or not widgets:
+            return
+        try:
+            self.frame_bus = FrameBus(FRAME_BUS)
+        except (OSError, ValueError) as e:
+            print(f"Lỗi khi tạo frame bus: {str(e)}")
+            return
+        widgets[0].set_frame_bus(self.frame_bus)
+        QApplication.instance().aboutToQuit.connect(self.stop_frame_bus)
+
+    def stop_frame_bus(self):
+        """Ngừng phát và xóa frame bus."""
+        if not self.frame_bus:
+            return
+        for widget in self.video_widgets():
+            widget.set_frame_bus(None)
+        self.frame_bus.close()
+        self.frame_bus = None
+
     def is_day_time(self):
         """Kiểm tra thời gian hiện tại là ban ngày (6h-18h)."""
         try:
@@ -127,72 +419,61 @@ class MainWindow:
         except Exception as e:
             print(f"Lỗi khi kiểm tra chế độ ngày/đêm: {str(e)}")
 
-    def update_colors(self):
-        """Cập nhật màu sắc giao diện theo chế độ ngày/đêm."""
+    def setup_theme(self):
+        """Đăng ký widget với giao diện ngày/đêm và áp dụng giao diện hiện tại."""
         try:
-            bg_color = "black" if self.day_mode else "white"
-            text_color = "yellow"
-            border_color = "white" if self.day_mode else "black"
-            font_size = 20
-
-            self.uic.centralwidget.setStyleSheet(f"background-color: {bg_color};")
-            self.uic.frame_video.setStyleSheet(
-                f"QFrame#frame_video {{ border: 4px solid orange; background-color: {bg_color}; }}")
-
-            # Cập nhật kiểu cho ô nhập
-            for text_edit in [self.uic.textEditDis, self.uic.textEditEA, self.uic.textEditAA]:
-                text_edit.setStyleSheet(
-                    f"background-color: {bg_color}; color: {text_color}; "
-                    f"font-size: {font_size}px; font-weight: bold; "
-                    f"border: 2px solid {border_color};")
-                text_edit.setAlignment(Qt.AlignCenter)
-
-            # Cập nhật kiểu cho nhãn
+            self.theme = ThemeManager(self.main_win, self.day_mode, font_size=20, border=2,
+                                      frame_border=4)
+            self.theme.style(self.uic.centralwidget)
+            self.theme.style(self.uic.frame_video)
+            # Ô thông số và nhãn lấy màu từ palette
+            for readout in [self.uic.textEditDis, self.uic.textEditEA, self.uic.textEditAA]:
+                readout.set_style(20, 2)
+                self.theme.style(readout)
             for label in [self.uic.label_distance, self.uic.label_EA, self.uic.label_AA]:
-                label.setStyleSheet(
-                    f"background-color: red; color: white; "
-                    f"font-size: {font_size}px; font-weight: bold; "
-                    f"border: 2px solid {border_color};")
-
-            # Cập nhật kiểu cho nhãn tùy chỉnh
+                self.theme.style(label, ROLE_HEADER)
             for label in [self.label_elevation, self.label_azimuth]:
-                label.setStyleSheet(
-                    f"background-color: {bg_color}; color: {text_color}; "
-                    f"font-size: {font_size}px; font-weight: bold; "
-                    f"border: 2px solid {border_color};")
-
-            # Cập nhật chế độ ngày/đêm cho widget
-            if self.video_widget:
-                self.video_widget.set_day_mode(self.day_mode)
-            self.radian_picker.set_day_mode(self.day_mode)
-            self.circle_picker.set_day_mode(self.day_mode)
-            self.border_frame.set_day_mode(self.day_mode)
+                self.theme.style(label, ROLE_CAPTION)
+
+            # Widget tự vẽ nhận chế độ ngày/đêm qua set_day_mode
+            for widget in [self.video_grid or self.video_widget, self.radian_picker,
+                           self.circle_picker, self.border_frame]:
+                if widget:
+                    self.theme.subscribe(widget)
+        except Exception as e:
+            print(f"Lỗi khi thiết lập giao diện ngày/đêm: {str(e)}")
+
+    def update_colors(self):
+        """Cập nhật màu sắc giao diện theo chế độ ngày/đêm."""
+        try:
+            self.theme.set_day_mode(self.day_mode)
         except Exception as e:
             print(f"Lỗi khi cập nhật màu sắc: {str(e)}")
 
     def initialize_values(self):
         """Khởi tạo giá trị mặc định cho giao diện."""
         try:
-            self.uic.textEditDis.setPlainText("50")
-            self.uic.textEditEA.setPlainText("45")
-            self.uic.textEditAA.setPlainText("39")
-            self.radian_picker.set_angle(45)
-            self.circle_picker.set_angle(39)
+            self.telemetry_model.update_from_device(
+                {"distance": 50, "elevation_angle": 45, "azimuth_angle": 39})
         except Exception as e:
             print(f"Lỗi khi khởi tạo giá trị: {str(e)}")
 
     def get_data_from_device(self):
-        """Mô phỏng dữ liệu từ thiết bị."""
+        """Mô phỏng dữ liệu từ thiết bị; khung tính theo điểm ảnh cảm biến của luồng chính."""
         try:
+            sensor_size = self.video_widget.sensor_size if self.video_widget else None
+            width, height = sensor_size or (640, 480)  # Trước frame đầu tiên khung nào cũng được nhận
+            w = random.randint(width // 16, width // 4)
+            h = random.randint(height // 16, height // 4)
             return {
                 "distance": random.uniform(10, 100),
                 "elevation_angle": random.uniform(0, 90),
                 "azimuth_angle": random.uniform(0, 360),
                 "bounding_box": {
-                    "x": random.randint(200, 1700),
-                    "y": random.randint(100, 800),
-                    "w": random.randint(100, 400),
-                    "h": random.randint(100, 400)
+                    "x": random.randint(0, width - w),
+                    "y": random.randint(0, height - h),
+                    "w": w,
+                    "h": h
                 }
             }
         except Exception as e:
@@ -207,43 +488,68 @@ class MainWindow:
     def update_parameters(self):
         """Cập nhật giao diện với dữ liệu từ thiết bị."""
         try:
-            data = self.get_data_from_device()
-            self.uic.textEditDis.setPlainText(str(round(data["distance"], 2)))
-            self.uic.textEditEA.setPlainText(str(round(data["elevation_angle"], 2)))
-            self.uic.textEditAA.setPlainText(str(round(data["azimuth_angle"], 2)))
-            self.radian_picker.set_angle(data["elevation_angle"])
-            self.circle_picker.set_angle(data["azimuth_angle"])
-            if self.video_widget:
-                self.video_widget.set_bounding_box(data.get("bounding_box"))
+            data = self.telemetry.take() if self.telemetry else self.get_data_from_device()
+            if data is None:
+                return
+            self.telemetry_model.update_from_device(data)
+            if "bounding_box" in data and self.video_widget and not self.detector:
+                # Mọi mẫu, kể cả khung không đổi, đều cho bộ dự đoán biết vị trí mục tiêu
+                sample_time = data.get("received_at", time.monotonic()) - TELEMETRY_LATENCY
+                self.video_widget.set_bounding_box(data["bounding_box"], sample_time)
         except Exception as e:
             print(f"Lỗi khi cập nhật thông số: {str(e)}")
-            error_label = QLabel(f"Lỗi: {str(e)}")
-            error_label.setStyleSheet("color: red; font-size: 20px;")
-            error_label.setGeometry(844, 900, 271, 40)
-            error_label.setAlignment(Qt.AlignCenter)
-            error_label.setParent(self.uic.centralwidget)
-            error_label.show()
-            QTimer.singleShot(2000, error_label.deleteLater)
+            self.show_error(f"Lỗi: {str(e)}")
+
+    def show_error(self, message):
+        """Hiện thông báo lỗi phía trên ô thông số trong 2 giây."""
+        error_label = QLabel(message)
+        error_label.setStyleSheet("color: red; font-size: 20px;")
+        error_label.setGeometry(844, 900, 271, 40)
+        error_label.setAlignment(Qt.AlignCenter)
+        error_label.setParent(self.uic.centralwidget)
+        error_label.show()
+        QTimer.singleShot(2000, error_label.deleteLater)
+
+    def apply_telemetry_value(self, field, value, origin):
+        """Đưa giá trị vừa thay đổi trong mô hình tới các widget hiển thị nó."""
+        if field == "bounding_box":
+            return  # update_parameters đưa từng mẫu khung kèm thời điểm cho bộ dự đoán
+        readout = self.readouts[field]
+        if origin == ORIGIN_DEVICE:
+            # Chặn textChanged để giá trị thiết bị không quay lại qua bước đọc chữ
+            readout.blockSignals(True)
+            try:
+                readout.setPlainText(str(value))
+            finally:
+                readout.blockSignals(False)
+        if field == "elevation_angle":
+            self.radian_picker.set_angle(value)
+        elif field == "azimuth_angle":
+            self.circle_picker.set_angle(value)
 
     def update_elevation_angle(self):
-        """Cập nhật hiển thị góc tầm."""
+        """Áp dụng góc tầm do người vận hành nhập."""
         try:
-            angle = float(self.uic.textEditEA.toPlainText())
-            self.radian_picker.set_angle(angle)
+            self.telemetry_model.set_operator_value(
+                "elevation_angle", float(self.uic.textEditEA.toPlainText()))
         except (ValueError, TypeError):
             print("Đầu vào góc tầm không hợp lệ")
 
     def update_azimuth_angle(self):
-        """Cập nhật hiển thị góc hướng."""
+        """Áp dụng góc hướng do người vận hành nhập."""
         try:
-            angle = float(self.uic.textEditAA.toPlainText())
-            self.circle_picker.set_angle(angle)
+            self.telemetry_model.set_operator_value(
+                "azimuth_angle", float(self.uic.textEditAA.toPlainText()))
         except (ValueError, TypeError):
             print("Đầu vào góc hướng không hợp lệ")
 
     def update_distance(self):
-        """Dự phòng cho cập nhật khoảng cách."""
-        pass
+        """Áp dụng khoảng cách do người vận hành nhập."""
+        try:
+            self.telemetry_model.set_operator_value(
+                "distance", float(self.uic.textEditDis.toPlainText()))
+        except (ValueError, TypeError):
+            print("Đầu vào khoảng cách không hợp lệ")
 
     def show(self):
         """Hiển thị cửa sổ chính."""
@@ -0,0 +1,61 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPainter, QPen, QFont, QPixmap
+
+# Trường nhìn ngang (mil) theo từng mức zoom của ống kính
+DEFAULT_FOV_BY_ZOOM = {1: 349}
+
+
+class MilReticle:
+    """Lớp vẽ sẵn thước mil màu đỏ, lưu đệm theo chiều rộng widget và FOV."""
+    def __init__(self, major_tick_length=10, minor_tick_length=5, label_offset=15,
+                 mil_range=200, major_tick_mil=10, label_mil=50):
+        self.major_tick_length = major_tick_length
+        self.minor_tick_length = minor_tick_length
+        self.label_offset = label_offset
+        self.mil_range = mil_range
+        self.major_tick_mil = major_tick_mil
+        self.label_mil = label_mil
+        self.cache = {}  # (width, fov_mil) -> (pixmap, origin_x)
+
+    def prerender(self, width, fov_mils):
+        """Vẽ sẵn thước mil cho mọi FOV, ví dụ mỗi mức zoom một bản."""
+        for fov_mil in fov_mils:
+            self.get(width, fov_mil)
+
+    def get(self, width, fov_mil):
+        """Trả về (pixmap, origin_x) với origin_x là vị trí vạch 0 mil."""
+        key = (width, fov_mil)
+        entry = self.cache.get(key)
+        if entry is None:
+            # Đổi chiều rộng thì mọi bản lưu đệm cũ đều vô dụng
+            self.cache = {k: v for k, v in self.cache.items() if k[0] == width}
+            entry = self.cache[key] = self.render(width, fov_mil)
+        return entry
+
+    def render(self, width, fov_mil):
+        """Vẽ vạch và nhãn lên pixmap trong suốt."""
+        pixel_per_mil = width / fov_mil
+        origin = int(self.mil_range * pixel_per_mil) + self.label_offset
+        height = self.major_tick_length + self.label_offset + 4
+        pixmap = QPixmap(origin * 2 + 1, height)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setPen(QPen(Qt.red, 1))
+        painter.setFont(QFont('Arial', 8))
+        for mil in range(-self.mil_range, self.mil_range + 1):
+            x = origin + int(mil * pixel_per_mil)
+            if mil % self.major_tick_mil == 0:
+                painter.drawLine(x, 0, x, self.major_tick_length)
+                if mil % self.label_mil == 0:
+                    painter.drawText(x - self.label_offset,
+                                     self.major_tick_length + self.label_offset, str(mil))
+            else:
+                painter.drawLine(x, 0, x, self.minor_tick_length)
+        painter.end()
+        return pixmap, origin
+
+    def draw(self, painter, center_x, width, fov_mil, top=0):
+        """Vẽ thước đã lưu đệm với vạch 0 mil tại center_x và mép trên tại top."""
+        pixmap, origin = self.get(width, fov_mil)
+        painter.drawPixmap(center_x - origin, top, pixmap)
@@ -0,0 +1,119 @@
+from PyQt5.QtWidgets import QWidget, QLineEdit
+from PyQt5.QtCore import Qt, QPointF, QRectF, pyqtSignal
+from PyQt5.QtGui import QPainter, QPen, QPalette, QFontDatabase, QFontMetrics, QStaticText
+
+
+class NumericReadout(QWidget):
+    """Ô số tự vẽ với chữ số cùng độ rộng, thay cho ô thông số QTextEdit.
+
+    Mỗi ký tự là một QStaticText được lưu sẵn và đặt theo bước cố định, nên
+    một giá trị mới chỉ tốn một phép so sánh chuỗi và một lần vẽ, không qua
+    tài liệu văn bản hay style sheet. Màu lấy từ palette (window cho nền, bright
+    text cho chữ số, window text cho viền) nên đổi giao diện chỉ là đổi palette.
+    setPlainText/toPlainText/textChanged giống
+    các lệnh QTextEdit mà MainWindow dùng. Khi cho phép sửa, nhấp đúp sẽ mở ô
+    nhập và textChanged được phát khi người vận hành nhấn Enter.
+    """
+    textChanged = pyqtSignal()
+
+    def __init__(self, parent=None, editable=True):
+        super().__init__(parent)
+        self.text = ""
+        self.editable = editable
+        self.editor = None  # QLineEdit hiện khi đang sửa
+        self.border_width = 1
+        self.digit_font = QFontDatabase.systemFont(QFontDatabase.FixedFont)
+        self.digit_font.setBold(True)
+        self.glyphs = {}  # Ký tự -> QStaticText đã chuẩn bị
+        self.advance = 0      # Độ rộng một ô chữ số
+        self.text_height = 0
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.set_style(16)
+
+    def set_style(self, font_size, border_width=1):
+        """Đặt cỡ chữ số (pixel) và độ dày viền; xóa bộ nhớ đệm ký tự."""
+        self.border_width = border_width
+        self.digit_font.setPixelSize(font_size)
+        metrics = QFontMetrics(self.digit_font)
+        self.advance = metrics.horizontalAdvance("0")
+        self.text_height = metrics.height()
+        self.glyphs = {}
+        self.update()
+
+    def glyph(self, char):
+        """Trả về QStaticText đã lưu của một ký tự."""
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            glyph = QStaticText(char)
+            glyph.setTextFormat(Qt.PlainText)
+            glyph.prepare(font=self.digit_font)
+            self.glyphs[char] = glyph
+        return glyph
+
+    def setPlainText(self, text):
+        """Hiển thị text; chỉ vẽ lại khi khác nội dung đang hiện."""
+        if text == self.text:
+            return
+        self.text = text
+        self.update()
+        self.textChanged.emit()
+
+    def toPlainText(self):
+        """Trả về nội dung đang hiển thị."""
+        return self.text
+
+    def setAlignment(self, alignment):
+        """Giữ để tương thích QTextEdit; chữ số luôn căn giữa."""
+
+    def setReadOnly(self, read_only):
+        """Tắt hoặc bật chế độ sửa bằng nhấp đúp."""
+        self.editable = not read_only
+
+    def mouseDoubleClickEvent(self, event):
+        """Mở ô nhập đè lên ô số khi ở chế độ sửa."""
+        if not self.editable:
+            return super().mouseDoubleClickEvent(event)
+        if self.editor is None:
+            self.editor = QLineEdit(self)
+            self.editor.setAlignment(Qt.AlignCenter)
+            self.editor.setFont(self.digit_font)
+            self.editor.editingFinished.connect(self.finish_editing)
+        self.editor.setGeometry(self.rect())
+        self.editor.setText(self.text)
+        self.editor.selectAll()
+        self.editor.show()
+        self.editor.setFocus()
+
+    def finish_editing(self):
+        """Áp dụng nội dung vừa sửa và đóng ô nhập."""
+        if self.editor.isVisible():
+            self.editor.hide()
+            self.setPlainText(self.editor.text().strip())
+
+    def keyPressEvent(self, event):
+        """Phím Escape thoát chế độ sửa mà không áp dụng."""
+        if event.key() == Qt.Key_Escape and self.editor and self.editor.isVisible():
+            self.editor.blockSignals(True)
+            self.editor.hide()
+            self.editor.blockSignals(False)
+            return
+        super().keyPressEvent(event)
+
+    def paintEvent(self, event):
+        """Vẽ nền, viền và các ký tự chữ số đã lưu."""
+        painter = QPainter(self)
+        palette = self.palette()
+        painter.fillRect(self.rect(), palette.color(QPalette.Window))
+        if self.border_width:
+            half = self.border_width / 2
+            painter.setPen(QPen(palette.color(QPalette.WindowText), self.border_width))
+            painter.drawRect(QRectF(self.rect()).adjusted(half, half, -half, -half))
+        if not self.text:
+            return
+        painter.setFont(self.digit_font)
+        painter.setPen(palette.color(QPalette.BrightText))
+        x = (self.width() - self.advance * len(self.text)) / 2
+        y = (self.height() - self.text_height) / 2
+        for char in self.text:
+            painter.drawStaticText(QPointF(x, y), self.glyph(char))
+            x += self.advance
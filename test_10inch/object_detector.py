@@ -0,0 +1,293 @@
+import os
+import queue
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+from pipeline_stats import PERCENTILES
+
+KIND_MOTION = "motion"  # Vùng chuyển động lớn nhất so với nền đã học, không cần mô hình
+KIND_DNN = "dnn"        # Mạng cv2.dnn có đầu ra kiểu SSD, ví dụ MobileNet-SSD
+KINDS = (KIND_MOTION, KIND_DNN)
+DEFAULT_SIZE = 320         # Frame được thu nhỏ để không cạnh nào vượt quá giá trị này
+DEFAULT_CPU_BUDGET = 0.5   # Số lõi CPU trung bình bộ phát hiện được dùng
+DEFAULT_WORKERS = max(1, min(2, (os.cpu_count() or 1) - 1))
+MISSES_BEFORE_LOST = 5     # Số kết quả rỗng liên tiếp trước khi báo mất mục tiêu
+HISTORY = 256              # Số kết quả giữ lại để tính phân vị thời gian
+COST_SMOOTHING = 0.2       # Trọng số của lần suy luận mới nhất trong chi phí trung bình
+MOTION_HISTORY = 100       # Số frame mô hình nền thích nghi theo
+MOTION_THRESHOLD = 16      # Bình phương khoảng cách Mahalanobis của điểm ảnh tiền cảnh trong MOG2
+MOTION_MIN_AREA = 0.002    # Vùng nhỏ nhất, tính theo tỉ lệ diện tích frame
+DNN_INPUT = (300, 300)     # Kích thước đầu vào của mạng
+DNN_CONFIDENCE = 0.5       # Điểm thấp nhất được coi là phát hiện
+
+worker = None  # Bộ phát hiện của từng tiến trình, do init_worker() đặt
+
+
+class ObjectDetector(QObject):
+    """Chạy bộ phát hiện trên CPU với các frame đã chụp trong một nhóm tiến trình và phát khung.
+
+    Luồng camera đưa mọi frame vào; frame được nhận sẽ được thu nhỏ vào một
+    slot bộ nhớ dùng chung còn trống, mỗi tiến trình một slot, và được phát
+    hiện ở tiến trình khác nên giao diện và camera không bao giờ chờ mô hình.
+    Frame bị bỏ qua khi mọi slot đều bận, và các frame được giãn cách để thời
+    gian CPU suy luận đo được không vượt quá cpu_budget lõi. Khung trả về theo
+    điểm ảnh cảm biến (lúc chụp), kèm frame_id và thời điểm chụp của frame
+    đã dùng để tính. Bộ phát hiện chuyển động giữ một mô hình nền phải thấy
+    mọi frame được gửi theo đúng thứ tự, nên luôn chạy một tiến trình; chỉ
+    loại dnn không trạng thái mới dùng nhiều hơn.
+    """
+    detection_ready = pyqtSignal(object)  # Dict khung, hoặc None khi mất mục tiêu
+
+    def __init__(self, kind=KIND_MOTION, model=None, config=None, size=DEFAULT_SIZE,
+                 workers=DEFAULT_WORKERS, cpu_budget=DEFAULT_CPU_BUDGET, parent=None):
+        super().__init__(parent)
+        if kind not in KINDS:
+            raise ValueError(f"Bộ phát hiện không hợp lệ {kind!r}, cần một trong {KINDS}")
+        if kind == KIND_DNN and not model:
+            raise ValueError("Bộ phát hiện dnn cần tệp mô hình")
+        self.kind = kind
+        self.model = model
+        self.config = config
+        self.size = size
+        self.worker_count = 1 if kind == KIND_MOTION else workers
+        self.cpu_budget = cpu_budget
+        self.lock = threading.Lock()
+        self.buffers = []             # SharedMemory của từng slot
+        self.free = queue.SimpleQueue()  # Chỉ số slot luồng camera được ghi vào
+        self.executor = None
+        self.cost = 0.0               # Thời gian CPU suy luận trung bình mỗi frame, giây
+        self.next_time = 0.0          # Thời điểm chụp sớm nhất được gửi tiếp
+        self.misses = 0               # Số kết quả rỗng liên tiếp
+        self.offered = 0
+        self.submitted = 0
+        self.busy = 0                 # Bỏ qua: mọi slot đều bận
+        self.over_budget = 0          # Bỏ qua: quá sớm so với ngân sách CPU
+        self.completed = 0            # Số kết quả đã nhận
+        self.detected = 0             # Số kết quả có khung
+        self.failed = 0               # Số lỗi của tiến trình phát hiện
+        self.timings = np.zeros((HISTORY, 2))  # Hàng: (giây suy luận, giây từ lúc chụp tới kết quả)
+        self.timing_index = 0
+        self.timing_count = 0
+        self.started_at = None
+
+    def is_running(self):
+        """Trả về True khi nhóm tiến trình đang chạy."""
+        return self.executor is not None
+
+    def start(self):
+        """Cấp phát mỗi tiến trình một slot và khởi động nhóm tiến trình."""
+        if self.executor:
+            return
+        self.buffers = [shared_memory.SharedMemory(create=True, size=self.size * self.size * 3)
+                        for _ in range(self.worker_count)]
+        self.free = queue.SimpleQueue()
+        for slot in range(len(self.buffers)):
+            self.free.put(slot)
+        context = multiprocessing.get_context("spawn")  # Fork một tiến trình Qt là không an toàn
+        try:
+            self.executor = ProcessPoolExecutor(
+                self.worker_count, context, init_worker,
+                ([buffer.name for buffer in self.buffers], self.kind, self.model, self.config))
+        except Exception:
+            self.release_buffers()
+            raise
+        self.started_at = time.monotonic()
+
+    def stop(self):
+        """Dừng nhóm tiến trình; các kết quả chưa về bị bỏ."""
+        executor, self.executor = self.executor, None
+        if executor is None:
+            return
+        executor.shutdown(wait=True, cancel_futures=True)
+        self.release_buffers()
+
+    def release_buffers(self):
+        """Đóng và xóa các slot bộ nhớ dùng chung."""
+        for buffer in self.buffers:
+            buffer.close()
+            buffer.unlink()
+        self.buffers = []
+
+    def offer(self, image, captured_at, frame_id):
+        """Gửi frame BGR đi phát hiện nếu còn slot trống và ngân sách cho phép.
+
+        Luồng camera gọi với frame độ phân giải gốc; thu nhỏ vào slot là việc
+        duy nhất làm trên luồng đó. Trả về True nếu frame đã được gửi.
+        """
+        executor = self.executor
+        if executor is None:
+            return False
+        self.offered += 1
+        if captured_at < self.next_time:
+            self.over_budget += 1
+            return False
+        try:
+            slot = self.free.get_nowait()
+        except queue.Empty:
+            self.busy += 1
+            return False
+        h, w = image.shape[:2]
+        size = detection_size(w, h, self.size)
+        shape = (size[1], size[0], 3)
+        array = np.ndarray(shape, np.uint8, self.buffers[slot].buf)
+        if size == (w, h):
+            np.copyto(array, image)
+        else:
+            cv2.resize(image, size, dst=array, interpolation=cv2.INTER_LINEAR)
+        array = None
+        with self.lock:
+            # Giãn cách frame để chi phí / khoảng cách không vượt ngân sách
+            self.next_time = captured_at + self.cost / self.cpu_budget
+        try:
+            future = executor.submit(detect_slot, slot, shape)
+        except RuntimeError:
+            self.free.put(slot)  # Nhóm tiến trình đang dừng
+            return False
+        self.submitted += 1
+        scale = w / size[0], h / size[1]
+        future.add_done_callback(
+            lambda future: self.finish(future, slot, frame_id, captured_at, scale, (w, h)))
+        return True
+
+    def finish(self, future, slot, frame_id, captured_at, scale, frame_size):
+        """Phát kết quả theo điểm ảnh cảm biến; chạy trên luồng nhận kết quả của nhóm tiến trình."""
+        self.free.put(slot)
+        if future.cancelled():
+            return
+        try:
+            box, cost = future.result()
+        except Exception as e:
+            with self.lock:
+                self.failed += 1
+            print(f"Lỗi bộ phát hiện: {str(e)}")
+            return
+        done = time.monotonic()
+        with self.lock:
+            self.completed += 1
+            self.cost = cost if not self.cost else self.cost + COST_SMOOTHING * (cost - self.cost)
+            self.timings[self.timing_index] = cost, done - captured_at
+            self.timing_index = (self.timing_index + 1) % len(self.timings)
+            self.timing_count = min(self.timing_count + 1, len(self.timings))
+            if box is None:
+                self.misses += 1
+                lost = self.misses == MISSES_BEFORE_LOST
+            else:
+                self.misses = 0
+                self.detected += 1
+        if box is None:
+            if lost:
+                self.detection_ready.emit(None)
+            return
+        x, y, w, h = box
+        self.detection_ready.emit({
+            "x": int(round(x * scale[0])), "y": int(round(y * scale[1])),
+            "w": int(round(w * scale[0])), "h": int(round(h * scale[1])),
+            "frame_id": frame_id, "captured_at": captured_at, "detected_at": done,
+            "frame_size": frame_size})
+
+    def stats(self):
+        """Trả về các bộ đếm frame và p50/p95/p99 thời gian suy luận, thời gian từ lúc chụp tới kết quả."""
+        with self.lock:
+            timings = self.timings[:self.timing_count].copy()
+            completed, detected, failed = self.completed, self.detected, self.failed
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        result = {"kind": self.kind, "workers": self.worker_count,
+                  "cpu_budget": self.cpu_budget, "offered": self.offered,
+                  "submitted": self.submitted, "busy": self.busy,
+                  "over_budget": self.over_budget, "detected": detected,
+                  "failed": failed, "rate": completed / elapsed if elapsed else 0.0}
+        if len(timings):
+            for name, column in (("inference_ms", 0), ("latency_ms", 1)):
+                result[name] = dict(zip((f"p{p}" for p in PERCENTILES),
+                                        (1000 * np.percentile(timings[:, column],
+                                                              PERCENTILES)).tolist()))
+        return result
+
+    def hud_row(self):
+        """Trả về hàng HUD: thời gian từ lúc chụp tới kết quả phát hiện, theo mili giây."""
+        latency = self.stats().get("latency_ms", {})
+        return ["detector"] + [f"{latency.get(f'p{p}', 0.0):.2f}" for p in PERCENTILES]
+
+
+def detection_size(w, h, size):
+    """Trả về (w, h) dùng để phát hiện frame w x h: giữ tỉ lệ, không cạnh nào vượt size."""
+    if max(w, h) <= size:
+        return w, h
+    if w >= h:
+        return size, max(1, h * size // w)
+    return max(1, w * size // h), size
+
+
+def init_worker(names, kind, model, config):
+    """Khởi tạo tiến trình: gắn các slot và nạp bộ phát hiện một lần mỗi tiến trình."""
+    global worker
+    cv2.setNumThreads(1)  # Số tiến trình là mức song song; luồng OpenCV sẽ vượt ngân sách
+    buffers = [shared_memory.SharedMemory(name=name) for name in names]
+    if kind == KIND_DNN:
+        worker = DnnDetector(buffers, model, config)
+    else:
+        worker = MotionDetector(buffers)
+
+
+def detect_slot(slot, shape):
+    """Tác vụ: trả về ((x, y, w, h) theo điểm ảnh slot hoặc None, số giây CPU đã dùng)."""
+    start = time.process_time()
+    frame = np.ndarray(shape, np.uint8, worker.buffers[slot].buf)
+    try:
+        box = worker.detect(frame)
+    finally:
+        frame = None  # Bỏ view trước khi slot được dùng lại
+    return box, time.process_time() - start
+
+
+class MotionDetector:
+    """Bộ phát hiện cổ điển: vùng tiền cảnh lớn nhất của mô hình nền MOG2.
+
+    Mỗi tiến trình tự học nền từ các frame nó nhận, nên không cần tệp mô
+    hình và tìm được mọi vật chuyển động, như vạch sáng của nguồn pattern://.
+    """
+    def __init__(self, buffers):
+        self.buffers = buffers
+        self.subtractor = cv2.createBackgroundSubtractorMOG2(
+            MOTION_HISTORY, MOTION_THRESHOLD, detectShadows=False)
+
+    def detect(self, frame):
+        mask = self.subtractor.apply(frame)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, None)  # Bỏ nhiễu từng điểm ảnh
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return None
+        largest = max(contours, key=cv2.contourArea)
+        if cv2.contourArea(largest) < MOTION_MIN_AREA * mask.size:
+            return None
+        return cv2.boundingRect(largest)
+
+
+class DnnDetector:
+    """Mạng cv2.dnn trả về kết quả kiểu SSD (1, 1, N, 7); giữ kết quả điểm cao nhất."""
+    def __init__(self, buffers, model, config=None):
+        self.buffers = buffers
+        self.net = cv2.dnn.readNet(model, config or "")
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+    def detect(self, frame):
+        h, w = frame.shape[:2]
+        blob = cv2.dnn.blobFromImage(frame, 1 / 127.5, DNN_INPUT, (127.5, 127.5, 127.5),
+                                     swapRB=True)
+        self.net.setInput(blob)
+        detections = self.net.forward().reshape(-1, 7)
+        if not len(detections):
+            return None
+        best = detections[np.argmax(detections[:, 2])]
+        if best[2] < DNN_CONFIDENCE:
+            return None
+        x0, y0, x1, y1 = np.clip(best[3:7], 0, 1) * (w, h, w, h)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return int(x0), int(y0), int(x1 - x0), int(y1 - y0)
@@ -0,0 +1,126 @@
+import csv
+import json
+import time
+import numpy as np
+
+# Các mốc thời gian ghi cho mỗi frame được hiển thị, theo thứ tự xử lý
+STAMPS = ("read_start", "read", "convert", "take", "upload", "scale", "paint")
+READ_START, READ, CONVERT, TAKE, UPLOAD, SCALE, PAINT = range(len(STAMPS))
+# Tên công đoạn -> (mốc bắt đầu, mốc kết thúc); "total" là từ lúc đọc đến lúc vẽ xong
+STAGES = {
+    "read": ("read_start", "read"),        # cap.read vào bộ đệm pool
+    "convert": ("read", "convert"),        # Chép, thu phóng và cvtColor trong luồng camera
+    "deliver": ("convert", "take"),        # Gửi vào hộp thư, truyền frame_ready và chờ vòng lặp sự kiện
+    "upload": ("take", "upload"),          # QPixmap.fromImage hoặc nạp texture
+    "scale": ("upload", "scale"),          # Thu phóng theo widget khi luồng camera chưa làm
+    "paint": ("scale", "paint"),           # Phần còn lại của paintEvent: vẽ frame và lớp phủ
+    "total": ("read_start", "paint"),
+}
+STAGE_STARTS = [STAMPS.index(start) for start, _ in STAGES.values()]
+STAGE_ENDS = [STAMPS.index(end) for _, end in STAGES.values()]
+PERCENTILES = (50, 95, 99)
+DEFAULT_CAPACITY = 600  # Số frame lưu, 20 giây ở 30 fps
+SUMMARY_INTERVAL = 0.5  # Thời gian (giây) dùng lại bản tổng hợp để HUD không tốn CPU
+
+
+def new_stamps():
+    """Tạo danh sách mốc thời gian mà mỗi PooledFrame mang theo qua các công đoạn."""
+    return [0.0] * len(STAMPS)
+
+
+class PipelineStats:
+    """Lớp vòng đệm cố định lưu mốc thời gian từng công đoạn của các frame đã hiển thị.
+
+    Luồng camera và giao diện ghi time.monotonic() vào danh sách đi kèm mỗi
+    frame (frame.stamps); giao diện lưu vào đây khi frame đã vẽ xong. Chỉ
+    luồng giao diện dùng vòng đệm nên không cần khóa, và vòng đệm cấp phát
+    một lần nên mỗi frame chỉ tốn một lần chép hàng.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.ring = np.zeros((capacity, len(STAMPS)))
+        self.index = 0   # Hàng sẽ ghi tiếp theo
+        self.count = 0   # Số hàng đã có dữ liệu, tối đa capacity
+        self.summary_cache = None
+        self.summary_time = 0.0
+
+    def commit(self, stamps):
+        """Lưu mốc thời gian của một frame đã vẽ."""
+        self.ring[self.index] = stamps
+        self.index = (self.index + 1) % len(self.ring)
+        self.count = min(self.count + 1, len(self.ring))
+
+    def clear(self):
+        """Xóa mọi frame đã ghi."""
+        self.index = 0
+        self.count = 0
+        self.summary_cache = None
+
+    def frames(self):
+        """Trả về mảng (frame, mốc) đã ghi, frame cũ nhất trước."""
+        if self.count < len(self.ring):
+            return self.ring[:self.count]
+        return np.roll(self.ring, -self.index, axis=0)
+
+    def durations(self, frames=None):
+        """Trả về mảng (frame, công đoạn) thời gian từng công đoạn tính bằng giây, theo thứ tự STAGES."""
+        frames = self.frames() if frames is None else frames
+        return frames[:, STAGE_ENDS] - frames[:, STAGE_STARTS]
+
+    def summary(self, max_age=0.0):
+        """Tính fps và p50/p95/p99 (ms) của từng công đoạn trên cửa sổ trượt.
+
+        Bản tổng hợp chưa quá max_age giây thì được trả lại thay vì tính lại.
+        """
+        now = time.monotonic()
+        if self.summary_cache is not None and now - self.summary_time < max_age:
+            return self.summary_cache
+        frames = self.frames()
+        result = {"frames": len(frames), "fps": 0.0, "stages": {}}
+        if len(frames):
+            painted = frames[:, PAINT]
+            if len(frames) > 1 and painted[-1] > painted[0]:
+                result["fps"] = (len(frames) - 1) / (painted[-1] - painted[0])
+            table = 1000 * np.percentile(self.durations(frames), PERCENTILES, axis=0)
+            for column, stage in enumerate(STAGES):
+                result["stages"][stage] = {f"p{p}": float(table[row, column])
+                                           for row, p in enumerate(PERCENTILES)}
+        self.summary_cache = result
+        self.summary_time = now
+        return result
+
+    def export(self, path, extra=None):
+        """Ghi bản tổng hợp và mọi frame ra path, dạng CSV hoặc JSON theo đuôi tệp."""
+        if path.lower().endswith(".csv"):
+            self.export_csv(path)
+        else:
+            self.export_json(path, extra)
+
+    def export_json(self, path, extra=None):
+        """Ghi {"summary", "frames", ...extra} với thời gian từng công đoạn (ms) của mỗi frame."""
+        frames = self.frames()
+        durations = 1000 * self.durations(frames)
+        data = dict(extra or {})
+        data["summary"] = self.summary()
+        data["frames"] = [
+            dict(zip(STAGES, row.tolist()), read_start=float(start))
+            for start, row in zip(frames[:, READ_START], durations)]
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+    def export_csv(self, path):
+        """Ghi mỗi frame một hàng: thời điểm đọc rồi thời gian từng công đoạn (ms)."""
+        frames = self.frames()
+        durations = 1000 * self.durations(frames)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["read_start"] + [f"{stage}_ms" for stage in STAGES])
+            for start, row in zip(frames[:, READ_START], durations):
+                writer.writerow([f"{start:.6f}"] + [f"{value:.3f}" for value in row])
+
+    def hud_rows(self):
+        """Trả về bảng HUD: một hàng tiêu đề rồi mỗi công đoạn một hàng."""
+        summary = self.summary(SUMMARY_INTERVAL)
+        rows = [[f"{summary['fps']:.1f} fps"] + [f"p{p}" for p in PERCENTILES]]
+        for stage, values in summary["stages"].items():
+            rows.append([stage] + [f"{value:.2f}" for value in values.values()])
+        return rows
@@ -1,7 +1,7 @@
-import math
 from PyQt5.QtWidgets import QWidget
-from PyQt5.QtCore import Qt, QRectF
-from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QFont
+from PyQt5.QtCore import Qt, QRect, QRectF
+from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QFont, QPixmap, QRegion
+from dial_geometry import TICK_VECTORS, unit_vector
 
 class RadianAnglePicker(QWidget):
     """Lớp hiển thị đồng hồ góc tầm (0-90 độ)."""
@@ -9,7 +9,10 @@ class RadianAnglePicker(QWidget):
         super().__init__(parent)
         self.setMinimumSize(124, 124)  # Kích thước tối thiểu
         self.indicator_angle = 45      # Góc ban đầu
+        self.indicator_vector = unit_vector(self.indicator_angle)  # (cos, sin) của kim
         self.day_mode = day_mode       # Chế độ ngày/đêm
+        self.dial = None               # Pixmap mặt đồng hồ tĩnh
+        self.dial_key = None           # (rộng, cao, day_mode) của pixmap đã vẽ
 
     def set_day_mode(self, day_mode):
         """Cập nhật chế độ ngày/đêm."""
@@ -19,55 +22,91 @@ class RadianAnglePicker(QWidget):
     def set_angle(self, angle):
         """Cập nhật góc tầm (0-90 độ)."""
         try:
+            old_rect = self.needle_rect()
             self.indicator_angle = max(0, min(90, float(angle)))
-            self.update()
+            self.indicator_vector = unit_vector(self.indicator_angle)
+            self.update(QRegion(old_rect).united(QRegion(self.needle_rect())))
         except (ValueError, TypeError):
             print(f"Góc không hợp lệ cho RadianAnglePicker: {angle}")
 
-    def paintEvent(self, event):
-        """Vẽ đồng hồ góc tầm với cung 90 độ và kim chỉ báo."""
-        painter = QPainter(self)
+    def dial_center(self):
+        """Trả về tâm và bán kính cung theo kích thước hiện tại."""
+        margin = 2
+        radius = min(self.width(), self.height()) - margin * 2
+        center_x = self.width() - margin - radius
+        center_y = self.height() - margin
+        return center_x, center_y, radius
+
+    def needle_end(self):
+        """Trả về tâm và đầu kim theo pixel widget."""
+        center_x, center_y, radius = self.dial_center()
+        cos_a, sin_a = self.indicator_vector
+        pointer_x = center_x + radius * 0.8 * cos_a
+        pointer_y = center_y - radius * 0.8 * sin_a
+        return center_x, center_y, int(pointer_x), int(pointer_y)
+
+    def needle_rect(self):
+        """Trả về hình chữ nhật bao kim chỉ báo, có lề cho độ dày bút."""
+        center_x, center_y, pointer_x, pointer_y = self.needle_end()
+        rect = QRect(min(center_x, pointer_x), min(center_y, pointer_y),
+                     abs(pointer_x - center_x) + 1, abs(pointer_y - center_y) + 1)
+        return rect.adjusted(-3, -3, 3, 3)
+
+    def dial_pixmap(self):
+        """Trả về mặt đồng hồ tĩnh, chỉ vẽ lại khi đổi kích thước hoặc chế độ ngày/đêm."""
+        key = (self.width(), self.height(), self.day_mode)
+        if key != self.dial_key:
+            self.dial = self.render_dial()
+            self.dial_key = key
+        return self.dial
+
+    def render_dial(self):
+        """Vẽ khung, cung 90 độ, trục và mốc góc vào pixmap."""
+        pixmap = QPixmap(self.size())
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
         painter.setRenderHint(QPainter.Antialiasing)
-        try:
-            width, height = self.width(), self.height()
-            margin = 2
-            radius = min(width, height) - margin * 2
-            center_x = width - margin - radius
-            center_y = height - margin
+        width, height = self.width(), self.height()
+        center_x, center_y, radius = self.dial_center()
+
+        border_color = Qt.white if self.day_mode else Qt.black
+        bg_color = Qt.black if self.day_mode else Qt.white
 
-            border_color = Qt.white if self.day_mode else Qt.black
-            bg_color = Qt.black if self.day_mode else Qt.white
-            indicator_color = Qt.red
+        # Vẽ khung và nền
+        painter.setPen(QPen(border_color, 2))
+        painter.drawRect(0, 0, width - 1, height - 1)
+        painter.setBrush(QBrush(bg_color))
+        painter.drawArc(QRectF(center_x - radius, center_y - radius, 
+                             radius * 2, radius * 2), 0 * 16, 90 * 16)
 
-            # Vẽ khung và nền
-            painter.setPen(QPen(border_color, 2))
-            painter.drawRect(0, 0, width - 1, height - 1)
-            painter.setBrush(QBrush(bg_color))
-            painter.drawArc(QRectF(center_x - radius, center_y - radius, 
-                                 radius * 2, radius * 2), 0 * 16, 90 * 16)
+        # Vẽ trục
+        painter.setPen(QPen(border_color, 2))
+        painter.drawLine(center_x, center_y, center_x + radius, center_y)
+        painter.drawLine(center_x, center_y, center_x, center_y - radius)
 
-            # Vẽ trục
-            painter.setPen(QPen(border_color, 2))
-            painter.drawLine(center_x, center_y, center_x + radius, center_y)
-            painter.drawLine(center_x, center_y, center_x, center_y - radius)
+        # Vẽ mốc góc (0-90 độ: 7 phần tử đầu của bảng vạch)
+        mark_length = radius // 6
+        painter.setFont(QFont('Arial', min(10, radius // 8)))
+        for cos_a, sin_a in TICK_VECTORS[:7]:
+            outer_x = center_x + radius * cos_a
+            outer_y = center_y - radius * sin_a
+            inner_x = center_x + (radius - mark_length) * cos_a
+            inner_y = center_y - (radius - mark_length) * sin_a
+            painter.setPen(QPen(border_color, 1))
+            painter.drawLine(int(outer_x), int(outer_y), int(inner_x), int(inner_y))
+        painter.end()
+        return pixmap
 
-            # Vẽ mốc góc
-            mark_length = radius // 6
-            painter.setFont(QFont('Arial', min(10, radius // 8)))
-            for angle in range(0, 91, 15):
-                rad_angle = math.radians(angle)
-                outer_x = center_x + radius * math.cos(rad_angle)
-                outer_y = center_y - radius * math.sin(rad_angle)
-                inner_x = center_x + (radius - mark_length) * math.cos(rad_angle)
-                inner_y = center_y - (radius - mark_length) * math.sin(rad_angle)
-                painter.setPen(QPen(border_color, 1))
-                painter.drawLine(int(outer_x), int(outer_y), int(inner_x), int(inner_y))
+    def paintEvent(self, event):
+        """Vẽ mặt đồng hồ đã lưu đệm và kim chỉ báo lên trên."""
+        painter = QPainter(self)
+        try:
+            painter.drawPixmap(0, 0, self.dial_pixmap())
+            painter.setRenderHint(QPainter.Antialiasing)
 
             # Vẽ kim chỉ báo
-            rad_angle = math.radians(self.indicator_angle)
-            pointer_x = center_x + radius * 0.8 * math.cos(rad_angle)
-            pointer_y = center_y - radius * 0.8 * math.sin(rad_angle)
-            painter.setPen(QPen(indicator_color, 2))
-            painter.drawLine(center_x, center_y, int(pointer_x), int(pointer_y))
+            center_x, center_y, pointer_x, pointer_y = self.needle_end()
+            painter.setPen(QPen(Qt.red, 2))
+            painter.drawLine(center_x, center_y, pointer_x, pointer_y)
         except Exception as e:
-            print(f"Lỗi trong paintEvent của RadianAnglePicker: {str(e)}")
\ No newline at end of file
+            print(f"Lỗi trong paintEvent của RadianAnglePicker: {str(e)}")
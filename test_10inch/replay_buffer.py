@@ -0,0 +1,202 @@
+import json
+import math
+import os
+import threading
+import cv2
+import numpy as np
+
+# Khoảng thời gian lưu lại trước sự kiện của luồng chính, ví dụ REPLAY_SECONDS=20 REPLAY_MEMORY_MB=128
+DEFAULT_SECONDS = float(os.environ.get("REPLAY_SECONDS", "10"))
+DEFAULT_MEMORY = int(float(os.environ.get("REPLAY_MEMORY_MB", "128")) * 2**20)
+DEFAULT_WIDTH = int(os.environ.get("REPLAY_WIDTH", "480"))  # Chiều rộng tối đa của frame lưu
+DEFAULT_FPS = 30.0           # Số frame lưu mỗi giây; nguồn nhanh hơn bị lấy thưa
+EXPORT_CODEC = "MJPG"
+EXPORT_EXTENSION = ".avi"
+
+
+def stored_size(shape, width):
+    """Trả về kích thước (w, h) lưu frame có kích thước shape, không phóng to."""
+    h, w = shape[:2]
+    if w <= width:
+        return w, h
+    return width, max(1, h * width // w)
+
+
+class ReplayBuffer:
+    """Bộ đệm vòng bộ nhớ cố định chứa vài giây gần nhất của luồng, để dừng hình và xem lại.
+
+    Luồng camera ghi bản thu nhỏ BGR của từng frame thẳng vào mảng
+    (frames, h, w, 3) cấp phát sẵn, tối đa fps lần mỗi giây, nên lưu một
+    frame không cấp phát gì. Mảng chỉ cấp phát lại khi nguồn đổi độ phân
+    giải và không vượt quá memory_bytes (khoảng thời gian ngắn lại nếu cần).
+    hold() giữ cố định vị trí các frame đã lưu để giao diện tua hoặc xuất;
+    camera vẫn ghi tiếp vào vòng đệm, ghi đè các frame cũ nhất của cửa sổ
+    trước, nhưng không bao giờ ghi đè frame đang bị pin() ghim. Khi hàng
+    sắp ghi đang bị ghim, frame mới bị bỏ và stalled là True, nên ghim frame
+    cũ nhất sẽ làm dừng ghi.
+    """
+    def __init__(self, seconds=DEFAULT_SECONDS, memory_bytes=DEFAULT_MEMORY,
+                 width=DEFAULT_WIDTH, fps=DEFAULT_FPS):
+        self.seconds = seconds
+        self.memory_bytes = memory_bytes
+        self.width = width
+        self.fps = fps
+        self.lock = threading.Lock()
+        self.frames = None        # Mảng vòng (capacity, h, w, 3) uint8
+        self.times = None         # Thời điểm chụp của từng hàng, time.monotonic()
+        self.source_shape = None  # Kích thước nguồn lúc cấp phát
+        self.written = 0          # Số frame đã lưu từ lúc cấp phát; hàng ghi tiếp là written % capacity
+        self.count = 0            # Số hàng đã có dữ liệu, tối đa capacity
+        self.holds = 0            # Số nơi cần giữ cố định vị trí frame
+        self.start = self.end = 0 # Cửa sổ đang giữ, tính theo số frame đã lưu
+        self.pins = []            # Số thứ tự các frame đang được đọc, không bị ghi đè
+        self.stalled = False      # True khi đang bỏ frame mới để giữ frame bị ghim
+        self.next_time = 0.0      # Thời điểm chụp sớm nhất được lưu tiếp
+
+    def allocate(self, source_shape):
+        """Cấp phát bộ đệm cho nguồn kích thước source_shape; xóa các frame đã lưu."""
+        w, h = stored_size(source_shape, self.width)
+        capacity = min(math.ceil(self.seconds * self.fps), self.memory_bytes // (w * h * 3))
+        self.frames = np.zeros((max(1, capacity), h, w, 3), np.uint8)
+        self.times = np.zeros(len(self.frames))
+        self.source_shape = source_shape
+        self.written = 0
+        self.count = 0
+
+    def write(self, image, captured_at, source=None):
+        """Lưu một frame BGR; do luồng camera gọi.
+
+        source là frame độ phân giải gốc khi image đã thu phóng để hiển thị:
+        bộ đệm cấp phát theo source nên đổi kích thước cửa sổ không cấp phát
+        lại, và source được dùng khi image nhỏ hơn một hàng.
+        Trả về True nếu frame được lưu.
+        """
+        with self.lock:
+            if captured_at < self.next_time:
+                return False
+            source = image if source is None else source
+            if source.shape != self.source_shape:
+                if self.holds:
+                    # Cấp phát lại sẽ mất cửa sổ đang giữ
+                    self.stalled = True
+                    return False
+                self.allocate(source.shape)
+            capacity = len(self.frames)
+            if self.pins and self.count == capacity and self.written - capacity >= min(self.pins):
+                self.stalled = True
+                return False
+            self.stalled = False
+            self.next_time = max(self.next_time + 1.0 / self.fps,
+                                 captured_at + 0.5 / self.fps)
+            index = self.written % capacity
+            row = self.frames[index]
+            if image.shape[1] < row.shape[1]:
+                image = source
+            if image.shape == row.shape:
+                np.copyto(row, image)
+            else:
+                # INTER_AREA tốn 5-10 ms mỗi frame trên luồng camera
+                cv2.resize(image, (row.shape[1], row.shape[0]), dst=row,
+                           interpolation=cv2.INTER_LINEAR)
+            self.times[index] = captured_at
+            self.written += 1
+            self.count = min(self.count + 1, capacity)
+        return True
+
+    def hold(self):
+        """Giữ cố định cửa sổ; vị trí frame không đổi cho đến release() tương ứng.
+
+        Camera vẫn ghi: các frame cũ hơn mọi chỗ ghim bị ghi đè như thường,
+        nên oldest() tăng dần trong lúc giữ.
+        """
+        with self.lock:
+            if not self.holds:
+                self.end = self.written
+                self.start = self.end - self.count
+            self.holds += 1
+
+    def release(self):
+        """Cho cửa sổ chạy theo camera trở lại."""
+        with self.lock:
+            self.holds = max(0, self.holds - 1)
+
+    def pin(self, position):
+        """Ghim frame tại position (giới hạn trong các frame còn lưu) để không bị ghi đè.
+
+        Chỉ dùng khi đang giữ. Trả về vị trí đã giới hạn; truyền nó cho unpin().
+        """
+        with self.lock:
+            position = max(self.oldest(), min(len(self) - 1, position))
+            self.pins.append(self.start + position)
+            return position
+
+    def unpin(self, position):
+        """Bỏ một chỗ ghim của pin()."""
+        with self.lock:
+            self.pins.remove(self.start + position)
+
+    def __len__(self):
+        return self.end - self.start if self.holds else self.count
+
+    def oldest(self):
+        """Trả về vị trí cũ nhất còn lưu; lớn hơn 0 khi camera đã ghi đè frame của cửa sổ đang giữ."""
+        if not self.holds:
+            return 0
+        return max(0, min(len(self), self.written - self.count - self.start))
+
+    def row(self, position):
+        """Trả về hàng của vị trí position, 0 là frame cũ nhất của cửa sổ."""
+        first = self.start if self.holds else self.written - self.count
+        return (first + position) % len(self.frames)
+
+    def frame(self, position):
+        """Trả về (mảng BGR, thời điểm chụp) tại position; chỉ ổn định khi đang ghim."""
+        row = self.row(position)
+        return self.frames[row], float(self.times[row])
+
+    def age(self, position):
+        """Trả về số giây frame tại position cũ hơn frame mới nhất của cửa sổ."""
+        return float(self.times[self.row(len(self) - 1)] - self.times[self.row(position)])
+
+    def memory(self):
+        """Trả về số byte đã cấp phát cho frame."""
+        return self.frames.nbytes if self.frames is not None else 0
+
+    def export(self, path, first=0, last=None):
+        """Ghi các vị trí first..last thành video kèm file .jsonl thời điểm chụp.
+
+        Cửa sổ được giữ và chỉ frame đang ghi bị ghim, nên camera vẫn ghi vào
+        vòng đệm trong lúc xuất; first đã bị ghi đè được nâng lên oldest().
+        Trả về số frame đã ghi.
+        """
+        self.hold()
+        try:
+            last = len(self) - 1 if last is None else min(last, len(self) - 1)
+            if last < max(first, self.oldest()):
+                return 0
+            first = pinned = self.pin(first)
+            try:
+                h, w = self.frames.shape[1:3]
+                writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*EXPORT_CODEC),
+                                         self.fps, (w, h))
+                if not writer.isOpened():
+                    raise OSError(f"Không ghi được {path}")
+                try:
+                    with open(os.path.splitext(path)[0] + ".jsonl", "w") as sidecar:
+                        sidecar.write(json.dumps({"fps": self.fps, "size": [w, h]}) + "\n")
+                        for number, position in enumerate(range(first, last + 1)):
+                            # Dời ghim theo để camera dùng lại các hàng đã ghi xong
+                            self.pin(position)
+                            self.unpin(pinned)
+                            pinned = position
+                            image, captured_at = self.frame(position)
+                            writer.write(image)
+                            sidecar.write(json.dumps({"frame": number,
+                                                      "captured_at": captured_at}) + "\n")
+                finally:
+                    writer.release()
+                return last - first + 1
+            finally:
+                self.unpin(pinned)
+        finally:
+            self.release()
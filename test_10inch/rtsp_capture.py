@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+# Tùy chọn FFmpeg cho luồng mạng độ trễ thấp; xem OPENCV_FFMPEG_CAPTURE_OPTIONS
+DEFAULT_FFMPEG_OPTIONS = {
+    "rtsp_transport": "tcp",  # "udp" giảm trễ thêm chút nhưng kém tin cậy hơn
+    "fflags": "nobuffer",
+    "flags": "low_delay",
+}
+READ_TIMEOUT = 2.0  # Số giây read() chờ frame mới
+
+_open_lock = threading.Lock()  # OpenCV đọc biến môi trường tùy chọn lúc mở
+
+
+def is_rtsp_source(source):
+    """Trả về True với URL rtsp:// và rtsps://."""
+    return isinstance(source, str) and source.lower().startswith(("rtsp://", "rtsps://"))
+
+
+def open_capture(source, ffmpeg_options=None):
+    """Mở URL RTSP bằng LatestFrameCapture, các nguồn khác bằng cv2.VideoCapture."""
+    if is_rtsp_source(source):
+        return LatestFrameCapture(source, ffmpeg_options)
+    return cv2.VideoCapture(source)
+
+
+class LatestFrameCapture:
+    """Lớp bọc camera có vòng grab riêng, chỉ giữ frame giải mã mới nhất.
+
+    Một luồng riêng rút cạn bộ đệm FFmpeg ngay khi frame tới, nên read()
+    luôn trả về ảnh mới nhất thay vì ảnh đã nằm trong hàng đợi vài giây.
+    Lớp có cùng các phương thức của cv2.VideoCapture mà VideoThread dùng.
+
+    realtime=True phát lại file theo đúng FPS của nó, biến file thành nguồn
+    thay thế cục bộ cho camera RTSP khi kiểm thử, xem live:// trong
+    video_source.
+    """
+    def __init__(self, source, ffmpeg_options=None, realtime=False):
+        options = dict(DEFAULT_FFMPEG_OPTIONS)
+        options.update(ffmpeg_options or {})
+        self.source = source
+        self.realtime = realtime
+        with _open_lock:
+            previous = os.environ.get("OPENCV_FFMPEG_CAPTURE_OPTIONS")
+            os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = "|".join(
+                f"{key};{value}" for key, value in options.items())
+            try:
+                self.cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG)
+            finally:
+                if previous is None:
+                    del os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"]
+                else:
+                    os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = previous
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.props = {prop: self.cap.get(prop) for prop in
+                      (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT, cv2.CAP_PROP_FPS)}
+        self.latest = None
+        self.sequence = 0       # Số frame vòng grab đã giải mã
+        self.read_sequence = 0  # Số thứ tự cuối cùng đã trả cho read()
+        self.skipped = 0        # Frame bị thay trước khi được đọc
+        self.ended = False
+        self.running = self.cap.isOpened()
+        self.condition = threading.Condition()
+        self.thread = None
+        if self.running:
+            self.thread = threading.Thread(target=self.grab_loop, daemon=True)
+            self.thread.start()
+
+    def grab_loop(self):
+        """Giải mã frame ngay khi tới và chỉ giữ frame mới nhất."""
+        spare = None
+        fps = self.props[cv2.CAP_PROP_FPS]
+        period = 1.0 / fps if self.realtime and fps > 0 else 0.0
+        next_time = time.monotonic()
+        while self.running:
+            ret, frame = self.cap.read(spare)
+            if not ret:
+                break
+            with self.condition:
+                if self.sequence != self.read_sequence:
+                    self.skipped += 1
+                spare, self.latest = self.latest, frame
+                self.sequence += 1
+                self.condition.notify_all()
+            if period:
+                next_time += period
+                time.sleep(max(0.0, next_time - time.monotonic()))
+        with self.condition:
+            self.ended = True
+            self.condition.notify_all()
+
+    def isOpened(self):
+        """Trả về True khi luồng đang mở và vòng grab đang chạy."""
+        return self.running and not self.ended and self.cap.isOpened()
+
+    def get(self, prop):
+        """Trả về thuộc tính camera; kích thước và FPS được lưu lúc mở."""
+        return self.props[prop] if prop in self.props else self.cap.get(prop)
+
+    def set(self, prop, value):
+        """Chuyển thuộc tính xuống camera bên dưới."""
+        return self.cap.set(prop, value)
+
+    def read(self, image=None):
+        """Trả về frame mới nhất chưa đọc, chép vào image nếu cùng kích thước."""
+        with self.condition:
+            if not self.condition.wait_for(
+                    lambda: self.sequence != self.read_sequence or self.ended, READ_TIMEOUT):
+                return False, None
+            if self.sequence == self.read_sequence:
+                return False, None
+            self.read_sequence = self.sequence
+            if image is not None and image.shape == self.latest.shape:
+                np.copyto(image, self.latest)
+                return True, image
+            return True, self.latest.copy()
+
+    def grab(self):
+        """Chờ frame chưa đọc như read(), rồi đánh dấu là đã dùng mà không chép."""
+        with self.condition:
+            if not self.condition.wait_for(
+                    lambda: self.sequence != self.read_sequence or self.ended, READ_TIMEOUT):
+                return False
+            fresh = self.sequence != self.read_sequence
+            self.read_sequence = self.sequence
+            return fresh
+
+    def release(self):
+        """Dừng vòng grab và đóng luồng."""
+        self.running = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(READ_TIMEOUT)
+        self.cap.release()
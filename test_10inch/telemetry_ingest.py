@@ -0,0 +1,133 @@
+import socket
+import threading
+import time
+from urllib.parse import urlsplit, parse_qs
+from PyQt5.QtCore import QThread, pyqtSignal
+from telemetry_protocol import PACKET_SIZE, PacketReader, SequenceTracker, decode_packet
+
+DEFAULT_BAUD = 115200
+RECEIVE_TIMEOUT = 0.2     # Số giây chờ nhận dữ liệu để kịp thấy stop()
+RETRY_DELAY = 1.0         # Số giây trước khi mở lại socket hoặc cổng nối tiếp bị lỗi
+UDP_RECEIVE_BUFFER = 1 << 20  # Đủ chứa các đợt gói dồn khi luồng chờ GIL
+
+
+class TelemetryIngest(QThread):
+    """Luồng nhận dữ liệu đo xa nhị phân từ "udp://host:port" hoặc "serial:///dev/ttyX?baud=N".
+
+    Mẫu đã giải mã được đặt vào một ô chứa "mẫu mới nhất thắng", sample_ready chỉ
+    được phát khi ô đang trống nên thiết bị 1 kHz không làm ngập hàng đợi sự kiện
+    giao diện. Mỗi mẫu mang số thứ tự, thời gian thiết bị, thời điểm nhận
+    (time.monotonic()) và số gói bị mất ngay trước nó.
+    """
+    sample_ready = pyqtSignal()       # Có mẫu mới đang chờ, xem take()
+    error_occurred = pyqtSignal(str)  # Mỗi lỗi chỉ gửi một lần
+
+    def __init__(self, source):
+        super().__init__()
+        self.source = urlsplit(source)
+        if self.source.scheme not in ("udp", "serial"):
+            raise ValueError(f"Không hỗ trợ nguồn đo xa {source!r}")
+        if self.source.scheme == "udp" and self.source.port is None:
+            raise ValueError(f"Nguồn đo xa {source!r} thiếu cổng")
+        self.tracker = SequenceTracker()
+        self.reader = PacketReader()
+        self.decode_errors = 0  # Số datagram hoặc gói không hợp lệ
+        self.coalesced = 0      # Số mẫu bị thay trước khi giao diện lấy
+        self.last_error = None
+        self._sample = None
+        self._lock = threading.Lock()
+        self.running = True
+
+    def take(self):
+        """Lấy ra mẫu mới nhất, hoặc None nếu chưa có mẫu mới."""
+        with self._lock:
+            sample, self._sample = self._sample, None
+        return sample
+
+    def stats(self):
+        """Trả về bản sao các bộ đếm đường truyền."""
+        stats = self.tracker.stats()
+        stats.update(decode_errors=self.decode_errors + self.reader.errors,
+                     coalesced=self.coalesced)
+        return stats
+
+    def post(self, sample, received_at):
+        """Kiểm tra số thứ tự của mẫu và chuyển lên giao diện nếu không đến muộn."""
+        gap, late = self.tracker.check(sample["sequence"])
+        if late:
+            return
+        sample["received_at"] = received_at
+        sample["gap"] = gap
+        with self._lock:
+            old, self._sample = self._sample, sample
+            if old is not None:
+                self.coalesced += 1
+        if old is None:
+            self.sample_ready.emit()
+
+    def report_error(self, message):
+        """Gửi thông báo lỗi trừ khi trùng với lỗi gần nhất."""
+        if message != self.last_error:
+            self.last_error = message
+            self.error_occurred.emit(message)
+
+    def run(self):
+        """Nhận dữ liệu đến khi stop(), mở lại đường truyền khi gặp lỗi."""
+        receive = self.receive_udp if self.source.scheme == "udp" else self.receive_serial
+        while self.running:
+            try:
+                receive()
+            except ImportError:
+                self.report_error("Cần cài pyserial để nhận đo xa qua cổng nối tiếp")
+                return
+            except (OSError, ValueError) as e:
+                self.report_error(f"Lỗi đường truyền đo xa: {str(e)}")
+                deadline = time.monotonic() + RETRY_DELAY
+                while self.running and time.monotonic() < deadline:
+                    self.msleep(50)
+
+    def receive_udp(self):
+        """Đọc các datagram, mỗi datagram chứa một hoặc nhiều gói."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RECEIVE_BUFFER)
+            sock.bind((self.source.hostname or "0.0.0.0", self.source.port))
+            sock.settimeout(RECEIVE_TIMEOUT)
+            buffer = bytearray(65536)
+            view = memoryview(buffer)
+            while self.running:
+                try:
+                    size = sock.recv_into(buffer)
+                except socket.timeout:
+                    continue
+                received_at = time.monotonic()
+                if size % PACKET_SIZE:
+                    self.decode_errors += 1
+                for offset in range(0, size - size % PACKET_SIZE, PACKET_SIZE):
+                    try:
+                        sample = decode_packet(view[offset:offset + PACKET_SIZE])
+                    except ValueError:
+                        self.decode_errors += 1
+                        continue
+                    self.post(sample, received_at)
+        finally:
+            sock.close()
+
+    def receive_serial(self):
+        """Đọc luồng byte nối tiếp và tách thành các gói."""
+        import serial  # Thư viện tùy chọn, chỉ cần cho cổng nối tiếp
+        options = parse_qs(self.source.query)
+        port = self.source.netloc + self.source.path
+        baud = int(options.get("baud", [DEFAULT_BAUD])[0])
+        with serial.Serial(port, baud, timeout=RECEIVE_TIMEOUT) as link:
+            while self.running:
+                data = link.read(link.in_waiting or 1)
+                if not data:
+                    continue
+                received_at = time.monotonic()
+                for sample in self.reader.feed(data):
+                    self.post(sample, received_at)
+
+    def stop(self):
+        """Dừng nhận; socket hoặc cổng đóng trong vòng RECEIVE_TIMEOUT."""
+        self.running = False
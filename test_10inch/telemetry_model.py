@@ -0,0 +1,76 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+ORIGIN_DEVICE = "device"      # Giá trị từ đường truyền đo xa hoặc bộ mô phỏng
+ORIGIN_OPERATOR = "operator"  # Giá trị do người vận hành nhập vào ô thông số
+
+# Số chữ số thập phân hiển thị; thay đổi nhỏ hơn mức này không được phát
+DISPLAY_PRECISION = {"distance": 2, "elevation_angle": 2, "azimuth_angle": 2}
+
+
+class TelemetryModel(QObject):
+    """Nguồn dữ liệu duy nhất cho ô thông số, đồng hồ góc và khung giới hạn.
+
+    Mẫu từ thiết bị và giá trị người vận hành nhập đi qua hai phương thức riêng.
+    Giá trị chỉ được phát khi thay đổi ở độ chính xác hiển thị, kèm nguồn gốc,
+    để ô nhập không bị ghi đè lại chính giá trị người vận hành vừa gõ.
+    Giá trị người vận hành nhập được giữ thay cho thiết bị cho tới khi thiết
+    bị báo lại đúng giá trị đó (xác nhận) hoặc báo một giá trị mới của nó.
+    """
+    value_changed = pyqtSignal(str, object, str)  # trường, giá trị, nguồn gốc
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.values = dict.fromkeys(DISPLAY_PRECISION)
+        self.values["bounding_box"] = None
+        self.device_values = dict(self.values)  # Giá trị thiết bị báo gần nhất theo trường
+        self.operator_values = {}  # Giá trị người vận hành nhập, thiết bị chưa xác nhận
+
+    def value(self, field):
+        """Trả về giá trị hiện tại của trường ở độ chính xác hiển thị."""
+        return self.values[field]
+
+    def device_value(self, field):
+        """Trả về giá trị thiết bị báo gần nhất cho trường."""
+        return self.device_values[field]
+
+    def operator_value(self, field):
+        """Trả về giá trị người vận hành đang giữ cho trường, None nếu đang hiện giá trị thiết bị."""
+        return self.operator_values.get(field)
+
+    def set_value(self, field, value, origin):
+        """Lưu giá trị cho trường và phát tín hiệu nếu giá trị hiển thị thay đổi."""
+        value = displayed(field, value)
+        if value == self.values[field]:
+            return False
+        self.values[field] = value
+        self.value_changed.emit(field, value, origin)
+        return True
+
+    def update_from_device(self, sample):
+        """Áp dụng dict đo xa; trường không có trong mẫu giữ nguyên."""
+        for field in self.values:
+            if field not in sample:
+                continue
+            value = displayed(field, sample[field])
+            previous, self.device_values[field] = self.device_values[field], value
+            if field in self.operator_values:
+                if value == previous and value != self.operator_values[field]:
+                    continue  # Thiết bị chưa cập nhật theo người vận hành
+                del self.operator_values[field]
+            self.set_value(field, value, ORIGIN_DEVICE)
+
+    def set_operator_value(self, field, value):
+        """Áp dụng giá trị người vận hành nhập; giữ cho tới khi thiết bị phản hồi."""
+        value = displayed(field, value)
+        if value == self.device_values[field]:
+            self.operator_values.pop(field, None)
+        else:
+            self.operator_values[field] = value
+        self.set_value(field, value, ORIGIN_OPERATOR)
+
+
+def displayed(field, value):
+    """Trả về giá trị làm tròn theo độ chính xác hiển thị của trường."""
+    if field in DISPLAY_PRECISION and value is not None:
+        return round(value, DISPLAY_PRECISION[field])
+    return value
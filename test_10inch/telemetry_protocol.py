@@ -0,0 +1,115 @@
+import struct
+import zlib
+
+MAGIC = b"\xa5\x5a"
+VERSION = 1
+FLAG_BOUNDING_BOX = 0x01  # Các trường khung chứa kết quả phát hiện
+
+# magic, phiên bản, cờ, số thứ tự, thời gian thiết bị (us), cự ly (m),
+# góc tầm (độ), góc hướng (độ), khung x, y, w, h (px cảm biến); cuối gói là CRC-32
+PACKET = struct.Struct("<2sBBIQfffhhhh")
+CRC = struct.Struct("<I")
+PACKET_SIZE = PACKET.size + CRC.size
+SEQUENCE_MODULO = 1 << 32
+
+
+def encode_packet(sample, sequence, device_time_us):
+    """Đóng gói dict đo xa (như get_data_from_device trả về) thành bytes."""
+    box = sample.get("bounding_box")
+    flags = FLAG_BOUNDING_BOX if box else 0
+    x, y, w, h = (box["x"], box["y"], box["w"], box["h"]) if box else (0, 0, 0, 0)
+    body = PACKET.pack(MAGIC, VERSION, flags, sequence % SEQUENCE_MODULO, device_time_us,
+                       sample["distance"], sample["elevation_angle"], sample["azimuth_angle"],
+                       x, y, w, h)
+    return body + CRC.pack(zlib.crc32(body))
+
+
+def decode_packet(data):
+    """Giải mã một gói thành dict đo xa; báo ValueError nếu gói không hợp lệ."""
+    if len(data) != PACKET_SIZE:
+        raise ValueError(f"Độ dài gói đo xa sai: {len(data)}")
+    body = data[:PACKET.size]
+    if CRC.unpack_from(data, PACKET.size)[0] != zlib.crc32(body):
+        raise ValueError("Sai CRC gói đo xa")
+    (magic, version, flags, sequence, device_time_us, distance, elevation, azimuth,
+     x, y, w, h) = PACKET.unpack(body)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Không hỗ trợ phiên bản gói đo xa {version}")
+    return {
+        "sequence": sequence,
+        "device_time": device_time_us / 1e6,
+        "distance": distance,
+        "elevation_angle": elevation,
+        "azimuth_angle": azimuth,
+        "bounding_box": {"x": x, "y": y, "w": w, "h": h} if flags & FLAG_BOUNDING_BOX else None,
+    }
+
+
+class PacketReader:
+    """Tách luồng byte (cổng nối tiếp) thành các gói, đồng bộ lại theo MAGIC khi gặp rác."""
+    def __init__(self):
+        self.buffer = bytearray()
+        self.errors = 0  # Số gói hoặc đoạn byte bị bỏ vì không hợp lệ
+
+    def feed(self, data):
+        """Thêm byte vừa nhận và trả về các dict đo xa đã đủ gói."""
+        self.buffer += data
+        samples = []
+        while True:
+            start = self.buffer.find(MAGIC)
+            if start < 0:
+                # Giữ byte MAGIC cuối vì lần đọc sau có thể nối tiếp
+                keep = 1 if self.buffer.endswith(MAGIC[:1]) else 0
+                if len(self.buffer) > keep:
+                    self.errors += 1
+                del self.buffer[:len(self.buffer) - keep]
+                return samples
+            if start:
+                self.errors += 1
+                del self.buffer[:start]
+            if len(self.buffer) < PACKET_SIZE:
+                return samples
+            try:
+                samples.append(decode_packet(bytes(self.buffer[:PACKET_SIZE])))
+                del self.buffer[:PACKET_SIZE]
+            except ValueError:
+                self.errors += 1
+                del self.buffer[:1]
+
+
+class SequenceTracker:
+    """Đếm gói mất, gói đến muộn (sai thứ tự) và gói trùng theo số thứ tự."""
+    def __init__(self):
+        self.expected = None
+        self.received = 0
+        self.lost = 0
+        self.reordered = 0
+        self.duplicates = 0
+
+    def check(self, sequence):
+        """Phân loại số thứ tự; trả về (gap, late).
+
+        gap là số gói bị mất ngay trước gói này; late là True với gói cũ hơn
+        gói đã nhận, gói đó không được ghi đè dữ liệu mới hơn.
+        """
+        self.received += 1
+        if self.expected is None:
+            self.expected = (sequence + 1) % SEQUENCE_MODULO
+            return 0, False
+        ahead = (sequence - self.expected) % SEQUENCE_MODULO
+        if ahead < SEQUENCE_MODULO // 2:
+            self.lost += ahead
+            self.expected = (sequence + 1) % SEQUENCE_MODULO
+            return ahead, False
+        if (self.expected - sequence) % SEQUENCE_MODULO == 1:
+            self.duplicates += 1
+        else:
+            # Gói đã tính là mất lại đến sau các gói kế tiếp
+            self.reordered += 1
+            self.lost = max(0, self.lost - 1)
+        return 0, True
+
+    def stats(self):
+        """Trả về bản sao các bộ đếm."""
+        return {"received": self.received, "lost": self.lost,
+                "reordered": self.reordered, "duplicates": self.duplicates}
@@ -0,0 +1,79 @@
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QPalette, QColor
+
+ROLE_HEADER = "header"    # Nhãn đỏ ghi tên ô thông số
+ROLE_CAPTION = "caption"  # Nhãn dưới đồng hồ góc
+
+# Áp dụng cho toàn ứng dụng một lần; màu lấy từ palette của ứng dụng nên đổi
+# giao diện chỉ cần đổi palette và polish lại các widget được tạo kiểu.
+STYLE_SHEET = """
+QWidget#centralwidget {{ background-color: palette(window); }}
+QFrame#frame_video {{ border: {frame_border}px solid orange; background-color: palette(window); }}
+QLabel[themeRole="header"] {{
+    background-color: red; color: white; font-size: {font_size}px; font-weight: bold;
+    border: {border}px solid palette(window-text);
+}}
+QLabel[themeRole="caption"] {{
+    background-color: palette(window); color: palette(bright-text); font-size: {font_size}px;
+    font-weight: bold; border: {border}px solid palette(window-text);
+}}
+"""
+
+
+def make_palette(day_mode):
+    """Tạo palette cho một giao diện.
+
+    Window là màu nền, WindowText là màu tương phản dùng cho viền (hộp thoại
+    chuẩn vẫn đọc được); BrightText là màu vàng cho giá trị và nhãn.
+    """
+    palette = QPalette()
+    palette.setColor(QPalette.Window, QColor("black" if day_mode else "white"))
+    palette.setColor(QPalette.WindowText, QColor("white" if day_mode else "black"))
+    palette.setColor(QPalette.BrightText, QColor("yellow"))
+    return palette
+
+
+class ThemeManager(QObject):
+    """Giao diện ngày/đêm: palette tính sẵn và một style sheet cho toàn ứng dụng.
+
+    Palette được đặt cho cả ứng dụng vì khi có style sheet, palette đặt ở widget
+    cha không truyền xuống widget con. Widget dùng style sheet được đăng ký bằng
+    style(); widget tự vẽ đăng ký bằng subscribe() để nhận set_day_mode().
+    """
+    theme_changed = pyqtSignal(bool)  # day_mode
+
+    def __init__(self, parent=None, day_mode=True, font_size=16, border=1, frame_border=3):
+        super().__init__(parent)
+        self.day_mode = day_mode
+        self.palettes = {True: make_palette(True), False: make_palette(False)}
+        self.styled = []
+        app = QApplication.instance()
+        app.setStyleSheet(STYLE_SHEET.format(
+            font_size=font_size, border=border, frame_border=frame_border))
+        app.setPalette(self.palettes[day_mode])
+
+    def style(self, widget, role=None):
+        """Đăng ký widget đọc màu từ palette; được polish lại mỗi lần đổi giao diện."""
+        if role:
+            widget.setProperty("themeRole", role)
+        self.styled.append(widget)
+        widget.style().unpolish(widget)
+        widget.style().polish(widget)
+
+    def subscribe(self, widget):
+        """Gọi widget.set_day_mode() theo giao diện hiện tại."""
+        widget.set_day_mode(self.day_mode)
+        self.theme_changed.connect(widget.set_day_mode)
+
+    def set_day_mode(self, day_mode):
+        """Đổi giao diện: đổi palette một lần và polish lại các widget được tạo kiểu."""
+        if day_mode == self.day_mode:
+            return
+        self.day_mode = day_mode
+        QApplication.instance().setPalette(self.palettes[day_mode])
+        for widget in self.styled:
+            widget.style().unpolish(widget)
+            widget.style().polish(widget)
+            widget.update()
+        self.theme_changed.emit(day_mode)
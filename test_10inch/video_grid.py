@@ -0,0 +1,81 @@
+import math
+from PyQt5.QtWidgets import QWidget
+from video_widget import VideoWidget
+
+LAYOUT_GRID = "grid"  # Các ô bằng nhau
+LAYOUT_MAIN = "main"  # Một khung chính và một cột ảnh thu nhỏ
+
+
+class VideoGrid(QWidget):
+    """Lớp hiển thị nhiều camera, mỗi camera một VideoThread riêng.
+
+    Mỗi ô là một VideoWidget nên luồng camera thu phóng frame theo đúng kích
+    thước ô. Ảnh thu nhỏ của bố trí main còn yêu cầu camera giải mã ở
+    thumbnail_size; ô lưới có thể lớn nên giữ độ phân giải gốc của camera.
+    Mọi luồng trừ khung chính chạy theo fps_budget, giữ chi phí mỗi camera
+    thêm vào gần như không đổi.
+    """
+    def __init__(self, parent=None, video_sources=(0,), day_mode=True, layout=LAYOUT_MAIN,
+                 fps_budget=15, main_fps=None, thumbnail_size=(320, 240), spacing=4):
+        super().__init__(parent)
+        self.layout_mode = layout   # Kiểu bố trí (grid/main)
+        self.spacing = spacing      # Khoảng cách giữa các ô (pixel)
+        self.widgets = []           # VideoWidget theo thứ tự nguồn
+        for index, source in enumerate(video_sources):
+            is_main = layout == LAYOUT_MAIN and index == 0
+            is_thumbnail = layout == LAYOUT_MAIN and index > 0
+            widget = VideoWidget(self, video_source=source, day_mode=day_mode,
+                                 target_fps=main_fps if is_main else fps_budget,
+                                 capture_size=thumbnail_size if is_thumbnail else None)
+            self.widgets.append(widget)
+
+    def main_widget(self):
+        """Trả về widget của camera chính."""
+        return self.widgets[0]
+
+    def set_day_mode(self, day_mode):
+        """Cập nhật chế độ ngày/đêm cho mọi camera."""
+        for widget in self.widgets:
+            widget.set_day_mode(day_mode)
+
+    def set_fps_budget(self, fps_budget):
+        """Đổi FPS đọc của mọi luồng trừ khung chính."""
+        for index, widget in enumerate(self.widgets):
+            if self.layout_mode == LAYOUT_GRID or index > 0:
+                widget.set_target_fps(fps_budget)
+
+    def frame_stats(self):
+        """Trả về bộ đếm frame của từng camera theo thứ tự nguồn."""
+        return [widget.frame_stats() for widget in self.widgets]
+
+    def resizeEvent(self, event):
+        """Bố trí lại các camera theo kích thước mới."""
+        self.arrange()
+        super().resizeEvent(event)
+
+    def arrange(self):
+        """Đặt vị trí từng VideoWidget theo kiểu bố trí."""
+        count = len(self.widgets)
+        if not count:
+            return
+        width, height, gap = self.width(), self.height(), self.spacing
+        if self.layout_mode == LAYOUT_MAIN and count > 1:
+            thumb_w = width // 4
+            thumb_h = (height - gap * (count - 2)) // (count - 1)
+            self.widgets[0].setGeometry(0, 0, width - thumb_w - gap, height)
+            for index, widget in enumerate(self.widgets[1:]):
+                widget.setGeometry(width - thumb_w, index * (thumb_h + gap), thumb_w, thumb_h)
+            return
+        cols = math.ceil(math.sqrt(count))
+        rows = math.ceil(count / cols)
+        cell_w = (width - gap * (cols - 1)) // cols
+        cell_h = (height - gap * (rows - 1)) // rows
+        for index, widget in enumerate(self.widgets):
+            row, col = divmod(index, cols)
+            widget.setGeometry(col * (cell_w + gap), row * (cell_h + gap), cell_w, cell_h)
+
+    def closeEvent(self, event):
+        """Dừng mọi luồng camera khi đóng."""
+        for widget in self.widgets:
+            widget.close()
+        super().closeEvent(event)
@@ -0,0 +1,246 @@
+import json
+import multiprocessing
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+
+DEFAULT_CODEC = "MJPG"       # Chỉ có khung I, đoạn bị cắt ngang do mất điện vẫn đọc được
+DEFAULT_EXTENSION = ".avi"
+DEFAULT_SEGMENT_SECONDS = 300.0
+DEFAULT_SLOTS = 8            # Số frame được chờ mã hóa
+DEFAULT_MAX_FRAME = (1920, 1080)  # Frame lớn nhất một slot chứa được
+MAX_STRIDE = 8               # Khi mã hóa chậm, ghi thưa nhất 1 trên 8 frame
+RECOVER_SECONDS = 2.0        # Thời gian hàng đợi phải gần rỗng trước khi giảm bước nhảy một nửa
+STOP_TIMEOUT = 5.0           # Số giây stop() chờ ghi nốt frame
+
+
+def telemetry_caption(telemetry):
+    """Trả về dòng chữ telemetry vẽ vào frame được ghi."""
+    return "  ".join(f"{field} {value:.2f}" for field, value in telemetry.items()
+                     if isinstance(value, (int, float)))
+
+
+class VideoRecorder:
+    """Ghi frame thành các đoạn video xoay vòng bằng một tiến trình mã hóa riêng.
+
+    Frame được chép vào một số slot bộ nhớ dùng chung cố định rồi gửi qua
+    hàng đợi cho tiến trình mã hóa; bên gọi không bao giờ phải chờ. Khi mọi
+    slot đều bận, frame bị bỏ và từ đó chỉ nhận 1 trên stride frame, nên mã
+    hóa chậm chỉ làm giảm tốc độ ghi chứ không làm giảm tốc độ hiển thị.
+    Bước nhảy giảm dần khi hàng đợi gần rỗng trở lại. Mỗi lần bước nhảy đổi
+    là mở đoạn mới ghi ở fps / stride, nên đoạn nào phát lại cũng đúng tốc
+    độ thực. Frame đến trước khi tiến trình mã hóa sẵn sàng không được ghi.
+    Mỗi đoạn có file .jsonl kèm theo, chứa thời điểm chụp và telemetry của
+    từng frame. Nếu tiến trình mã hóa chết, acquire() thôi cấp slot và error
+    cho biết lý do.
+    """
+    def __init__(self, directory, fps=30.0, segment_seconds=DEFAULT_SEGMENT_SECONDS,
+                 codec=DEFAULT_CODEC, extension=DEFAULT_EXTENSION, slots=DEFAULT_SLOTS,
+                 max_frame=DEFAULT_MAX_FRAME, overlay=True):
+        self.directory = directory
+        self.fps = fps
+        self.segment_seconds = segment_seconds
+        self.codec = codec
+        self.extension = extension
+        self.slot_count = slots
+        self.slot_bytes = max_frame[0] * max_frame[1] * 3
+        self.overlay = overlay    # Vẽ dấu cộng, thước mil và telemetry vào frame
+        self.buffers = []         # SharedMemory của từng slot
+        self.free = []            # Các slot giao diện được ghi vào
+        self.ready = False        # Tiến trình mã hóa đã gắn vào các slot
+        self.process = None
+        self.work_queue = None    # (slot, shape, rgb, thời điểm chụp, giờ hệ thống, telemetry, mã frame, bước nhảy)
+        self.free_queue = None    # Slot tiến trình mã hóa đã ghi xong
+        self.stride = 1
+        self.offered = 0          # Số frame đưa vào acquire()
+        self.calm_since = None    # Thời điểm hàng đợi bắt đầu gần rỗng
+        self.recorded = 0
+        self.dropped = 0          # Hết slot trống
+        self.skipped = 0          # Bỏ qua theo bước nhảy
+        self.too_large = 0        # Frame lớn hơn slot
+        self.waiting = 0          # Đến khi tiến trình mã hóa đang khởi động
+        self.error = ""           # Lý do tiến trình mã hóa dừng, rỗng khi đang chạy
+
+    def is_recording(self):
+        """Trả về True khi tiến trình mã hóa đang chạy."""
+        return self.process is not None
+
+    def start(self):
+        """Cấp phát slot và khởi động tiến trình mã hóa."""
+        if self.process:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        context = multiprocessing.get_context("spawn")  # Fork tiến trình Qt không an toàn
+        self.buffers = [shared_memory.SharedMemory(create=True, size=self.slot_bytes)
+                        for _ in range(self.slot_count)]
+        self.free = []  # Tiến trình mã hóa trả mọi slot khi đã sẵn sàng
+        self.ready = False
+        self.work_queue = context.Queue(self.slot_count + 1)
+        self.free_queue = context.Queue(self.slot_count)
+        self.stride = 1
+        self.calm_since = None
+        self.error = ""
+        self.process = context.Process(
+            target=encode_loop, name="video-recorder", daemon=True,
+            args=([buffer.name for buffer in self.buffers], self.work_queue, self.free_queue,
+                  self.directory, self.fps, self.segment_seconds, self.codec, self.extension))
+        try:
+            self.process.start()
+        except Exception:
+            self.process = None
+            self.release_buffers()
+            raise
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        """Chờ mã hóa nốt các frame đang chờ rồi giải phóng slot."""
+        if not self.process:
+            return
+        self.work_queue.put(None)
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.release_buffers()
+        self.process = None
+
+    def release_buffers(self):
+        """Đóng và xóa các slot bộ nhớ dùng chung."""
+        for buffer in self.buffers:
+            buffer.close()
+            buffer.unlink()
+        self.buffers = []
+        self.free = []
+
+    def reclaim(self):
+        """Lấy lại các slot tiến trình mã hóa đã ghi xong."""
+        while True:
+            try:
+                self.free.append(self.free_queue.get_nowait())
+                self.ready = True
+            except queue.Empty:
+                return
+
+    def acquire(self, shape):
+        """Trả về (slot, array) để chép frame kích thước shape vào, hoặc None nếu bỏ frame này."""
+        if not self.process:
+            return None
+        self.offered += 1
+        if self.offered % self.stride:
+            self.skipped += 1
+            return None
+        if shape[0] * shape[1] * shape[2] > self.slot_bytes:
+            self.too_large += 1
+            return None
+        self.reclaim()
+        if (not self.ready or not self.free) and self.encoder_failed():
+            return None  # Slot do tiến trình mã hóa đã chết giữ sẽ không bao giờ được trả lại
+        if not self.ready:
+            self.waiting += 1
+            return None
+        if not self.free:
+            self.dropped += 1
+            self.stride = min(MAX_STRIDE, self.stride * 2)
+            self.calm_since = None
+            return None
+        if len(self.free) >= self.slot_count * 3 // 4:
+            now = time.monotonic()
+            if self.calm_since is None:
+                self.calm_since = now
+            elif now - self.calm_since >= RECOVER_SECONDS and self.stride > 1:
+                self.stride //= 2
+                self.calm_since = now
+        else:
+            self.calm_since = None
+        slot = self.free.pop()
+        array = np.ndarray(shape, np.uint8, self.buffers[slot].buf)
+        return slot, array
+
+    def encoder_failed(self):
+        """Trả về True, và đặt error, nếu tiến trình mã hóa đã thoát khi đang ghi."""
+        if self.process.is_alive():
+            return False
+        if not self.error:
+            self.error = f"Tiến trình mã hóa đã thoát với mã {self.process.exitcode}"
+        return True
+
+    def submit(self, slot, shape, captured_at, telemetry=None, rgb=False, frame_id=None):
+        """Đưa slot đã chép vào hàng đợi mã hóa; rgb=True nếu frame là RGB thay vì BGR."""
+        self.work_queue.put_nowait((slot, shape, rgb, captured_at, time.time(), telemetry or {},
+                                    frame_id, self.stride))
+        self.recorded += 1
+
+    def record(self, frame, captured_at, telemetry=None, rgb=False, frame_id=None):
+        """Chép frame BGR/RGB vào slot và đưa vào hàng đợi; trả về False nếu không ghi."""
+        acquired = self.acquire(frame.shape)
+        if acquired is None:
+            return False
+        slot, array = acquired
+        np.copyto(array, frame)
+        self.submit(slot, frame.shape, captured_at, telemetry, rgb, frame_id)
+        return True
+
+    def stats(self):
+        """Trả về các bộ đếm ghi hình."""
+        return {"recorded": self.recorded, "dropped": self.dropped, "skipped": self.skipped,
+                "too_large": self.too_large, "waiting": self.waiting, "stride": self.stride,
+                "error": self.error}
+
+
+def encode_loop(names, work_queue, free_queue, directory, fps, segment_seconds, codec, extension):
+    """Tiến trình mã hóa: ghi slot trong hàng đợi thành các đoạn xoay vòng kèm file telemetry."""
+    buffers = [shared_memory.SharedMemory(name=name) for name in names]
+    for slot in range(len(buffers)):
+        free_queue.put(slot)
+    writer = None
+    sidecar = None
+    segment_start = None
+    segment_shape = None
+    segment_stride = None
+    segment = 0
+    frame_number = 0
+    try:
+        while True:
+            item = work_queue.get()
+            if item is None:
+                break
+            slot, shape, rgb, captured_at, wall_time, telemetry, frame_id, stride = item
+            try:
+                frame = np.ndarray(shape, np.uint8, buffers[slot].buf)
+                if rgb:
+                    frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+                if (writer is None or shape != segment_shape or stride != segment_stride
+                        or captured_at - segment_start >= segment_seconds):
+                    if writer is not None:
+                        writer.release()
+                        sidecar.close()
+                    segment += 1
+                    base = os.path.join(directory, time.strftime("rec_%Y%m%d_%H%M%S",
+                                                                 time.localtime(wall_time)))
+                    base = f"{base}_{segment:03d}"
+                    writer = cv2.VideoWriter(base + extension, cv2.VideoWriter_fourcc(*codec),
+                                             fps / stride, (shape[1], shape[0]))
+                    sidecar = open(base + ".jsonl", "w", buffering=1)  # Ghi ra theo từng dòng
+                    sidecar.write(json.dumps({"segment": segment, "fps": fps / stride,
+                                              "stride": stride,
+                                              "size": [shape[1], shape[0]]}) + "\n")
+                    segment_start = captured_at
+                    segment_shape = shape
+                    segment_stride = stride
+                    frame_number = 0
+                writer.write(frame)
+                sidecar.write(json.dumps({"frame": frame_number, "frame_id": frame_id,
+                                          "captured_at": captured_at, "time": wall_time,
+                                          "telemetry": telemetry}) + "\n")
+                frame_number += 1
+            finally:
+                frame = None  # Bỏ view để đóng được slot
+                free_queue.put(slot)
+    finally:
+        if writer is not None:
+            writer.release()
+            sidecar.close()
+        for buffer in buffers:
+            buffer.close()
@@ -0,0 +1,227 @@
+import struct
+import time
+from abc import ABC, abstractmethod
+from urllib.parse import urlsplit, parse_qs
+import cv2
+import numpy as np
+from rtsp_capture import LatestFrameCapture, open_capture
+
+PATTERN_SCHEME = "pattern"  # pattern://640x480?fps=30&frames=300
+RAW_SCHEME = "raw"          # raw:///path/to/file.raw?fps=0&loop=1
+LIVE_SCHEME = "live"        # live:///path/to/file.mp4
+RAW_MAGIC = b"RAWV"
+RAW_HEADER = struct.Struct("<4sIIIf")  # Mã nhận dạng, rộng, cao, số frame, fps
+RAW_HEADER_SIZE = 64  # Phần đầu được đệm để dữ liệu frame bắt đầu thẳng hàng
+COUNTER_BITS = 32     # Số bit của bộ đếm frame mã hóa trong ảnh mẫu
+
+
+def open_source(source, ffmpeg_options=None):
+    """Mở mọi nguồn VideoThread hỗ trợ, trả về đối tượng giống cv2.VideoCapture.
+
+    Chỉ số camera, đường dẫn thiết bị và tệp video mở bằng cv2.VideoCapture,
+    URL rtsp:// bằng LatestFrameCapture, pattern:// bằng PatternSource,
+    raw:// bằng RawReplaySource, còn live:// phát tệp theo đúng FPS của nó
+    qua LatestFrameCapture, giống một camera RTSP trực tiếp.
+    """
+    if isinstance(source, str):
+        url = urlsplit(source)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.scheme == PATTERN_SCHEME:
+            width, height = parse_size(url.netloc)
+            return PatternSource(width, height, float(query.get("fps", 30)),
+                                 int(query.get("frames", 0)) or None)
+        if url.scheme == RAW_SCHEME:
+            fps = float(query["fps"]) if "fps" in query else None
+            return RawReplaySource(url.netloc + url.path, fps, query.get("loop", "1") != "0")
+        if url.scheme == LIVE_SCHEME:
+            return LatestFrameCapture(url.netloc + url.path, ffmpeg_options, realtime=True)
+    return open_capture(source, ffmpeg_options)
+
+
+def parse_size(text):
+    """Tách "640x480" thành (640, 480)."""
+    try:
+        width, height = (int(value) for value in text.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Kích thước frame {text!r} không hợp lệ, cần dạng RỘNGxCAO") from None
+    return width, height
+
+
+def encode_counter(image, counter):
+    """Ghi bộ đếm thành dải ô đen/trắng ở mép trên bên trái."""
+    block = max(2, image.shape[1] // (COUNTER_BITS + 8))
+    bits = (counter >> np.arange(COUNTER_BITS - 1, -1, -1)) & 1
+    strip = np.repeat((bits * 255).astype(np.uint8), block)
+    image[:block, :strip.size] = strip[None, :, None]
+
+
+def decode_counter(image):
+    """Đọc lại bộ đếm do encode_counter ghi, kể cả từ frame đã thu phóng."""
+    block = image.shape[1] / (COUNTER_BITS + 8)
+    xs = ((np.arange(COUNTER_BITS) + 0.5) * block).astype(int)
+    bits = image[int(block / 2), xs].mean(axis=1) > 127
+    return int(np.dot(bits, 1 << np.arange(COUNTER_BITS - 1, -1, -1, dtype=np.int64)))
+
+
+class GeneratedSource(ABC):
+    """Lớp cơ sở cho các nguồn không cần camera hay bộ giải mã.
+
+    Có các hàm cv2.VideoCapture mà VideoThread gọi. Với fps > 0, read() chờ
+    đến hạn frame kế tiếp như camera thật; với fps == 0 nguồn không điều
+    nhịp và trả frame nhanh nhất có thể. Lớp con cài đặt render(image, index)
+    và frame_count().
+    """
+    def __init__(self, width, height, fps):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.unpaced = not fps  # VideoThread bỏ điều nhịp với nguồn này
+        self.index = 0          # Số frame đã trả
+        self.next_time = None
+        self.opened = True
+
+    def frame_count(self):
+        """Trả về số frame của nguồn, hoặc None nếu phát mãi."""
+        return None
+
+    @abstractmethod
+    def render(self, image, index):
+        """Vẽ frame thứ index của nguồn vào image, mảng BGR (height, width, 3)."""
+
+    def isOpened(self):
+        """Trả về True cho đến khi release() hoặc hết frame."""
+        if not self.opened:
+            return False
+        count = self.frame_count()
+        return count is None or self.index < count
+
+    def get(self, prop):
+        """Trả về kích thước frame và fps; thuộc tính khác là 0."""
+        return {cv2.CAP_PROP_FRAME_WIDTH: self.width, cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+                cv2.CAP_PROP_FPS: self.fps, cv2.CAP_PROP_POS_FRAMES: self.index}.get(prop, 0.0)
+
+    def set(self, prop, value):
+        """Kích thước cố định, như camera bỏ qua yêu cầu."""
+        return False
+
+    def wait_for_frame(self):
+        """Ngủ đến hạn frame kế tiếp; bên đọc bị chậm thì đồng bộ lại."""
+        if self.unpaced:
+            return
+        now = time.monotonic()
+        if self.next_time is None or now - self.next_time > 1.0 / self.fps:
+            self.next_time = now
+        elif self.next_time > now:
+            time.sleep(self.next_time - now)
+        self.next_time += 1.0 / self.fps
+
+    def grab(self):
+        """Bỏ qua một frame."""
+        if not self.isOpened():
+            return False
+        self.wait_for_frame()
+        self.index += 1
+        return True
+
+    def read(self, image=None):
+        """Trả về frame kế tiếp, vẽ vào image nếu cùng kích thước."""
+        if not self.isOpened():
+            return False, None
+        self.wait_for_frame()
+        if image is None or image.shape != (self.height, self.width, 3):
+            image = np.empty((self.height, self.width, 3), np.uint8)
+        self.render(image, self.index)
+        self.index += 1
+        return True, image
+
+    def release(self):
+        """Đóng nguồn."""
+        self.opened = False
+
+
+class PatternSource(GeneratedSource):
+    """Lớp ảnh mẫu tự sinh: nền chuyển màu, thanh di chuyển và bộ đếm frame.
+
+    Bộ đếm được mã hóa bằng encode_counter nên decode_counter phát hiện được
+    frame bị bỏ, lặp hoặc sai thứ tự trên màn hình hay trong bản ghi. Mỗi
+    frame chỉ là một lần chép nền vẽ sẵn cộng hai lần tô nhỏ, tốn tương đương
+    bộ giải mã ghi một frame.
+    """
+    def __init__(self, width, height, fps=30.0, frames=None):
+        super().__init__(width, height, fps)
+        self.frames = frames
+        self.background = np.empty((height, width, 3), np.uint8)
+        self.background[:, :, 0] = np.linspace(40, 200, height, dtype=np.uint8)[:, None]
+        self.background[:, :, 1] = np.linspace(0, 160, width, dtype=np.uint8)[None, :]
+        self.background[:, :, 2] = 60
+        self.bar_width = max(4, width // 32)
+
+    def frame_count(self):
+        return self.frames
+
+    def render(self, image, index):
+        np.copyto(image, self.background)
+        x = index * self.bar_width // 4 % self.width
+        image[:, x:x + self.bar_width] = 255
+        encode_counter(image, index)
+
+
+class RawReplaySource(GeneratedSource):
+    """Lớp phát lại tệp frame BGR thô qua ánh xạ bộ nhớ chỉ đọc.
+
+    Frame được chép thẳng từ page cache nên phát lại ổn định và không tốn
+    giải mã. fps=None dùng FPS lưu trong tệp, 0 phát nhanh nhất có thể; loop
+    phát lại từ đầu khi hết. Tệp được tạo bằng write_raw() hoặc record_raw().
+    """
+    def __init__(self, path, fps=None, loop=True):
+        with open(path, "rb") as f:
+            magic, width, height, count, file_fps = RAW_HEADER.unpack(f.read(RAW_HEADER.size))
+        if magic != RAW_MAGIC:
+            raise ValueError(f"{path} không phải tệp frame thô")
+        if not count:
+            raise ValueError(f"{path} không có frame nào")
+        super().__init__(width, height, file_fps if fps is None else fps)
+        self.loop = loop
+        self.frames = np.memmap(path, np.uint8, "r", RAW_HEADER_SIZE, (count, height, width, 3))
+
+    def frame_count(self):
+        return None if self.loop else len(self.frames)
+
+    def render(self, image, index):
+        np.copyto(image, self.frames[index % len(self.frames)])
+
+
+def write_raw(path, frames, fps):
+    """Ghi các frame BGR cùng kích thước thành tệp phát lại thô; trả về số frame."""
+    count = 0
+    with open(path, "wb") as f:
+        f.write(bytes(RAW_HEADER_SIZE))
+        shape = None
+        for frame in frames:
+            if shape is None:
+                shape = frame.shape
+            elif frame.shape != shape:
+                raise ValueError(f"Frame {count} có kích thước {frame.shape}, cần {shape}")
+            f.write(np.ascontiguousarray(frame, np.uint8).tobytes())
+            count += 1
+        height, width = shape[:2] if shape else (0, 0)
+        f.seek(0)
+        f.write(RAW_HEADER.pack(RAW_MAGIC, width, height, count, fps))
+    return count
+
+
+def record_raw(source, path, count, fps=None):
+    """Lưu count frame của một nguồn bất kỳ (camera, pattern://...) thành tệp phát lại thô."""
+    cap = open_source(source)
+    try:
+        fps = fps or cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+        def frames():
+            for _ in range(count):
+                ret, frame = cap.read()
+                if not ret:
+                    return
+                yield frame
+        return write_raw(path, frames(), fps)
+    finally:
+        cap.release()
@@ -1,41 +1,196 @@
+import time
 import cv2
+import numpy as np
 from PyQt5.QtCore import QThread, pyqtSignal
-from PyQt5.QtGui import QPixmap, QImage
+from frame_pool import FramePool, HAS_BGR888
+from frame_mailbox import FrameMailbox
+from frame_pacer import FramePacer, PACING_DEADLINE
+from video_source import open_source
+from pipeline_stats import READ_START, READ, CONVERT
+from capture_supervisor import CaptureSupervisor, STATE_RECONNECTING, READ_RETRY_DELAY
+from view_transform import fit_size
+from frame_index import FrameIndex
 
 class VideoThread(QThread):
-    """Lớp luồng để xử lý và truyền dữ liệu video từ camera."""
-    frame_updated = pyqtSignal(QPixmap)  # Tín hiệu gửi frame video mới
-    error_occurred = pyqtSignal(str)    # Tín hiệu gửi thông báo lỗi
+    """Lớp luồng để đọc frame video từ camera vào các bộ đệm dùng lại."""
+    frame_ready = pyqtSignal()          # Tín hiệu báo có frame mới trong hộp thư
+    error_occurred = pyqtSignal(str)    # Tín hiệu gửi thông báo lỗi (mỗi lỗi một lần)
+    state_changed = pyqtSignal(str)     # Trạng thái giám sát camera, xem capture_supervisor
 
-    def __init__(self, video_source=0):
+    def __init__(self, video_source=0, target_fps=None, pacing=PACING_DEADLINE,
+                 capture_size=None, ffmpeg_options=None):
         super().__init__()
         self.video_source = video_source  # Nguồn video (0: camera mặc định)
         self.cap = None                   # Đối tượng camera
+        self.pool = FramePool()           # Bộ đệm frame cấp phát sẵn
+        self.mailbox = FrameMailbox()     # Ô chứa frame mới nhất cho giao diện
+        self.pacer = FramePacer(pacing, target_fps)  # Điều nhịp đọc frame
+        self.target_size = None           # Kích thước hiển thị (w, h) do widget đặt
+        self.interpolation = None         # None: tự chọn INTER_AREA/INTER_LINEAR
+        self.raw_buffer = None            # Bộ đệm đọc độ phân giải gốc khi thu phóng
+        self.capture_size = capture_size  # Độ phân giải (w, h) yêu cầu camera giải mã
+        self.ffmpeg_options = ffmpeg_options  # Tùy chọn FFmpeg cho nguồn RTSP
+        self.replay = None                # ReplayBuffer lưu mọi frame đọc được, nếu có
+        self.frame_id = 0                 # Số thứ tự của frame đọc gần nhất, không dùng lại
+        self.frame_index = FrameIndex()   # Thời điểm chụp của mọi frame đọc được, theo mã frame
+        self.detector = None              # ObjectDetector nhận mọi frame độ phân giải gốc, nếu có
+        self.bus = None                   # FrameBus được phát mọi frame độ phân giải gốc, nếu có
+        self.supervisor = CaptureSupervisor()  # Quyết định khi nào mở lại camera
         self.running = True               # Cờ kiểm soát vòng lặp
 
+    def frame_shape(self):
+        """Lấy kích thước frame (h, w, 3) do camera báo."""
+        w = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 640
+        h = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 480
+        return (h, w, 3)
+
+    def apply_capture_size(self):
+        """Yêu cầu camera giải mã ở capture_size, ví dụ độ phân giải ảnh thu nhỏ."""
+        if self.capture_size and self.cap:
+            w, h = self.capture_size
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, w)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
+
+    def set_target_size(self, width, height):
+        """Đặt kích thước hiển thị để thu phóng frame trước khi gửi lên giao diện."""
+        self.target_size = (width, height) if width > 0 and height > 0 else None
+
+    def output_shape(self, shape):
+        """Tính kích thước bộ đệm pool cho frame chụp có kích thước shape."""
+        if self.target_size is None:
+            return shape
+        w, h = fit_size(shape[1], shape[0], *self.target_size)
+        return (h, w, 3)
+
+    def scale_into(self, data, frame):
+        """Thu phóng frame vừa chụp vào bộ đệm pool."""
+        h, w, _ = frame.array.shape
+        interpolation = self.interpolation
+        if interpolation is None:
+            interpolation = cv2.INTER_AREA if w < data.shape[1] else cv2.INTER_LINEAR
+        cv2.resize(data, (w, h), dst=frame.array, interpolation=interpolation)
+
+    def set_state(self, state):
+        """Gửi trạng thái giám sát mới lên giao diện; None nghĩa là không đổi."""
+        if state:
+            self.state_changed.emit(state)
+
+    def report_error(self, message):
+        """Gửi thông báo lỗi trừ khi trùng với lỗi gần nhất."""
+        if self.supervisor.report_error(message):
+            self.error_occurred.emit(message)
+
+    def sleep_while_running(self, seconds):
+        """Ngủ từng đoạn ngắn để stop() không phải chờ hết thời gian chờ dài."""
+        deadline = time.monotonic() + seconds
+        while self.running and time.monotonic() < deadline:
+            self.msleep(max(1, int(min(0.05, deadline - time.monotonic()) * 1000)))
+
+    def reopen(self):
+        """Đóng camera, chờ hết thời gian chờ rồi mở lại nguồn.
+
+        Trả về kích thước frame của nguồn vừa mở, hoặc None nếu vẫn chưa mở được.
+        """
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+            if not self.supervisor.should_reopen():
+                # Nguồn tự đóng chứ không phải đọc quá thời gian
+                self.report_error("Mất kết nối camera")
+                self.set_state(self.supervisor.transition(STATE_RECONNECTING))
+        self.sleep_while_running(self.supervisor.next_delay())
+        if not self.running:
+            return None
+        try:
+            cap = open_source(self.video_source, self.ffmpeg_options)
+        except (OSError, ValueError) as e:
+            self.report_error(f"Không mở được nguồn video: {str(e)}")
+            self.set_state(self.supervisor.open_failed())
+            return None
+        if not cap.isOpened():
+            cap.release()
+            self.report_error("Không tìm thấy hoặc không mở được camera")
+            self.set_state(self.supervisor.open_failed())
+            return None
+        self.cap = cap
+        self.apply_capture_size()
+        self.set_state(self.supervisor.opened())
+        self.pacer.start(self.cap.get(cv2.CAP_PROP_FPS), getattr(self.cap, "unpaced", False))
+        return self.frame_shape()
+
     def run(self):
-        """Chụp và gửi frame video dưới dạng QPixmap."""
+        """Đọc frame vào bộ đệm dùng lại và gửi đi dưới dạng QImage."""
         try:
-            self.cap = cv2.VideoCapture(self.video_source)
-            if not self.cap.isOpened():
-                self.error_occurred.emit("Không tìm thấy hoặc không mở được camera")
-                self.frame_updated.emit(QPixmap())
-                return
+            shape = None
             while self.running:
-                ret, frame = self.cap.read()
-                if not ret or frame is None:
-                    self.error_occurred.emit("Không đọc được frame video")
-                    self.frame_updated.emit(QPixmap())
+                if not self.cap or not self.cap.isOpened() or self.supervisor.should_reopen():
+                    shape = self.reopen()
+                    continue
+                out_shape = self.output_shape(shape)
+                frame = self.pool.acquire(out_shape)
+                if frame is None:
+                    # Giao diện còn giữ hết bộ đệm: bỏ frame này
+                    if self.cap.grab():
+                        self.mailbox.note_dropped()
+                    else:
+                        self.sleep_while_running(READ_RETRY_DELAY)  # Không có frame để bỏ
+                    continue
+                if out_shape == shape:
+                    target = frame.array
+                else:
+                    if self.raw_buffer is None or self.raw_buffer.shape != shape:
+                        self.raw_buffer = np.empty(shape, np.uint8)
+                    target = self.raw_buffer
+                read_start = time.monotonic()
+                ret, data = self.cap.read(target)
+                captured_at = time.monotonic()
+                if not ret or data is None:
+                    # Nghỉ giữa các lần đọc lỗi thay vì lặp nóng; quá lâu thì mở lại camera
+                    frame.release()
+                    self.report_error("Không đọc được frame video")
+                    self.set_state(self.supervisor.read_failed(captured_at))
+                    if not self.supervisor.should_reopen():
+                        self.sleep_while_running(READ_RETRY_DELAY)
                     continue
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = frame.shape
-                image = QImage(frame.data, w, h, ch * w, QImage.Format_RGB888)
-                pixmap = QPixmap.fromImage(image)
-                self.frame_updated.emit(pixmap)
-                self.msleep(30)  # Nghỉ 30ms (~33 FPS)
+                self.set_state(self.supervisor.frame_read())
+                self.frame_id += 1
+                self.frame_index.add(self.frame_id, captured_at)
+                if data.shape != shape:
+                    # Camera đổi độ phân giải: cấp phát lại một lần rồi tiếp tục
+                    frame.release()
+                    shape = data.shape
+                    frame = self.pool.acquire(self.output_shape(shape))
+                if data is not frame.array:
+                    if data.shape == frame.array.shape:
+                        np.copyto(frame.array, data)
+                    else:
+                        self.scale_into(data, frame)
+                replay = self.replay
+                if replay is not None:
+                    replay.write(frame.array, captured_at, data)
+                detector = self.detector
+                if detector is not None:
+                    detector.offer(data, captured_at, self.frame_id)
+                bus = self.bus
+                if bus is not None:
+                    bus.publish(data, captured_at, self.frame_id)
+                if not HAS_BGR888:
+                    cv2.cvtColor(frame.array, cv2.COLOR_BGR2RGB, dst=frame.array)
+                frame.frame_id = self.frame_id
+                frame.sensor_size = (data.shape[1], data.shape[0])
+                stamps = frame.stamps
+                stamps[READ_START] = read_start
+                stamps[READ] = captured_at
+                stamps[CONVERT] = time.monotonic()
+                if self.mailbox.post(frame):
+                    self.frame_ready.emit()
+                # Chỉ nghỉ đến hạn frame kế tiếp thay vì cố định 30ms
+                self.pacer.frame_captured(captured_at)
+                delay = self.pacer.remaining()
+                if delay > 0:
+                    self.usleep(int(delay * 1e6))
         except Exception as e:
             self.error_occurred.emit(f"Lỗi luồng video: {str(e)}")
-            self.frame_updated.emit(QPixmap())
         finally:
             if self.cap:
                 self.cap.release()
@@ -46,4 +201,4 @@ class VideoThread(QThread):
         self.running = False
         if self.cap:
             self.cap.release()
-            self.cap = None
\ No newline at end of file
+            self.cap = None
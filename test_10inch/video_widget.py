@@ -1,136 +1,529 @@
+import os
+import time
+import cv2
+import numpy as np
+from PyQt5 import sip
 from PyQt5.QtWidgets import QWidget
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPainter, QPen, QColor, QFont, QPixmap
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QPainter, QPen, QColor, QFont, QFontDatabase, QImage, QPixmap, QRegion
 from video_thread import VideoThread
-import cv2
+from frame_pool import FRAME_FORMAT, HAS_BGR888
+from frame_pacer import PACING_DEADLINE
+from mil_reticle import MilReticle, DEFAULT_FOV_BY_ZOOM
+from capture_supervisor import STATE_CONNECTING, STATE_RECONNECTING
+from pipeline_stats import PipelineStats, new_stamps, READ, TAKE, UPLOAD, SCALE, PAINT
+from video_recorder import telemetry_caption
+from box_predictor import BoxPredictor
+from view_transform import ViewTransform
+
+BACKEND_RASTER = "raster"  # Vẽ bằng QPainter trên QWidget thường
+BACKEND_OPENGL = "opengl"  # Texture cố định trên QOpenGLWidget
+# Backend mặc định, ví dụ VIDEO_BACKEND=opengl LIBGL_ALWAYS_SOFTWARE=1
+DEFAULT_BACKEND = os.environ.get("VIDEO_BACKEND", BACKEND_RASTER)
+# PIPELINE_HUD=1 hiện bảng thời gian từng công đoạn ngay khi khởi động
+DEFAULT_HUD = os.environ.get("PIPELINE_HUD", "") == "1"
+HUD_FONT_SIZE = 14
 
 class VideoWidget(QWidget):
     """Lớp hiển thị video với dấu cộng đỏ, mốc mil và khung giới hạn."""
-    def __init__(self, parent=None, video_source=0, day_mode=True):
+    recording_failed = pyqtSignal(str)  # Recorder không nhận frame nữa, kèm lý do
+    def __init__(self, parent=None, video_source=0, day_mode=True,
+                 target_fps=None, pacing=PACING_DEADLINE, backend=None,
+                 fov_by_zoom=None, capture_size=None, ffmpeg_options=None):
         super().__init__(parent)
         self.day_mode = day_mode         # Chế độ ngày (True) hoặc đêm (False)
         self.pixmap = None               # Frame video hiện tại
         self.bounding_box = None         # Khung giới hạn từ AI
         self.error_message = ""          # Thông báo lỗi
-        # Kiểm tra camera trước khi khởi động
-        cap = cv2.VideoCapture(video_source)
-        if not cap.isOpened():
-            self.error_message = "Camera không khả dụng"
-            cap.release()
-            self.video_thread = None
+        self.capture_state = STATE_CONNECTING  # Trạng thái giám sát camera
+        self.fov_by_zoom = dict(fov_by_zoom or DEFAULT_FOV_BY_ZOOM)  # FOV (mil) theo mức zoom
+        self.zoom_level = min(self.fov_by_zoom)  # Mức zoom hiện tại
+        self.reticle = MilReticle()      # Thước mil vẽ sẵn
+        self.surface = None              # Bề mặt OpenGL (None: vẽ raster)
+        self.pipeline = PipelineStats()  # Mốc thời gian từng công đoạn của các frame đã hiển thị
+        self.stamps = new_stamps()       # Mốc thời gian của frame đang vẽ
+        self.stamps_pending = False      # Đã lấy frame nhưng chưa ghi mốc vẽ xong
+        self.hud_visible = DEFAULT_HUD   # Hiện bảng thời gian (HUD)
+        self.hud_rows = []               # Nội dung HUD đang hiện
+        self.hud_font = QFontDatabase.systemFont(QFontDatabase.FixedFont)
+        self.hud_font.setPixelSize(HUD_FONT_SIZE)
+        self.recorder = None             # VideoRecorder nhận mọi frame được hiển thị
+        self.recording_telemetry = None  # Hàm trả về dict telemetry ghi kèm frame
+        self.replay_position = None      # Frame xem lại đang hiện thay cho video trực tiếp
+        self.box_predictor = BoxPredictor()  # Dời khung tới thời điểm chụp của từng frame
+        self.frame_time = None           # Thời điểm chụp của frame đang hiện
+        self.frame_id = None             # Số thứ tự lần chụp của frame đang hiện
+        self.detector = None             # ObjectDetector chạy trên các frame của luồng này
+        self.sensor_size = None          # (w, h) của ảnh chụp, trước khi thu phóng
+        self.view = ViewTransform()      # Pixel cảm biến sang pixel widget cho lớp phủ
+        self.record_view = ViewTransform()  # Pixel cảm biến sang pixel frame được ghi
+        if (backend or DEFAULT_BACKEND) == BACKEND_OPENGL:
+            from gl_video_surface import GLVideoSurface
+            self.surface = GLVideoSurface(self)
+        # Luồng camera tự mở và tự kết nối lại, không cần kiểm tra trước
+        self.video_thread = VideoThread(video_source, target_fps, pacing, capture_size,
+                                        ffmpeg_options)
+        self.frame_index = self.video_thread.frame_index  # Ghi lúc chụp, cho kết quả phát hiện
+        self.video_thread.frame_ready.connect(self.update)
+        self.video_thread.error_occurred.connect(self.set_error_message)
+        self.video_thread.state_changed.connect(self.set_capture_state)
+        self.video_thread.start()
+
+    def update(self, *args):
+        """Yêu cầu vẽ lại trên backend đang hiển thị video."""
+        if self.surface:
+            self.surface.update(*args)
         else:
-            cap.release()
-            self.video_thread = VideoThread(video_source)
-            self.video_thread.frame_updated.connect(self.set_pixmap)
-            self.video_thread.error_occurred.connect(self.set_error_message)
-            self.video_thread.start()
+            super().update(*args)
 
     def set_day_mode(self, day_mode):
         """Cập nhật chế độ ngày/đêm."""
         self.day_mode = day_mode
         self.update()
 
+    def set_zoom_level(self, zoom_level):
+        """Đổi mức zoom ống kính; thước mil tương ứng đã được vẽ sẵn."""
+        if zoom_level in self.fov_by_zoom and zoom_level != self.zoom_level:
+            self.zoom_level = zoom_level
+            self.update()
+
+    def set_target_fps(self, target_fps):
+        """Đặt FPS đọc camera; None để theo CAP_PROP_FPS của camera."""
+        if self.video_thread:
+            self.video_thread.pacer.set_target_fps(target_fps)
+
     def set_error_message(self, message):
         """Hiển thị thông báo lỗi khi video gặp sự cố."""
         self.error_message = message
         self.pixmap = None
         self.update()
 
-    def set_bounding_box(self, bounding_box):
-        """Cập nhật tọa độ khung giới hạn."""
+    def set_capture_state(self, state):
+        """Cập nhật trạng thái giám sát camera; bỏ frame cũ khi đang kết nối lại."""
+        self.capture_state = state
+        if state == STATE_RECONNECTING:
+            self.pixmap = None
+        self.update()
+
+    def set_hud_visible(self, visible):
+        """Bật/tắt HUD thời gian các công đoạn."""
+        self.hud_visible = visible
+        self.hud_rows = self.hud_table() if visible else []
+        self.update()
+
+    def toggle_hud(self):
+        """Đảo trạng thái HUD thời gian các công đoạn."""
+        self.set_hud_visible(not self.hud_visible)
+
+    def set_recorder(self, recorder, telemetry=None):
+        """Gửi frame hiển thị cho recorder (None: dừng); telemetry() được ghi kèm từng frame."""
+        self.recorder = recorder
+        self.recording_telemetry = telemetry
+
+    def set_detector(self, detector):
+        """Chạy detector (một ObjectDetector, None: không chạy) trên luồng này và bám theo khung của nó."""
+        if self.detector:
+            self.detector.detection_ready.disconnect(self.set_detection)
+        self.detector = detector
+        if self.video_thread:
+            self.video_thread.detector = detector
+        if detector:
+            detector.detection_ready.connect(self.set_detection)
+
+    def set_detection(self, detection):
+        """Bám theo khung của bộ phát hiện theo điểm ảnh cảm biến; None nghĩa là mất mục tiêu."""
         try:
+            if detection is None:
+                self.set_bounding_box(None)
+                return
+            self.set_bounding_box(detection, detection["captured_at"])
+        except Exception as e:
+            print(f"Lỗi khi nhận kết quả phát hiện: {str(e)}")
+
+    def set_frame_bus(self, bus):
+        """Phát các frame của luồng này lên bus, một FrameBus cho tiến trình khác đọc (None: dừng)."""
+        if self.video_thread:
+            self.video_thread.bus = bus
+
+    def set_replay_buffer(self, replay):
+        """Lưu vài giây gần nhất của luồng này vào replay, một ReplayBuffer (None: không lưu)."""
+        self.unfreeze()
+        if self.video_thread:
+            self.video_thread.replay = replay
+
+    def is_frozen(self):
+        """Trả về True khi đang hiện frame xem lại thay cho video trực tiếp."""
+        return self.replay_position is not None
+
+    def freeze(self):
+        """Giữ cửa sổ xem lại và hiện frame mới nhất của nó; camera vẫn chạy.
+
+        Trả về False nếu luồng không có bộ đệm xem lại hoặc chưa lưu frame nào.
+        """
+        replay = self.video_thread.replay if self.video_thread else None
+        if replay is None or self.is_frozen():
+            return False
+        replay.hold()
+        if not len(replay):
+            replay.release()
+            return False
+        self.show_replay(len(replay) - 1)
+        return True
+
+    def unfreeze(self):
+        """Quay lại video trực tiếp và cho cửa sổ xem lại tiếp tục ghi."""
+        if not self.is_frozen():
+            return
+        self.video_thread.replay.unpin(self.replay_position)
+        self.replay_position = None
+        self.video_thread.replay.release()
+        self.update()
+
+    def step_replay(self, frames):
+        """Dịch khung hình đang dừng một số frame đã lưu, số âm là lùi về trước."""
+        if self.is_frozen():
+            self.show_replay(self.replay_position + frames)
+
+    def show_replay(self, position):
+        """Hiện một frame đã lưu, giới hạn trong các frame còn lưu, và ghim nó.
+
+        Chỗ ghim giữ frame này và các frame mới hơn để tua tiếp trong khi camera
+        ghi đè phần cũ hơn của cửa sổ đang giữ.
+        """
+        try:
+            replay = self.video_thread.replay
+            position = replay.pin(position)
+            if self.replay_position is not None:
+                replay.unpin(self.replay_position)
+            self.replay_position = position
+            array, _ = replay.frame(position)
+            if not HAS_BGR888:
+                array = cv2.cvtColor(array, cv2.COLOR_BGR2RGB)
+            if self.surface:
+                # Slot của vòng đệm có thể bị ghi đè khi bỏ ghim, trước khi paintGL tải lên
+                self.surface.queue_upload(array.copy())
+            else:
+                h, w, _ = array.shape
+                image = QImage(array.data, w, h, array.strides[0], FRAME_FORMAT)
+                self.pixmap = QPixmap.fromImage(image).scaled(self.size(), Qt.KeepAspectRatio,
+                                                              Qt.SmoothTransformation)
+            self.update_view()
+            self.update()
+        except Exception as e:
+            print(f"Lỗi khi hiện frame xem lại: {str(e)}")
+
+    def set_bounding_box(self, bounding_box, sample_time=None):
+        """Thêm một mẫu khung giới hạn theo pixel cảm biến, chỉ vẽ lại phần lớp phủ đã di chuyển.
+
+        sample_time là thời điểm time.monotonic() quan sát được khung. Khung có
+        khóa "frame_id" được tính trên frame đó, nên dùng thời điểm chụp của
+        frame ấy nếu còn trong chỉ mục. Khung được vẽ ở vị trí bộ dự đoán tính
+        cho thời điểm chụp của từng frame.
+        """
+        try:
+            old_region = self.overlay_region()
+            now = time.monotonic()
+            sample_time = now if sample_time is None else sample_time
+            box = None
             if bounding_box:
                 x, y, w, h = (bounding_box["x"], bounding_box["y"], 
                              bounding_box["w"], bounding_box["h"])
-                if (x >= 0 and y >= 0 and w > 0 and h > 0 and 
-                    (self.pixmap is None or (x + w <= self.pixmap.width() and 
-                                             y + h <= self.pixmap.height()))):
-                    self.bounding_box = (x, y, w, h)
-                else:
-                    self.bounding_box = None
-            else:
-                self.bounding_box = None
-            self.update()
+                if self.view.contains_box((x, y, w, h)):
+                    box = (x, y, w, h)
+                    sample_time = self.detection_time(bounding_box, sample_time)
+            self.box_predictor.update(box, sample_time)
+            self.bounding_box = self.box_predictor.predict(self.frame_time or now)
+            self.update(old_region.united(self.overlay_region()))
         except Exception as e:
             print(f"Lỗi khi đặt khung giới hạn: {str(e)}")
             self.bounding_box = None
             self.update()
 
+    def detection_time(self, bounding_box, sample_time):
+        """Trả về thời điểm chụp của kết quả phát hiện và ghi độ chậm của nó so với màn hình.
+
+        Chỉ ghi các khung có frame_id nằm trong chỉ mục; khung telemetry giữ
+        sample_time, vốn không phải thời điểm chụp.
+        """
+        frame_id = bounding_box.get("frame_id")
+        if frame_id is None:
+            return sample_time
+        captured_at = self.frame_index.capture_time(frame_id)
+        if captured_at is None:
+            self.frame_index.unmatched += 1
+            return sample_time
+        if self.frame_time is not None:
+            self.frame_index.record_detection(captured_at, self.frame_time,
+                                              frame_id, self.frame_id)
+        return captured_at
+
+    def set_box_prediction(self, mode):
+        """Đổi cách khung bám theo telemetry, xem box_predictor.MODES."""
+        self.box_predictor.set_mode(mode)
+        self.update()
+
     def set_pixmap(self, pixmap):
         """Cập nhật frame video mới, thu phóng theo kích thước widget."""
         try:
             self.pixmap = None if pixmap.isNull() else pixmap.scaled(
                 self.size(), Qt.KeepAspectRatio)
             self.error_message = ""
+            self.update_view()
             self.update()
         except Exception as e:
             print(f"Lỗi khi đặt pixmap: {str(e)}")
             self.error_message = f"Lỗi pixmap: {str(e)}"
             self.update()
 
+    def take_frame(self):
+        """Lấy frame mới nhất từ hộp thư camera vào self.pixmap hoặc texture OpenGL."""
+        if not self.video_thread:
+            return
+        frame = self.video_thread.mailbox.take()
+        if frame is None:
+            return
+        if self.is_frozen():
+            # Frame trực tiếp vẫn được đọc, và ghi hình, khi đang hiện frame xem lại
+            if self.recorder:
+                self.record_frame(frame)
+            frame.release()
+            return
+        stamps = self.stamps
+        stamps[:] = frame.stamps  # Bộ đệm trả về luồng camera trước khi vẽ xong
+        stamps[TAKE] = time.monotonic()
+        self.stamps_pending = True
+        self.frame_time = stamps[READ]
+        self.frame_id = frame.frame_id
+        self.sensor_size = frame.sensor_size
+        self.bounding_box = self.box_predictor.predict(self.frame_time)
+        if self.recorder:
+            self.record_frame(frame)
+        if self.surface:
+            try:
+                self.surface.upload(frame.array)
+            finally:
+                frame.release()
+            stamps[UPLOAD] = stamps[SCALE] = time.monotonic()
+            self.pixmap = None
+            self.error_message = ""
+            self.update_view()
+            return
+        try:
+            pixmap = QPixmap.fromImage(frame.image)
+        finally:
+            frame.release()
+        stamps[UPLOAD] = time.monotonic()
+        # Frame đã được luồng camera thu phóng vừa thì vẽ thẳng
+        if pixmap.size() != pixmap.size().scaled(self.size(), Qt.KeepAspectRatio):
+            pixmap = pixmap.scaled(self.size(), Qt.KeepAspectRatio)
+        stamps[SCALE] = time.monotonic()
+        self.pixmap = pixmap
+        self.error_message = ""
+        self.update_view()
+
+    def update_view(self):
+        """Cập nhật phép ánh xạ lớp phủ; chỉ tính lại khi frame mới hoặc widget đổi kích thước."""
+        size = self.display_size()
+        display_size = (size.width(), size.height()) if size else None
+        if self.view.update(self.sensor_size, display_size, (self.width(), self.height())):
+            # Thước mil trải theo ảnh hiển thị, không theo cả widget có viền đen
+            self.reticle.prerender(self.view.rect.width(), self.fov_by_zoom.values())
+
+    def record_frame(self, frame):
+        """Chép frame vào một slot của recorder, vẽ thêm lớp phủ nếu recorder yêu cầu."""
+        try:
+            acquired = self.recorder.acquire(frame.array.shape)
+            if acquired is None:
+                if self.recorder.error:
+                    self.recording_failed.emit(self.recorder.error)
+                return
+            slot, array = acquired
+            np.copyto(array, frame.array)
+            telemetry = self.recording_telemetry() if self.recording_telemetry else {}
+            if self.recorder.overlay:
+                self.paint_recording_overlay(array, telemetry)
+            self.recorder.submit(slot, array.shape, frame.stamps[READ], telemetry,
+                                 rgb=not HAS_BGR888, frame_id=frame.frame_id)
+        except Exception as e:
+            print(f"Lỗi khi ghi hình: {str(e)}")
+
+    def paint_recording_overlay(self, array, telemetry):
+        """Vẽ dấu cộng, mốc mil và telemetry vào frame được ghi."""
+        h, w, _ = array.shape
+        # Con trỏ ghi được, để QPainter vẽ thẳng vào slot thay vì vào bản sao
+        image = QImage(sip.voidptr(array.ctypes.data), w, h, array.strides[0], FRAME_FORMAT)
+        painter = QPainter(image)
+        try:
+            # Frame được ghi là toàn bộ ảnh cảm biến, không có viền đen
+            self.record_view.update(self.sensor_size, (w, h), (w, h))
+            self.paint_overlay(painter, hud=False, view=self.record_view)
+            caption = telemetry_caption(telemetry)
+            if caption:
+                painter.setFont(self.hud_font)
+                painter.setPen(Qt.yellow)
+                painter.drawText(4, h - 4, caption)
+        finally:
+            painter.end()
+
+    def finish_frame(self):
+        """Ghi mốc vẽ xong của frame lấy trong lượt vẽ này, nếu có."""
+        if not self.stamps_pending:
+            return
+        self.stamps[PAINT] = time.monotonic()
+        self.stamps_pending = False
+        self.pipeline.commit(self.stamps)
+        if self.hud_visible:
+            self.hud_rows = self.hud_table()
+
+    def resizeEvent(self, event):
+        """Gửi kích thước hiển thị mới để luồng camera thu phóng frame cho vừa."""
+        if self.video_thread:
+            self.video_thread.set_target_size(self.width(), self.height())
+        if self.surface:
+            self.surface.setGeometry(self.rect())
+        self.update_view()
+        if self.is_frozen():
+            self.show_replay(self.replay_position)
+        super().resizeEvent(event)
+
+    def display_size(self):
+        """Trả về kích thước hiển thị của frame hiện tại, hoặc None."""
+        if self.surface:
+            return self.surface.display_size()
+        return self.pixmap.size() if self.pixmap else None
+
+    def frame_stats(self):
+        """Trả về bộ đếm frame đã chụp/đã hiển thị/bị bỏ."""
+        if not self.video_thread:
+            return {"produced": 0, "displayed": 0, "dropped": 0}
+        return self.video_thread.mailbox.stats()
+
     def paintEvent(self, event):
         """Vẽ frame video, dấu cộng đỏ và mốc mil."""
+        if self.surface:
+            return  # Bề mặt OpenGL tự vẽ toàn bộ
         painter = QPainter(self)
-        widget_size = self.size()
 
         try:
+            # Vẽ lại một phần (lớp phủ di chuyển) thì giữ frame cũ để tránh xé hình
+            if self.visibleRegion().subtracted(event.region()).isEmpty():
+                self.take_frame()
             if self.pixmap and not self.error_message:
-                pixmap_rect = self.pixmap.rect()
-                pixmap_rect.moveCenter(self.rect().center())
-                painter.drawPixmap(pixmap_rect, self.pixmap)
+                painter.drawPixmap(self.view.rect, self.pixmap)
             else:
-                painter.fillRect(0, 0, widget_size.width(), widget_size.height(), 
-                               QColor(0, 0, 0))
-                if self.error_message:
-                    painter.setPen(QPen(Qt.red, 2))
-                    painter.setFont(QFont('Arial', 20))
-                    painter.drawText(self.rect(), Qt.AlignCenter, self.error_message)
-
-            center_x = widget_size.width() // 2
-            center_y = widget_size.height() // 2
-            cross_length = 30
-
-            if self.bounding_box:
-                x, y, w, h = self.bounding_box
-                center_x = x + w // 2
-                center_y = y + h // 2
-                scale_x = widget_size.width() / self.pixmap.width() if self.pixmap else 1
-                scale_y = widget_size.height() / self.pixmap.height() if self.pixmap else 1
-                center_x = int(center_x * scale_x)
-                center_y = int(center_y * scale_y)
-                cross_length = max(15, min(45, (w + h) // 4))
-
-            # Vẽ dấu cộng đỏ
-            painter.setPen(QPen(Qt.red, 3))
-            painter.drawLine(center_x - cross_length // 2, center_y, 
-                           center_x + cross_length // 2, center_y)
-            painter.drawLine(center_x, center_y - cross_length // 2, 
-                           center_x, center_y + cross_length // 2)
-
-            # Vẽ mốc mil
-            painter.setPen(QPen(Qt.red, 1))
-            painter.setFont(QFont('Arial', 8))
-            width = self.width()
-            fov_mil = 349
-            pixel_per_mil = width / fov_mil
-            major_tick_mil, minor_tick_mil = 10, 1
-            label_mil = 50
-            major_tick_length, minor_tick_length = 10, 5
-            for mil in range(-200, 201, minor_tick_mil):
-                x = int(center_x + mil * pixel_per_mil)
-                if x < 0 or x > width:
-                    continue
-                if mil % major_tick_mil == 0:
-                    painter.drawLine(x, 0, x, major_tick_length)
-                    if mil % label_mil == 0:
-                        painter.drawText(x - 15, major_tick_length + 15, str(mil))
-                else:
-                    painter.drawLine(x, 0, x, minor_tick_length)
+                self.paint_background(painter)
+            self.paint_overlay(painter)
+            self.finish_frame()
         except Exception as e:
             print(f"Lỗi trong paintEvent: {str(e)}")
 
+    def paint_background(self, painter):
+        """Tô nền đen cho vùng video và hiện thông báo lỗi nếu có."""
+        widget_size = self.size()
+        painter.fillRect(0, 0, widget_size.width(), widget_size.height(), 
+                         QColor(0, 0, 0))
+        message = self.error_message
+        if self.capture_state == STATE_RECONNECTING:
+            message = "\n".join(filter(None, [message, "Đang kết nối lại..."]))
+        if message:
+            painter.setPen(QPen(Qt.red, 2))
+            painter.setFont(QFont('Arial', 20))
+            painter.drawText(self.rect(), Qt.AlignCenter, message)
+
+    def crosshair_geometry(self, view=None):
+        """Trả về (center_x, center_y, cross_length) của dấu cộng theo pixel của view.
+
+        view là ViewTransform dùng để vẽ, mặc định là của widget.
+        """
+        view = view or self.view
+        center = view.rect.center()
+        center_x = center.x()
+        center_y = center.y()
+        cross_length = 30
+
+        if self.bounding_box:
+            x, y, w, h = view.map_box(self.bounding_box)
+            center_x = x + w // 2
+            center_y = y + h // 2
+            cross_length = max(15, min(45, (w + h) // 4))
+        return center_x, center_y, cross_length
+
+    def overlay_region(self, view=None):
+        """Trả về vùng bị dấu cộng và thước mil đi theo nó che phủ."""
+        view = view or self.view
+        center_x, center_y, cross_length = self.crosshair_geometry(view)
+        half = cross_length // 2 + 3  # Lề cho độ dày bút và khử răng cưa
+        region = QRegion(center_x - half, center_y - half, half * 2 + 1, half * 2 + 1)
+        reticle, origin = self.reticle.get(view.rect.width(), self.fov_by_zoom[self.zoom_level])
+        return region.united(QRegion(center_x - origin, view.rect.top(),
+                                     reticle.width(), reticle.height()))
+
+    def paint_overlay(self, painter, hud=True, view=None):
+        """Vẽ dấu cộng đỏ và mốc mil lên trên video, kèm HUD nếu đang hiện."""
+        view = view or self.view
+        center_x, center_y, cross_length = self.crosshair_geometry(view)
+
+        # Vẽ dấu cộng đỏ
+        painter.setPen(QPen(Qt.red, 3))
+        painter.drawLine(center_x - cross_length // 2, center_y, 
+                         center_x + cross_length // 2, center_y)
+        painter.drawLine(center_x, center_y - cross_length // 2, 
+                         center_x, center_y + cross_length // 2)
+
+        # Vẽ mốc mil
+        self.reticle.draw(painter, center_x, view.rect.width(),
+                          self.fov_by_zoom[self.zoom_level], view.rect.top())
+        if hud and self.hud_visible:
+            self.paint_hud(painter)
+        if hud and self.is_frozen():
+            self.paint_replay_label(painter)
+
+    def paint_replay_label(self, painter):
+        """Ghi tuổi, vị trí của frame đang dừng trong cửa sổ xem lại và báo đệm đầy."""
+        replay = self.video_thread.replay
+        text = (f"XEM LẠI  -{replay.age(self.replay_position):.2f} s  "
+                f"{self.replay_position + 1}/{len(replay)}")
+        if replay.stalled:
+            text += "  ĐỆM ĐẦY"  # Bỏ frame trực tiếp cho đến khi tua tiếp
+        painter.setFont(self.hud_font)
+        metrics = painter.fontMetrics()
+        painter.fillRect(0, 0, metrics.horizontalAdvance(text) + 8, metrics.height() + 4,
+                         QColor(0, 0, 0, 160))
+        painter.setPen(Qt.yellow)
+        painter.drawText(4, 2 + metrics.ascent(), text)
+
+    def hud_table(self):
+        """Trả về các hàng HUD: thời gian từng công đoạn, sai số dự đoán khung (px), độ chậm phát hiện (ms)."""
+        rows = self.pipeline.hud_rows() + [self.box_predictor.hud_row(),
+                                           self.frame_index.hud_row()]
+        if self.detector:
+            rows.append(self.detector.hud_row())
+        return rows
+
+    def paint_hud(self, painter):
+        """Vẽ bảng thời gian các công đoạn ở góc dưới bên trái."""
+        if not self.hud_rows:
+            return
+        painter.setFont(self.hud_font)
+        metrics = painter.fontMetrics()
+        line_height = metrics.height()
+        label_width = max(metrics.horizontalAdvance(row[0]) for row in self.hud_rows) + 4
+        cell_width = metrics.horizontalAdvance("000.00") + 4
+        width = label_width + cell_width * (len(self.hud_rows[0]) - 1)
+        top = self.height() - line_height * len(self.hud_rows) - 6
+        painter.fillRect(0, top - 2, width + 8, line_height * len(self.hud_rows) + 4,
+                         QColor(0, 0, 0, 160))
+        painter.setPen(Qt.green)
+        for index, row in enumerate(self.hud_rows):
+            y = top + index * line_height
+            painter.drawText(4, y, label_width, line_height, Qt.AlignLeft, row[0])
+            for column, cell in enumerate(row[1:]):
+                painter.drawText(4 + label_width + column * cell_width, y, cell_width,
+                                 line_height, Qt.AlignRight, cell)
+
     def closeEvent(self, event):
         """Dừng luồng video khi đóng widget."""
         if self.video_thread:
             self.video_thread.stop()
+            self.video_thread.mailbox.clear()
         super().closeEvent(event)
\ No newline at end of file
@@ -0,0 +1,82 @@
+import numpy as np
+from PyQt5.QtCore import QRect
+
+
+def fit_size(src_w, src_h, dst_w, dst_h):
+    """Tính (w, h) khi thu phóng src vào dst, làm tròn giống Qt.KeepAspectRatio."""
+    rw = src_w * dst_h // src_h
+    if rw <= dst_w:
+        return max(1, rw), max(1, dst_h)
+    return max(1, dst_w), max(1, src_h * dst_w // src_w)
+
+
+class ViewTransform:
+    """Phép ánh xạ từ pixel cảm biến sang ảnh hiển thị và widget.
+
+    Ảnh hiển thị là frame cảm biến thu phóng về display_size rồi đặt giữa
+    widget, có viền đen khi tỉ lệ khung khác nhau, nên điểm cảm biến p được
+    vẽ tại p * scale + offset. rect là vùng vẽ ảnh. Gọi update() mỗi frame
+    rất rẻ: phép ánh xạ chỉ được tính lại khi kích thước cảm biến, ảnh hiển
+    thị hoặc widget thay đổi. Khi chưa biết kích thước, pixel cảm biến được
+    coi là pixel widget.
+    """
+    def __init__(self):
+        self.sizes = None               # (sensor, display, widget) đã dùng để tính
+        self.sensor_size = None         # (w, h) của ảnh chụp, None khi chưa biết
+        self.rect = QRect()             # Ảnh hiển thị theo pixel widget
+        self.scale_x = self.scale_y = 1.0
+        self.offset_x = self.offset_y = 0
+        self.factors = np.ones(4)       # Hệ số thu phóng từng cột hộp cho map_boxes
+        self.shift = np.zeros(4)        # Độ dời từng cột hộp cho map_boxes
+
+    def update(self, sensor_size, display_size, widget_size):
+        """Tính lại phép ánh xạ nếu có (w, h) thay đổi; kích thước None lấy theo widget.
+
+        Trả về True nếu phép ánh xạ thay đổi.
+        """
+        sizes = (sensor_size, display_size, widget_size)
+        if sizes == self.sizes:
+            return False
+        self.sizes = sizes
+        display_size = display_size or widget_size
+        sensor_size = sensor_size or display_size
+        self.sensor_size = sizes[0]
+        rect = QRect(0, 0, *display_size)
+        rect.moveCenter(QRect(0, 0, *widget_size).center())  # Giống cách vẽ frame
+        self.rect = rect
+        self.scale_x = display_size[0] / sensor_size[0]
+        self.scale_y = display_size[1] / sensor_size[1]
+        self.offset_x = rect.left()
+        self.offset_y = rect.top()
+        self.factors = np.array([self.scale_x, self.scale_y, self.scale_x, self.scale_y])
+        self.shift = np.array([self.offset_x, self.offset_y, 0, 0])
+        return True
+
+    def map_point(self, x, y):
+        """Trả về pixel widget của điểm cảm biến (x, y)."""
+        return (int(round(x * self.scale_x + self.offset_x)),
+                int(round(y * self.scale_y + self.offset_y)))
+
+    def map_box(self, box):
+        """Trả về (x, y, w, h) theo pixel widget của một hộp cảm biến."""
+        x, y, w, h = box
+        return (int(round(x * self.scale_x + self.offset_x)),
+                int(round(y * self.scale_y + self.offset_y)),
+                int(round(w * self.scale_x)), int(round(h * self.scale_y)))
+
+    def map_boxes(self, boxes):
+        """Trả về các hàng (x, y, w, h) pixel widget của mảng (N, 4) hộp cảm biến."""
+        return np.rint(np.asarray(boxes, float) * self.factors + self.shift).astype(int)
+
+    def unmap_point(self, x, y):
+        """Trả về điểm cảm biến nằm dưới pixel widget (x, y)."""
+        return (x - self.offset_x) / self.scale_x, (y - self.offset_y) / self.scale_y
+
+    def contains_box(self, box):
+        """Trả về True nếu hộp cảm biến nằm trong frame cảm biến, hoặc chưa biết frame."""
+        x, y, w, h = box
+        if x < 0 or y < 0 or w <= 0 or h <= 0:
+            return False
+        if self.sensor_size is None:
+            return True
+        return x + w <= self.sensor_size[0] and y + h <= self.sensor_size[1]
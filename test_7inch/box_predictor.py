@@ -0,0 +1,152 @@
+import os
+import numpy as np
+from pipeline_stats import PERCENTILES
+
+MODE_OFF = "off"                  # Show the newest box as received
+MODE_INTERPOLATE = "interpolate"  # Smooth, one sample interval behind
+MODE_VELOCITY = "velocity"        # Extrapolate the last two samples
+MODE_KALMAN = "kalman"            # Constant-velocity Kalman filter
+MODES = (MODE_OFF, MODE_INTERPOLATE, MODE_VELOCITY, MODE_KALMAN)
+# Mode used when none is passed, e.g. BOX_PREDICTION=off to compare
+DEFAULT_MODE = os.environ.get("BOX_PREDICTION", MODE_KALMAN)
+MAX_HORIZON = 0.3      # Seconds a box is extrapolated past its last sample
+RESET_GAP = 1.0        # Seconds without a sample after which the target is reacquired
+GATE_DISTANCE = 120.0  # px; a sample this far from its prediction is a new target
+PROCESS_NOISE = 2e4    # Kalman white-acceleration density, px^2/s^3
+MEASUREMENT_NOISE = 4.0  # Kalman box measurement variance, px^2
+INITIAL_VELOCITY_VARIANCE = 1e5  # px^2/s^2, so the first velocity comes from the data
+ERROR_HISTORY = 256    # Samples kept for the prediction error percentiles
+
+
+class BoxPredictor:
+    """Predict where a tracked box is at a given time from sparse telemetry samples.
+
+    The box is tracked as center x, center y, width and height, each an
+    independent position/velocity pair, so the whole state is a (2, 4)
+    array plus a (3, 4) array of Kalman covariances (p00, p01, p11) and a
+    sample costs a few vectorized numpy operations. predict(t) gives the
+    box for a frame captured at t, clamped to MAX_HORIZON past the last
+    sample. Each sample is first compared with what the current mode
+    predicted for its time; stats() reports that error, and a sample
+    further than GATE_DISTANCE away restarts the track.
+    """
+    def __init__(self, mode=DEFAULT_MODE):
+        self.mode = mode if mode in MODES else MODE_OFF
+        self.state = np.zeros((2, 4))       # Rows: value, velocity per second
+        self.covariance = np.zeros((3, 4))  # Rows: p00, p01, p11
+        self.previous = np.zeros(4)         # Sample before the last, for interpolation
+        self.previous_time = None
+        self.last = np.zeros(4)             # Last sample as received
+        self.last_time = None               # None while no target is tracked
+        self.errors = np.zeros(ERROR_HISTORY)
+        self.error_index = 0
+        self.error_count = 0
+
+    def set_mode(self, mode):
+        """Switch the prediction mode; the filter state carries over."""
+        if mode in MODES:
+            self.mode = mode
+
+    def reset(self):
+        """Forget the target."""
+        self.last_time = None
+        self.previous_time = None
+
+    def update(self, box, sample_time):
+        """Add a sample: an (x, y, w, h) box, or None when the target is lost."""
+        if box is None:
+            self.reset()
+            return
+        x, y, w, h = box
+        measured = np.array([x + w / 2, y + h / 2, w, h], float)
+        if self.last_time is None or sample_time - self.last_time > RESET_GAP:
+            self.start(measured, sample_time)
+            return
+        if sample_time <= self.last_time:
+            return  # Late or duplicate sample
+        error = np.hypot(*(measured[:2] - self.predict_center(sample_time)))
+        self.record_error(error)
+        if error > GATE_DISTANCE:
+            # The detector switched targets: motion across the jump is not velocity
+            self.start(measured, sample_time)
+            return
+        dt = sample_time - self.last_time
+        self.correct(measured, dt)
+        self.previous, self.previous_time = self.last, self.last_time
+        self.last, self.last_time = measured, sample_time
+
+    def start(self, measured, sample_time):
+        """Begin tracking at measured with no known motion."""
+        self.state[0] = measured
+        self.state[1] = 0.0
+        self.covariance[0] = MEASUREMENT_NOISE
+        self.covariance[1] = 0.0
+        self.covariance[2] = INITIAL_VELOCITY_VARIANCE
+        self.previous, self.previous_time = measured, None
+        self.last, self.last_time = measured, sample_time
+
+    def correct(self, measured, dt):
+        """Advance the Kalman filter by dt and fold in a measurement."""
+        value, velocity = self.state
+        p00, p01, p11 = self.covariance
+        q = PROCESS_NOISE
+        value += velocity * dt
+        p00 += dt * (2 * p01 + dt * p11) + q * dt ** 3 / 3
+        p01 += dt * p11 + q * dt ** 2 / 2
+        p11 += q * dt
+        gain0 = p00 / (p00 + MEASUREMENT_NOISE)
+        gain1 = p01 / (p00 + MEASUREMENT_NOISE)
+        residual = measured - value
+        value += gain0 * residual
+        velocity += gain1 * residual
+        p11 -= gain1 * p01
+        p00 *= 1 - gain0
+        p01 *= 1 - gain0
+
+    def estimate(self, t):
+        """Return the (cx, cy, w, h) array the current mode gives for time t."""
+        if self.mode == MODE_OFF or self.previous_time is None:
+            return self.last
+        if self.mode == MODE_INTERPOLATE:
+            interval = self.last_time - self.previous_time
+            fraction = min(1.0, max(0.0, (t - self.last_time) / interval))
+            return self.previous + (self.last - self.previous) * fraction
+        dt = min(MAX_HORIZON, max(-MAX_HORIZON, t - self.last_time))
+        if self.mode == MODE_VELOCITY:
+            interval = self.last_time - self.previous_time
+            return self.last + (self.last - self.previous) * (dt / interval)
+        value, velocity = self.state
+        return value + velocity * dt
+
+    def predict_center(self, t):
+        """Return the predicted (cx, cy) at time t."""
+        return self.estimate(t)[:2]
+
+    def predict(self, t):
+        """Return the (x, y, w, h) box at time t in integer pixels, or None without a target."""
+        if self.last_time is None:
+            return None
+        cx, cy, w, h = self.estimate(t)
+        w = max(1.0, w)
+        h = max(1.0, h)
+        return int(round(cx - w / 2)), int(round(cy - h / 2)), int(round(w)), int(round(h))
+
+    def record_error(self, error):
+        """Store the distance between a prediction and the sample that followed it."""
+        self.errors[self.error_index] = error
+        self.error_index = (self.error_index + 1) % len(self.errors)
+        self.error_count = min(self.error_count + 1, len(self.errors))
+
+    def stats(self):
+        """Return the mode and the p50/p95/p99 center error in pixels."""
+        errors = self.errors[:self.error_count]
+        result = {"mode": self.mode, "samples": int(self.error_count)}
+        if len(errors):
+            for p, value in zip(PERCENTILES, np.percentile(errors, PERCENTILES)):
+                result[f"p{p}"] = float(value)
+        return result
+
+    def hud_row(self):
+        """Return the HUD row: the mode, then the error percentiles in pixels."""
+        stats = self.stats()
+        return [f"box {self.mode}"] + [f"{stats.get(f'p{p}', 0.0):.2f}" for p in PERCENTILES]
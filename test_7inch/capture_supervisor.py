@@ -0,0 +1,80 @@
+import random
+
+STATE_CONNECTING = "connecting"      # Opening the source for the first time
+STATE_STREAMING = "streaming"        # Frames are arriving
+STATE_DEGRADED = "degraded"          # Reads are failing but the source is still open
+STATE_RECONNECTING = "reconnecting"  # Source closed, waiting to reopen it
+
+BACKOFF_INITIAL = 0.5     # Seconds before the first reopen attempt
+BACKOFF_MAX = 10.0        # Upper bound on the wait between attempts
+BACKOFF_FACTOR = 2.0
+BACKOFF_JITTER = 0.25     # +/- fraction so several cameras don't retry in lockstep
+DEGRADED_TIMEOUT = 2.0    # Seconds of failed reads before the source is reopened
+READ_RETRY_DELAY = 0.05   # Pause between failed reads while degraded
+
+
+class CaptureSupervisor:
+    """State machine deciding when a failing capture is retried or reopened."""
+    def __init__(self, backoff_initial=BACKOFF_INITIAL, backoff_max=BACKOFF_MAX,
+                 degraded_timeout=DEGRADED_TIMEOUT):
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.degraded_timeout = degraded_timeout
+        self.state = STATE_CONNECTING
+        self.opens = 0              # Open attempts so far; the first one is immediate
+        self.attempts = 0           # Reopen attempts since the last good frame
+        self.degraded_since = None  # monotonic time of the first failed read
+        self.last_error = None      # Last message reported, for de-duplication
+
+    def transition(self, state):
+        """Move to state and return it, or None when nothing changed."""
+        if state == self.state:
+            return None
+        self.state = state
+        return state
+
+    def frame_read(self):
+        """Record a good frame; the source is streaming again."""
+        self.attempts = 0
+        self.degraded_since = None
+        self.last_error = None
+        return self.transition(STATE_STREAMING)
+
+    def read_failed(self, now):
+        """Record a failed read at monotonic time now."""
+        if self.degraded_since is None:
+            self.degraded_since = now
+        if self.state == STATE_STREAMING:
+            return self.transition(STATE_DEGRADED)
+        if now - self.degraded_since >= self.degraded_timeout:
+            return self.transition(STATE_RECONNECTING)
+        return None
+
+    def should_reopen(self):
+        """Return True when the capture has to be closed and opened again."""
+        return self.state == STATE_RECONNECTING
+
+    def open_failed(self):
+        """Record a failed open; the source is retried after a backoff."""
+        return self.transition(STATE_RECONNECTING)
+
+    def opened(self):
+        """Record a successful open; reads decide whether it is streaming."""
+        self.degraded_since = None
+        return self.transition(STATE_CONNECTING)
+
+    def next_delay(self):
+        """Return the jittered exponential backoff to wait before the next open."""
+        self.opens += 1
+        if self.opens == 1:
+            return 0.0
+        delay = min(self.backoff_max, self.backoff_initial * BACKOFF_FACTOR ** self.attempts)
+        self.attempts += 1
+        return delay * random.uniform(1 - BACKOFF_JITTER, 1 + BACKOFF_JITTER)
+
+    def report_error(self, message):
+        """Return True if message differs from the last one reported."""
+        if message == self.last_error:
+            return False
+        self.last_error = message
+        return True
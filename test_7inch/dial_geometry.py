@@ -0,0 +1,13 @@
+import math
+
+TICK_STEP = 15  # Degrees between dial ticks
+
+# Unit vectors (cos, sin) for the ticks at 0, 15, ..., 345 degrees.
+TICK_VECTORS = tuple((math.cos(math.radians(angle)), math.sin(math.radians(angle)))
+                     for angle in range(0, 360, TICK_STEP))
+
+
+def unit_vector(angle):
+    """Return (cos, sin) of an angle in degrees."""
+    rad_angle = math.radians(angle)
+    return math.cos(rad_angle), math.sin(rad_angle)
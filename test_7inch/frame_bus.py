@@ -0,0 +1,215 @@
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+
+BUS_MAGIC = 0x53554246  # "FBUS"
+DEFAULT_SLOTS = 8       # Frames a reader may fall behind before it misses some
+DEFAULT_MAX_FRAME = (1920, 1080)  # Largest frame a slot holds
+HEADER_BYTES = 64       # Bus and slot headers are padded so frame data stays aligned
+# Bus header: layout, then the sequence number of the newest published frame
+BUS_HEADER = np.dtype([("magic", "<u4"), ("slots", "<u4"), ("slot_bytes", "<u8"),
+                       ("head", "<u8")])
+# Slot header: seq is 0 while the slot is being written
+SLOT_HEADER = np.dtype([("seq", "<u8"), ("frame_id", "<u8"), ("timestamp", "<f8"),
+                        ("height", "<u4"), ("width", "<u4"), ("channels", "<u4"),
+                        ("stride", "<u4")])
+
+
+def bus_size(slots, slot_bytes):
+    """Return the shared-memory size of a bus."""
+    return HEADER_BYTES + slots * (HEADER_BYTES + slot_bytes)
+
+
+def map_bus(buffer):
+    """Return (bus header, slot headers, slot data) numpy views of a bus buffer."""
+    header = np.ndarray((), BUS_HEADER, buffer)
+    slots = int(header["slots"])
+    slot_bytes = int(header["slot_bytes"])
+    stride = HEADER_BYTES + slot_bytes
+    slot_headers = np.ndarray((slots,), SLOT_HEADER, buffer, HEADER_BYTES, (stride,))
+    data = np.ndarray((slots, slot_bytes), np.uint8, buffer, 2 * HEADER_BYTES, (stride, 1))
+    return header, slot_headers, data
+
+
+class FrameBus:
+    """Single-writer ring of frames in shared memory for readers in other processes.
+
+    Each slot has a small header (sequence number, frame ID, capture time,
+    shape and row stride) followed by the frame bytes. Publishing a frame
+    marks its slot as being written, copies the frame in, fills the header,
+    then advances the bus head; the writer never waits for readers. Bus
+    sequence numbers start at 1 and have no gaps, so frame seq lives in
+    slot seq % slots and readers keep their own cursors, see FrameBusReader.
+    """
+    def __init__(self, name=None, slots=DEFAULT_SLOTS, max_frame=DEFAULT_MAX_FRAME):
+        slot_bytes = max_frame[0] * max_frame[1] * 3
+        slot_bytes += -slot_bytes % HEADER_BYTES
+        size = bus_size(slots, slot_bytes)
+        try:
+            self.memory = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a writer that did not close, e.g. after a crash
+            stale = shared_memory.SharedMemory(name)
+            stale.close()
+            stale.unlink()
+            self.memory = shared_memory.SharedMemory(name, create=True, size=size)
+        # close() unlinks the bus; the resource tracker is kept out of it so that
+        # readers attaching and exiting cannot unlink it early
+        resource_tracker.unregister(self.memory._name, "shared_memory")
+        header = np.ndarray((), BUS_HEADER, self.memory.buf)
+        header["slots"] = slots
+        header["slot_bytes"] = slot_bytes
+        header["head"] = 0
+        header["magic"] = BUS_MAGIC
+        header = None
+        self.header, self.slot_headers, self.data = map_bus(self.memory.buf)
+        self.name = self.memory.name
+        self.lock = threading.Lock()  # Keeps close() from unmapping a frame being published
+        self.seq = 0              # Sequence number of the last published frame
+        self.too_large = 0        # Frames bigger than a slot
+
+    def publish(self, image, timestamp, frame_id=0):
+        """Copy a frame into the next slot and make it visible; returns its seq, 0 if not published."""
+        h, w = image.shape[:2]
+        channels = image.shape[2] if image.ndim == 3 else 1
+        with self.lock:
+            if self.data is None:
+                return 0  # Closed
+            if h * w * channels > self.data.shape[1]:
+                self.too_large += 1
+                return 0
+            return self.write(image, timestamp, frame_id, h, w, channels)
+
+    def write(self, image, timestamp, frame_id, h, w, channels):
+        """Fill the next slot and advance the head; called with the lock held."""
+        seq = self.seq + 1
+        index = seq % len(self.slot_headers)
+        slot = self.slot_headers[index]
+        slot["seq"] = 0  # Readers holding this slot see it change before the data does
+        np.copyto(self.data[index, :h * w * channels].reshape(image.shape), image)
+        slot["frame_id"] = frame_id
+        slot["timestamp"] = timestamp
+        slot["height"] = h
+        slot["width"] = w
+        slot["channels"] = channels
+        slot["stride"] = w * channels
+        slot["seq"] = seq
+        self.header["head"] = seq
+        self.seq = seq
+        return seq
+
+    def close(self):
+        """Remove the bus; attached readers keep their mapping until they close."""
+        with self.lock:
+            if self.data is None:
+                return
+            self.header = self.slot_headers = self.data = None
+        self.memory.close()
+        resource_tracker.register(self.memory._name, "shared_memory")  # unlink() unregisters
+        self.memory.unlink()
+
+
+class FrameBusReader:
+    """Lock-free reader of a FrameBus, usable from any process.
+
+    The cursor is local to the reader, so readers never coordinate with
+    each other or the writer. read() returns frames in order; a reader that
+    falls more than the ring behind skips to the oldest frame still held and
+    counts the rest as missed. Frames are returned as views into the shared
+    memory: a view stays valid until the writer wraps around to its slot,
+    which is_current(seq) checks after use. copy=True returns a private
+    copy that was verified intact.
+    """
+    def __init__(self, name):
+        self.memory = shared_memory.SharedMemory(name)
+        # Only the writer unlinks the bus, not the resource tracker when this process exits
+        resource_tracker.unregister(self.memory._name, "shared_memory")
+        header = np.ndarray((), BUS_HEADER, self.memory.buf)
+        if int(header["magic"]) != BUS_MAGIC:
+            header = None
+            self.memory.close()
+            raise ValueError(f"{name} is not a frame bus")
+        header = None
+        self.header, self.slot_headers, self.data = map_bus(self.memory.buf)
+        self.cursor = int(self.header["head"])  # Last seq read; start at the newest frame
+        self.read_count = 0
+        self.missed = 0           # Overwritten before this reader got to them
+        self.torn = 0             # Overwritten while being read
+        self.skipped = 0          # Passed over by latest()
+
+    def head(self):
+        """Return the seq of the newest published frame."""
+        return int(self.header["head"])
+
+    def lag(self):
+        """Return how many published frames this reader has not read yet."""
+        return self.head() - self.cursor
+
+    def read(self, copy=False):
+        """Return the next (image, seq, frame_id, timestamp), or None if there is none yet."""
+        head = self.head()
+        while self.cursor < head:
+            oldest = head - len(self.slot_headers) + 1
+            if self.cursor + 1 < oldest:
+                self.missed += oldest - self.cursor - 1
+                self.cursor = oldest - 1
+            seq = self.cursor + 1
+            self.cursor = seq
+            frame = self.frame(seq, copy)
+            if frame is not None:
+                self.read_count += 1
+                return frame
+            head = self.head()
+        return None
+
+    def latest(self, copy=False):
+        """Return the newest frame, skipping any unread ones, or None if none is new."""
+        head = self.head()
+        if head > self.cursor + 1:
+            self.skipped += head - self.cursor - 1
+            self.cursor = head - 1
+        return self.read(copy)
+
+    def frame(self, seq, copy=False):
+        """Return (image, seq, frame_id, timestamp) of seq if its slot still holds it."""
+        index = seq % len(self.slot_headers)
+        slot = self.slot_headers[index]
+        if int(slot["seq"]) != seq:
+            self.missed += 1
+            return None
+        h, w, channels = int(slot["height"]), int(slot["width"]), int(slot["channels"])
+        stride = int(slot["stride"])
+        frame_id = int(slot["frame_id"])
+        timestamp = float(slot["timestamp"])
+        image = np.ndarray((h, w, channels), np.uint8, self.data[index],
+                           strides=(stride, channels, 1))
+        if copy:
+            image = image.copy()
+        if int(slot["seq"]) != seq:
+            self.torn += 1  # The writer reused the slot while the header or data was read
+            return None
+        return image, seq, frame_id, timestamp
+
+    def is_current(self, seq):
+        """Return True if the view returned for seq has not been overwritten since."""
+        return int(self.slot_headers[seq % len(self.slot_headers)]["seq"]) == seq
+
+    def wait(self, timeout=None, poll=0.001, copy=False):
+        """Poll for the next frame for up to timeout seconds (None: forever)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            frame = self.read(copy)
+            if frame is not None or (deadline is not None and time.monotonic() >= deadline):
+                return frame
+            time.sleep(poll)
+
+    def stats(self):
+        """Return the reader counters."""
+        return {"read": self.read_count, "missed": self.missed, "torn": self.torn,
+                "skipped": self.skipped, "lag": self.lag()}
+
+    def close(self):
+        """Detach from the bus."""
+        self.header = self.slot_headers = self.data = None
+        self.memory.close()
@@ -0,0 +1,66 @@
+import numpy as np
+from pipeline_stats import PERCENTILES
+
+DEFAULT_CAPACITY = 256  # Frames remembered, 8.5 s at 30 fps
+LAG_HISTORY = 256       # Detections kept for the misalignment percentiles
+
+
+class FrameIndex:
+    """Capture times of the most recent frames by frame ID, and detection misalignment.
+
+    Frame IDs are the capture thread's sequence numbers, so a frame's slot
+    is its ID modulo the capacity and lookups cost one comparison. Each
+    detection is logged with how many frames and seconds the frame it was
+    computed on trails the frame on screen when it arrives. The capture
+    thread adds every frame it reads and the GUI thread looks them up; a
+    slot is invalidated while it is rewritten, so no lock is needed.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.ids = np.full(capacity, -1, np.int64)
+        self.times = np.zeros(capacity)
+        self.lags = np.full((LAG_HISTORY, 2), np.nan)  # Rows: (frames, seconds)
+        self.lag_index = 0
+        self.lag_count = 0
+        self.unmatched = 0  # Detections whose frame is no longer indexed
+
+    def add(self, frame_id, captured_at):
+        """Remember the capture time of a frame; called by the capture thread."""
+        slot = frame_id % len(self.ids)
+        self.ids[slot] = -1
+        self.times[slot] = captured_at
+        self.ids[slot] = frame_id
+
+    def capture_time(self, frame_id):
+        """Return the capture time of frame_id, or None if it is unknown or too old."""
+        slot = frame_id % len(self.ids)
+        if self.ids[slot] != frame_id:
+            return None
+        captured_at = float(self.times[slot])
+        return captured_at if self.ids[slot] == frame_id else None
+
+    def record_detection(self, detection_time, shown_time, frame_id=None, shown_id=None):
+        """Log how far a detection trails the frame on screen; frames is NaN without IDs."""
+        frames = np.nan
+        if frame_id is not None and shown_id is not None:
+            frames = shown_id - frame_id
+        self.lags[self.lag_index] = frames, shown_time - detection_time
+        self.lag_index = (self.lag_index + 1) % len(self.lags)
+        self.lag_count = min(self.lag_count + 1, len(self.lags))
+
+    def stats(self):
+        """Return the p50/p95/p99 detection lag in frames and milliseconds."""
+        lags = self.lags[:self.lag_count]
+        result = {"detections": int(self.lag_count), "unmatched": self.unmatched}
+        if len(lags):
+            frames = lags[~np.isnan(lags[:, 0]), 0]
+            if len(frames):
+                result["frames"] = dict(zip((f"p{p}" for p in PERCENTILES),
+                                            np.percentile(frames, PERCENTILES).tolist()))
+            result["ms"] = dict(zip((f"p{p}" for p in PERCENTILES),
+                                    (1000 * np.percentile(lags[:, 1], PERCENTILES)).tolist()))
+        return result
+
+    def hud_row(self):
+        """Return the HUD row: detection lag behind the screen in milliseconds."""
+        ms = self.stats().get("ms", {})
+        return ["detect lag"] + [f"{ms.get(f'p{p}', 0.0):.2f}" for p in PERCENTILES]
@@ -0,0 +1,55 @@
+import threading
+
+
+class FrameMailbox:
+    """Single-slot "latest frame wins" handoff between capture thread and GUI.
+
+    The producer overwrites the slot; a frame that is replaced before the GUI
+    takes it is released back to its pool and counted as dropped.
+    """
+    def __init__(self):
+        self._frame = None
+        self._lock = threading.Lock()
+        self.produced = 0
+        self.displayed = 0
+        self.dropped = 0
+
+    def post(self, frame):
+        """Store the newest frame. Returns True if the slot was empty (GUI needs a nudge)."""
+        with self._lock:
+            old, self._frame = self._frame, frame
+            self.produced += 1
+            if old is not None:
+                self.dropped += 1
+        if old is not None:
+            old.release()
+        return old is None
+
+    def take(self):
+        """Remove and return the newest frame, or None if nothing new arrived."""
+        with self._lock:
+            frame, self._frame = self._frame, None
+            if frame is not None:
+                self.displayed += 1
+        return frame
+
+    def note_dropped(self):
+        """Count a frame the producer had to discard before posting it."""
+        with self._lock:
+            self.produced += 1
+            self.dropped += 1
+
+    def clear(self):
+        """Release any pending frame without displaying it."""
+        with self._lock:
+            frame, self._frame = self._frame, None
+            if frame is not None:
+                self.dropped += 1
+        if frame is not None:
+            frame.release()
+
+    def stats(self):
+        """Return a snapshot of the frame counters."""
+        with self._lock:
+            return {"produced": self.produced, "displayed": self.displayed,
+                    "dropped": self.dropped}
@@ -0,0 +1,61 @@
+import time
+
+PACING_DEADLINE = "deadline"  # Sleep only until the next frame deadline
+PACING_FREE_RUN = "free"      # No sleep: the blocking read() sets the pace
+
+DEFAULT_FPS = 30.0
+MAX_SOURCE_FPS = 240.0  # Cameras reporting more than this are treated as unknown
+
+
+class FramePacer:
+    """Work out how long the capture loop should sleep after each frame."""
+    def __init__(self, mode=PACING_DEADLINE, target_fps=None):
+        self.mode = mode
+        self.target_fps = target_fps
+        self.source_fps = None
+        self.period = 1.0 / DEFAULT_FPS
+        self.deadline = None
+        self.last_capture = None
+        self.measured_fps = 0.0
+        self.unpaced = False
+
+    def start(self, source_fps, unpaced=False):
+        """Reset pacing for a freshly opened source reporting CAP_PROP_FPS.
+
+        An unpaced source (a replay running as fast as possible) gets no
+        sleep unless a target_fps is set.
+        """
+        self.unpaced = unpaced
+        self.source_fps = source_fps if 0 < source_fps <= MAX_SOURCE_FPS else None
+        self.deadline = None
+        self.last_capture = None
+        self._update_period()
+
+    def set_target_fps(self, target_fps):
+        """Override the source rate; None follows the camera again."""
+        self.target_fps = target_fps
+        self._update_period()
+
+    def _update_period(self):
+        fps = self.target_fps or self.source_fps or DEFAULT_FPS
+        self.period = 1.0 / fps
+
+    def frame_captured(self, timestamp=None):
+        """Record the capture time of a frame and schedule the next deadline."""
+        now = time.monotonic() if timestamp is None else timestamp
+        if self.last_capture is not None and now > self.last_capture:
+            fps = 1.0 / (now - self.last_capture)
+            self.measured_fps = fps if not self.measured_fps else 0.9 * self.measured_fps + 0.1 * fps
+        self.last_capture = now
+        if self.deadline is None or now - self.deadline > self.period:
+            # First frame, or we fell more than a frame behind: resync.
+            self.deadline = now
+        self.deadline += self.period
+
+    def remaining(self):
+        """Seconds left until the next frame deadline (0 in free-run mode)."""
+        if self.mode == PACING_FREE_RUN or self.deadline is None:
+            return 0.0
+        if self.unpaced and not self.target_fps:
+            return 0.0
+        return max(0.0, self.deadline - time.monotonic())
@@ -0,0 +1,60 @@
+import threading
+import numpy as np
+from PyQt5.QtGui import QImage
+from pipeline_stats import new_stamps
+
+# Qt 5.14+ can wrap OpenCV's BGR data directly; older builds swap channels in place.
+HAS_BGR888 = hasattr(QImage, "Format_BGR888")
+FRAME_FORMAT = QImage.Format_BGR888 if HAS_BGR888 else QImage.Format_RGB888
+
+
+class PooledFrame:
+    """A frame buffer borrowed from a FramePool.
+
+    `image` is a QImage that shares memory with `array`. The consumer must
+    call release() once it has finished with the image. `frame_id` and
+    `stamps[READ]` identify the capture the buffer currently holds.
+    """
+    def __init__(self, pool, generation, array):
+        self.pool = pool
+        self.generation = generation
+        self.array = array
+        h, w, _ = array.shape
+        self.image = QImage(array.data, w, h, array.strides[0], FRAME_FORMAT)
+        self.stamps = new_stamps()  # Per-stage timestamps, see pipeline_stats
+        self.frame_id = 0           # Capture sequence number, set by the producer
+        self.sensor_size = None     # (w, h) of the capture before scaling, set by the producer
+
+    def release(self):
+        """Return the buffer to its pool."""
+        self.pool.release(self)
+
+
+class FramePool:
+    """Fixed set of preallocated frame buffers shared by producer and consumer."""
+    def __init__(self, size=3):
+        self.size = size
+        self.shape = None
+        self.generation = 0
+        self._free = []
+        self._lock = threading.Lock()
+
+    def acquire(self, shape):
+        """Borrow a buffer of the given (h, w, 3) shape, or None if all are in use."""
+        with self._lock:
+            if shape != self.shape:
+                self._allocate(shape)
+            return self._free.pop() if self._free else None
+
+    def release(self, frame):
+        """Give a buffer back; buffers from an older resolution are discarded."""
+        with self._lock:
+            if frame.generation == self.generation and frame not in self._free:
+                self._free.append(frame)
+
+    def _allocate(self, shape):
+        """Replace all buffers after a resolution change."""
+        self.shape = shape
+        self.generation += 1
+        self._free = [PooledFrame(self, self.generation, np.empty(shape, np.uint8))
+                      for _ in range(self.size)]
@@ -1,13 +1,66 @@
+import os
 import sys
 import datetime
 import random
-from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QMessageBox
+import threading
+import time
+from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QMessageBox, QShortcut
 from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QKeySequence
 from testui import Ui_MainWindow
 from video_widget import VideoWidget
+from video_grid import VideoGrid, LAYOUT_MAIN
 from radian_angle_picker import RadianAnglePicker
 from full_circle_angle_picker import FullCircleAnglePicker
 from border_frame import BorderFrame
+from numeric_readout import NumericReadout
+from theme_manager import ThemeManager, ROLE_HEADER, ROLE_CAPTION
+from telemetry_ingest import TelemetryIngest
+from telemetry_model import TelemetryModel, ORIGIN_DEVICE
+from video_recorder import VideoRecorder
+from replay_buffer import ReplayBuffer, EXPORT_EXTENSION
+from box_predictor import MODES as BOX_PREDICTION_MODES
+from frame_bus import FrameBus
+from object_detector import ObjectDetector, DEFAULT_WORKERS, DEFAULT_CPU_BUDGET, DEFAULT_SIZE
+
+def parse_video_sources(value):
+    """Parse "0,1,rtsp://..." into camera indices and stream URLs."""
+    return [int(item) if item.isdigit() else item for item in value.split(",") if item]
+
+# More than one source turns frame_video into a VideoGrid, e.g. VIDEO_SOURCES=0,1,2
+# Sources without a camera: a file, pattern://640x480?fps=30 or raw:///path.raw, live:///path.mp4, see video_source
+VIDEO_SOURCES = parse_video_sources(os.environ.get("VIDEO_SOURCES", "0"))
+VIDEO_LAYOUT = os.environ.get("VIDEO_LAYOUT", LAYOUT_MAIN)  # "main" or "grid"
+STREAM_FPS_BUDGET = 15  # Capture rate of each secondary stream
+# Device link, e.g. udp://0.0.0.0:5005 or serial:///dev/ttyUSB0?baud=115200; empty simulates data
+TELEMETRY_SOURCE = os.environ.get("TELEMETRY_SOURCE", "")
+# How long before its arrival a telemetry sample was observed, e.g. detector latency
+TELEMETRY_LATENCY = float(os.environ.get("TELEMETRY_LATENCY_MS", "0")) / 1000
+BOX_PREDICTION_SHORTCUT = "F8"  # Cycles the bounding box prediction mode
+# Frame pipeline timings written on exit, .json or .csv; extra feeds get _1, _2... suffixes
+PIPELINE_STATS_FILE = os.environ.get("PIPELINE_STATS_FILE", "")
+HUD_SHORTCUT = "F3"  # Toggles the pipeline timing HUD on every video feed
+# Recordings of the main feed with its overlay: segments plus a .jsonl telemetry sidecar each
+RECORD_DIR = os.environ.get("RECORD_DIR", "recordings")
+RECORD_FPS = float(os.environ.get("RECORD_FPS", "30"))
+RECORD_SHORTCUT = "F5"  # Starts or stops recording
+FREEZE_SHORTCUT = "F6"  # Freezes the main feed on its replay window, or goes back to live
+REPLAY_EXPORT_SHORTCUT = "F7"  # Saves the replay window to RECORD_DIR
+# While frozen: key -> stored frames to step; Home and End jump to the ends of the window
+REPLAY_STEPS = {"Left": -1, "Right": 1, "PgUp": -30, "PgDown": 30,
+                "Home": -sys.maxsize, "End": sys.maxsize}
+# On-box detector for the main feed instead of telemetry boxes: "motion", or "dnn" with
+# DETECTOR_MODEL (and DETECTOR_CONFIG); empty leaves the boxes to the device
+DETECTOR = os.environ.get("DETECTOR", "")
+DETECTOR_MODEL = os.environ.get("DETECTOR_MODEL", "")
+DETECTOR_CONFIG = os.environ.get("DETECTOR_CONFIG", "")
+# Detector processes, dnn only: the motion detector always runs one
+DETECTOR_WORKERS = int(os.environ.get("DETECTOR_WORKERS", DEFAULT_WORKERS))
+DETECTOR_CPU = float(os.environ.get("DETECTOR_CPU", DEFAULT_CPU_BUDGET))  # Cores on average
+DETECTOR_SIZE = int(os.environ.get("DETECTOR_SIZE", DEFAULT_SIZE))  # Longest side detected
+# Shared-memory name the main feed's captures are published under for other processes,
+# e.g. FRAME_BUS=camera0; read them with frame_bus.FrameBusReader("camera0")
+FRAME_BUS = os.environ.get("FRAME_BUS", "")
 
 class MainWindow:
     """Main application window for the camera interface."""
@@ -16,17 +69,38 @@ class MainWindow:
         self.uic = Ui_MainWindow()
         self.uic.setupUi(self.main_win)
         self.day_mode = self.is_day_time()
+        self.video_widget = None
+        self.video_grid = None
+        self.telemetry = None
+        self.telemetry_model = TelemetryModel(self.main_win)
 
         # Setup UI components
         self.setup_ui_geometry()
         self.setup_widgets()
         self.setup_connections()
         self.setup_timers()
+        self.setup_pipeline_stats()
+        self.setup_recording()
+        self.setup_replay()
+        self.setup_detector()
+        self.setup_frame_bus()
         self.initialize_values()
-        self.update_colors()
+        self.setup_theme()
+
+    def setup_readouts(self):
+        """Swap the Designer QTextEdit value fields for painted NumericReadouts."""
+        for name in ("textEditDis", "textEditEA", "textEditAA"):
+            text_edit = getattr(self.uic, name)
+            readout = NumericReadout(text_edit.parentWidget())
+            readout.setObjectName(name)
+            readout.setGeometry(text_edit.geometry())
+            text_edit.hide()
+            text_edit.deleteLater()
+            setattr(self.uic, name, readout)
 
     def setup_ui_geometry(self):
         """Set geometry for UI elements."""
+        self.setup_readouts()
         self.uic.frame_video.setGeometry(10, 10, 780, 300)
         self.uic.label_distance.setGeometry(320, 335, 70, 30)
         self.uic.label_EA.setGeometry(320, 365, 70, 30)
@@ -62,7 +136,14 @@ class MainWindow:
     def setup_video_player(self):
         """Setup the video player widget."""
         try:
-            self.video_widget = VideoWidget(self.uic.frame_video, video_source=0, day_mode=self.day_mode)
+            if len(VIDEO_SOURCES) > 1:
+                self.video_grid = VideoGrid(self.uic.frame_video, VIDEO_SOURCES, self.day_mode,
+                                            VIDEO_LAYOUT, STREAM_FPS_BUDGET)
+                self.video_grid.setGeometry(4, 4, 772, 292)
+                self.video_grid.show()
+                self.video_widget = self.video_grid.main_widget()
+                return
+            self.video_widget = VideoWidget(self.uic.frame_video, video_source=VIDEO_SOURCES[0], day_mode=self.day_mode)
             self.video_widget.setGeometry(4, 4, 772, 292)
             self.video_widget.show()
         except Exception as e:
@@ -70,20 +151,226 @@ class MainWindow:
 
     def setup_connections(self):
         """Setup signal-slot connections."""
+        # textChanged only carries operator edits: device values are written with signals blocked
         self.uic.textEditEA.textChanged.connect(self.update_elevation_angle)
         self.uic.textEditAA.textChanged.connect(self.update_azimuth_angle)
         self.uic.textEditDis.textChanged.connect(self.update_distance)
+        self.readouts = {"distance": self.uic.textEditDis,
+                         "elevation_angle": self.uic.textEditEA,
+                         "azimuth_angle": self.uic.textEditAA}
+        self.telemetry_model.value_changed.connect(self.apply_telemetry_value)
 
     def setup_timers(self):
         """Setup timers for updating parameters and checking day mode."""
         self.data_timer = QTimer(self.main_win)
         self.data_timer.timeout.connect(self.update_parameters)
-        self.data_timer.start(100)
+        if TELEMETRY_SOURCE:
+            self.setup_telemetry()
+        else:
+            self.data_timer.start(100)
 
         self.time_check_timer = QTimer(self.main_win)
         self.time_check_timer.timeout.connect(self.check_day_mode)
         self.time_check_timer.start(60000)
 
+    def setup_telemetry(self):
+        """Start the device telemetry link; each new sample triggers update_parameters."""
+        self.telemetry = TelemetryIngest(TELEMETRY_SOURCE)
+        self.telemetry.sample_ready.connect(self.update_parameters)
+        self.telemetry.error_occurred.connect(self.show_error)
+        QApplication.instance().aboutToQuit.connect(self.stop_telemetry)
+        self.telemetry.start()
+
+    def stop_telemetry(self):
+        """Stop the telemetry thread before the application exits."""
+        if self.telemetry:
+            self.telemetry.stop()
+            self.telemetry.wait(2000)
+
+    def video_widgets(self):
+        """Return every VideoWidget on screen, main feed first."""
+        if self.video_grid:
+            return self.video_grid.widgets
+        return [self.video_widget] if self.video_widget else []
+
+    def setup_pipeline_stats(self):
+        """Bind the HUD shortcut and export the frame timings on exit if asked to."""
+        self.hud_shortcut = QShortcut(QKeySequence(HUD_SHORTCUT), self.main_win)
+        self.hud_shortcut.activated.connect(self.toggle_pipeline_hud)
+        self.box_prediction_shortcut = QShortcut(QKeySequence(BOX_PREDICTION_SHORTCUT),
+                                                 self.main_win)
+        self.box_prediction_shortcut.activated.connect(self.cycle_box_prediction)
+        if PIPELINE_STATS_FILE:
+            QApplication.instance().aboutToQuit.connect(self.export_pipeline_stats)
+
+    def setup_recording(self):
+        """Bind the record shortcut and stop recording on exit or when the encoder fails."""
+        self.recorder = None
+        self.record_shortcut = QShortcut(QKeySequence(RECORD_SHORTCUT), self.main_win)
+        self.record_shortcut.activated.connect(self.toggle_recording)
+        for widget in self.video_widgets():
+            widget.recording_failed.connect(self.recording_failed)
+        QApplication.instance().aboutToQuit.connect(self.stop_recording)
+
+    def toggle_recording(self):
+        """Start or stop recording the main feed."""
+        if self.recorder:
+            self.stop_recording()
+        else:
+            self.start_recording()
+
+    def start_recording(self):
+        """Record the main feed, overlay and telemetry to RECORD_DIR."""
+        widgets = self.video_widgets()
+        if self.recorder or not widgets:
+            return
+        recorder = VideoRecorder(RECORD_DIR, RECORD_FPS)
+        try:
+            recorder.start()
+        except OSError as e:
+            print(f"Failed to start recording: {str(e)}")
+            return
+        self.recorder = recorder
+        widgets[0].set_recorder(recorder, lambda: dict(self.telemetry_model.values))
+
+    def stop_recording(self):
+        """Stop recording and let the encoder finish the queued frames."""
+        if not self.recorder:
+            return
+        for widget in self.video_widgets():
+            widget.set_recorder(None)
+        self.recorder.stop()
+        print(f"Recording stopped: {self.recorder.stats()}")
+        self.recorder = None
+
+    def recording_failed(self, message):
+        """Stop a recording whose encoder died and tell the operator."""
+        self.stop_recording()
+        self.show_error(f"Recording stopped: {message}")
+
+    def toggle_pipeline_hud(self):
+        """Show or hide the timing HUD on every video feed."""
+        for widget in self.video_widgets():
+            widget.toggle_hud()
+
+    def cycle_box_prediction(self):
+        """Switch the main feed to the next bounding box prediction mode."""
+        if not self.video_widget:
+            return
+        modes = BOX_PREDICTION_MODES
+        mode = modes[(modes.index(self.video_widget.box_predictor.mode) + 1) % len(modes)]
+        self.video_widget.set_box_prediction(mode)
+        print(f"Bounding box prediction: {mode}")
+
+    def export_pipeline_stats(self, path=None):
+        """Write each feed's frame timings to path (PIPELINE_STATS_FILE by default)."""
+        path = path or PIPELINE_STATS_FILE
+        root, ext = os.path.splitext(path)
+        for index, widget in enumerate(self.video_widgets()):
+            feed_path = path if index == 0 else f"{root}_{index}{ext}"
+            try:
+                widget.pipeline.export(feed_path, {
+                    "source": str(widget.video_thread.video_source),
+                    "counters": widget.frame_stats(),
+                    "box_prediction": widget.box_predictor.stats(),
+                    "detections": widget.frame_index.stats(),
+                    "detector": widget.detector.stats() if widget.detector else None})
+            except OSError as e:
+                print(f"Failed to export pipeline stats: {str(e)}")
+
+    def setup_replay(self):
+        """Keep a pre-event replay window of the main feed and bind its keys."""
+        widgets = self.video_widgets()
+        self.replay = ReplayBuffer()
+        self.replay_shortcuts = []
+        if not widgets:
+            return
+        widgets[0].set_replay_buffer(self.replay)
+        self.freeze_shortcut = QShortcut(QKeySequence(FREEZE_SHORTCUT), self.main_win)
+        self.freeze_shortcut.activated.connect(self.toggle_freeze)
+        self.replay_export_shortcut = QShortcut(QKeySequence(REPLAY_EXPORT_SHORTCUT), self.main_win)
+        self.replay_export_shortcut.activated.connect(self.export_replay)
+        for key, frames in REPLAY_STEPS.items():
+            shortcut = QShortcut(QKeySequence(key), self.main_win)
+            shortcut.activated.connect(lambda frames=frames: widgets[0].step_replay(frames))
+            shortcut.setEnabled(False)  # Arrow keys belong to the other widgets while live
+            self.replay_shortcuts.append(shortcut)
+
+    def toggle_freeze(self):
+        """Freeze the main feed on its newest stored frame, or return to live video."""
+        widgets = self.video_widgets()
+        if widgets[0].is_frozen():
+            widgets[0].unfreeze()
+        else:
+            widgets[0].freeze()
+        for shortcut in self.replay_shortcuts:
+            shortcut.setEnabled(widgets[0].is_frozen())
+
+    def export_replay(self):
+        """Write the replay window to RECORD_DIR without blocking the GUI."""
+        if not len(self.replay):
+            return
+        path = os.path.join(RECORD_DIR, time.strftime("replay_%Y%m%d_%H%M%S") + EXPORT_EXTENSION)
+
+        def export():
+            try:
+                os.makedirs(RECORD_DIR, exist_ok=True)
+                count = self.replay.export(path)
+                print(f"Replay exported: {path} ({count} frames)")
+            except OSError as e:
+                print(f"Failed to export replay: {str(e)}")
+        threading.Thread(target=export, name="replay-export", daemon=True).start()
+
+    def setup_detector(self):
+        """Start the on-box detector on the main feed if DETECTOR names one."""
+        self.detector = None
+        widgets = self.video_widgets()
+        if not DETECTOR or not widgets:
+            return
+        try:
+            detector = ObjectDetector(DETECTOR, DETECTOR_MODEL, DETECTOR_CONFIG or None,
+                                      DETECTOR_SIZE, DETECTOR_WORKERS, DETECTOR_CPU)
+            detector.start()
+        except (OSError, ValueError) as e:
+            print(f"Failed to start detector: {str(e)}")
+            return
+        self.detector = detector
+        widgets[0].set_detector(detector)
+        QApplication.instance().aboutToQuit.connect(self.stop_detector)
+
+    def stop_detector(self):
+        """Stop feeding the detector, then shut its workers down."""
+        if not self.detector:
+            return
+        for widget in self.video_widgets():
+            widget.set_detector(None)
+        self.detector.stop()
+        print(f"Detector stopped: {self.detector.stats()}")
+        self.detector = None
+
+    def setup_frame_bus(self):
+        """Publish the main feed to the FRAME_BUS shared-memory ring if one is named."""
+        self.frame_bus = None
+        widgets = self.video_widgets()
+        if not FRAME_BUS or not widgets:
+            return
+        try:
+            self.frame_bus = FrameBus(FRAME_BUS)
+        except (OSError, ValueError) as e:
+            print(f"Failed to create frame bus: {str(e)}")
+            return
+        widgets[0].set_frame_bus(self.frame_bus)
+        QApplication.instance().aboutToQuit.connect(self.stop_frame_bus)
+
+    def stop_frame_bus(self):
+        """Stop publishing and remove the frame bus."""
+        if not self.frame_bus:
+            return
+        for widget in self.video_widgets():
+            widget.set_frame_bus(None)
+        self.frame_bus.close()
+        self.frame_bus = None
+
     def is_day_time(self):
         """Check if current time is daytime (6 AM to 6 PM)."""
         current_hour = datetime.datetime.now().hour
@@ -96,95 +383,113 @@ class MainWindow:
             self.day_mode = new_day_mode
             self.update_colors()
 
-    def update_colors(self):
-        """Update UI colors based on day/night mode."""
-        bg_color = "black" if self.day_mode else "white"
-        text_color = "yellow"
-        border_color = "white" if self.day_mode else "black"
-        font_size = 16
-
-        self.uic.centralwidget.setStyleSheet(f"background-color: {bg_color};")
-        self.uic.frame_video.setStyleSheet(
-            f"QFrame#frame_video {{ border: 3px solid orange; background-color: {bg_color}; }}")
-        for text_edit in [self.uic.textEditDis, self.uic.textEditEA, self.uic.textEditAA]:
-            text_edit.setStyleSheet(
-                f"background-color: {bg_color}; color: {text_color}; font-size: {font_size}px; "
-                f"font-weight: bold; border: 1px solid {border_color};")
-            text_edit.setAlignment(Qt.AlignCenter)
+    def setup_theme(self):
+        """Register widgets with the day/night theme and apply the current one."""
+        self.theme = ThemeManager(self.main_win, self.day_mode, font_size=16, border=1,
+                                  frame_border=3)
+        self.theme.style(self.uic.centralwidget)
+        self.theme.style(self.uic.frame_video)
         for label in [self.uic.label_distance, self.uic.label_EA, self.uic.label_AA]:
-            label.setStyleSheet(
-                f"background-color: red; color: white; font-size: {font_size}px; "
-                f"font-weight: bold; border: 1px solid {border_color};")
+            self.theme.style(label, ROLE_HEADER)
         for label in [self.label_elevation, self.label_azimuth]:
-            label.setStyleSheet(
-                f"background-color: {bg_color}; color: {text_color}; font-size: {font_size}px; "
-                f"font-weight: bold; border: 1px solid {border_color};")
+            self.theme.style(label, ROLE_CAPTION)
+        for readout in [self.uic.textEditDis, self.uic.textEditEA, self.uic.textEditAA]:
+            readout.set_style(16)
+            self.theme.style(readout)
+        for widget in [self.video_grid or self.video_widget, self.radian_picker,
+                       self.circle_picker, self.border_frame]:
+            self.theme.subscribe(widget)
 
-        self.video_widget.set_day_mode(self.day_mode)
-        self.radian_picker.set_day_mode(self.day_mode)
-        self.circle_picker.set_day_mode(self.day_mode)
-        self.border_frame.set_day_mode(self.day_mode)
+    def update_colors(self):
+        """Update UI colors based on day/night mode."""
+        self.theme.set_day_mode(self.day_mode)
 
     def initialize_values(self):
         """Initialize default values for UI elements."""
-        self.uic.textEditDis.setPlainText("50")
-        self.uic.textEditEA.setPlainText("45")
-        self.uic.textEditAA.setPlainText("39")
-        self.radian_picker.set_angle(45)
-        self.circle_picker.set_angle(39)
+        self.telemetry_model.update_from_device(
+            {"distance": 50, "elevation_angle": 45, "azimuth_angle": 39})
 
     def get_data_from_device(self):
-        """Simulate data retrieval from a device."""
+        """Simulate data retrieval from a device; the box is in sensor pixels of the main feed."""
+        sensor_size = self.video_widget.sensor_size if self.video_widget else None
+        width, height = sensor_size or (640, 480)  # Any box is accepted before the first frame
+        w = random.randint(width // 16, width // 4)
+        h = random.randint(height // 16, height // 4)
         return {
             "distance": random.uniform(10, 100),
             "elevation_angle": random.uniform(0, 90),
             "azimuth_angle": random.uniform(0, 360),
             "bounding_box": {
-                "x": random.randint(100, 600),
-                "y": random.randint(50, 250),
-                "w": random.randint(50, 200),
-                "h": random.randint(50, 200)
+                "x": random.randint(0, width - w),
+                "y": random.randint(0, height - h),
+                "w": w,
+                "h": h
             }
         }
 
     def update_parameters(self):
         """Update UI with data from device."""
         try:
-            data = self.get_data_from_device()
-            self.uic.textEditDis.setPlainText(str(round(data["distance"], 2)))
-            self.uic.textEditEA.setPlainText(str(round(data["elevation_angle"], 2)))
-            self.uic.textEditAA.setPlainText(str(round(data["azimuth_angle"], 2)))
-            self.radian_picker.set_angle(data["elevation_angle"])
-            self.circle_picker.set_angle(data["azimuth_angle"])
-            self.video_widget.set_bounding_box(data.get("bounding_box"))
+            data = self.telemetry.take() if self.telemetry else self.get_data_from_device()
+            if data is None:
+                return
+            self.telemetry_model.update_from_device(data)
+            if "bounding_box" in data and self.video_widget and not self.detector:
+                # Every sample, even an unchanged box, tells the predictor where the target is
+                sample_time = data.get("received_at", time.monotonic()) - TELEMETRY_LATENCY
+                self.video_widget.set_bounding_box(data["bounding_box"], sample_time)
         except Exception as e:
-            error_label = QLabel(f"Error: {str(e)}")
-            error_label.setStyleSheet("color: red; font-size: 16px;")
-            error_label.setGeometry(310, 310, 180, 20)
-            error_label.setAlignment(Qt.AlignCenter)
-            error_label.setParent(self.uic.centralwidget)
-            error_label.show()
-            QTimer.singleShot(2000, error_label.deleteLater)
+            self.show_error(f"Error: {str(e)}")
+
+    def show_error(self, message):
+        """Show a message above the readouts for two seconds."""
+        error_label = QLabel(message)
+        error_label.setStyleSheet("color: red; font-size: 16px;")
+        error_label.setGeometry(310, 310, 180, 20)
+        error_label.setAlignment(Qt.AlignCenter)
+        error_label.setParent(self.uic.centralwidget)
+        error_label.show()
+        QTimer.singleShot(2000, error_label.deleteLater)
+
+    def apply_telemetry_value(self, field, value, origin):
+        """Push a changed model value to the widgets that show it."""
+        if field == "bounding_box":
+            return  # update_parameters feeds every box sample with its time
+        readout = self.readouts[field]
+        if origin == ORIGIN_DEVICE:
+            readout.blockSignals(True)
+            try:
+                readout.setPlainText(str(value))
+            finally:
+                readout.blockSignals(False)
+        if field == "elevation_angle":
+            self.radian_picker.set_angle(value)
+        elif field == "azimuth_angle":
+            self.circle_picker.set_angle(value)
 
     def update_elevation_angle(self):
-        """Update elevation angle display."""
+        """Apply an elevation angle typed by the operator."""
         try:
-            angle = float(self.uic.textEditEA.toPlainText())
-            self.radian_picker.set_angle(angle)
+            self.telemetry_model.set_operator_value(
+                "elevation_angle", float(self.uic.textEditEA.toPlainText()))
         except ValueError:
             pass
 
     def update_azimuth_angle(self):
-        """Update azimuth angle display."""
+        """Apply an azimuth angle typed by the operator."""
         try:
-            angle = float(self.uic.textEditAA.toPlainText())
-            self.circle_picker.set_angle(angle)
+            self.telemetry_model.set_operator_value(
+                "azimuth_angle", float(self.uic.textEditAA.toPlainText()))
         except ValueError:
             pass
 
     def update_distance(self):
-        """Placeholder for distance update."""
-        pass
+        """Apply a distance typed by the operator."""
+        try:
+            self.telemetry_model.set_operator_value(
+                "distance", float(self.uic.textEditDis.toPlainText()))
+        except ValueError:
+            pass
 
     def show(self):
         """Show the main window."""
@@ -0,0 +1,61 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPainter, QPen, QFont, QPixmap
+
+# Horizontal field of view in mils for each zoom level of the lens.
+DEFAULT_FOV_BY_ZOOM = {1: 349}
+
+
+class MilReticle:
+    """Pre-rendered red mil scale, cached per widget width and FOV."""
+    def __init__(self, major_tick_length=8, minor_tick_length=4, label_offset=12,
+                 mil_range=200, major_tick_mil=10, label_mil=50):
+        self.major_tick_length = major_tick_length
+        self.minor_tick_length = minor_tick_length
+        self.label_offset = label_offset
+        self.mil_range = mil_range
+        self.major_tick_mil = major_tick_mil
+        self.label_mil = label_mil
+        self.cache = {}  # (width, fov_mil) -> (pixmap, origin_x)
+
+    def prerender(self, width, fov_mils):
+        """Render the reticle for every FOV up front, e.g. one per zoom level."""
+        for fov_mil in fov_mils:
+            self.get(width, fov_mil)
+
+    def get(self, width, fov_mil):
+        """Return (pixmap, origin_x) where origin_x is the pixel of the 0 mil tick."""
+        key = (width, fov_mil)
+        entry = self.cache.get(key)
+        if entry is None:
+            # A new width makes every cached scale useless.
+            self.cache = {k: v for k, v in self.cache.items() if k[0] == width}
+            entry = self.cache[key] = self.render(width, fov_mil)
+        return entry
+
+    def render(self, width, fov_mil):
+        """Draw the ticks and labels into a transparent pixmap."""
+        pixel_per_mil = width / fov_mil
+        origin = int(self.mil_range * pixel_per_mil) + self.label_offset
+        height = self.major_tick_length + self.label_offset + 4
+        pixmap = QPixmap(origin * 2 + 1, height)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setPen(QPen(Qt.red, 1))
+        painter.setFont(QFont('Arial', 8))
+        for mil in range(-self.mil_range, self.mil_range + 1):
+            x = origin + int(mil * pixel_per_mil)
+            if mil % self.major_tick_mil == 0:
+                painter.drawLine(x, 0, x, self.major_tick_length)
+                if mil % self.label_mil == 0:
+                    painter.drawText(x - self.label_offset,
+                                     self.major_tick_length + self.label_offset, str(mil))
+            else:
+                painter.drawLine(x, 0, x, self.minor_tick_length)
+        painter.end()
+        return pixmap, origin
+
+    def draw(self, painter, center_x, width, fov_mil, top=0):
+        """Blit the cached scale with its 0 mil tick at center_x and its top edge at top."""
+        pixmap, origin = self.get(width, fov_mil)
+        painter.drawPixmap(center_x - origin, top, pixmap)
@@ -0,0 +1,119 @@
+from PyQt5.QtWidgets import QWidget, QLineEdit
+from PyQt5.QtCore import Qt, QPointF, QRectF, pyqtSignal
+from PyQt5.QtGui import QPainter, QPen, QPalette, QFontDatabase, QFontMetrics, QStaticText
+
+
+class NumericReadout(QWidget):
+    """Painted numeric field with fixed-width digits, replacing a QTextEdit readout.
+
+    Each character is a cached QStaticText laid out on a fixed advance, so a
+    new value costs a string compare and a repaint, with no text document
+    or style sheet involved. Colors come from the palette (window, bright text
+    for the digits, window text for the border), so a theme switch is just a
+    palette change.
+    setPlainText/toPlainText/textChanged match the QTextEdit calls MainWindow uses. When editable, a double click opens a
+    line edit and textChanged fires once the operator presses Enter.
+    """
+    textChanged = pyqtSignal()
+
+    def __init__(self, parent=None, editable=True):
+        super().__init__(parent)
+        self.text = ""
+        self.editable = editable
+        self.editor = None  # QLineEdit shown while editing
+        self.border_width = 1
+        self.digit_font = QFontDatabase.systemFont(QFontDatabase.FixedFont)
+        self.digit_font.setBold(True)
+        self.glyphs = {}  # Character -> prepared QStaticText
+        self.advance = 0      # Width of one digit cell
+        self.text_height = 0
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.set_style(16)
+
+    def set_style(self, font_size, border_width=1):
+        """Set the digit size in pixels and the border width; drops the glyph cache."""
+        self.border_width = border_width
+        self.digit_font.setPixelSize(font_size)
+        metrics = QFontMetrics(self.digit_font)
+        self.advance = metrics.horizontalAdvance("0")
+        self.text_height = metrics.height()
+        self.glyphs = {}
+        self.update()
+
+    def glyph(self, char):
+        """Return the cached static text for one character."""
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            glyph = QStaticText(char)
+            glyph.setTextFormat(Qt.PlainText)
+            glyph.prepare(font=self.digit_font)
+            self.glyphs[char] = glyph
+        return glyph
+
+    def setPlainText(self, text):
+        """Show text; repaints only when it differs from what is shown."""
+        if text == self.text:
+            return
+        self.text = text
+        self.update()
+        self.textChanged.emit()
+
+    def toPlainText(self):
+        """Return the text shown."""
+        return self.text
+
+    def setAlignment(self, alignment):
+        """Kept for QTextEdit compatibility; digits are always centered."""
+
+    def setReadOnly(self, read_only):
+        """Turn the double-click edit mode off or on."""
+        self.editable = not read_only
+
+    def mouseDoubleClickEvent(self, event):
+        """Open the line edit over the readout in edit mode."""
+        if not self.editable:
+            return super().mouseDoubleClickEvent(event)
+        if self.editor is None:
+            self.editor = QLineEdit(self)
+            self.editor.setAlignment(Qt.AlignCenter)
+            self.editor.setFont(self.digit_font)
+            self.editor.editingFinished.connect(self.finish_editing)
+        self.editor.setGeometry(self.rect())
+        self.editor.setText(self.text)
+        self.editor.selectAll()
+        self.editor.show()
+        self.editor.setFocus()
+
+    def finish_editing(self):
+        """Apply the edited text and close the line edit."""
+        if self.editor.isVisible():
+            self.editor.hide()
+            self.setPlainText(self.editor.text().strip())
+
+    def keyPressEvent(self, event):
+        """Escape leaves edit mode without applying the edit."""
+        if event.key() == Qt.Key_Escape and self.editor and self.editor.isVisible():
+            self.editor.blockSignals(True)
+            self.editor.hide()
+            self.editor.blockSignals(False)
+            return
+        super().keyPressEvent(event)
+
+    def paintEvent(self, event):
+        """Paint the background, border and cached digit glyphs."""
+        painter = QPainter(self)
+        palette = self.palette()
+        painter.fillRect(self.rect(), palette.color(QPalette.Window))
+        if self.border_width:
+            half = self.border_width / 2
+            painter.setPen(QPen(palette.color(QPalette.WindowText), self.border_width))
+            painter.drawRect(QRectF(self.rect()).adjusted(half, half, -half, -half))
+        if not self.text:
+            return
+        painter.setFont(self.digit_font)
+        painter.setPen(palette.color(QPalette.BrightText))
+        x = (self.width() - self.advance * len(self.text)) / 2
+        y = (self.height() - self.text_height) / 2
+        for char in self.text:
+            painter.drawStaticText(QPointF(x, y), self.glyph(char))
+            x += self.advance
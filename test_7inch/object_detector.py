@@ -0,0 +1,295 @@
+import os
+import queue
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+from pipeline_stats import PERCENTILES
+
+KIND_MOTION = "motion"  # Largest moving blob against a learned background, no model needed
+KIND_DNN = "dnn"        # cv2.dnn network with SSD-style output, e.g. MobileNet-SSD
+KINDS = (KIND_MOTION, KIND_DNN)
+DEFAULT_SIZE = 320         # Frames are downscaled so neither side exceeds this
+DEFAULT_CPU_BUDGET = 0.5   # Cores' worth of CPU time the detector may use on average
+DEFAULT_WORKERS = max(1, min(2, (os.cpu_count() or 1) - 1))
+MISSES_BEFORE_LOST = 5     # Empty results in a row before the target is reported lost
+HISTORY = 256              # Results kept for the timing percentiles
+COST_SMOOTHING = 0.2       # Weight of the newest inference time in the running cost
+MOTION_HISTORY = 100       # Frames the background model adapts over
+MOTION_THRESHOLD = 16      # MOG2 squared Mahalanobis distance of a foreground pixel
+MOTION_MIN_AREA = 0.002    # Smallest blob, as a fraction of the frame area
+DNN_INPUT = (300, 300)     # Network input size
+DNN_CONFIDENCE = 0.5       # Lowest score accepted as a detection
+
+worker = None  # Per-process detector state, set by init_worker()
+
+
+class ObjectDetector(QObject):
+    """Run a CPU detector on captured frames in a process pool and publish the boxes.
+
+    The capture thread offers every frame; the ones admitted are downscaled
+    into a free shared-memory slot, one per worker, and detected in another
+    process so the GUI and capture never wait on the model. A frame is
+    skipped when every slot is busy, and frames are spaced so the measured
+    inference CPU time stays within cpu_budget cores. Boxes come back in
+    sensor (capture) pixels, tagged with the frame_id and capture time of
+    the frame they were computed on. The motion detector keeps a background
+    model that must see every submitted frame in order, so it always runs a
+    single worker; only the stateless dnn kind uses more.
+    """
+    detection_ready = pyqtSignal(object)  # Box dict, or None once the target is lost
+
+    def __init__(self, kind=KIND_MOTION, model=None, config=None, size=DEFAULT_SIZE,
+                 workers=DEFAULT_WORKERS, cpu_budget=DEFAULT_CPU_BUDGET, parent=None):
+        super().__init__(parent)
+        if kind not in KINDS:
+            raise ValueError(f"Unknown detector {kind!r}, expected one of {KINDS}")
+        if kind == KIND_DNN and not model:
+            raise ValueError("The dnn detector needs a model file")
+        self.kind = kind
+        self.model = model
+        self.config = config
+        self.size = size
+        self.worker_count = 1 if kind == KIND_MOTION else workers
+        self.cpu_budget = cpu_budget
+        self.lock = threading.Lock()
+        self.buffers = []             # SharedMemory per slot
+        self.free = queue.SimpleQueue()  # Slot indices the capture thread may fill
+        self.executor = None
+        self.cost = 0.0               # Running inference CPU seconds per frame
+        self.next_time = 0.0          # Earliest capture time submitted next
+        self.misses = 0               # Empty results in a row
+        self.offered = 0
+        self.submitted = 0
+        self.busy = 0                 # Skipped: every slot in use
+        self.over_budget = 0          # Skipped: too soon for the CPU budget
+        self.completed = 0            # Results received
+        self.detected = 0             # Results with a box
+        self.failed = 0               # Worker errors
+        self.timings = np.zeros((HISTORY, 2))  # Rows: (inference s, capture to result s)
+        self.timing_index = 0
+        self.timing_count = 0
+        self.started_at = None
+
+    def is_running(self):
+        """Return True while the worker pool is up."""
+        return self.executor is not None
+
+    def start(self):
+        """Allocate one slot per worker and start the pool."""
+        if self.executor:
+            return
+        self.buffers = [shared_memory.SharedMemory(create=True, size=self.size * self.size * 3)
+                        for _ in range(self.worker_count)]
+        self.free = queue.SimpleQueue()
+        for slot in range(len(self.buffers)):
+            self.free.put(slot)
+        context = multiprocessing.get_context("spawn")  # Forking a Qt process is unsafe
+        try:
+            self.executor = ProcessPoolExecutor(
+                self.worker_count, context, init_worker,
+                ([buffer.name for buffer in self.buffers], self.kind, self.model, self.config))
+        except Exception:
+            self.release_buffers()
+            raise
+        self.started_at = time.monotonic()
+
+    def stop(self):
+        """Stop the pool; results still in flight are discarded."""
+        executor, self.executor = self.executor, None
+        if executor is None:
+            return
+        executor.shutdown(wait=True, cancel_futures=True)
+        self.release_buffers()
+
+    def release_buffers(self):
+        """Close and remove the shared-memory slots."""
+        for buffer in self.buffers:
+            buffer.close()
+            buffer.unlink()
+        self.buffers = []
+
+    def offer(self, image, captured_at, frame_id):
+        """Submit a BGR capture for detection if a slot is free and the budget allows.
+
+        Called by the capture thread with the full-resolution frame; the
+        downscale into the slot is the only work done on that thread.
+        Returns True if the frame was submitted.
+        """
+        executor = self.executor
+        if executor is None:
+            return False
+        self.offered += 1
+        if captured_at < self.next_time:
+            self.over_budget += 1
+            return False
+        try:
+            slot = self.free.get_nowait()
+        except queue.Empty:
+            self.busy += 1
+            return False
+        h, w = image.shape[:2]
+        size = detection_size(w, h, self.size)
+        shape = (size[1], size[0], 3)
+        array = np.ndarray(shape, np.uint8, self.buffers[slot].buf)
+        if size == (w, h):
+            np.copyto(array, image)
+        else:
+            cv2.resize(image, size, dst=array, interpolation=cv2.INTER_LINEAR)
+        array = None
+        with self.lock:
+            # Space frames so cost / interval stays within the budget
+            self.next_time = captured_at + self.cost / self.cpu_budget
+        try:
+            future = executor.submit(detect_slot, slot, shape)
+        except RuntimeError:
+            self.free.put(slot)  # The pool is shutting down
+            return False
+        self.submitted += 1
+        scale = w / size[0], h / size[1]
+        future.add_done_callback(
+            lambda future: self.finish(future, slot, frame_id, captured_at, scale, (w, h)))
+        return True
+
+    def finish(self, future, slot, frame_id, captured_at, scale, frame_size):
+        """Publish a worker result in sensor pixels; runs on the pool's result thread."""
+        self.free.put(slot)
+        if future.cancelled():
+            return
+        try:
+            box, cost = future.result()
+        except Exception as e:
+            with self.lock:
+                self.failed += 1
+            print(f"Detector error: {str(e)}")
+            return
+        done = time.monotonic()
+        with self.lock:
+            self.completed += 1
+            self.cost = cost if not self.cost else self.cost + COST_SMOOTHING * (cost - self.cost)
+            self.timings[self.timing_index] = cost, done - captured_at
+            self.timing_index = (self.timing_index + 1) % len(self.timings)
+            self.timing_count = min(self.timing_count + 1, len(self.timings))
+            if box is None:
+                self.misses += 1
+                lost = self.misses == MISSES_BEFORE_LOST
+            else:
+                self.misses = 0
+                self.detected += 1
+        if box is None:
+            if lost:
+                self.detection_ready.emit(None)
+            return
+        x, y, w, h = box
+        self.detection_ready.emit({
+            "x": int(round(x * scale[0])), "y": int(round(y * scale[1])),
+            "w": int(round(w * scale[0])), "h": int(round(h * scale[1])),
+            "frame_id": frame_id, "captured_at": captured_at, "detected_at": done,
+            "frame_size": frame_size})
+
+    def stats(self):
+        """Return the frame counters and p50/p95/p99 inference and capture-to-result times."""
+        with self.lock:
+            timings = self.timings[:self.timing_count].copy()
+            completed, detected, failed = self.completed, self.detected, self.failed
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        result = {"kind": self.kind, "workers": self.worker_count,
+                  "cpu_budget": self.cpu_budget, "offered": self.offered,
+                  "submitted": self.submitted, "busy": self.busy,
+                  "over_budget": self.over_budget, "detected": detected,
+                  "failed": failed, "rate": completed / elapsed if elapsed else 0.0}
+        if len(timings):
+            for name, column in (("inference_ms", 0), ("latency_ms", 1)):
+                result[name] = dict(zip((f"p{p}" for p in PERCENTILES),
+                                        (1000 * np.percentile(timings[:, column],
+                                                              PERCENTILES)).tolist()))
+        return result
+
+    def hud_row(self):
+        """Return the HUD row: capture to detection result in milliseconds."""
+        latency = self.stats().get("latency_ms", {})
+        return ["detector"] + [f"{latency.get(f'p{p}', 0.0):.2f}" for p in PERCENTILES]
+
+
+def detection_size(w, h, size):
+    """Return the (w, h) a w x h capture is detected at: aspect kept, no side above size."""
+    if max(w, h) <= size:
+        return w, h
+    if w >= h:
+        return size, max(1, h * size // w)
+    return max(1, w * size // h), size
+
+
+def init_worker(names, kind, model, config):
+    """Pool initializer: attach the slots and load the detector once per process."""
+    global worker
+    cv2.setNumThreads(1)  # The pool size is the parallelism; OpenCV threads would bust the budget
+    buffers = [shared_memory.SharedMemory(name=name) for name in names]
+    if kind == KIND_DNN:
+        worker = DnnDetector(buffers, model, config)
+    else:
+        worker = MotionDetector(buffers)
+
+
+def detect_slot(slot, shape):
+    """Pool task: return ((x, y, w, h) in slot pixels or None, CPU seconds spent)."""
+    start = time.process_time()
+    frame = np.ndarray(shape, np.uint8, worker.buffers[slot].buf)
+    try:
+        box = worker.detect(frame)
+    finally:
+        frame = None  # Drop the view before the slot is reused
+    return box, time.process_time() - start
+
+
+class MotionDetector:
+    """Classical detector: the largest foreground blob of a MOG2 background model.
+
+    Each worker keeps its own background from the frames it is given, so
+    it needs no model file and finds anything that moves, like the bar of
+    the pattern:// source.
+    """
+    def __init__(self, buffers):
+        self.buffers = buffers
+        self.subtractor = cv2.createBackgroundSubtractorMOG2(
+            MOTION_HISTORY, MOTION_THRESHOLD, detectShadows=False)
+
+    def detect(self, frame):
+        mask = self.subtractor.apply(frame)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, None)  # Drop single-pixel noise
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return None
+        largest = max(contours, key=cv2.contourArea)
+        if cv2.contourArea(largest) < MOTION_MIN_AREA * mask.size:
+            return None
+        return cv2.boundingRect(largest)
+
+
+class DnnDetector:
+    """cv2.dnn network returning SSD-style (1, 1, N, 7) detections; the best one is kept."""
+    def __init__(self, buffers, model, config=None):
+        self.buffers = buffers
+        self.net = cv2.dnn.readNet(model, config or "")
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+    def detect(self, frame):
+        h, w = frame.shape[:2]
+        blob = cv2.dnn.blobFromImage(frame, 1 / 127.5, DNN_INPUT, (127.5, 127.5, 127.5),
+                                     swapRB=True)
+        self.net.setInput(blob)
+        detections = self.net.forward().reshape(-1, 7)
+        if not len(detections):
+            return None
+        best = detections[np.argmax(detections[:, 2])]
+        if best[2] < DNN_CONFIDENCE:
+            return None
+        x0, y0, x1, y1 = np.clip(best[3:7], 0, 1) * (w, h, w, h)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return int(x0), int(y0), int(x1 - x0), int(y1 - y0)
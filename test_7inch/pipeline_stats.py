@@ -0,0 +1,127 @@
+import csv
+import json
+import time
+import numpy as np
+
+# Timestamps taken for every displayed frame, in pipeline order
+STAMPS = ("read_start", "read", "convert", "take", "upload", "scale", "paint")
+READ_START, READ, CONVERT, TAKE, UPLOAD, SCALE, PAINT = range(len(STAMPS))
+# Stage name -> (start stamp, end stamp); "total" is capture to painted
+STAGES = {
+    "read": ("read_start", "read"),        # cap.read into the pooled buffer
+    "convert": ("read", "convert"),        # Copy, resize and cvtColor in the worker
+    "deliver": ("convert", "take"),        # Mailbox post, frame_ready delivery and event loop wait
+    "upload": ("take", "upload"),          # QPixmap.fromImage or texture upload
+    "scale": ("upload", "scale"),          # Scaling to the widget when the worker did not
+    "paint": ("scale", "paint"),           # Rest of paintEvent: blit and overlays
+    "total": ("read_start", "paint"),
+}
+STAGE_STARTS = [STAMPS.index(start) for start, _ in STAGES.values()]
+STAGE_ENDS = [STAMPS.index(end) for _, end in STAGES.values()]
+PERCENTILES = (50, 95, 99)
+DEFAULT_CAPACITY = 600  # Frames kept, 20 s at 30 fps
+SUMMARY_INTERVAL = 0.5  # Seconds a summary is reused for, so the HUD stays cheap
+
+
+def new_stamps():
+    """Return the per-frame timestamp list a PooledFrame carries through the pipeline."""
+    return [0.0] * len(STAMPS)
+
+
+class PipelineStats:
+    """Fixed-size ring of per-stage monotonic timestamps for displayed frames.
+
+    The capture thread and the GUI write time.monotonic() into the list each
+    frame carries (frame.stamps); the GUI commits it here once the frame is
+    painted. Only the GUI thread touches the ring, so it needs no lock, and
+    the ring is allocated once so recording costs a row copy.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.ring = np.zeros((capacity, len(STAMPS)))
+        self.index = 0   # Next row to write
+        self.count = 0   # Rows filled, up to capacity
+        self.summary_cache = None
+        self.summary_time = 0.0
+
+    def commit(self, stamps):
+        """Store the timestamps of one painted frame."""
+        self.ring[self.index] = stamps
+        self.index = (self.index + 1) % len(self.ring)
+        self.count = min(self.count + 1, len(self.ring))
+
+    def clear(self):
+        """Forget every recorded frame."""
+        self.index = 0
+        self.count = 0
+        self.summary_cache = None
+
+    def frames(self):
+        """Return the recorded timestamps, oldest first, as a (frames, stamps) array."""
+        if self.count < len(self.ring):
+            return self.ring[:self.count]
+        return np.roll(self.ring, -self.index, axis=0)
+
+    def durations(self, frames=None):
+        """Return a (frames, stages) array of stage durations in seconds, in STAGES order."""
+        frames = self.frames() if frames is None else frames
+        return frames[:, STAGE_ENDS] - frames[:, STAGE_STARTS]
+
+    def summary(self, max_age=0.0):
+        """Return rolling fps and p50/p95/p99 per stage in milliseconds.
+
+        A summary younger than max_age seconds is returned again instead of
+        being recomputed.
+        """
+        now = time.monotonic()
+        if self.summary_cache is not None and now - self.summary_time < max_age:
+            return self.summary_cache
+        frames = self.frames()
+        result = {"frames": len(frames), "fps": 0.0, "stages": {}}
+        if len(frames):
+            painted = frames[:, PAINT]
+            if len(frames) > 1 and painted[-1] > painted[0]:
+                result["fps"] = (len(frames) - 1) / (painted[-1] - painted[0])
+            table = 1000 * np.percentile(self.durations(frames), PERCENTILES, axis=0)
+            for column, stage in enumerate(STAGES):
+                result["stages"][stage] = {f"p{p}": float(table[row, column])
+                                           for row, p in enumerate(PERCENTILES)}
+        self.summary_cache = result
+        self.summary_time = now
+        return result
+
+    def export(self, path, extra=None):
+        """Write the summary and every recorded frame to path, as CSV or JSON by extension."""
+        if path.lower().endswith(".csv"):
+            self.export_csv(path)
+        else:
+            self.export_json(path, extra)
+
+    def export_json(self, path, extra=None):
+        """Write {"summary", "frames", ...extra} with per-frame stage durations in ms."""
+        frames = self.frames()
+        durations = 1000 * self.durations(frames)
+        data = dict(extra or {})
+        data["summary"] = self.summary()
+        data["frames"] = [
+            dict(zip(STAGES, row.tolist()), read_start=float(start))
+            for start, row in zip(frames[:, READ_START], durations)]
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+    def export_csv(self, path):
+        """Write one row per frame: capture time then each stage duration in ms."""
+        frames = self.frames()
+        durations = 1000 * self.durations(frames)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["read_start"] + [f"{stage}_ms" for stage in STAGES])
+            for start, row in zip(frames[:, READ_START], durations):
+                writer.writerow([f"{start:.6f}"] + [f"{value:.3f}" for value in row])
+
+    def hud_rows(self):
+        """Return the HUD table: a header row, then one row of cells per stage."""
+        summary = self.summary(SUMMARY_INTERVAL)
+        rows = [[f"{summary['fps']:.1f} fps"] + [f"p{p}" for p in PERCENTILES]]
+        for stage, values in summary["stages"].items():
+            rows.append([stage] + [f"{value:.2f}" for value in values.values()])
+        return rows
@@ -1,7 +1,7 @@
-import math
 from PyQt5.QtWidgets import QWidget
-from PyQt5.QtCore import Qt, QRectF
-from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QFont
+from PyQt5.QtCore import Qt, QRect, QRectF
+from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QFont, QPixmap, QRegion
+from dial_geometry import TICK_VECTORS, unit_vector
 
 class RadianAnglePicker(QWidget):
     """Widget to display an elevation angle indicator (0-90 degrees)."""
@@ -9,7 +9,10 @@ class RadianAnglePicker(QWidget):
         super().__init__(parent)
         self.setMinimumSize(80, 80)
         self.indicator_angle = 45
+        self.indicator_vector = unit_vector(self.indicator_angle)
         self.day_mode = day_mode
+        self.dial = None
+        self.dial_key = None
 
     def set_day_mode(self, day_mode):
         """Set day or night mode for display."""
@@ -17,24 +20,55 @@ class RadianAnglePicker(QWidget):
         self.update()
 
     def set_angle(self, angle):
-        """Set the elevation angle (0-90 degrees)."""
+        """Set the elevation angle (0-90 degrees), repainting only the needle."""
+        old_rect = self.needle_rect()
         self.indicator_angle = max(0, min(90, angle))
-        self.update()
+        self.indicator_vector = unit_vector(self.indicator_angle)
+        self.update(QRegion(old_rect).united(QRegion(self.needle_rect())))
 
-    def paintEvent(self, event):
-        """Paint the angle picker with an arc and angle indicator."""
-        painter = QPainter(self)
+    def dial_center(self):
+        """Return the arc center and radius for the current size."""
+        margin = 2
+        radius = min(self.width(), self.height()) - margin * 2
+        center_x = self.width() - margin - radius
+        center_y = self.height() - margin
+        return center_x, center_y, radius
+
+    def needle_end(self):
+        """Return the needle center and tip in widget pixels."""
+        center_x, center_y, radius = self.dial_center()
+        cos_a, sin_a = self.indicator_vector
+        pointer_x = center_x + radius * 0.8 * cos_a
+        pointer_y = center_y - radius * 0.8 * sin_a
+        return center_x, center_y, int(pointer_x), int(pointer_y)
+
+    def needle_rect(self):
+        """Return the bounding rectangle of the needle, padded for pen width."""
+        center_x, center_y, pointer_x, pointer_y = self.needle_end()
+        rect = QRect(min(center_x, pointer_x), min(center_y, pointer_y),
+                     abs(pointer_x - center_x) + 1, abs(pointer_y - center_y) + 1)
+        return rect.adjusted(-3, -3, 3, 3)
+
+    def dial_pixmap(self):
+        """Return the static dial, re-rendered only when size or day mode changes."""
+        key = (self.width(), self.height(), self.day_mode)
+        if key != self.dial_key:
+            self.dial = self.render_dial()
+            self.dial_key = key
+        return self.dial
+
+    def render_dial(self):
+        """Draw the border, arc, axes and ticks into a pixmap."""
+        pixmap = QPixmap(self.size())
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
         painter.setRenderHint(QPainter.Antialiasing)
         width = self.width()
         height = self.height()
-        margin = 2
-        radius = min(width, height) - margin * 2
-        center_x = width - margin - radius
-        center_y = height - margin
+        center_x, center_y, radius = self.dial_center()
 
         border_color = Qt.white if self.day_mode else Qt.black
         bg_color = Qt.black if self.day_mode else Qt.white
-        indicator_color = Qt.red
 
         # Draw border and background
         painter.setPen(QPen(border_color, 1))
@@ -47,21 +81,26 @@ class RadianAnglePicker(QWidget):
         painter.drawLine(center_x, center_y, center_x + radius, center_y)
         painter.drawLine(center_x, center_y, center_x, center_y - radius)
 
-        # Draw angle markers
+        # Draw angle markers (0-90 degrees: the first 7 entries of the tick table)
         mark_length = radius // 6
         painter.setFont(QFont('Arial', min(10, radius // 8)))
-        for angle in range(0, 91, 15):
-            rad_angle = math.radians(angle)
-            outer_x = center_x + radius * math.cos(rad_angle)
-            outer_y = center_y - radius * math.sin(rad_angle)
-            inner_x = center_x + (radius - mark_length) * math.cos(rad_angle)
-            inner_y = center_y - (radius - mark_length) * math.sin(rad_angle)
+        for cos_a, sin_a in TICK_VECTORS[:7]:
+            outer_x = center_x + radius * cos_a
+            outer_y = center_y - radius * sin_a
+            inner_x = center_x + (radius - mark_length) * cos_a
+            inner_y = center_y - (radius - mark_length) * sin_a
             painter.setPen(QPen(border_color, 1))
             painter.drawLine(int(outer_x), int(outer_y), int(inner_x), int(inner_y))
+        painter.end()
+        return pixmap
+
+    def paintEvent(self, event):
+        """Paint the cached dial and the angle indicator on top."""
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.dial_pixmap())
+        painter.setRenderHint(QPainter.Antialiasing)
 
         # Draw angle indicator
-        rad_angle = math.radians(self.indicator_angle)
-        pointer_x = center_x + radius * 0.8 * math.cos(rad_angle)
-        pointer_y = center_y - radius * 0.8 * math.sin(rad_angle)
-        painter.setPen(QPen(indicator_color, 1))
-        painter.drawLine(center_x, center_y, int(pointer_x), int(pointer_y))
\ No newline at end of file
+        center_x, center_y, pointer_x, pointer_y = self.needle_end()
+        painter.setPen(QPen(Qt.red, 1))
+        painter.drawLine(center_x, center_y, pointer_x, pointer_y)
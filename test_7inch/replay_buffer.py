@@ -0,0 +1,202 @@
+import json
+import math
+import os
+import threading
+import cv2
+import numpy as np
+
+# Pre-event window kept for the main feed, e.g. REPLAY_SECONDS=20 REPLAY_MEMORY_MB=128
+DEFAULT_SECONDS = float(os.environ.get("REPLAY_SECONDS", "10"))
+DEFAULT_MEMORY = int(float(os.environ.get("REPLAY_MEMORY_MB", "128")) * 2**20)
+DEFAULT_WIDTH = int(os.environ.get("REPLAY_WIDTH", "480"))  # Frames are stored at most this wide
+DEFAULT_FPS = 30.0           # Frames stored per second; faster sources are decimated
+EXPORT_CODEC = "MJPG"
+EXPORT_EXTENSION = ".avi"
+
+
+def stored_size(shape, width):
+    """Return the (w, h) a capture of shape is stored at, never upscaled."""
+    h, w = shape[:2]
+    if w <= width:
+        return w, h
+    return width, max(1, h * width // w)
+
+
+class ReplayBuffer:
+    """Fixed-memory ring of the last seconds of a feed for freeze-frame and instant replay.
+
+    The capture thread writes a downscaled BGR copy of each frame straight
+    into a preallocated (frames, h, w, 3) array, at most fps times a second,
+    so storing a frame allocates nothing. The array is allocated once per
+    source resolution and capped at memory_bytes, which shortens the window
+    if needed. hold() fixes the positions of the stored frames so the GUI
+    can scrub or export them; the writer keeps recording into the ring,
+    overwriting the oldest held frames first, but never a frame pinned by
+    pin(). While the next row to write is pinned new frames are dropped and
+    stalled is True, so a reader pinned on the oldest frame stops recording.
+    """
+    def __init__(self, seconds=DEFAULT_SECONDS, memory_bytes=DEFAULT_MEMORY,
+                 width=DEFAULT_WIDTH, fps=DEFAULT_FPS):
+        self.seconds = seconds
+        self.memory_bytes = memory_bytes
+        self.width = width
+        self.fps = fps
+        self.lock = threading.Lock()
+        self.frames = None        # (capacity, h, w, 3) uint8 ring
+        self.times = None         # Capture time of each row, time.monotonic()
+        self.source_shape = None  # Capture shape the ring was allocated for
+        self.written = 0          # Frames stored since allocation; the next row is written % capacity
+        self.count = 0            # Rows filled, up to capacity
+        self.holds = 0            # Readers that need positions fixed
+        self.start = self.end = 0 # Held window, as numbers of frames written
+        self.pins = []            # Numbers of the frames readers are using, never overwritten
+        self.stalled = False      # True while writes are dropped to keep a pinned frame
+        self.next_time = 0.0      # Earliest capture time stored next
+
+    def allocate(self, source_shape):
+        """Size the ring for captures of source_shape; forgets stored frames."""
+        w, h = stored_size(source_shape, self.width)
+        capacity = min(math.ceil(self.seconds * self.fps), self.memory_bytes // (w * h * 3))
+        self.frames = np.zeros((max(1, capacity), h, w, 3), np.uint8)
+        self.times = np.zeros(len(self.frames))
+        self.source_shape = source_shape
+        self.written = 0
+        self.count = 0
+
+    def write(self, image, captured_at, source=None):
+        """Store a BGR frame; called by the capture thread.
+
+        source is the full-resolution capture when image was scaled for
+        display: the ring is sized from it, so window resizes do not
+        reallocate, and it is read instead when image is smaller than a row.
+        Returns True if the frame was stored.
+        """
+        with self.lock:
+            if captured_at < self.next_time:
+                return False
+            source = image if source is None else source
+            if source.shape != self.source_shape:
+                if self.holds:
+                    # Reallocating would lose the held window
+                    self.stalled = True
+                    return False
+                self.allocate(source.shape)
+            capacity = len(self.frames)
+            if self.pins and self.count == capacity and self.written - capacity >= min(self.pins):
+                self.stalled = True
+                return False
+            self.stalled = False
+            self.next_time = max(self.next_time + 1.0 / self.fps,
+                                 captured_at + 0.5 / self.fps)
+            index = self.written % capacity
+            row = self.frames[index]
+            if image.shape[1] < row.shape[1]:
+                image = source
+            if image.shape == row.shape:
+                np.copyto(row, image)
+            else:
+                # INTER_AREA would cost 5-10 ms a frame on the capture thread
+                cv2.resize(image, (row.shape[1], row.shape[0]), dst=row,
+                           interpolation=cv2.INTER_LINEAR)
+            self.times[index] = captured_at
+            self.written += 1
+            self.count = min(self.count + 1, capacity)
+        return True
+
+    def hold(self):
+        """Fix the window; positions stay valid until the matching release().
+
+        Recording goes on: frames older than every pin are overwritten as
+        usual, so oldest() moves up while held.
+        """
+        with self.lock:
+            if not self.holds:
+                self.end = self.written
+                self.start = self.end - self.count
+            self.holds += 1
+
+    def release(self):
+        """Let the window follow live capture again."""
+        with self.lock:
+            self.holds = max(0, self.holds - 1)
+
+    def pin(self, position):
+        """Keep the frame at position, clamped to the stored frames, from being overwritten.
+
+        Only valid while held. Returns the clamped position; pass it to unpin().
+        """
+        with self.lock:
+            position = max(self.oldest(), min(len(self) - 1, position))
+            self.pins.append(self.start + position)
+            return position
+
+    def unpin(self, position):
+        """Drop a pin taken by pin()."""
+        with self.lock:
+            self.pins.remove(self.start + position)
+
+    def __len__(self):
+        return self.end - self.start if self.holds else self.count
+
+    def oldest(self):
+        """Return the oldest position still stored; above 0 once recording overwrote held frames."""
+        if not self.holds:
+            return 0
+        return max(0, min(len(self), self.written - self.count - self.start))
+
+    def row(self, position):
+        """Return the ring row of position, 0 being the oldest frame of the window."""
+        first = self.start if self.holds else self.written - self.count
+        return (first + position) % len(self.frames)
+
+    def frame(self, position):
+        """Return (BGR array, capture time) at position; only stable while pinned."""
+        row = self.row(position)
+        return self.frames[row], float(self.times[row])
+
+    def age(self, position):
+        """Return how many seconds position is older than the newest frame of the window."""
+        return float(self.times[self.row(len(self) - 1)] - self.times[self.row(position)])
+
+    def memory(self):
+        """Return the bytes allocated for frames."""
+        return self.frames.nbytes if self.frames is not None else 0
+
+    def export(self, path, first=0, last=None):
+        """Write positions first..last as a video plus a .jsonl of capture times.
+
+        The window is held and only the frame being written is pinned, so
+        recording goes on meanwhile; a first already overwritten is raised
+        to oldest(). Returns the number of frames written.
+        """
+        self.hold()
+        try:
+            last = len(self) - 1 if last is None else min(last, len(self) - 1)
+            if last < max(first, self.oldest()):
+                return 0
+            first = pinned = self.pin(first)
+            try:
+                h, w = self.frames.shape[1:3]
+                writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*EXPORT_CODEC),
+                                         self.fps, (w, h))
+                if not writer.isOpened():
+                    raise OSError(f"Cannot write {path}")
+                try:
+                    with open(os.path.splitext(path)[0] + ".jsonl", "w") as sidecar:
+                        sidecar.write(json.dumps({"fps": self.fps, "size": [w, h]}) + "\n")
+                        for number, position in enumerate(range(first, last + 1)):
+                            # Move the pin along so recording can reuse the rows already written
+                            self.pin(position)
+                            self.unpin(pinned)
+                            pinned = position
+                            image, captured_at = self.frame(position)
+                            writer.write(image)
+                            sidecar.write(json.dumps({"frame": number,
+                                                      "captured_at": captured_at}) + "\n")
+                finally:
+                    writer.release()
+                return last - first + 1
+            finally:
+                self.unpin(pinned)
+        finally:
+            self.release()
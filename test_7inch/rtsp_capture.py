@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+# FFmpeg options for low-latency network streams; see OPENCV_FFMPEG_CAPTURE_OPTIONS.
+DEFAULT_FFMPEG_OPTIONS = {
+    "rtsp_transport": "tcp",  # "udp" trades reliability for a little less latency
+    "fflags": "nobuffer",
+    "flags": "low_delay",
+}
+READ_TIMEOUT = 2.0  # Seconds read() waits for a new frame
+
+_open_lock = threading.Lock()  # OpenCV reads the options env var at open time
+
+
+def is_rtsp_source(source):
+    """Return True for rtsp:// and rtsps:// URLs."""
+    return isinstance(source, str) and source.lower().startswith(("rtsp://", "rtsps://"))
+
+
+def open_capture(source, ffmpeg_options=None):
+    """Open RTSP URLs with LatestFrameCapture and anything else with cv2.VideoCapture."""
+    if is_rtsp_source(source):
+        return LatestFrameCapture(source, ffmpeg_options)
+    return cv2.VideoCapture(source)
+
+
+class LatestFrameCapture:
+    """Capture wrapper whose own grab loop keeps only the newest decoded frame.
+
+    A dedicated thread drains the FFmpeg buffer as fast as frames arrive,
+    so read() always returns the most recent picture instead of one that
+    has been queued for seconds. It mirrors the parts of cv2.VideoCapture
+    that VideoThread uses.
+
+    realtime=True replays a file at its own frame rate, which makes a file
+    a local stand-in for a live RTSP camera in tests, see live:// in
+    video_source.
+    """
+    def __init__(self, source, ffmpeg_options=None, realtime=False):
+        options = dict(DEFAULT_FFMPEG_OPTIONS)
+        options.update(ffmpeg_options or {})
+        self.source = source
+        self.realtime = realtime
+        with _open_lock:
+            previous = os.environ.get("OPENCV_FFMPEG_CAPTURE_OPTIONS")
+            os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = "|".join(
+                f"{key};{value}" for key, value in options.items())
+            try:
+                self.cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG)
+            finally:
+                if previous is None:
+                    del os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"]
+                else:
+                    os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = previous
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.props = {prop: self.cap.get(prop) for prop in
+                      (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT, cv2.CAP_PROP_FPS)}
+        self.latest = None
+        self.sequence = 0       # Frames decoded by the grab loop
+        self.read_sequence = 0  # Last sequence handed to read()
+        self.skipped = 0        # Decoded frames replaced before anyone read them
+        self.ended = False
+        self.running = self.cap.isOpened()
+        self.condition = threading.Condition()
+        self.thread = None
+        if self.running:
+            self.thread = threading.Thread(target=self.grab_loop, daemon=True)
+            self.thread.start()
+
+    def grab_loop(self):
+        """Decode frames as they arrive and keep only the newest."""
+        spare = None
+        fps = self.props[cv2.CAP_PROP_FPS]
+        period = 1.0 / fps if self.realtime and fps > 0 else 0.0
+        next_time = time.monotonic()
+        while self.running:
+            ret, frame = self.cap.read(spare)
+            if not ret:
+                break
+            with self.condition:
+                if self.sequence != self.read_sequence:
+                    self.skipped += 1
+                spare, self.latest = self.latest, frame
+                self.sequence += 1
+                self.condition.notify_all()
+            if period:
+                next_time += period
+                time.sleep(max(0.0, next_time - time.monotonic()))
+        with self.condition:
+            self.ended = True
+            self.condition.notify_all()
+
+    def isOpened(self):
+        """Return True while the stream is open and the grab loop is running."""
+        return self.running and not self.ended and self.cap.isOpened()
+
+    def get(self, prop):
+        """Return a capture property; size and fps are cached at open time."""
+        return self.props[prop] if prop in self.props else self.cap.get(prop)
+
+    def set(self, prop, value):
+        """Forward a property to the underlying capture."""
+        return self.cap.set(prop, value)
+
+    def read(self, image=None):
+        """Return the newest frame not yet read, copied into image when shapes match."""
+        with self.condition:
+            if not self.condition.wait_for(
+                    lambda: self.sequence != self.read_sequence or self.ended, READ_TIMEOUT):
+                return False, None
+            if self.sequence == self.read_sequence:
+                return False, None
+            self.read_sequence = self.sequence
+            if image is not None and image.shape == self.latest.shape:
+                np.copyto(image, self.latest)
+                return True, image
+            return True, self.latest.copy()
+
+    def grab(self):
+        """Wait for a frame not yet read, like read(), and mark it consumed without copying."""
+        with self.condition:
+            if not self.condition.wait_for(
+                    lambda: self.sequence != self.read_sequence or self.ended, READ_TIMEOUT):
+                return False
+            fresh = self.sequence != self.read_sequence
+            self.read_sequence = self.sequence
+            return fresh
+
+    def release(self):
+        """Stop the grab loop and close the stream."""
+        self.running = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(READ_TIMEOUT)
+        self.cap.release()
@@ -0,0 +1,133 @@
+import socket
+import threading
+import time
+from urllib.parse import urlsplit, parse_qs
+from PyQt5.QtCore import QThread, pyqtSignal
+from telemetry_protocol import PACKET_SIZE, PacketReader, SequenceTracker, decode_packet
+
+DEFAULT_BAUD = 115200
+RECEIVE_TIMEOUT = 0.2     # Seconds a blocking receive waits so stop() is noticed
+RETRY_DELAY = 1.0         # Seconds before reopening a failed socket or serial port
+UDP_RECEIVE_BUFFER = 1 << 20  # Absorbs bursts while the thread waits for the GIL
+
+
+class TelemetryIngest(QThread):
+    """Thread receiving binary telemetry from "udp://host:port" or "serial:///dev/ttyX?baud=N".
+
+    Decoded samples go into a single "latest sample wins" slot and sample_ready
+    is emitted only when the slot was empty, so a 1 kHz device cannot flood the
+    GUI event queue. Each sample carries its sequence number, device time,
+    receive time (time.monotonic()) and the number of packets lost before it.
+    """
+    sample_ready = pyqtSignal()       # A new sample is waiting, see take()
+    error_occurred = pyqtSignal(str)  # Emitted once per distinct error
+
+    def __init__(self, source):
+        super().__init__()
+        self.source = urlsplit(source)
+        if self.source.scheme not in ("udp", "serial"):
+            raise ValueError(f"Unsupported telemetry source {source!r}")
+        if self.source.scheme == "udp" and self.source.port is None:
+            raise ValueError(f"Telemetry source {source!r} needs a port")
+        self.tracker = SequenceTracker()
+        self.reader = PacketReader()
+        self.decode_errors = 0  # Datagrams or packets that failed validation
+        self.coalesced = 0      # Samples replaced before the GUI took them
+        self.last_error = None
+        self._sample = None
+        self._lock = threading.Lock()
+        self.running = True
+
+    def take(self):
+        """Remove and return the newest sample, or None if nothing new arrived."""
+        with self._lock:
+            sample, self._sample = self._sample, None
+        return sample
+
+    def stats(self):
+        """Return a snapshot of the link counters."""
+        stats = self.tracker.stats()
+        stats.update(decode_errors=self.decode_errors + self.reader.errors,
+                     coalesced=self.coalesced)
+        return stats
+
+    def post(self, sample, received_at):
+        """Track the sample's sequence number and hand it to the GUI unless it is late."""
+        gap, late = self.tracker.check(sample["sequence"])
+        if late:
+            return
+        sample["received_at"] = received_at
+        sample["gap"] = gap
+        with self._lock:
+            old, self._sample = self._sample, sample
+            if old is not None:
+                self.coalesced += 1
+        if old is None:
+            self.sample_ready.emit()
+
+    def report_error(self, message):
+        """Emit message unless it repeats the last error."""
+        if message != self.last_error:
+            self.last_error = message
+            self.error_occurred.emit(message)
+
+    def run(self):
+        """Receive telemetry until stop(), reopening the link after errors."""
+        receive = self.receive_udp if self.source.scheme == "udp" else self.receive_serial
+        while self.running:
+            try:
+                receive()
+            except ImportError:
+                self.report_error("pyserial is required for serial telemetry")
+                return
+            except (OSError, ValueError) as e:
+                self.report_error(f"Telemetry link error: {str(e)}")
+                deadline = time.monotonic() + RETRY_DELAY
+                while self.running and time.monotonic() < deadline:
+                    self.msleep(50)
+
+    def receive_udp(self):
+        """Read datagrams holding one or more packets each."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RECEIVE_BUFFER)
+            sock.bind((self.source.hostname or "0.0.0.0", self.source.port))
+            sock.settimeout(RECEIVE_TIMEOUT)
+            buffer = bytearray(65536)
+            view = memoryview(buffer)
+            while self.running:
+                try:
+                    size = sock.recv_into(buffer)
+                except socket.timeout:
+                    continue
+                received_at = time.monotonic()
+                if size % PACKET_SIZE:
+                    self.decode_errors += 1
+                for offset in range(0, size - size % PACKET_SIZE, PACKET_SIZE):
+                    try:
+                        sample = decode_packet(view[offset:offset + PACKET_SIZE])
+                    except ValueError:
+                        self.decode_errors += 1
+                        continue
+                    self.post(sample, received_at)
+        finally:
+            sock.close()
+
+    def receive_serial(self):
+        """Read the serial byte stream and split it into packets."""
+        import serial  # Optional dependency, only needed for serial links
+        options = parse_qs(self.source.query)
+        port = self.source.netloc + self.source.path
+        baud = int(options.get("baud", [DEFAULT_BAUD])[0])
+        with serial.Serial(port, baud, timeout=RECEIVE_TIMEOUT) as link:
+            while self.running:
+                data = link.read(link.in_waiting or 1)
+                if not data:
+                    continue
+                received_at = time.monotonic()
+                for sample in self.reader.feed(data):
+                    self.post(sample, received_at)
+
+    def stop(self):
+        """Stop receiving; the socket or port closes within RECEIVE_TIMEOUT."""
+        self.running = False
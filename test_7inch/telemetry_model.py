@@ -0,0 +1,76 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+ORIGIN_DEVICE = "device"      # Value came from the telemetry link or simulator
+ORIGIN_OPERATOR = "operator"  # Value was typed into a readout by the operator
+
+# Decimal places shown in the readouts; changes below this are not emitted
+DISPLAY_PRECISION = {"distance": 2, "elevation_angle": 2, "azimuth_angle": 2}
+
+
+class TelemetryModel(QObject):
+    """Single source of truth for the readouts, gauges and bounding box.
+
+    Device samples and operator edits enter through separate methods. A value
+    is emitted only when it changes at display precision, together with its
+    origin, so views can skip writing an operator's own edit back to them.
+    An operator edit overrides the device until the device reports that
+    value (acknowledges it) or a new value of its own.
+    """
+    value_changed = pyqtSignal(str, object, str)  # field, value, origin
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.values = dict.fromkeys(DISPLAY_PRECISION)
+        self.values["bounding_box"] = None
+        self.device_values = dict(self.values)  # Last device value per field
+        self.operator_values = {}  # Operator overrides not yet acknowledged by the device
+
+    def value(self, field):
+        """Return the current value of field at display precision."""
+        return self.values[field]
+
+    def device_value(self, field):
+        """Return the last value the device reported for field."""
+        return self.device_values[field]
+
+    def operator_value(self, field):
+        """Return the operator's override of field, or None if the device value is shown."""
+        return self.operator_values.get(field)
+
+    def set_value(self, field, value, origin):
+        """Store value for field and emit it if the displayed value changes."""
+        value = displayed(field, value)
+        if value == self.values[field]:
+            return False
+        self.values[field] = value
+        self.value_changed.emit(field, value, origin)
+        return True
+
+    def update_from_device(self, sample):
+        """Apply a telemetry dict; fields missing from the sample are left alone."""
+        for field in self.values:
+            if field not in sample:
+                continue
+            value = displayed(field, sample[field])
+            previous, self.device_values[field] = self.device_values[field], value
+            if field in self.operator_values:
+                if value == previous and value != self.operator_values[field]:
+                    continue  # The device has not caught up with the operator yet
+                del self.operator_values[field]
+            self.set_value(field, value, ORIGIN_DEVICE)
+
+    def set_operator_value(self, field, value):
+        """Apply a value the operator typed into a readout; it holds until the device answers."""
+        value = displayed(field, value)
+        if value == self.device_values[field]:
+            self.operator_values.pop(field, None)
+        else:
+            self.operator_values[field] = value
+        self.set_value(field, value, ORIGIN_OPERATOR)
+
+
+def displayed(field, value):
+    """Return value rounded to the display precision of field."""
+    if field in DISPLAY_PRECISION and value is not None:
+        return round(value, DISPLAY_PRECISION[field])
+    return value
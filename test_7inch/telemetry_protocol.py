@@ -0,0 +1,115 @@
+import struct
+import zlib
+
+MAGIC = b"\xa5\x5a"
+VERSION = 1
+FLAG_BOUNDING_BOX = 0x01  # The box fields carry a detection
+
+# magic, version, flags, sequence, device time (us), distance (m),
+# elevation (deg), azimuth (deg), box x, y, w, h (sensor px); then a CRC-32 trailer
+PACKET = struct.Struct("<2sBBIQfffhhhh")
+CRC = struct.Struct("<I")
+PACKET_SIZE = PACKET.size + CRC.size
+SEQUENCE_MODULO = 1 << 32
+
+
+def encode_packet(sample, sequence, device_time_us):
+    """Pack a telemetry dict (as returned by get_data_from_device) into bytes."""
+    box = sample.get("bounding_box")
+    flags = FLAG_BOUNDING_BOX if box else 0
+    x, y, w, h = (box["x"], box["y"], box["w"], box["h"]) if box else (0, 0, 0, 0)
+    body = PACKET.pack(MAGIC, VERSION, flags, sequence % SEQUENCE_MODULO, device_time_us,
+                       sample["distance"], sample["elevation_angle"], sample["azimuth_angle"],
+                       x, y, w, h)
+    return body + CRC.pack(zlib.crc32(body))
+
+
+def decode_packet(data):
+    """Unpack one packet into a telemetry dict; raises ValueError if it is invalid."""
+    if len(data) != PACKET_SIZE:
+        raise ValueError(f"Bad telemetry packet length {len(data)}")
+    body = data[:PACKET.size]
+    if CRC.unpack_from(data, PACKET.size)[0] != zlib.crc32(body):
+        raise ValueError("Telemetry packet CRC mismatch")
+    (magic, version, flags, sequence, device_time_us, distance, elevation, azimuth,
+     x, y, w, h) = PACKET.unpack(body)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Unsupported telemetry packet version {version}")
+    return {
+        "sequence": sequence,
+        "device_time": device_time_us / 1e6,
+        "distance": distance,
+        "elevation_angle": elevation,
+        "azimuth_angle": azimuth,
+        "bounding_box": {"x": x, "y": y, "w": w, "h": h} if flags & FLAG_BOUNDING_BOX else None,
+    }
+
+
+class PacketReader:
+    """Split a byte stream (serial port) into packets, resyncing on MAGIC after garbage."""
+    def __init__(self):
+        self.buffer = bytearray()
+        self.errors = 0  # Packets or byte runs skipped because they failed validation
+
+    def feed(self, data):
+        """Append received bytes and return the telemetry dicts they complete."""
+        self.buffer += data
+        samples = []
+        while True:
+            start = self.buffer.find(MAGIC)
+            if start < 0:
+                # Keep a trailing MAGIC byte that may be completed by the next read
+                keep = 1 if self.buffer.endswith(MAGIC[:1]) else 0
+                if len(self.buffer) > keep:
+                    self.errors += 1
+                del self.buffer[:len(self.buffer) - keep]
+                return samples
+            if start:
+                self.errors += 1
+                del self.buffer[:start]
+            if len(self.buffer) < PACKET_SIZE:
+                return samples
+            try:
+                samples.append(decode_packet(bytes(self.buffer[:PACKET_SIZE])))
+                del self.buffer[:PACKET_SIZE]
+            except ValueError:
+                self.errors += 1
+                del self.buffer[:1]
+
+
+class SequenceTracker:
+    """Count lost, late (reordered) and duplicate packets from their sequence numbers."""
+    def __init__(self):
+        self.expected = None
+        self.received = 0
+        self.lost = 0
+        self.reordered = 0
+        self.duplicates = 0
+
+    def check(self, sequence):
+        """Classify a sequence number; returns (gap, late).
+
+        gap is how many packets were skipped just before this one; late is True
+        for a packet older than one already seen, which must not overwrite it.
+        """
+        self.received += 1
+        if self.expected is None:
+            self.expected = (sequence + 1) % SEQUENCE_MODULO
+            return 0, False
+        ahead = (sequence - self.expected) % SEQUENCE_MODULO
+        if ahead < SEQUENCE_MODULO // 2:
+            self.lost += ahead
+            self.expected = (sequence + 1) % SEQUENCE_MODULO
+            return ahead, False
+        if (self.expected - sequence) % SEQUENCE_MODULO == 1:
+            self.duplicates += 1
+        else:
+            # A packet counted as lost turned up after its successors
+            self.reordered += 1
+            self.lost = max(0, self.lost - 1)
+        return 0, True
+
+    def stats(self):
+        """Return a snapshot of the counters."""
+        return {"received": self.received, "lost": self.lost,
+                "reordered": self.reordered, "duplicates": self.duplicates}
@@ -0,0 +1,81 @@
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QPalette, QColor
+
+ROLE_HEADER = "header"    # Red label naming a readout
+ROLE_CAPTION = "caption"  # Label under a gauge
+
+# Applied to the whole application once; colors come from the application
+# palette, so a theme switch only swaps palettes and repolishes the styled widgets.
+STYLE_SHEET = """
+QWidget#centralwidget {{ background-color: palette(window); }}
+QFrame#frame_video {{ border: {frame_border}px solid orange; background-color: palette(window); }}
+QLabel[themeRole="header"] {{
+    background-color: red; color: white; font-size: {font_size}px; font-weight: bold;
+    border: {border}px solid palette(window-text);
+}}
+QLabel[themeRole="caption"] {{
+    background-color: palette(window); color: palette(bright-text); font-size: {font_size}px;
+    font-weight: bold; border: {border}px solid palette(window-text);
+}}
+"""
+
+
+def make_palette(day_mode):
+    """Build the palette for one theme.
+
+    Window is the background and WindowText its contrast color, used for
+    borders (and by stock dialogs, which stay readable); BrightText is the
+    yellow used for values and captions.
+    """
+    palette = QPalette()
+    palette.setColor(QPalette.Window, QColor("black" if day_mode else "white"))
+    palette.setColor(QPalette.WindowText, QColor("white" if day_mode else "black"))
+    palette.setColor(QPalette.BrightText, QColor("yellow"))
+    return palette
+
+
+class ThemeManager(QObject):
+    """Day/night theme: precomputed palettes and one application style sheet.
+
+    The palette is set on the application because a style sheet stops
+    palettes set on parent widgets from reaching their children. Widgets
+    styled by the sheet are registered with style(); custom-painted widgets
+    with subscribe(), which keeps calling their set_day_mode().
+    """
+    theme_changed = pyqtSignal(bool)  # day_mode
+
+    def __init__(self, parent=None, day_mode=True, font_size=16, border=1, frame_border=3):
+        super().__init__(parent)
+        self.day_mode = day_mode
+        self.palettes = {True: make_palette(True), False: make_palette(False)}
+        self.styled = []
+        app = QApplication.instance()
+        app.setStyleSheet(STYLE_SHEET.format(
+            font_size=font_size, border=border, frame_border=frame_border))
+        app.setPalette(self.palettes[day_mode])
+
+    def style(self, widget, role=None):
+        """Register a widget that reads the palette; it is repolished on every switch."""
+        if role:
+            widget.setProperty("themeRole", role)
+        self.styled.append(widget)
+        widget.style().unpolish(widget)
+        widget.style().polish(widget)
+
+    def subscribe(self, widget):
+        """Keep widget.set_day_mode() in step with the theme."""
+        widget.set_day_mode(self.day_mode)
+        self.theme_changed.connect(widget.set_day_mode)
+
+    def set_day_mode(self, day_mode):
+        """Switch theme: one palette swap plus a repolish of the styled widgets."""
+        if day_mode == self.day_mode:
+            return
+        self.day_mode = day_mode
+        QApplication.instance().setPalette(self.palettes[day_mode])
+        for widget in self.styled:
+            widget.style().unpolish(widget)
+            widget.style().polish(widget)
+            widget.update()
+        self.theme_changed.emit(day_mode)
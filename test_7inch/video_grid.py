@@ -0,0 +1,81 @@
+import math
+from PyQt5.QtWidgets import QWidget
+from video_widget import VideoWidget
+
+LAYOUT_GRID = "grid"  # Equal cells
+LAYOUT_MAIN = "main"  # One main view plus a column of thumbnails
+
+
+class VideoGrid(QWidget):
+    """Widget showing several camera feeds, each with its own VideoThread.
+
+    Every cell is a VideoWidget, so each worker scales frames to its own cell
+    size. Thumbnails of the main layout also ask their camera for
+    thumbnail_size; grid cells can be large, so they keep the camera's own
+    resolution. Every feed but the main view is paced to fps_budget, keeping
+    the cost per extra camera roughly constant.
+    """
+    def __init__(self, parent=None, video_sources=(0,), day_mode=True, layout=LAYOUT_MAIN,
+                 fps_budget=15, main_fps=None, thumbnail_size=(320, 240), spacing=4):
+        super().__init__(parent)
+        self.layout_mode = layout
+        self.spacing = spacing
+        self.widgets = []
+        for index, source in enumerate(video_sources):
+            is_main = layout == LAYOUT_MAIN and index == 0
+            is_thumbnail = layout == LAYOUT_MAIN and index > 0
+            widget = VideoWidget(self, video_source=source, day_mode=day_mode,
+                                 target_fps=main_fps if is_main else fps_budget,
+                                 capture_size=thumbnail_size if is_thumbnail else None)
+            self.widgets.append(widget)
+
+    def main_widget(self):
+        """Return the widget that shows the primary camera."""
+        return self.widgets[0]
+
+    def set_day_mode(self, day_mode):
+        """Set day or night mode for every feed."""
+        for widget in self.widgets:
+            widget.set_day_mode(day_mode)
+
+    def set_fps_budget(self, fps_budget):
+        """Change the capture rate of every stream except the main view."""
+        for index, widget in enumerate(self.widgets):
+            if self.layout_mode == LAYOUT_GRID or index > 0:
+                widget.set_target_fps(fps_budget)
+
+    def frame_stats(self):
+        """Return the frame counters of each feed, in source order."""
+        return [widget.frame_stats() for widget in self.widgets]
+
+    def resizeEvent(self, event):
+        """Lay the feeds out again for the new size."""
+        self.arrange()
+        super().resizeEvent(event)
+
+    def arrange(self):
+        """Place each VideoWidget according to the layout mode."""
+        count = len(self.widgets)
+        if not count:
+            return
+        width, height, gap = self.width(), self.height(), self.spacing
+        if self.layout_mode == LAYOUT_MAIN and count > 1:
+            thumb_w = width // 4
+            thumb_h = (height - gap * (count - 2)) // (count - 1)
+            self.widgets[0].setGeometry(0, 0, width - thumb_w - gap, height)
+            for index, widget in enumerate(self.widgets[1:]):
+                widget.setGeometry(width - thumb_w, index * (thumb_h + gap), thumb_w, thumb_h)
+            return
+        cols = math.ceil(math.sqrt(count))
+        rows = math.ceil(count / cols)
+        cell_w = (width - gap * (cols - 1)) // cols
+        cell_h = (height - gap * (rows - 1)) // rows
+        for index, widget in enumerate(self.widgets):
+            row, col = divmod(index, cols)
+            widget.setGeometry(col * (cell_w + gap), row * (cell_h + gap), cell_w, cell_h)
+
+    def closeEvent(self, event):
+        """Stop every capture worker when closing."""
+        for widget in self.widgets:
+            widget.close()
+        super().closeEvent(event)
@@ -0,0 +1,247 @@
+import json
+import multiprocessing
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+
+DEFAULT_CODEC = "MJPG"       # Intra-only, so a segment cut short by power loss stays readable
+DEFAULT_EXTENSION = ".avi"
+DEFAULT_SEGMENT_SECONDS = 300.0
+DEFAULT_SLOTS = 8            # Frames that can wait for the encoder
+DEFAULT_MAX_FRAME = (1920, 1080)  # Largest frame a slot holds
+MAX_STRIDE = 8               # Record at most every 8th frame when the encoder lags
+RECOVER_SECONDS = 2.0        # Time the queue must stay mostly idle before the stride halves
+STOP_TIMEOUT = 5.0           # Seconds stop() waits for the encoder to flush
+
+
+def telemetry_caption(telemetry):
+    """Return the one-line telemetry text burnt into recorded frames."""
+    return "  ".join(f"{field} {value:.2f}" for field, value in telemetry.items()
+                     if isinstance(value, (int, float)))
+
+
+class VideoRecorder:
+    """Record frames to rotating video segments from a separate encoder process.
+
+    Frames are copied into a fixed set of shared-memory slots and handed to
+    the encoder through a queue; the caller never waits. When every slot is
+    busy the frame is dropped and only every stride-th frame is offered from
+    then on, so a slow encoder lowers the recorded frame rate instead of the
+    live one. The stride halves again once the queue stays mostly empty.
+    A stride change starts a new segment written at fps / stride, so every
+    segment plays back in real time.
+    Frames offered before the encoder process is up are not recorded.
+    Each segment gets a .jsonl sidecar with the capture time and telemetry
+    of every recorded frame. If the encoder process dies, acquire() stops
+    handing out slots and error says why.
+    """
+    def __init__(self, directory, fps=30.0, segment_seconds=DEFAULT_SEGMENT_SECONDS,
+                 codec=DEFAULT_CODEC, extension=DEFAULT_EXTENSION, slots=DEFAULT_SLOTS,
+                 max_frame=DEFAULT_MAX_FRAME, overlay=True):
+        self.directory = directory
+        self.fps = fps
+        self.segment_seconds = segment_seconds
+        self.codec = codec
+        self.extension = extension
+        self.slot_count = slots
+        self.slot_bytes = max_frame[0] * max_frame[1] * 3
+        self.overlay = overlay    # Composite crosshair, reticle and telemetry into frames
+        self.buffers = []         # SharedMemory per slot
+        self.free = []            # Slot indices the GUI may fill
+        self.ready = False        # The encoder has attached to the slots
+        self.process = None
+        self.work_queue = None    # (slot, shape, rgb, capture time, wall time, telemetry, frame ID, stride)
+        self.free_queue = None    # Slots the encoder has finished with
+        self.stride = 1
+        self.offered = 0          # Frames offered to acquire()
+        self.calm_since = None    # When the queue last became mostly empty
+        self.recorded = 0
+        self.dropped = 0          # No free slot
+        self.skipped = 0          # Left out by the stride
+        self.too_large = 0        # Frames bigger than a slot
+        self.waiting = 0          # Offered while the encoder was starting
+        self.error = ""           # Why the encoder process stopped, empty while it runs
+
+    def is_recording(self):
+        """Return True while the encoder process is running."""
+        return self.process is not None
+
+    def start(self):
+        """Allocate the slots and start the encoder process."""
+        if self.process:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        context = multiprocessing.get_context("spawn")  # Forking a Qt process is unsafe
+        self.buffers = [shared_memory.SharedMemory(create=True, size=self.slot_bytes)
+                        for _ in range(self.slot_count)]
+        self.free = []  # The encoder hands every slot over once it is ready
+        self.ready = False
+        self.work_queue = context.Queue(self.slot_count + 1)
+        self.free_queue = context.Queue(self.slot_count)
+        self.stride = 1
+        self.calm_since = None
+        self.error = ""
+        self.process = context.Process(
+            target=encode_loop, name="video-recorder", daemon=True,
+            args=([buffer.name for buffer in self.buffers], self.work_queue, self.free_queue,
+                  self.directory, self.fps, self.segment_seconds, self.codec, self.extension))
+        try:
+            self.process.start()
+        except Exception:
+            self.process = None
+            self.release_buffers()
+            raise
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        """Let the encoder finish the queued frames, then free the slots."""
+        if not self.process:
+            return
+        self.work_queue.put(None)
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.release_buffers()
+        self.process = None
+
+    def release_buffers(self):
+        """Close and remove the shared-memory slots."""
+        for buffer in self.buffers:
+            buffer.close()
+            buffer.unlink()
+        self.buffers = []
+        self.free = []
+
+    def reclaim(self):
+        """Take back the slots the encoder has written."""
+        while True:
+            try:
+                self.free.append(self.free_queue.get_nowait())
+                self.ready = True
+            except queue.Empty:
+                return
+
+    def acquire(self, shape):
+        """Return (slot, array) to fill with a frame of shape, or None to skip this frame."""
+        if not self.process:
+            return None
+        self.offered += 1
+        if self.offered % self.stride:
+            self.skipped += 1
+            return None
+        if shape[0] * shape[1] * shape[2] > self.slot_bytes:
+            self.too_large += 1
+            return None
+        self.reclaim()
+        if (not self.ready or not self.free) and self.encoder_failed():
+            return None  # Slots held by a dead encoder never come back
+        if not self.ready:
+            self.waiting += 1
+            return None
+        if not self.free:
+            self.dropped += 1
+            self.stride = min(MAX_STRIDE, self.stride * 2)
+            self.calm_since = None
+            return None
+        if len(self.free) >= self.slot_count * 3 // 4:
+            now = time.monotonic()
+            if self.calm_since is None:
+                self.calm_since = now
+            elif now - self.calm_since >= RECOVER_SECONDS and self.stride > 1:
+                self.stride //= 2
+                self.calm_since = now
+        else:
+            self.calm_since = None
+        slot = self.free.pop()
+        array = np.ndarray(shape, np.uint8, self.buffers[slot].buf)
+        return slot, array
+
+    def encoder_failed(self):
+        """Return True, and set error, if the encoder process has exited while recording."""
+        if self.process.is_alive():
+            return False
+        if not self.error:
+            self.error = f"Recording encoder exited with code {self.process.exitcode}"
+        return True
+
+    def submit(self, slot, shape, captured_at, telemetry=None, rgb=False, frame_id=None):
+        """Queue a filled slot for encoding; rgb=True when the frame is RGB rather than BGR."""
+        self.work_queue.put_nowait((slot, shape, rgb, captured_at, time.time(), telemetry or {},
+                                    frame_id, self.stride))
+        self.recorded += 1
+
+    def record(self, frame, captured_at, telemetry=None, rgb=False, frame_id=None):
+        """Copy a BGR/RGB frame into a slot and queue it; returns False if it was not recorded."""
+        acquired = self.acquire(frame.shape)
+        if acquired is None:
+            return False
+        slot, array = acquired
+        np.copyto(array, frame)
+        self.submit(slot, frame.shape, captured_at, telemetry, rgb, frame_id)
+        return True
+
+    def stats(self):
+        """Return the recording counters."""
+        return {"recorded": self.recorded, "dropped": self.dropped, "skipped": self.skipped,
+                "too_large": self.too_large, "waiting": self.waiting, "stride": self.stride,
+                "error": self.error}
+
+
+def encode_loop(names, work_queue, free_queue, directory, fps, segment_seconds, codec, extension):
+    """Encoder process: write queued slots to rotating segments with a telemetry sidecar."""
+    buffers = [shared_memory.SharedMemory(name=name) for name in names]
+    for slot in range(len(buffers)):
+        free_queue.put(slot)
+    writer = None
+    sidecar = None
+    segment_start = None
+    segment_shape = None
+    segment_stride = None
+    segment = 0
+    frame_number = 0
+    try:
+        while True:
+            item = work_queue.get()
+            if item is None:
+                break
+            slot, shape, rgb, captured_at, wall_time, telemetry, frame_id, stride = item
+            try:
+                frame = np.ndarray(shape, np.uint8, buffers[slot].buf)
+                if rgb:
+                    frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+                if (writer is None or shape != segment_shape or stride != segment_stride
+                        or captured_at - segment_start >= segment_seconds):
+                    if writer is not None:
+                        writer.release()
+                        sidecar.close()
+                    segment += 1
+                    base = os.path.join(directory, time.strftime("rec_%Y%m%d_%H%M%S",
+                                                                 time.localtime(wall_time)))
+                    base = f"{base}_{segment:03d}"
+                    writer = cv2.VideoWriter(base + extension, cv2.VideoWriter_fourcc(*codec),
+                                             fps / stride, (shape[1], shape[0]))
+                    sidecar = open(base + ".jsonl", "w", buffering=1)  # Line-buffered
+                    sidecar.write(json.dumps({"segment": segment, "fps": fps / stride,
+                                              "stride": stride,
+                                              "size": [shape[1], shape[0]]}) + "\n")
+                    segment_start = captured_at
+                    segment_shape = shape
+                    segment_stride = stride
+                    frame_number = 0
+                writer.write(frame)
+                sidecar.write(json.dumps({"frame": frame_number, "frame_id": frame_id,
+                                          "captured_at": captured_at, "time": wall_time,
+                                          "telemetry": telemetry}) + "\n")
+                frame_number += 1
+            finally:
+                frame = None  # Drop the view so the slot can be closed
+                free_queue.put(slot)
+    finally:
+        if writer is not None:
+            writer.release()
+            sidecar.close()
+        for buffer in buffers:
+            buffer.close()
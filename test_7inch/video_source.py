@@ -0,0 +1,228 @@
+import struct
+import time
+from abc import ABC, abstractmethod
+from urllib.parse import urlsplit, parse_qs
+import cv2
+import numpy as np
+from rtsp_capture import LatestFrameCapture, open_capture
+
+PATTERN_SCHEME = "pattern"  # pattern://640x480?fps=30&frames=300
+RAW_SCHEME = "raw"          # raw:///path/to/file.raw?fps=0&loop=1
+LIVE_SCHEME = "live"        # live:///path/to/file.mp4
+RAW_MAGIC = b"RAWV"
+RAW_HEADER = struct.Struct("<4sIIIf")  # Magic, width, height, frame count, fps
+RAW_HEADER_SIZE = 64  # Header padded so frame data starts aligned
+COUNTER_BITS = 32     # Width of the frame counter encoded in pattern frames
+
+
+def open_source(source, ffmpeg_options=None):
+    """Open any source VideoThread accepts and return a cv2.VideoCapture-like object.
+
+    Camera indices, device paths and video files open with cv2.VideoCapture,
+    rtsp:// URLs with LatestFrameCapture, pattern:// with PatternSource,
+    raw:// with RawReplaySource and live:// plays a file at its own rate
+    through LatestFrameCapture, like a live RTSP camera.
+    """
+    if isinstance(source, str):
+        url = urlsplit(source)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.scheme == PATTERN_SCHEME:
+            width, height = parse_size(url.netloc)
+            return PatternSource(width, height, float(query.get("fps", 30)),
+                                 int(query.get("frames", 0)) or None)
+        if url.scheme == RAW_SCHEME:
+            fps = float(query["fps"]) if "fps" in query else None
+            return RawReplaySource(url.netloc + url.path, fps, query.get("loop", "1") != "0")
+        if url.scheme == LIVE_SCHEME:
+            return LatestFrameCapture(url.netloc + url.path, ffmpeg_options, realtime=True)
+    return open_capture(source, ffmpeg_options)
+
+
+def parse_size(text):
+    """Parse "640x480" into (640, 480)."""
+    try:
+        width, height = (int(value) for value in text.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Bad frame size {text!r}, expected WIDTHxHEIGHT") from None
+    return width, height
+
+
+def encode_counter(image, counter):
+    """Write counter as a strip of black/white blocks along the top-left edge."""
+    block = max(2, image.shape[1] // (COUNTER_BITS + 8))
+    bits = (counter >> np.arange(COUNTER_BITS - 1, -1, -1)) & 1
+    strip = np.repeat((bits * 255).astype(np.uint8), block)
+    image[:block, :strip.size] = strip[None, :, None]
+
+
+def decode_counter(image):
+    """Read back the counter written by encode_counter, also from a scaled frame."""
+    block = image.shape[1] / (COUNTER_BITS + 8)
+    xs = ((np.arange(COUNTER_BITS) + 0.5) * block).astype(int)
+    bits = image[int(block / 2), xs].mean(axis=1) > 127
+    return int(np.dot(bits, 1 << np.arange(COUNTER_BITS - 1, -1, -1, dtype=np.int64)))
+
+
+class GeneratedSource(ABC):
+    """Base of the sources that need no camera or decoder.
+
+    Mirrors the cv2.VideoCapture calls VideoThread makes. With fps > 0,
+    read() blocks until the next frame is due, like a camera; with fps == 0
+    the source is unpaced and frames come as fast as they are read.
+    Subclasses implement render(image, index) and frame_count().
+    """
+    def __init__(self, width, height, fps):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.unpaced = not fps  # VideoThread skips frame pacing for these sources
+        self.index = 0          # Frames delivered so far
+        self.next_time = None
+        self.opened = True
+
+    def frame_count(self):
+        """Return how many frames the source has, or None if it never ends."""
+        return None
+
+    @abstractmethod
+    def render(self, image, index):
+        """Draw frame index of the source into image, a (height, width, 3) BGR array."""
+
+    def isOpened(self):
+        """Return True until release() or the end of a finite source."""
+        if not self.opened:
+            return False
+        count = self.frame_count()
+        return count is None or self.index < count
+
+    def get(self, prop):
+        """Return frame size and fps; other properties read as 0."""
+        return {cv2.CAP_PROP_FRAME_WIDTH: self.width, cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+                cv2.CAP_PROP_FPS: self.fps, cv2.CAP_PROP_POS_FRAMES: self.index}.get(prop, 0.0)
+
+    def set(self, prop, value):
+        """The size is fixed, like a camera that ignores the request."""
+        return False
+
+    def wait_for_frame(self):
+        """Sleep until the next frame is due; a reader that fell behind resyncs."""
+        if self.unpaced:
+            return
+        now = time.monotonic()
+        if self.next_time is None or now - self.next_time > 1.0 / self.fps:
+            self.next_time = now
+        elif self.next_time > now:
+            time.sleep(self.next_time - now)
+        self.next_time += 1.0 / self.fps
+
+    def grab(self):
+        """Skip one frame."""
+        if not self.isOpened():
+            return False
+        self.wait_for_frame()
+        self.index += 1
+        return True
+
+    def read(self, image=None):
+        """Return the next frame, rendered into image when its shape matches."""
+        if not self.isOpened():
+            return False, None
+        self.wait_for_frame()
+        if image is None or image.shape != (self.height, self.width, 3):
+            image = np.empty((self.height, self.width, 3), np.uint8)
+        self.render(image, self.index)
+        self.index += 1
+        return True, image
+
+    def release(self):
+        """Close the source."""
+        self.opened = False
+
+
+class PatternSource(GeneratedSource):
+    """Procedural test pattern: a gradient, a moving bar and the frame counter.
+
+    The counter is encoded with encode_counter so dropped, repeated or
+    reordered frames can be detected on screen or in a recording with
+    decode_counter. Rendering is a copy of a prerendered background plus
+    two small fills, so it costs about as much as a decoder writing a frame.
+    """
+    def __init__(self, width, height, fps=30.0, frames=None):
+        super().__init__(width, height, fps)
+        self.frames = frames
+        self.background = np.empty((height, width, 3), np.uint8)
+        self.background[:, :, 0] = np.linspace(40, 200, height, dtype=np.uint8)[:, None]
+        self.background[:, :, 1] = np.linspace(0, 160, width, dtype=np.uint8)[None, :]
+        self.background[:, :, 2] = 60
+        self.bar_width = max(4, width // 32)
+
+    def frame_count(self):
+        return self.frames
+
+    def render(self, image, index):
+        np.copyto(image, self.background)
+        x = index * self.bar_width // 4 % self.width
+        image[:, x:x + self.bar_width] = 255
+        encode_counter(image, index)
+
+
+class RawReplaySource(GeneratedSource):
+    """Replay of a raw BGR frame file through a read-only memory map.
+
+    Frames are copied straight from the page cache, so replays are
+    deterministic and cost no decoding. fps=None uses the rate stored in the
+    file and 0 replays as fast as possible; loop restarts at the end.
+    Files are written by write_raw() or record_raw().
+    """
+    def __init__(self, path, fps=None, loop=True):
+        with open(path, "rb") as f:
+            magic, width, height, count, file_fps = RAW_HEADER.unpack(f.read(RAW_HEADER.size))
+        if magic != RAW_MAGIC:
+            raise ValueError(f"{path} is not a raw frame file")
+        if not count:
+            raise ValueError(f"{path} holds no frames")
+        super().__init__(width, height, file_fps if fps is None else fps)
+        self.loop = loop
+        self.frames = np.memmap(path, np.uint8, "r", RAW_HEADER_SIZE, (count, height, width, 3))
+
+    def frame_count(self):
+        return None if self.loop else len(self.frames)
+
+    def render(self, image, index):
+        np.copyto(image, self.frames[index % len(self.frames)])
+
+
+def write_raw(path, frames, fps):
+    """Write an iterable of equally sized BGR frames as a raw replay file; returns the count."""
+    count = 0
+    with open(path, "wb") as f:
+        f.write(bytes(RAW_HEADER_SIZE))
+        shape = None
+        for frame in frames:
+            if shape is None:
+                shape = frame.shape
+            elif frame.shape != shape:
+                raise ValueError(f"Frame {count} is {frame.shape}, expected {shape}")
+            f.write(np.ascontiguousarray(frame, np.uint8).tobytes())
+            count += 1
+        height, width = shape[:2] if shape else (0, 0)
+        f.seek(0)
+        f.write(RAW_HEADER.pack(RAW_MAGIC, width, height, count, fps))
+    return count
+
+
+def record_raw(source, path, count, fps=None):
+    """Save count frames of any source as a raw replay file, e.g. a camera or pattern://."""
+    cap = open_source(source)
+    try:
+        fps = fps or cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+        def frames():
+            for _ in range(count):
+                ret, frame = cap.read()
+                if not ret:
+                    return
+                yield frame
+        return write_raw(path, frames(), fps)
+    finally:
+        cap.release()
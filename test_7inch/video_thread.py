@@ -1,38 +1,196 @@
+import time
 import cv2
+import numpy as np
 from PyQt5.QtCore import QThread, pyqtSignal
-from PyQt5.QtGui import QPixmap, QImage
+from frame_pool import FramePool, HAS_BGR888
+from frame_mailbox import FrameMailbox
+from frame_pacer import FramePacer, PACING_DEADLINE
+from video_source import open_source
+from pipeline_stats import READ_START, READ, CONVERT
+from capture_supervisor import CaptureSupervisor, STATE_RECONNECTING, READ_RETRY_DELAY
+from view_transform import fit_size
+from frame_index import FrameIndex
 
 class VideoThread(QThread):
-    """Thread to capture and process video frames from a camera."""
-    frame_updated = pyqtSignal(QPixmap)
-    error_occurred = pyqtSignal(str)
+    """Thread to capture video frames from a camera into pooled buffers."""
+    frame_ready = pyqtSignal()  # A new frame is waiting in the mailbox
+    error_occurred = pyqtSignal(str)  # Emitted once per distinct error
+    state_changed = pyqtSignal(str)   # Capture supervisor state, see capture_supervisor
 
-    def __init__(self, video_source=0):
+    def __init__(self, video_source=0, target_fps=None, pacing=PACING_DEADLINE,
+                 capture_size=None, ffmpeg_options=None):
         super().__init__()
-        self.cap = cv2.VideoCapture(video_source)
+        self.video_source = video_source
+        self.ffmpeg_options = ffmpeg_options
+        self.cap = None             # Opened by run() so reconnects use the same path
+        self.supervisor = CaptureSupervisor()
+        self.pool = FramePool()
+        self.mailbox = FrameMailbox()
+        self.pacer = FramePacer(pacing, target_fps)
+        self.target_size = None     # (w, h) of the display, set by the widget
+        self.interpolation = None   # None picks INTER_AREA/INTER_LINEAR per frame
+        self.raw_buffer = None      # Full-resolution capture buffer when scaling
+        self.capture_size = capture_size  # (w, h) to request from the camera
+        self.replay = None          # ReplayBuffer filled with every captured frame, if any
+        self.frame_id = 0           # Sequence number of the last frame read, never reused
+        self.frame_index = FrameIndex()  # Capture time of every frame read, by frame ID
+        self.detector = None        # ObjectDetector offered every full-resolution capture, if any
+        self.bus = None             # FrameBus every full-resolution capture is published to, if any
         self.running = True
 
+    def frame_shape(self):
+        """Return the (h, w, 3) shape reported by the camera."""
+        w = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 640
+        h = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 480
+        return (h, w, 3)
+
+    def apply_capture_size(self):
+        """Ask the camera to decode at capture_size, e.g. thumbnail resolution."""
+        if self.capture_size and self.cap:
+            w, h = self.capture_size
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, w)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
+
+    def set_target_size(self, width, height):
+        """Set the display size frames are scaled to before they reach the GUI."""
+        self.target_size = (width, height) if width > 0 and height > 0 else None
+
+    def output_shape(self, shape):
+        """Return the pooled buffer shape for a capture of the given shape."""
+        if self.target_size is None:
+            return shape
+        w, h = fit_size(shape[1], shape[0], *self.target_size)
+        return (h, w, 3)
+
+    def scale_into(self, data, frame):
+        """Resize a captured frame into a pooled buffer."""
+        h, w, _ = frame.array.shape
+        interpolation = self.interpolation
+        if interpolation is None:
+            interpolation = cv2.INTER_AREA if w < data.shape[1] else cv2.INTER_LINEAR
+        cv2.resize(data, (w, h), dst=frame.array, interpolation=interpolation)
+
+    def set_state(self, state):
+        """Forward a supervisor transition to the GUI; None means no change."""
+        if state:
+            self.state_changed.emit(state)
+
+    def report_error(self, message):
+        """Emit message unless it repeats the last error."""
+        if self.supervisor.report_error(message):
+            self.error_occurred.emit(message)
+
+    def sleep_while_running(self, seconds):
+        """Sleep in short steps so stop() is not held up by a long backoff."""
+        deadline = time.monotonic() + seconds
+        while self.running and time.monotonic() < deadline:
+            self.msleep(max(1, int(min(0.05, deadline - time.monotonic()) * 1000)))
+
+    def reopen(self):
+        """Close the capture, wait out the backoff and open the source again.
+
+        Returns the frame shape of the opened source, or None if it is still unavailable.
+        """
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+            if not self.supervisor.should_reopen():
+                # The source closed itself instead of timing out on reads
+                self.report_error("Camera disconnected")
+                self.set_state(self.supervisor.transition(STATE_RECONNECTING))
+        self.sleep_while_running(self.supervisor.next_delay())
+        if not self.running:
+            return None
+        try:
+            cap = open_source(self.video_source, self.ffmpeg_options)
+        except (OSError, ValueError) as e:
+            self.report_error(f"Video source could not be opened: {str(e)}")
+            self.set_state(self.supervisor.open_failed())
+            return None
+        if not cap.isOpened():
+            cap.release()
+            self.report_error("Camera not found or could not be opened")
+            self.set_state(self.supervisor.open_failed())
+            return None
+        self.cap = cap
+        self.apply_capture_size()
+        self.set_state(self.supervisor.opened())
+        self.pacer.start(self.cap.get(cv2.CAP_PROP_FPS), getattr(self.cap, "unpaced", False))
+        return self.frame_shape()
+
     def run(self):
-        """Capture video frames and emit them as QPixmap."""
+        """Capture video frames and emit them as pooled QImage buffers."""
+        shape = None
         while self.running:
-            if not self.cap or not self.cap.isOpened():
-                self.error_occurred.emit("Camera disconnected")
-                self.frame_updated.emit(QPixmap())
-                break
-            ret, frame = self.cap.read()
-            if not ret or frame is None:
-                self.error_occurred.emit("Failed to read frame")
-                self.frame_updated.emit(QPixmap())
+            if not self.cap or not self.cap.isOpened() or self.supervisor.should_reopen():
+                shape = self.reopen()
                 continue
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = frame.shape
-            image = QImage(frame.data, w, h, ch * w, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(image)
-            self.frame_updated.emit(pixmap)
-            self.msleep(30) # điều chỉnh frame
+            out_shape = self.output_shape(shape)
+            frame = self.pool.acquire(out_shape)
+            if frame is None:
+                # The GUI still holds every buffer: drop this frame.
+                if self.cap.grab():
+                    self.mailbox.note_dropped()
+                else:
+                    self.sleep_while_running(READ_RETRY_DELAY)  # No frame to drop
+                continue
+            if out_shape == shape:
+                target = frame.array
+            else:
+                if self.raw_buffer is None or self.raw_buffer.shape != shape:
+                    self.raw_buffer = np.empty(shape, np.uint8)
+                target = self.raw_buffer
+            read_start = time.monotonic()
+            ret, data = self.cap.read(target)
+            captured_at = time.monotonic()
+            if not ret or data is None:
+                frame.release()
+                self.report_error("Failed to read frame")
+                self.set_state(self.supervisor.read_failed(captured_at))
+                if not self.supervisor.should_reopen():
+                    self.sleep_while_running(READ_RETRY_DELAY)
+                continue
+            self.set_state(self.supervisor.frame_read())
+            self.frame_id += 1
+            self.frame_index.add(self.frame_id, captured_at)
+            if data.shape != shape:
+                # Camera resolution changed: reallocate once and keep going.
+                frame.release()
+                shape = data.shape
+                frame = self.pool.acquire(self.output_shape(shape))
+            if data is not frame.array:
+                if data.shape == frame.array.shape:
+                    np.copyto(frame.array, data)
+                else:
+                    self.scale_into(data, frame)
+            replay = self.replay
+            if replay is not None:
+                replay.write(frame.array, captured_at, data)
+            detector = self.detector
+            if detector is not None:
+                detector.offer(data, captured_at, self.frame_id)
+            bus = self.bus
+            if bus is not None:
+                bus.publish(data, captured_at, self.frame_id)
+            if not HAS_BGR888:
+                cv2.cvtColor(frame.array, cv2.COLOR_BGR2RGB, dst=frame.array)
+            frame.frame_id = self.frame_id
+            frame.sensor_size = (data.shape[1], data.shape[0])
+            stamps = frame.stamps
+            stamps[READ_START] = read_start
+            stamps[READ] = captured_at
+            stamps[CONVERT] = time.monotonic()
+            if self.mailbox.post(frame):
+                self.frame_ready.emit()
+            self.pacer.frame_captured(captured_at)
+            delay = self.pacer.remaining()
+            if delay > 0:
+                self.usleep(int(delay * 1e6))
+        if self.cap:
+            self.cap.release()
 
     def stop(self):
         """Stop the video thread and release the camera."""
         self.running = False
         if self.cap:
-            self.cap.release()
\ No newline at end of file
+            self.cap.release()
@@ -1,43 +1,247 @@
+import os
+import time
+import cv2
+import numpy as np
+from PyQt5 import sip
 from PyQt5.QtWidgets import QWidget
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPainter, QPen, QColor, QFont, QPixmap
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QPainter, QPen, QColor, QFont, QFontDatabase, QImage, QPixmap, QRegion
 from video_thread import VideoThread
+from frame_pool import FRAME_FORMAT, HAS_BGR888
+from frame_pacer import PACING_DEADLINE
+from mil_reticle import MilReticle, DEFAULT_FOV_BY_ZOOM
+from capture_supervisor import STATE_CONNECTING, STATE_RECONNECTING
+from pipeline_stats import PipelineStats, new_stamps, READ, TAKE, UPLOAD, SCALE, PAINT
+from video_recorder import telemetry_caption
+from box_predictor import BoxPredictor
+from view_transform import ViewTransform
+
+BACKEND_RASTER = "raster"  # QPainter on a raster QWidget
+BACKEND_OPENGL = "opengl"  # Persistent texture on a QOpenGLWidget
+# Backend used when none is passed, e.g. VIDEO_BACKEND=opengl LIBGL_ALWAYS_SOFTWARE=1
+DEFAULT_BACKEND = os.environ.get("VIDEO_BACKEND", BACKEND_RASTER)
+# PIPELINE_HUD=1 shows the per-stage timing overlay from the start
+DEFAULT_HUD = os.environ.get("PIPELINE_HUD", "") == "1"
+HUD_FONT_SIZE = 11
 
 class VideoWidget(QWidget):
     """Widget to display video stream with a red crosshair and optional bounding box."""
-    def __init__(self, parent=None, video_source=0, day_mode=True):
+    recording_failed = pyqtSignal(str)  # The recorder stopped taking frames, with why
+    def __init__(self, parent=None, video_source=0, day_mode=True,
+                 target_fps=None, pacing=PACING_DEADLINE, backend=None,
+                 fov_by_zoom=None, capture_size=None, ffmpeg_options=None):
         super().__init__(parent)
         self.day_mode = day_mode
         self.pixmap = None
         self.bounding_box = None
         self.error_message = ""
-        self.video_thread = VideoThread(video_source)
-        self.video_thread.frame_updated.connect(self.set_pixmap)
+        self.capture_state = STATE_CONNECTING
+        self.fov_by_zoom = dict(fov_by_zoom or DEFAULT_FOV_BY_ZOOM)
+        self.zoom_level = min(self.fov_by_zoom)
+        self.reticle = MilReticle()
+        self.surface = None
+        self.pipeline = PipelineStats()  # Per-stage timestamps of displayed frames
+        self.stamps = new_stamps()       # Timestamps of the frame being painted
+        self.stamps_pending = False      # A frame was taken but not yet committed
+        self.hud_visible = DEFAULT_HUD
+        self.hud_rows = []
+        self.hud_font = QFontDatabase.systemFont(QFontDatabase.FixedFont)
+        self.hud_font.setPixelSize(HUD_FONT_SIZE)
+        self.recorder = None             # VideoRecorder fed with every displayed frame
+        self.recording_telemetry = None  # Callable returning the telemetry dict to record
+        self.replay_position = None      # Replay frame shown instead of live video, if frozen
+        self.box_predictor = BoxPredictor()  # Moves the box to each frame's capture time
+        self.frame_time = None           # Capture time of the frame on screen
+        self.frame_id = None             # Capture sequence number of the frame on screen
+        self.detector = None             # ObjectDetector fed with this feed's captures
+        self.sensor_size = None          # (w, h) of the captures, before any scaling
+        self.view = ViewTransform()      # Sensor pixels to widget pixels for the overlays
+        self.record_view = ViewTransform()  # Sensor pixels to recorded frame pixels
+        if (backend or DEFAULT_BACKEND) == BACKEND_OPENGL:
+            from gl_video_surface import GLVideoSurface
+            self.surface = GLVideoSurface(self)
+        self.video_thread = VideoThread(video_source, target_fps, pacing, capture_size,
+                                        ffmpeg_options)
+        self.frame_index = self.video_thread.frame_index  # Filled at capture, for detections
+        self.video_thread.frame_ready.connect(self.update)
         self.video_thread.error_occurred.connect(self.set_error_message)
+        self.video_thread.state_changed.connect(self.set_capture_state)
         self.video_thread.start()
 
+    def update(self, *args):
+        """Schedule a repaint on whichever backend draws the video."""
+        if self.surface:
+            self.surface.update(*args)
+        else:
+            super().update(*args)
+
     def set_day_mode(self, day_mode):
         """Set day or night mode for display."""
         self.day_mode = day_mode
         self.update()
 
+    def set_zoom_level(self, zoom_level):
+        """Switch the lens zoom level; its reticle is already pre-rendered."""
+        if zoom_level in self.fov_by_zoom and zoom_level != self.zoom_level:
+            self.zoom_level = zoom_level
+            self.update()
+
+    def set_target_fps(self, target_fps):
+        """Set the capture rate; None follows the camera's CAP_PROP_FPS."""
+        if self.video_thread:
+            self.video_thread.pacer.set_target_fps(target_fps)
+
     def set_error_message(self, message):
         """Set error message to display when video fails."""
         self.error_message = message
         self.pixmap = None
         self.update()
 
-    def set_bounding_box(self, bounding_box):
-        """Set bounding box coordinates for display."""
-        if bounding_box:
-            self.bounding_box = (
-                bounding_box["x"],
-                bounding_box["y"],
-                bounding_box["w"],
-                bounding_box["h"]
-            )
+    def set_capture_state(self, state):
+        """Track the capture supervisor state; the last frame is dropped while reconnecting."""
+        self.capture_state = state
+        if state == STATE_RECONNECTING:
+            self.pixmap = None
+        self.update()
+
+    def set_hud_visible(self, visible):
+        """Show or hide the pipeline timing HUD."""
+        self.hud_visible = visible
+        self.hud_rows = self.hud_table() if visible else []
+        self.update()
+
+    def toggle_hud(self):
+        """Flip the pipeline timing HUD."""
+        self.set_hud_visible(not self.hud_visible)
+
+    def set_recorder(self, recorder, telemetry=None):
+        """Feed displayed frames to recorder (None stops); telemetry() is stored with each."""
+        self.recorder = recorder
+        self.recording_telemetry = telemetry
+
+    def set_detector(self, detector):
+        """Run detector (an ObjectDetector, None: none) on this feed and follow its boxes."""
+        if self.detector:
+            self.detector.detection_ready.disconnect(self.set_detection)
+        self.detector = detector
+        self.video_thread.detector = detector
+        if detector:
+            detector.detection_ready.connect(self.set_detection)
+
+    def set_detection(self, detection):
+        """Follow a detector box given in sensor pixels; None means the target was lost."""
+        if detection is None:
+            self.set_bounding_box(None)
+            return
+        self.set_bounding_box(detection, detection["captured_at"])
+
+    def set_frame_bus(self, bus):
+        """Publish this feed's captures to bus, a FrameBus other processes read (None: stop)."""
+        self.video_thread.bus = bus
+
+    def set_replay_buffer(self, replay):
+        """Keep the last seconds of this feed in replay, a ReplayBuffer (None: none)."""
+        self.unfreeze()
+        self.video_thread.replay = replay
+
+    def is_frozen(self):
+        """Return True while a replay frame is shown instead of live video."""
+        return self.replay_position is not None
+
+    def freeze(self):
+        """Hold the replay window and show its newest frame; capture keeps running.
+
+        Returns False if the feed has no replay buffer or nothing stored yet.
+        """
+        replay = self.video_thread.replay
+        if replay is None or self.is_frozen():
+            return False
+        replay.hold()
+        if not len(replay):
+            replay.release()
+            return False
+        self.show_replay(len(replay) - 1)
+        return True
+
+    def unfreeze(self):
+        """Go back to live video and let the replay window move on."""
+        if not self.is_frozen():
+            return
+        self.video_thread.replay.unpin(self.replay_position)
+        self.replay_position = None
+        self.video_thread.replay.release()
+        self.update()
+
+    def step_replay(self, frames):
+        """Move the frozen view by a number of stored frames, negative is back in time."""
+        if self.is_frozen():
+            self.show_replay(self.replay_position + frames)
+
+    def show_replay(self, position):
+        """Display a stored frame, clamped to the frames still stored, and pin it.
+
+        The pin keeps this frame and the newer ones to step through while
+        recording overwrites the older part of the held window.
+        """
+        replay = self.video_thread.replay
+        position = replay.pin(position)
+        if self.replay_position is not None:
+            replay.unpin(self.replay_position)
+        self.replay_position = position
+        array, _ = replay.frame(position)
+        if not HAS_BGR888:
+            array = cv2.cvtColor(array, cv2.COLOR_BGR2RGB)
+        if self.surface:
+            # The ring slot may be rewritten once unpinned, before paintGL uploads it
+            self.surface.queue_upload(array.copy())
         else:
-            self.bounding_box = None
+            h, w, _ = array.shape
+            image = QImage(array.data, w, h, array.strides[0], FRAME_FORMAT)
+            self.pixmap = QPixmap.fromImage(image).scaled(self.size(), Qt.KeepAspectRatio,
+                                                          Qt.SmoothTransformation)
+        self.update_view()
+        self.update()
+
+    def set_bounding_box(self, bounding_box, sample_time=None):
+        """Add a telemetry box sample, in sensor pixels, and repaint only the overlay that moved.
+
+        sample_time is the time.monotonic() the box was observed at. A box
+        with a "frame_id" key was computed on that frame, whose capture time
+        is used instead while it is still in the frame index. The box is
+        drawn where the predictor puts it at each frame's capture time.
+        """
+        old_region = self.overlay_region()
+        now = time.monotonic()
+        sample_time = now if sample_time is None else sample_time
+        box = None
+        if bounding_box:
+            box = (bounding_box["x"], bounding_box["y"], bounding_box["w"], bounding_box["h"])
+            sample_time = self.detection_time(bounding_box, sample_time)
+        self.box_predictor.update(box, sample_time)
+        self.bounding_box = self.box_predictor.predict(self.frame_time or now)
+        self.update(old_region.united(self.overlay_region()))
+
+    def detection_time(self, bounding_box, sample_time):
+        """Return when a detection was captured and log how far it trails the screen.
+
+        Only boxes tagged with an indexed frame_id are logged; telemetry
+        boxes keep sample_time, which is not a capture time.
+        """
+        frame_id = bounding_box.get("frame_id")
+        if frame_id is None:
+            return sample_time
+        captured_at = self.frame_index.capture_time(frame_id)
+        if captured_at is None:
+            self.frame_index.unmatched += 1
+            return sample_time
+        if self.frame_time is not None:
+            self.frame_index.record_detection(captured_at, self.frame_time,
+                                              frame_id, self.frame_id)
+        return captured_at
+
+    def set_box_prediction(self, mode):
+        """Switch how the box follows the telemetry, see box_predictor.MODES."""
+        self.box_predictor.set_mode(mode)
         self.update()
 
     def set_pixmap(self, pixmap):
@@ -47,71 +251,247 @@ class VideoWidget(QWidget):
         else:
             self.pixmap = pixmap.scaled(self.size(), Qt.KeepAspectRatio)
         self.error_message = ""
+        self.update_view()
         self.update()
 
+    def take_frame(self):
+        """Pull the newest frame from the capture mailbox into self.pixmap or the GL texture."""
+        frame = self.video_thread.mailbox.take()
+        if frame is None:
+            return
+        if self.is_frozen():
+            # Live frames keep flowing, and recording, while a replay frame is shown
+            if self.recorder:
+                self.record_frame(frame)
+            frame.release()
+            return
+        stamps = self.stamps
+        stamps[:] = frame.stamps  # The buffer goes back to the worker before painting ends
+        stamps[TAKE] = time.monotonic()
+        self.stamps_pending = True
+        self.frame_time = stamps[READ]
+        self.frame_id = frame.frame_id
+        self.sensor_size = frame.sensor_size
+        self.bounding_box = self.box_predictor.predict(self.frame_time)
+        if self.recorder:
+            self.record_frame(frame)
+        if self.surface:
+            try:
+                self.surface.upload(frame.array)
+            finally:
+                frame.release()
+            stamps[UPLOAD] = stamps[SCALE] = time.monotonic()
+            self.pixmap = None
+            self.error_message = ""
+            self.update_view()
+            return
+        try:
+            pixmap = QPixmap.fromImage(frame.image)
+        finally:
+            frame.release()
+        stamps[UPLOAD] = time.monotonic()
+        # Frames already fitted by the worker are blitted as-is.
+        if pixmap.size() != pixmap.size().scaled(self.size(), Qt.KeepAspectRatio):
+            pixmap = pixmap.scaled(self.size(), Qt.KeepAspectRatio)
+        stamps[SCALE] = time.monotonic()
+        self.pixmap = pixmap
+        self.error_message = ""
+        self.update_view()
+
+    def update_view(self):
+        """Refresh the overlay transform; only a new frame or widget size rebuilds it."""
+        size = self.display_size()
+        display_size = (size.width(), size.height()) if size else None
+        if self.view.update(self.sensor_size, display_size, (self.width(), self.height())):
+            # The mil scale spans the displayed image, not the letterboxed widget
+            self.reticle.prerender(self.view.rect.width(), self.fov_by_zoom.values())
+
+    def record_frame(self, frame):
+        """Copy a frame into a recorder slot, compositing the overlay if the recorder asks."""
+        acquired = self.recorder.acquire(frame.array.shape)
+        if acquired is None:
+            if self.recorder.error:
+                self.recording_failed.emit(self.recorder.error)
+            return
+        slot, array = acquired
+        np.copyto(array, frame.array)
+        telemetry = self.recording_telemetry() if self.recording_telemetry else {}
+        if self.recorder.overlay:
+            self.paint_recording_overlay(array, telemetry)
+        self.recorder.submit(slot, array.shape, frame.stamps[READ], telemetry,
+                             rgb=not HAS_BGR888, frame_id=frame.frame_id)
+
+    def paint_recording_overlay(self, array, telemetry):
+        """Draw the crosshair, mil markers and telemetry into a recorded frame."""
+        h, w, _ = array.shape
+        # A writable pointer, so QPainter draws into the slot instead of a detached copy
+        image = QImage(sip.voidptr(array.ctypes.data), w, h, array.strides[0], FRAME_FORMAT)
+        painter = QPainter(image)
+        try:
+            # The recorded frame is the whole sensor image, without letterbox
+            self.record_view.update(self.sensor_size, (w, h), (w, h))
+            self.paint_overlay(painter, hud=False, view=self.record_view)
+            caption = telemetry_caption(telemetry)
+            if caption:
+                painter.setFont(self.hud_font)
+                painter.setPen(Qt.yellow)
+                painter.drawText(4, h - 4, caption)
+        finally:
+            painter.end()
+
+    def finish_frame(self):
+        """Record the paint timestamp of the frame taken this pass, if any."""
+        if not self.stamps_pending:
+            return
+        self.stamps[PAINT] = time.monotonic()
+        self.stamps_pending = False
+        self.pipeline.commit(self.stamps)
+        if self.hud_visible:
+            self.hud_rows = self.hud_table()
+
+    def resizeEvent(self, event):
+        """Publish the new display size so the worker scales frames to fit."""
+        if self.video_thread:
+            self.video_thread.set_target_size(self.width(), self.height())
+        if self.surface:
+            self.surface.setGeometry(self.rect())
+        self.update_view()
+        if self.is_frozen():
+            self.show_replay(self.replay_position)
+        super().resizeEvent(event)
+
+    def display_size(self):
+        """Return the on-screen size of the current frame, or None."""
+        if self.surface:
+            return self.surface.display_size()
+        return self.pixmap.size() if self.pixmap else None
+
+    def frame_stats(self):
+        """Return produced/displayed/dropped frame counters."""
+        return self.video_thread.mailbox.stats()
+
     def paintEvent(self, event):
         """Paint the video frame, crosshair, and mil markers."""
+        if self.surface:
+            return  # The OpenGL surface paints everything
         painter = QPainter(self)
-        widget_size = self.size()
 
         try:
+            # Partial repaints (overlay moves) keep the current frame to avoid tearing.
+            if self.visibleRegion().subtracted(event.region()).isEmpty():
+                self.take_frame()
             if self.pixmap and not self.error_message:
-                pixmap_rect = self.pixmap.rect()
-                pixmap_rect.moveCenter(self.rect().center())
-                painter.drawPixmap(pixmap_rect, self.pixmap)
+                painter.drawPixmap(self.view.rect, self.pixmap)
             else:
-                painter.fillRect(0, 0, widget_size.width(), widget_size.height(), QColor(0, 0, 0))
-                if self.error_message:
-                    painter.setPen(QPen(Qt.red, 2))
-                    painter.setFont(QFont('Arial', 16))
-                    painter.drawText(self.rect(), Qt.AlignCenter, self.error_message)
-
-            center_x = widget_size.width() // 2
-            center_y = widget_size.height() // 2
-            cross_length = 20
-
-            if self.bounding_box:
-                x, y, w, h = self.bounding_box
-                center_x = x + w // 2
-                center_y = y + h // 2
-                scale_x = widget_size.width() / self.pixmap.width() if self.pixmap else 1
-                scale_y = widget_size.height() / self.pixmap.height() if self.pixmap else 1
-                center_x = int(center_x * scale_x)
-                center_y = int(center_y * scale_y)
-                cross_length = max(10, min(30, (w + h) // 4))
-
-            # Draw red crosshair
-            painter.setPen(QPen(Qt.red, 3))
-            painter.drawLine(center_x - cross_length // 2, center_y, center_x + cross_length // 2, center_y)
-            painter.drawLine(center_x, center_y - cross_length // 2, center_x, center_y + cross_length // 2)
-
-            # Draw mil markers
-            text_color = Qt.red
-            painter.setPen(QPen(text_color, 1))
-            painter.setFont(QFont('Arial', 8))
-            width = self.width()
-            fov_mil = 349
-            pixel_per_mil = width / fov_mil
-            major_tick_mil = 10
-            minor_tick_mil = 1
-            label_mil = 50
-            major_tick_length = 8
-            minor_tick_length = 4
-            for mil in range(-200, 201, minor_tick_mil):
-                x = int(center_x + mil * pixel_per_mil)
-                if x < 0 or x > width:
-                    continue
-                if mil % major_tick_mil == 0:
-                    painter.drawLine(x, 0, x, major_tick_length)
-                    if mil % label_mil == 0:
-                        painter.drawText(x - 12, major_tick_length + 12, str(mil))
-                else:
-                    painter.drawLine(x, 0, x, minor_tick_length)
-
+                self.paint_background(painter)
+            self.paint_overlay(painter)
+            self.finish_frame()
         except Exception as e:
             print(f"Error in paintEvent: {str(e)}")
 
+    def paint_background(self, painter):
+        """Fill the video area with black and show any error message."""
+        widget_size = self.size()
+        painter.fillRect(0, 0, widget_size.width(), widget_size.height(), QColor(0, 0, 0))
+        message = self.error_message
+        if self.capture_state == STATE_RECONNECTING:
+            message = "\n".join(filter(None, [message, "Reconnecting..."]))
+        if message:
+            painter.setPen(QPen(Qt.red, 2))
+            painter.setFont(QFont('Arial', 16))
+            painter.drawText(self.rect(), Qt.AlignCenter, message)
+
+    def crosshair_geometry(self, view=None):
+        """Return (center_x, center_y, cross_length) of the crosshair in view pixels.
+
+        view is the ViewTransform to draw through, the widget's by default.
+        """
+        view = view or self.view
+        center = view.rect.center()
+        center_x = center.x()
+        center_y = center.y()
+        cross_length = 20
+
+        if self.bounding_box:
+            x, y, w, h = view.map_box(self.bounding_box)
+            center_x = x + w // 2
+            center_y = y + h // 2
+            cross_length = max(10, min(30, (w + h) // 4))
+        return center_x, center_y, cross_length
+
+    def overlay_region(self, view=None):
+        """Return the region covered by the crosshair and the mil scale that follows it."""
+        view = view or self.view
+        center_x, center_y, cross_length = self.crosshair_geometry(view)
+        half = cross_length // 2 + 3  # Pen width and antialiasing margin
+        region = QRegion(center_x - half, center_y - half, half * 2 + 1, half * 2 + 1)
+        reticle, origin = self.reticle.get(view.rect.width(), self.fov_by_zoom[self.zoom_level])
+        return region.united(QRegion(center_x - origin, view.rect.top(),
+                                     reticle.width(), reticle.height()))
+
+    def paint_overlay(self, painter, hud=True, view=None):
+        """Draw the crosshair and mil markers over the video, and the HUD if shown."""
+        view = view or self.view
+        center_x, center_y, cross_length = self.crosshair_geometry(view)
+
+        # Draw red crosshair
+        painter.setPen(QPen(Qt.red, 3))
+        painter.drawLine(center_x - cross_length // 2, center_y, center_x + cross_length // 2, center_y)
+        painter.drawLine(center_x, center_y - cross_length // 2, center_x, center_y + cross_length // 2)
+
+        # Draw mil markers
+        self.reticle.draw(painter, center_x, view.rect.width(),
+                          self.fov_by_zoom[self.zoom_level], view.rect.top())
+        if hud and self.hud_visible:
+            self.paint_hud(painter)
+        if hud and self.is_frozen():
+            self.paint_replay_label(painter)
+
+    def paint_replay_label(self, painter):
+        """Mark the frozen view with its age, its position in the replay window and a full buffer."""
+        replay = self.video_thread.replay
+        text = (f"REPLAY  -{replay.age(self.replay_position):.2f} s  "
+                f"{self.replay_position + 1}/{len(replay)}")
+        if replay.stalled:
+            text += "  BUFFER FULL"  # Live frames are dropped until the view moves on
+        painter.setFont(self.hud_font)
+        metrics = painter.fontMetrics()
+        painter.fillRect(0, 0, metrics.horizontalAdvance(text) + 8, metrics.height() + 4,
+                         QColor(0, 0, 0, 160))
+        painter.setPen(Qt.yellow)
+        painter.drawText(4, 2 + metrics.ascent(), text)
+
+    def hud_table(self):
+        """Return the HUD rows: stage timings, box prediction error in px, detection lag in ms."""
+        rows = self.pipeline.hud_rows() + [self.box_predictor.hud_row(),
+                                           self.frame_index.hud_row()]
+        if self.detector:
+            rows.append(self.detector.hud_row())
+        return rows
+
+    def paint_hud(self, painter):
+        """Draw the pipeline timing summary in the bottom-left corner."""
+        if not self.hud_rows:
+            return
+        painter.setFont(self.hud_font)
+        metrics = painter.fontMetrics()
+        line_height = metrics.height()
+        label_width = max(metrics.horizontalAdvance(row[0]) for row in self.hud_rows) + 4
+        cell_width = metrics.horizontalAdvance("000.00") + 4
+        width = label_width + cell_width * (len(self.hud_rows[0]) - 1)
+        top = self.height() - line_height * len(self.hud_rows) - 6
+        painter.fillRect(0, top - 2, width + 8, line_height * len(self.hud_rows) + 4,
+                         QColor(0, 0, 0, 160))
+        painter.setPen(Qt.green)
+        for index, row in enumerate(self.hud_rows):
+            y = top + index * line_height
+            painter.drawText(4, y, label_width, line_height, Qt.AlignLeft, row[0])
+            for column, cell in enumerate(row[1:]):
+                painter.drawText(4 + label_width + column * cell_width, y, cell_width,
+                                 line_height, Qt.AlignRight, cell)
+
     def closeEvent(self, event):
         """Stop the video thread when closing."""
         self.video_thread.stop()
+        self.video_thread.mailbox.clear()
         super().closeEvent(event)
\ No newline at end of file
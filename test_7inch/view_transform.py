@@ -0,0 +1,82 @@
+import numpy as np
+from PyQt5.QtCore import QRect
+
+
+def fit_size(src_w, src_h, dst_w, dst_h):
+    """Return the (w, h) of src scaled into dst with Qt.KeepAspectRatio rounding."""
+    rw = src_w * dst_h // src_h
+    if rw <= dst_w:
+        return max(1, rw), max(1, dst_h)
+    return max(1, dst_w), max(1, src_h * dst_w // src_w)
+
+
+class ViewTransform:
+    """Mapping from sensor pixels to the displayed image and the widget.
+
+    The displayed image is the sensor frame scaled to display_size and
+    centered in the widget, letterboxed when the aspect ratios differ, so a
+    sensor point p is drawn at p * scale + offset. rect is where the image
+    is painted. update() is cheap to call every frame: the mapping is only
+    recomputed when the sensor, display or widget size changes. Until the
+    sizes are known, sensor pixels are widget pixels.
+    """
+    def __init__(self):
+        self.sizes = None               # (sensor, display, widget) the mapping was built for
+        self.sensor_size = None         # (w, h) of the capture, None until known
+        self.rect = QRect()             # Displayed image in widget pixels
+        self.scale_x = self.scale_y = 1.0
+        self.offset_x = self.offset_y = 0
+        self.factors = np.ones(4)       # Per-column box scale for map_boxes
+        self.shift = np.zeros(4)        # Per-column box offset for map_boxes
+
+    def update(self, sensor_size, display_size, widget_size):
+        """Rebuild the mapping if any (w, h) changed; None sizes fall back to the widget.
+
+        Returns True if the mapping changed.
+        """
+        sizes = (sensor_size, display_size, widget_size)
+        if sizes == self.sizes:
+            return False
+        self.sizes = sizes
+        display_size = display_size or widget_size
+        sensor_size = sensor_size or display_size
+        self.sensor_size = sizes[0]
+        rect = QRect(0, 0, *display_size)
+        rect.moveCenter(QRect(0, 0, *widget_size).center())  # As the frame is painted
+        self.rect = rect
+        self.scale_x = display_size[0] / sensor_size[0]
+        self.scale_y = display_size[1] / sensor_size[1]
+        self.offset_x = rect.left()
+        self.offset_y = rect.top()
+        self.factors = np.array([self.scale_x, self.scale_y, self.scale_x, self.scale_y])
+        self.shift = np.array([self.offset_x, self.offset_y, 0, 0])
+        return True
+
+    def map_point(self, x, y):
+        """Return the widget pixel of sensor point (x, y)."""
+        return (int(round(x * self.scale_x + self.offset_x)),
+                int(round(y * self.scale_y + self.offset_y)))
+
+    def map_box(self, box):
+        """Return the widget (x, y, w, h) of a sensor box."""
+        x, y, w, h = box
+        return (int(round(x * self.scale_x + self.offset_x)),
+                int(round(y * self.scale_y + self.offset_y)),
+                int(round(w * self.scale_x)), int(round(h * self.scale_y)))
+
+    def map_boxes(self, boxes):
+        """Return the widget (x, y, w, h) rows of an (N, 4) array of sensor boxes."""
+        return np.rint(np.asarray(boxes, float) * self.factors + self.shift).astype(int)
+
+    def unmap_point(self, x, y):
+        """Return the sensor point under widget pixel (x, y)."""
+        return (x - self.offset_x) / self.scale_x, (y - self.offset_y) / self.scale_y
+
+    def contains_box(self, box):
+        """Return True if a sensor box lies inside the sensor frame, or the frame is unknown."""
+        x, y, w, h = box
+        if x < 0 or y < 0 or w <= 0 or h <= 0:
+            return False
+        if self.sensor_size is None:
+            return True
+        return x + w <= self.sensor_size[0] and y + h <= self.sensor_size[1]